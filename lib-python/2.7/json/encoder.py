@@ -206,6 +206,21 @@ class JSONEncoder(object):
         '{"foo": ["bar", "baz"]}'
 
         """
+        if type(self).iterencode.im_func is not _iterencode_func:
+            # a subclass overrides iterencode(): use it, like CPython
+            chunks = self.iterencode(o, _one_shot=True)
+            if not isinstance(chunks, (list, tuple)):
+                chunks = list(chunks)
+            return ''.join(chunks)
+        if (_pypyjson_encode is not None and self.ensure_ascii and
+                self.encoding == 'utf-8' and FLOAT_REPR is repr and
+                type(self.item_separator) is str and
+                type(self.key_separator) is str and
+                (self.indent is None or isinstance(self.indent, (int, long)))):
+            return _pypyjson_encode(o, self.default, self.skipkeys,
+                                    self.check_circular, self.allow_nan,
+                                    self.sort_keys, self.indent,
+                                    self.item_separator, self.key_separator)
         if self.check_circular:
             markers = {}
         else:
@@ -531,8 +546,14 @@ class JSONEncoder(object):
             self.__remove_markers(markers, o)
 
 
+_iterencode_func = JSONEncoder.iterencode.im_func
+
 # overwrite some helpers here with more efficient versions
 try:
     from _pypyjson import raw_encode_basestring_ascii
 except ImportError:
     pass
+try:
+    from _pypyjson import encode as _pypyjson_encode
+except ImportError:
+    _pypyjson_encode = None
@@ -225,6 +225,15 @@ class _socketobject(object):
             return self._sock.sendto(data, param2, param3)
     sendto.__doc__ = _realsocket.sendto.__doc__
 
+    if hasattr(_realsocket, 'recvmmsg_into'):
+        def recvmmsg_into(self, buffers, flags=0):
+            return self._sock.recvmmsg_into(buffers, flags)
+        recvmmsg_into.__doc__ = _realsocket.recvmmsg_into.__doc__
+
+        def sendmmsg(self, buffers, flags=0, addresses=None):
+            return self._sock.sendmmsg(buffers, flags, addresses)
+        sendmmsg.__doc__ = _realsocket.sendmmsg.__doc__
+
     def close(self):
         s = self._sock
         self._sock = _closedsocket()
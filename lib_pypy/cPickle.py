@@ -598,3 +598,98 @@ def load(f):
 def loads(str):
     f = StringIO(str)
     return Unpickler(f).load()
+
+# ____________________________________________________________
+# When the _cpickle module is available, the common cases are done at
+# interp-level, and it only calls back the methods below for the rare ones
+
+try:
+    import _cpickle
+except ImportError:
+    pass
+else:
+    from pickle import whichmodule as _whichmodule
+
+    class Pickler(_cpickle.Pickler):
+        __doc__ = PythonPickler.__doc__
+
+        def save_inst(self, obj):
+            # no _keep_alive() here: the memo keeps the objects alive
+            cls = obj.__class__
+            if hasattr(obj, '__getinitargs__'):
+                args = obj.__getinitargs__()
+                len(args) # XXX Assert it's a sequence
+            else:
+                args = ()
+            self.write(chr(MARK))
+            if self.bin:
+                self.save(cls)
+                for arg in args:
+                    self.save(arg)
+                self.write(chr(OBJ))
+            else:
+                for arg in args:
+                    self.save(arg)
+                self.write('%c%s\n%s\n' % (INST, cls.__module__,
+                                           cls.__name__))
+            self.memoize(obj)
+            try:
+                getstate = obj.__getstate__
+            except AttributeError:
+                stuff = obj.__dict__
+            else:
+                stuff = getstate()
+            self.save(stuff)
+            self.write(chr(BUILD))
+
+        def whichmodule(self, obj, name):
+            return _whichmodule(obj, name)
+
+    PythonUnpickler = Unpickler
+    class Unpickler(_cpickle.Unpickler):
+        __doc__ = PythonUnpickler.__init__.__doc__
+
+        find_class = PythonUnpickler.find_class.im_func
+
+        def _instantiate(self, klass, args):
+            if (not args and
+                    type(klass) is ClassType and
+                    not hasattr(klass, "__getinitargs__")):
+                value = _EmptyClass()
+                value.__class__ = klass
+                return value
+            try:
+                return klass(*args)
+            except TypeError, err:
+                raise TypeError, "in constructor for %s: %s" % (
+                    klass.__name__, str(err)), sys.exc_info()[2]
+
+        def get_extension(self, code):
+            nil = []
+            obj = _extension_cache.get(code, nil)
+            if obj is not nil:
+                return obj
+            key = _inverted_registry.get(code)
+            if not key:
+                raise ValueError("unregistered extension code %d" % code)
+            obj = self.find_class(*key)
+            _extension_cache[code] = obj
+            return obj
+
+    @builtinify
+    def dump(obj, file, protocol=None):
+        Pickler(file, protocol).dump(obj)
+
+    @builtinify
+    def dumps(obj, protocol=None):
+        pickler = Pickler(protocol or 0)
+        pickler.dump(obj)
+        return pickler.getvalue()
+
+    @builtinify
+    def load(f):
+        return Unpickler(f).load()
+
+    @builtinify
+    def loads(str):
+        return Unpickler(None).loads(str)
@@ -35,7 +35,7 @@ working_modules.update([
     "cStringIO", "thread", "itertools", "pyexpat", "_ssl", "cpyext", "array",
     "binascii", "_multiprocessing", '_warnings', "_collections",
     "_multibytecodec", "micronumpy", "_continuation", "_cffi_backend",
-    "_csv", "cppyy", "_pypyjson"
+    "_csv", "cppyy", "_pypyjson", "_cpickle"
 ])
 
 if sys.platform.startswith('linux') and sys.maxint > 2147483647:
@@ -209,6 +209,12 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                    "use specialised tuples",
                    default=False),
 
+        BoolOption("withhomogeneoustuple",
+                   "store tuples of more than two ints, floats or strings "
+                   "unboxed",
+                   default=False,
+                   requires=[("objspace.std.withspecialisedtuple", True)]),
+
         BoolOption("withcelldict",
                    "use dictionaries that are optimized for being used as module dicts",
                    default=False,
@@ -229,6 +235,10 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
         BoolOption("withliststrategies",
                    "enable optimized ways to store lists of primitives ",
                    default=True),
+        BoolOption("withcompactintlist",
+                   "store lists of small ints with 1, 2 or 4 bytes per item",
+                   default=False,
+                   requires=[("objspace.std.withliststrategies", True)]),
 
         BoolOption("withtypeversion",
                    "version type objects when changing them",
@@ -296,6 +306,7 @@ def set_pypy_opt_level(config, level):
         config.objspace.std.suggest(getattributeshortcut=True)
         #config.objspace.std.suggest(newshortcut=True)
         config.objspace.std.suggest(withspecialisedtuple=True)
+        config.objspace.std.suggest(withhomogeneoustuple=True)
         config.objspace.std.suggest(withidentitydict=True)
         #if not IS_64_BITS:
         #    config.objspace.std.suggest(withsmalllong=True)
@@ -312,6 +323,7 @@ def set_pypy_opt_level(config, level):
         config.objspace.std.suggest(withrangelist=True)
         config.objspace.std.suggest(withprebuiltchar=True)
         config.objspace.std.suggest(withmapdict=True)
+        config.objspace.std.suggest(withcompactintlist=True)
         if not IS_64_BITS:
             config.objspace.std.suggest(withsmalllong=True)
 
@@ -136,6 +136,17 @@ class W_Root(object):
     def delweakref(self):
         pass
 
+    # used by cpyext, see pypy.module.cpyext.pyobject.CpyextLink
+
+    def getcpyextlink(self):
+        return None
+
+    def setcpyextlink(self, link):
+        """Store 'link' on the object itself.  Returns False if the
+        object has no room for it; cpyext then keeps it in a dictionary.
+        """
+        return False
+
     def clear_all_weakrefs(self):
         """Call this at the beginning of interp-level __del__() methods
         in subclasses.  It ensures that weakrefs (if any) are cleared
@@ -391,7 +391,9 @@ class AbstractActionFlag(object):
         self._periodic_actions = []
         self._nonperiodic_actions = []
         self.has_bytecode_counter = False
-        self.fired_actions = None
+        # the fired actions are chained via their '_next' attribute
+        self._fired_actions_first = None
+        self._fired_actions_last = None
         # the default value is not 100, unlike CPython 2.7, but a much
         # larger value, because we use a technique that not only allows
         # but actually *forces* another thread to run whenever the counter
@@ -400,12 +402,16 @@ class AbstractActionFlag(object):
         self._rebuild_action_dispatcher()
 
     def fire(self, action):
-        """Request for the action to be run before the next opcode."""
+        """Request for the action to be run before the next opcode.
+        This doesn't allocate, so that it can be called by the GC hooks."""
         if not action._fired:
             action._fired = True
-            if self.fired_actions is None:
-                self.fired_actions = []
-            self.fired_actions.append(action)
+            last = self._fired_actions_last
+            if last is None:
+                self._fired_actions_first = action
+            else:
+                last._next = action
+            self._fired_actions_last = action
             # set the ticker to -1 in order to force action_dispatcher()
             # to run at the next possible bytecode
             self.reset_ticker(-1)
@@ -432,6 +438,13 @@ class AbstractActionFlag(object):
     def getcheckinterval(self):
         return self.checkinterval_scaled // TICK_COUNTER_STEP
 
+    def get_ticker_address(self):
+        """Returns the raw address of the ticker, or NULL if it is not
+        a raw value.  See thread_gil.c, which uses it to force the
+        ticker to -1 from another thread."""
+        from rpython.rtyper.lltypesystem import rffi, lltype
+        return lltype.nullptr(rffi.LONGP.TO)
+
     def setcheckinterval(self, interval):
         MAX = sys.maxint // TICK_COUNTER_STEP
         if interval < 1:
@@ -452,12 +465,16 @@ class AbstractActionFlag(object):
                 action.perform(ec, frame)
 
             # nonperiodic actions
-            list = self.fired_actions
-            if list is not None:
-                self.fired_actions = None
-                for action in list:
+            action = self._fired_actions_first
+            if action is not None:
+                self._fired_actions_first = None
+                self._fired_actions_last = None
+                while action is not None:
+                    next_action = action._next
+                    action._next = None
                     action._fired = False
                     action.perform(ec, frame)
+                    action = next_action
 
         action_dispatcher._dont_inline_ = True
         self.action_dispatcher = action_dispatcher
@@ -491,6 +508,7 @@ class AsyncAction(object):
     to occur between two opcodes, not at a completely random time.
     """
     _fired = False
+    _next = None
 
     def __init__(self, space):
         self.space = space
@@ -10,6 +10,7 @@ class ThreadLocals:
     'thread' is initialized.
     """
     _value = None
+    _switchinterval = 0.005
 
     def get_ec(self):
         return self._value
@@ -32,6 +33,12 @@ class ThreadLocals:
     def getallvalues(self):
         return {0: self._value}
 
+    def getswitchinterval(self):
+        return self._switchinterval
+
+    def setswitchinterval(self, interval):
+        self._switchinterval = interval
+
 
 def make_weak_value_dictionary(space, keytype, valuetype):
     "NOT_RPYTHON"
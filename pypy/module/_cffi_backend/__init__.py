@@ -37,6 +37,7 @@ class Module(MixedModule):
         'from_handle': 'handle.from_handle',
         '_get_types': 'func._get_types',
         'from_buffer': 'func.from_buffer',
+        'map_call': 'parallel.map_call',
 
         'string': 'func.string',
         'buffer': 'cbuffer.buffer',
@@ -0,0 +1,186 @@
+"""
+Calling a C function many times in parallel, on arrays of arguments.
+"""
+
+import py
+
+from rpython.rlib import clibffi, rthread, jit
+from rpython.rlib.objectmodel import keepalive_until_here
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.translator import cdir
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.module._cffi_backend.cdataobj import W_CData, W_CDataFromBuffer
+from pypy.module._cffi_backend.ctypearray import W_CTypeArray
+from pypy.module._cffi_backend.ctypefunc import W_CTypeFunc
+from pypy.module._cffi_backend.ctypeptr import W_CTypePointer
+from pypy.module._cffi_backend.ctypevoid import W_CTypeVoid
+
+
+srcdir = py.path.local(__file__).dirpath().join('src')
+eci = ExternalCompilationInfo(
+    includes=[srcdir.join('parallel.h')],
+    include_dirs=[str(srcdir), cdir],
+    separate_module_files=[srcdir.join('parallel.c')])
+eci = clibffi.eci.merge(rthread.eci, eci)
+
+BATCH_P = rffi.COpaquePtr('struct pypy_cffi_batch_s', compilation_info=eci)
+
+# pypy_cffi_batch_new() and pypy_cffi_batch_free() must be called with
+# the GIL; pypy_cffi_batch_run() releases it for the whole batch.
+pypy_cffi_batch_new = rffi.llexternal('pypy_cffi_batch_new',
+    [clibffi.FFI_CIFP, rffi.VOIDP, lltype.Signed, lltype.Signed,
+     rffi.CCHARPP, rffi.LONGP, rffi.CCHARP, lltype.Signed, lltype.Signed,
+     lltype.Signed],
+    BATCH_P, compilation_info=eci, releasegil=False)
+pypy_cffi_batch_run = rffi.llexternal('pypy_cffi_batch_run', [BATCH_P],
+    lltype.Void, compilation_info=eci, releasegil=True)
+pypy_cffi_batch_free = rffi.llexternal('pypy_cffi_batch_free', [BATCH_P],
+    lltype.Void, compilation_info=eci, releasegil=False)
+
+
+class RawCopy(object):
+    """A copy in raw memory of the content of a buffer, which the C
+    function reads or writes while the GIL is released.  The buffer
+    itself could be resized or moved by another thread at that point.
+    """
+    def __init__(self, buf, size):
+        self.buf = buf
+        self.size = size
+        self.raw = lltype.malloc(rffi.CCHARP.TO, max(size, 1), flavor='raw')
+
+    def copy_in(self):
+        rffi.str2chararray(self.buf.getslice(0, self.size, 1, self.size),
+                           self.raw, self.size)
+
+    def copy_out(self):
+        self.buf.setslice(0, rffi.charpsize2str(self.raw, self.size))
+
+    def free(self):
+        lltype.free(self.raw, flavor='raw')
+
+
+def _get_array(space, w_array, ctitem, count, what, copies, writable=False):
+    """Return the raw pointer to the 'count' items of type 'ctitem' in
+    'w_array': a cdata pointer or array of 'ctitem', or any object with
+    the buffer interface.  A cdata returned by from_buffer() is handled
+    like the object it was made from.  The content of the buffers is
+    copied into a RawCopy, which is added to 'copies'.
+    """
+    if isinstance(w_array, W_CDataFromBuffer):
+        w_array = w_array.w_keepalive     # the object passed to from_buffer()
+    if isinstance(w_array, W_CData):
+        ctype = w_array.ctype
+        if ((isinstance(ctype, W_CTypePointer) or
+             isinstance(ctype, W_CTypeArray)) and ctype.ctitem is ctitem):
+            if (isinstance(ctype, W_CTypeArray) and
+                    w_array.get_array_length() < count):
+                raise oefmt(space.w_IndexError,
+                            "%s: array of length %d is too short for %d "
+                            "calls", what, w_array.get_array_length(), count)
+            return w_array.unsafe_escaping_ptr()
+        raise oefmt(space.w_TypeError,
+                    "%s: expected a cdata pointer or array of '%s', got '%s'",
+                    what, ctitem.name, ctype.name)
+    else:
+        try:
+            if writable:
+                buf = space.writebuf_w(w_array)
+            else:
+                buf = space.readbuf_w(w_array)
+        except OperationError, e:
+            if not e.match(space, space.w_TypeError):
+                raise
+            raise oefmt(space.w_TypeError,
+                        "%s: expected a cdata pointer or array of '%s', or "
+                        "a %s buffer, got %T", what, ctitem.name,
+                        "writable" if writable else "readable", w_array)
+    size = count * ctitem.size
+    if buf.getlength() < size:
+        raise oefmt(space.w_IndexError,
+                    "%s: buffer of %d bytes is too short for %d calls",
+                    what, buf.getlength(), count)
+    copy = RawCopy(buf, size)
+    copies.append(copy)
+    if not writable:
+        copy.copy_in()
+    return copy.raw
+
+@jit.dont_look_inside
+@unwrap_spec(w_func=W_CData, count=int, nthreads=int)
+def map_call(space, w_func, count, w_args, w_results=None, nthreads=1):
+    """map_call(func, count, args, results=None, nthreads=1)
+
+    Call the C function 'func' 'count' times, splitting the calls between
+    'nthreads' OS threads taken from a pool.  'args' is a sequence with
+    one cdata pointer or array, or buffer, per argument of 'func': the
+    i-th call receives the i-th item of each of them.  The result of the
+    i-th call is stored in the i-th item of 'results', which must be None
+    if 'func' returns void.  The GIL is released only once around the
+    whole batch, so the function must not call back into Python.  The
+    buffers, including the cdata returned by from_buffer(), are copied
+    before the calls, and 'results' is written back after them.
+    """
+    ctype = w_func.ctype
+    if not isinstance(ctype, W_CTypeFunc) or not ctype.cif_descr:
+        raise oefmt(space.w_TypeError,
+                    "expected a cdata of non-variadic function type, got '%s'",
+                    ctype.name)
+    if count < 0:
+        raise oefmt(space.w_ValueError, "negative count")
+    if nthreads < 1:
+        raise oefmt(space.w_ValueError, "nthreads must be at least 1")
+    args_w = space.fixedview(w_args)
+    nargs = len(ctype.fargs)
+    if len(args_w) != nargs:
+        raise oefmt(space.w_TypeError, "'%s' expects %d arguments, got %d",
+                    ctype.name, nargs, len(args_w))
+    fresult = ctype.ctitem
+    copies = []
+    results_copy = None
+    args = lltype.malloc(rffi.CCHARPP.TO, nargs, flavor='raw')
+    argsizes = lltype.malloc(rffi.LONGP.TO, nargs, flavor='raw')
+    try:
+        if isinstance(fresult, W_CTypeVoid):
+            if not space.is_none(w_results):
+                raise oefmt(space.w_TypeError,
+                            "'results' must be None for a function returning "
+                            "void")
+            results = lltype.nullptr(rffi.CCHARP.TO)
+        else:
+            results = _get_array(space, w_results, fresult, count,
+                                 "results", copies, writable=True)
+            if copies:
+                results_copy = copies[0]
+        if count == 0:
+            return
+        for i in range(nargs):
+            farg = ctype.fargs[i]
+            args[i] = _get_array(space, args_w[i], farg, count,
+                                 "argument %d" % (i + 1,), copies)
+            argsizes[i] = rffi.cast(rffi.LONG, farg.size)
+        cif_descr = ctype.cif_descr
+        resultoffset = (cif_descr.exchange_result -
+                        cif_descr.exchange_result_libffi)
+        batch = pypy_cffi_batch_new(cif_descr.cif,
+                                    rffi.cast(rffi.VOIDP,
+                                              w_func.unsafe_escaping_ptr()),
+                                    count, nargs, args, argsizes, results,
+                                    fresult.size, resultoffset, nthreads)
+        if not batch:
+            raise oefmt(space.w_MemoryError,
+                        "cannot allocate the data for map_call()")
+        pypy_cffi_batch_run(batch)
+        pypy_cffi_batch_free(batch)
+        if results_copy is not None:
+            results_copy.copy_out()
+    finally:
+        for copy in copies:
+            copy.free()
+        lltype.free(argsizes, flavor='raw')
+        lltype.free(args, flavor='raw')
+        keepalive_until_here(args_w)
+        keepalive_until_here(w_results)
+        keepalive_until_here(w_func)
@@ -0,0 +1,311 @@
+/* Calls of the same C function over arrays of arguments, split between
+ * several OS threads.  The threads never enter RPython code: they only
+ * call ffi_call() on raw memory, so they don't need the GIL at all.
+ *
+ * The threads are kept in a pool: they are started when no idle thread
+ * is available, up to PYPY_CFFI_MAX_WORKERS of them, and wait for the
+ * next batch when they are done.
+ *
+ * pypy_cffi_batch_new() and pypy_cffi_batch_free() must be called with
+ * the GIL held, because initializing locks may touch a global list and
+ * the free list of 'done' locks is not protected otherwise;
+ * pypy_cffi_batch_run() is called with the GIL released.
+ */
+
+#include <stdlib.h>
+#include <string.h>
+#ifndef _WIN32
+#include <unistd.h>
+#endif
+#include <ffi.h>
+#include "src/precommondefs.h"
+#include "src/thread.h"
+#include "parallel.h"
+
+
+struct pypy_cffi_slice_s {
+    struct pypy_cffi_batch_s *batch;
+    long start, stop;
+    void **avalue;                      /* nargs pointers */
+    char *rvalue;                       /* buffer for the result */
+    struct pypy_cffi_slice_s *next;     /* in the 'pending' queue */
+};
+
+struct pypy_cffi_batch_s {
+    ffi_cif *cif;
+    void *func;
+    long nargs;
+    char **args;
+    long *argsizes;
+    char *results;
+    long resultsize, resultoffset;
+    long nslices;
+    long remaining;                     /* protected by 'pending_lock' */
+    struct pypy_cffi_donelock_s *done;  /* released by the last slice */
+    struct pypy_cffi_slice_s slices[1];
+};
+
+/* The 'done' locks are never deallocated, but kept in a free list: the
+   last thread of a batch may still be inside RPyThreadReleaseLock()
+   when the waiting thread wakes up and frees the batch. */
+struct pypy_cffi_donelock_s {
+    struct RPyOpaque_ThreadLock lock;
+    struct pypy_cffi_donelock_s *next;
+};
+static struct pypy_cffi_donelock_s *free_donelocks = NULL;
+
+#define PYPY_CFFI_MAX_WORKERS 64
+
+/* A thread of the pool.  It waits on 'wakeup' while it is idle, until
+   it is given a 'slice' to process. */
+struct pypy_cffi_worker_s {
+    struct RPyOpaque_ThreadLock wakeup;
+    struct pypy_cffi_slice_s *slice;
+    struct pypy_cffi_worker_s *next;
+};
+
+/* The slices that no idle thread could take are put in the 'pending'
+   queue, which the threads empty before they become idle again.  The
+   new threads are started with no argument: they too start with the
+   'pending' queue.  All of these are protected by 'pending_lock'. */
+static struct pypy_cffi_slice_s *pending = NULL;
+static struct pypy_cffi_worker_s *idle_workers = NULL;
+static long nworkers = 0;
+static struct RPyOpaque_ThreadLock pending_lock;
+static int pending_lock_ready = 0;
+#ifndef _WIN32
+static pid_t pool_pid = 0;
+#endif
+
+
+static void run_slice(struct pypy_cffi_slice_s *slice)
+{
+    struct pypy_cffi_batch_s *batch = slice->batch;
+    long i, k;
+
+    for (i = slice->start; i < slice->stop; i++) {
+        for (k = 0; k < batch->nargs; k++)
+            slice->avalue[k] = batch->args[k] + i * batch->argsizes[k];
+        ffi_call(batch->cif, FFI_FN(batch->func), slice->rvalue,
+                 slice->avalue);
+        if (batch->results != NULL)
+            memcpy(batch->results + i * batch->resultsize,
+                   slice->rvalue + batch->resultoffset,
+                   batch->resultsize);
+    }
+}
+
+static void run_slice_and_finish(struct pypy_cffi_slice_s *slice)
+{
+    struct pypy_cffi_batch_s *batch;
+    struct pypy_cffi_donelock_s *done;
+    int last;
+
+    run_slice(slice);
+
+    /* don't touch 'batch' after 'remaining' was decremented */
+    batch = slice->batch;
+    done = batch->done;
+    RPyThreadAcquireLock(&pending_lock, 1);
+    last = (--batch->remaining == 0);
+    RPyThreadReleaseLock(&pending_lock);
+    if (last)
+        RPyThreadReleaseLock(&done->lock);
+}
+
+static void worker_main(void)
+{
+    struct pypy_cffi_worker_s *worker;
+    struct pypy_cffi_slice_s *slice;
+
+    worker = malloc(sizeof(struct pypy_cffi_worker_s));
+    if (worker != NULL && !RPyThreadLockInit(&worker->wakeup)) {
+        free(worker);
+        worker = NULL;
+    }
+    if (worker != NULL)
+        RPyThreadAcquireLock(&worker->wakeup, 1);
+
+    while (1) {
+        RPyThreadAcquireLock(&pending_lock, 1);
+        slice = pending;
+        if (slice != NULL) {
+            pending = slice->next;
+            RPyThreadReleaseLock(&pending_lock);
+        }
+        else if (worker == NULL) {
+            /* out of memory: cannot wait for more work, so stop */
+            nworkers--;
+            RPyThreadReleaseLock(&pending_lock);
+            return;
+        }
+        else {
+            worker->next = idle_workers;
+            idle_workers = worker;
+            RPyThreadReleaseLock(&pending_lock);
+            RPyThreadAcquireLock(&worker->wakeup, 1);
+            slice = worker->slice;
+        }
+        run_slice_and_finish(slice);
+    }
+}
+
+static void run_pending_slice_here(void)
+{
+    struct pypy_cffi_slice_s *slice;
+
+    RPyThreadAcquireLock(&pending_lock, 1);
+    slice = pending;
+    if (slice != NULL)
+        pending = slice->next;
+    RPyThreadReleaseLock(&pending_lock);
+    if (slice != NULL)
+        run_slice_and_finish(slice);
+}
+
+/* Give 'slice' to an idle thread, or to a new one.  If there are
+   already PYPY_CFFI_MAX_WORKERS threads, all busy, it stays in the
+   'pending' queue until one of them is done. */
+static void dispatch_slice(struct pypy_cffi_slice_s *slice)
+{
+    struct pypy_cffi_worker_s *worker;
+
+    RPyThreadAcquireLock(&pending_lock, 1);
+    worker = idle_workers;
+    if (worker != NULL) {
+        idle_workers = worker->next;
+        worker->slice = slice;
+        RPyThreadReleaseLock(&pending_lock);
+        RPyThreadReleaseLock(&worker->wakeup);
+        return;
+    }
+    slice->next = pending;
+    pending = slice;
+    if (nworkers >= PYPY_CFFI_MAX_WORKERS) {
+        RPyThreadReleaseLock(&pending_lock);
+        return;
+    }
+    nworkers++;
+    RPyThreadReleaseLock(&pending_lock);
+
+    if (RPyThreadStart(worker_main) == -1) {
+        RPyThreadAcquireLock(&pending_lock, 1);
+        nworkers--;
+        RPyThreadReleaseLock(&pending_lock);
+        /* cannot start a new thread: run a queued slice here */
+        run_pending_slice_here();
+    }
+}
+
+struct pypy_cffi_batch_s *pypy_cffi_batch_new(
+        ffi_cif *cif, void *func, long count, long nargs,
+        char **args, long *argsizes, char *results, long resultsize,
+        long resultoffset, long nthreads)
+{
+    struct pypy_cffi_batch_s *batch;
+    size_t rsize, slicesize, size;
+    char *p;
+    long i;
+
+#ifndef _WIN32
+    if (pool_pid != getpid()) {
+        /* first call, or we are in a child process after fork(): the
+           threads of the pool, if any, don't exist any more */
+        pending = NULL;
+        idle_workers = NULL;
+        nworkers = 0;
+        free_donelocks = NULL;
+        pending_lock_ready = 0;
+        pool_pid = getpid();
+    }
+#endif
+    if (!pending_lock_ready) {
+        if (!RPyThreadLockInit(&pending_lock))
+            return NULL;
+        pending_lock_ready = 1;
+    }
+    if (nthreads > count)
+        nthreads = count;
+    if (nthreads < 1)
+        nthreads = 1;
+
+    /* libffi writes at least a full 'ffi_arg' for small results */
+    rsize = cif->rtype->size;
+    if (rsize < sizeof(ffi_arg))
+        rsize = sizeof(ffi_arg);
+    rsize = (rsize + 15) & ~15;
+    slicesize = rsize + nargs * sizeof(void *);
+
+    size = sizeof(struct pypy_cffi_batch_s) +
+           (nthreads - 1) * sizeof(struct pypy_cffi_slice_s);
+    size = (size + 15) & ~15;
+    batch = malloc(size + nthreads * slicesize);
+    if (batch == NULL)
+        return NULL;
+    batch->cif = cif;
+    batch->func = func;
+    batch->nargs = nargs;
+    batch->args = args;
+    batch->argsizes = argsizes;
+    batch->results = results;
+    batch->resultsize = resultsize;
+    batch->resultoffset = resultoffset;
+    batch->nslices = nthreads;
+    batch->remaining = nthreads - 1;
+
+    p = ((char *)batch) + size;
+    for (i = 0; i < nthreads; i++) {
+        struct pypy_cffi_slice_s *slice = &batch->slices[i];
+        slice->batch = batch;
+        slice->start = count * i / nthreads;
+        slice->stop = count * (i + 1) / nthreads;
+        slice->rvalue = p;
+        slice->avalue = (void **)(p + rsize);
+        slice->next = NULL;
+        p += slicesize;
+    }
+
+    if (free_donelocks != NULL) {
+        batch->done = free_donelocks;
+        free_donelocks = free_donelocks->next;
+    }
+    else {
+        batch->done = malloc(sizeof(struct pypy_cffi_donelock_s));
+        if (batch->done == NULL) {
+            free(batch);
+            return NULL;
+        }
+        if (!RPyThreadLockInit(&batch->done->lock)) {
+            free(batch->done);
+            free(batch);
+            return NULL;
+        }
+    }
+    RPyThreadAcquireLock(&batch->done->lock, 1);
+    return batch;
+}
+
+void pypy_cffi_batch_run(struct pypy_cffi_batch_s *batch)
+{
+    long i;
+
+    for (i = 1; i < batch->nslices; i++)
+        dispatch_slice(&batch->slices[i]);
+    run_slice(&batch->slices[0]);
+
+    if (batch->nslices > 1) {
+        /* wait until the last slice is done */
+        RPyThreadAcquireLock(&batch->done->lock, 1);
+    }
+}
+
+void pypy_cffi_batch_free(struct pypy_cffi_batch_s *batch)
+{
+    struct pypy_cffi_donelock_s *done = batch->done;
+    /* the lock is still acquired here; release it, because it is
+       acquired again by the next pypy_cffi_batch_new() */
+    RPyThreadReleaseLock(&done->lock);
+    done->next = free_donelocks;
+    free_donelocks = done;
+    free(batch);
+}
@@ -0,0 +1,8 @@
+struct pypy_cffi_batch_s;
+
+RPY_EXTERN struct pypy_cffi_batch_s *pypy_cffi_batch_new(
+        ffi_cif *cif, void *func, long count, long nargs,
+        char **args, long *argsizes, char *results, long resultsize,
+        long resultoffset, long nthreads);
+RPY_EXTERN void pypy_cffi_batch_run(struct pypy_cffi_batch_s *batch);
+RPY_EXTERN void pypy_cffi_batch_free(struct pypy_cffi_batch_s *batch);
@@ -0,0 +1,137 @@
+import ctypes.util
+# side-effect: FORMAT_LONGDOUBLE must be built before the first test
+from pypy.module._cffi_backend import misc
+
+
+class AppTestMapCall(object):
+    spaceconfig = dict(usemodules=('_cffi_backend', 'struct', 'array'))
+
+    def setup_class(cls):
+        cls.w_libm = cls.space.wrap(ctypes.util.find_library('m'))
+        cls.w_libc = cls.space.wrap(ctypes.util.find_library('c'))
+
+    def test_map_call_double(self):
+        import _cffi_backend as _cffi
+        DOUBLE = _cffi.new_primitive_type('double')
+        DOUBLE_ARRAY = _cffi.new_array_type(_cffi.new_pointer_type(DOUBLE),
+                                            None)
+        BFunc = _cffi.new_function_type((DOUBLE,), DOUBLE, False)
+        sqrt = _cffi.load_library(self.libm).load_function(BFunc, 'sqrt')
+        n = 1000
+        args = _cffi.newp(DOUBLE_ARRAY, [float(i * i) for i in range(n)])
+        for nthreads in [1, 3, 8, 2000]:
+            results = _cffi.newp(DOUBLE_ARRAY, n)
+            res = _cffi.map_call(sqrt, n, [args], results, nthreads)
+            assert res is None
+            assert list(results) == [float(i) for i in range(n)]
+
+    def test_map_call_small_int_result(self):
+        import _cffi_backend as _cffi
+        INT = _cffi.new_primitive_type('int')
+        SHORT = _cffi.new_primitive_type('short')
+        P_INT = _cffi.new_pointer_type(INT)
+        BFunc = _cffi.new_function_type((INT,), INT, False)
+        abs = _cffi.load_library(self.libc).load_function(BFunc, 'abs')
+        args = _cffi.newp(_cffi.new_array_type(P_INT, 5), [-5, 3, -2, 0, 7])
+        results = _cffi.newp(_cffi.new_array_type(P_INT, None), 4)
+        # a pointer is accepted without a length check
+        _cffi.map_call(abs, 4, [_cffi.cast(P_INT, args)], results, 2)
+        assert list(results) == [5, 3, 2, 0]
+        # but arrays must be long enough
+        raises(IndexError, _cffi.map_call, abs, 6, [args], results)
+        raises(IndexError, _cffi.map_call, abs, 5, [args], results)
+        # and of the right type
+        P_SHORT = _cffi.new_pointer_type(SHORT)
+        shorts = _cffi.newp(_cffi.new_array_type(P_SHORT, None), 4)
+        raises(TypeError, _cffi.map_call, abs, 4, [shorts], results)
+        raises(TypeError, _cffi.map_call, abs, 4, [args], shorts)
+        raises(TypeError, _cffi.map_call, abs, 4, [args, args], results)
+        raises(TypeError, _cffi.map_call, abs, 4, args, results)
+        raises(ValueError, _cffi.map_call, abs, -1, [args], results)
+        raises(ValueError, _cffi.map_call, abs, 4, [args], results, 0)
+        # count == 0 does nothing
+        _cffi.map_call(abs, 0, [args], results, 4)
+        assert list(results) == [5, 3, 2, 0]
+
+    def test_map_call_void(self):
+        import _cffi_backend as _cffi
+        VOIDP = _cffi.new_pointer_type(_cffi.new_void_type())
+        INT = _cffi.new_primitive_type('int')
+        SIZE_T = _cffi.new_primitive_type('size_t')
+        CHAR = _cffi.new_primitive_type('char')
+        BUF = _cffi.new_array_type(_cffi.new_pointer_type(CHAR), 5)
+        BFunc = _cffi.new_function_type((VOIDP, INT, SIZE_T), VOIDP, False)
+        memset = _cffi.load_library(self.libc).load_function(BFunc, 'memset')
+        bufs = [_cffi.newp(BUF) for i in range(3)]
+        ptrs = _cffi.newp(_cffi.new_array_type(_cffi.new_pointer_type(VOIDP),
+                                               None), bufs)
+        chars = _cffi.newp(_cffi.new_array_type(_cffi.new_pointer_type(INT),
+                                                None), [65, 66, 67])
+        sizes = _cffi.newp(_cffi.new_array_type(_cffi.new_pointer_type(SIZE_T),
+                                                None), [1, 2, 4])
+        results = _cffi.newp(_cffi.new_array_type(_cffi.new_pointer_type(VOIDP),
+                                                  None), 3)
+        _cffi.map_call(memset, 3, [ptrs, chars, sizes], results, 3)
+        assert [_cffi.string(buf) for buf in bufs] == ['A', 'BB', 'CCCC']
+        assert list(results) == list(ptrs)
+        #
+        VOID = _cffi.new_void_type()
+        BFunc2 = _cffi.new_function_type((INT,), VOID, False)
+        srand = _cffi.load_library(self.libc).load_function(BFunc2, 'srand')
+        _cffi.map_call(srand, 3, [chars], None, 2)
+        raises(TypeError, _cffi.map_call, srand, 3, [chars], results)
+
+    def test_map_call_not_a_function(self):
+        import _cffi_backend as _cffi
+        INT = _cffi.new_primitive_type('int')
+        p = _cffi.newp(_cffi.new_pointer_type(INT), 5)
+        raises(TypeError, _cffi.map_call, p, 1, [], None)
+
+    def test_map_call_bytearray(self):
+        import _cffi_backend as _cffi
+        import struct
+        INT = _cffi.new_primitive_type('int')
+        BFunc = _cffi.new_function_type((INT,), INT, False)
+        abs = _cffi.load_library(self.libc).load_function(BFunc, 'abs')
+        args = bytearray(struct.pack('5i', -5, 3, -2, 0, 7))
+        results = bytearray(20)
+        _cffi.map_call(abs, 5, [args], results, 2)
+        assert struct.unpack('5i', results) == (5, 3, 2, 0, 7)
+        # a longer buffer is fine, the rest is left alone
+        results = bytearray('x' * 24)
+        _cffi.map_call(abs, 5, [str(args)], results)
+        assert struct.unpack('5i', results[:20]) == (5, 3, 2, 0, 7)
+        assert results[20:] == 'xxxx'
+        raises(IndexError, _cffi.map_call, abs, 6, [args], results)
+        raises(IndexError, _cffi.map_call, abs, 5, [args], bytearray(19))
+        raises(TypeError, _cffi.map_call, abs, 5, [args], str(results))
+        raises(TypeError, _cffi.map_call, abs, 5, [42], results)
+
+    def test_map_call_from_buffer(self):
+        import _cffi_backend as _cffi
+        import array
+        INT = _cffi.new_primitive_type('int')
+        CHAR_ARRAY = _cffi.new_array_type(_cffi.new_pointer_type(
+            _cffi.new_primitive_type('char')), None)
+        BFunc = _cffi.new_function_type((INT,), INT, False)
+        abs = _cffi.load_library(self.libc).load_function(BFunc, 'abs')
+        a = array.array('i', [-5, 3, -2, 0])
+        r = array.array('i', [0] * 4)
+        _cffi.map_call(abs, 4, [_cffi.from_buffer(CHAR_ARRAY, a)],
+                       _cffi.from_buffer(CHAR_ARRAY, r), 2)
+        assert list(r) == [5, 3, 2, 0]
+
+    def test_map_call_many_batches(self):
+        import _cffi_backend as _cffi
+        DOUBLE = _cffi.new_primitive_type('double')
+        DOUBLE_ARRAY = _cffi.new_array_type(_cffi.new_pointer_type(DOUBLE),
+                                            None)
+        BFunc = _cffi.new_function_type((DOUBLE,), DOUBLE, False)
+        sqrt = _cffi.load_library(self.libm).load_function(BFunc, 'sqrt')
+        args = _cffi.newp(DOUBLE_ARRAY, [float(i * i) for i in range(100)])
+        results = _cffi.newp(DOUBLE_ARRAY, 100)
+        # the threads of the pool are reused from one batch to the next
+        for i in range(50):
+            _cffi.map_call(sqrt, 100, [args], results, 4)
+            assert results[99] == 99.0
+            results[99] = 0.0
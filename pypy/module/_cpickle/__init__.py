@@ -0,0 +1,12 @@
+from pypy.interpreter.mixedmodule import MixedModule
+
+class Module(MixedModule):
+    """RPython speedups for cPickle"""
+
+    appleveldefs = {}
+
+    interpleveldefs = {
+        'Pickler' : 'interp_pickle.W_Pickler',
+        'Unpickler' : 'interp_unpickle.W_Unpickler',
+        'HIGHEST_PROTOCOL' : 'space.wrap(interp_pickle.HIGHEST_PROTOCOL)',
+        }
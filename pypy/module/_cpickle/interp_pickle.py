@@ -0,0 +1,673 @@
+"""
+Interp-level implementation of the pickling half of cPickle.
+
+The common types are saved here directly into a StringBuilder.  The rare
+cases are delegated to methods of the app-level subclass defined in
+lib_pypy/cPickle.py, which can call back write(), save() and memoize().
+"""
+
+from rpython.rlib import runicode
+from rpython.rlib.rstring import StringBuilder, replace
+from rpython.rlib.rstruct.ieee import pack_float
+
+from pypy.interpreter import unicodehelper
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+from pypy.module._cpickle.state import get_state
+from pypy.module._cpickle import opcodes
+
+
+HIGHEST_PROTOCOL = 2
+BATCHSIZE = 1000
+
+
+def pack_int32(builder, x):
+    builder.append(chr(x & 0xff))
+    builder.append(chr((x >> 8) & 0xff))
+    builder.append(chr((x >> 16) & 0xff))
+    builder.append(chr((x >> 24) & 0xff))
+
+def fits_int32(x):
+    return -0x80000000 <= x <= 0x7fffffff
+
+def raw_unicode_escape_for_pickle(space, w_obj):
+    # like pickle.py: escape the backslashes and newlines, and encode
+    # with 'raw-unicode-escape'
+    u = space.unicode_w(w_obj)
+    u = replace(replace(u, u'\\', u'\\u005c'), u'\n', u'\\u000a')
+    return runicode.unicode_encode_raw_unicode_escape(u, len(u), 'strict')
+
+
+class W_Pickler(W_Root):
+
+    def __init__(self, space):
+        self.space = space
+        self.proto = 0
+        self.w_file = None
+        self.fast = False
+        self.memo = {}          # {w_obj: index}
+        self.memo_next = 1      # cPickle starts counting at one
+        # the app-level memo {id(obj): (index, obj)}, only created when
+        # the 'memo' attribute is used; it then replaces 'self.memo'
+        self.w_memo = None
+        self.builder = None
+        self.output = []        # for getvalue()
+        self.w_persistent_id = None
+
+    @unwrap_spec(w_protocol=WrappedDefault(0))
+    def descr_init(self, space, w_file, w_protocol):
+        if space.isinstance_w(w_file, space.w_int):
+            # Pickler(protocol): keep the data for getvalue()
+            w_protocol = w_file
+            w_file = None
+        if space.is_none(w_protocol):
+            proto = 0
+        else:
+            proto = space.int_w(w_protocol)
+        if proto < 0:
+            proto = HIGHEST_PROTOCOL
+        elif proto > HIGHEST_PROTOCOL:
+            raise oefmt(space.w_ValueError,
+                        "pickle protocol must be <= %d", HIGHEST_PROTOCOL)
+        self.proto = proto
+        self.w_file = w_file
+        self.w_memo = None
+        self.clear_memo()
+
+    # ---------- app-level interface ----------
+
+    def descr_dump(self, space, w_obj):
+        """Write a pickled representation of obj to the open file."""
+        if self.builder is not None:
+            # called recursively, e.g. by an app-level save_xxx()
+            self.save(w_obj)
+            return
+        self.builder = StringBuilder()
+        self.w_persistent_id = space.findattr(self,
+                                              space.wrap('persistent_id'))
+        try:
+            if self.proto >= 2:
+                self.builder.append(opcodes.PROTO)
+                self.builder.append(chr(self.proto))
+            self.save(w_obj)
+            self.builder.append(opcodes.STOP)
+            data = self.builder.build()
+        finally:
+            self.builder = None
+            self.w_persistent_id = None
+        if self.w_file is None:
+            self.output.append(data)
+        else:
+            space.call_method(self.w_file, 'write', space.wrap(data))
+
+    @unwrap_spec(data=str)
+    def descr_write(self, space, data):
+        self._get_builder(space).append(data)
+
+    def descr_save(self, space, w_obj):
+        self._get_builder(space)
+        self.save(w_obj)
+
+    def descr_memoize(self, space, w_obj):
+        self._get_builder(space)
+        self.memoize(w_obj)
+
+    def descr_clear_memo(self, space):
+        """Clears the pickler's "memo"."""
+        self.clear_memo()
+
+    def descr_getvalue(self, space):
+        if self.w_file is not None:
+            return space.w_None
+        return space.wrap(''.join(self.output))
+
+    def descr_get_memo(self, space):
+        # like in cPickle: {id(obj): (index, obj)}.  From now on, the
+        # pickler uses this dict, which the caller may modify.
+        if self.w_memo is None:
+            w_memo = space.newdict()
+            for w_obj, index in self.memo.items():
+                space.setitem(w_memo, space.id(w_obj),
+                              space.newtuple([space.wrap(index), w_obj]))
+            self.w_memo = w_memo
+            self.memo = {}
+        return self.w_memo
+
+    def descr_set_memo(self, space, w_memo):
+        if not space.isinstance_w(w_memo, space.w_dict):
+            raise oefmt(space.w_TypeError, "memo must be a dictionary")
+        self.w_memo = w_memo
+        self.memo = {}
+
+    def descr_get_fast(self, space):
+        return space.newbool(self.fast)
+
+    def descr_set_fast(self, space, w_value):
+        self.fast = space.is_true(w_value)
+
+    def descr_get_bin(self, space):
+        return space.newbool(self.proto >= 1)
+
+    def descr_get_proto(self, space):
+        return space.wrap(self.proto)
+
+    def _get_builder(self, space):
+        builder = self.builder
+        if builder is None:
+            raise oefmt(space.w_RuntimeError,
+                        "can only be called during dump()")
+        return builder
+
+    # ---------- memo ----------
+
+    def clear_memo(self):
+        if self.w_memo is not None:
+            # the dict may also be referenced from app-level
+            self.space.call_method(self.w_memo, 'clear')
+        self.memo = {}
+        self.memo_next = 1
+
+    def memo_get(self, w_obj):
+        """Returns the memo index of 'w_obj', or 0."""
+        if self.w_memo is None:
+            return self.memo.get(w_obj, 0)
+        space = self.space
+        w_entry = space.finditem(self.w_memo, space.id(w_obj))
+        if w_entry is None:
+            return 0
+        return space.int_w(space.getitem(w_entry, space.wrap(0)))
+
+    def memoize(self, w_obj):
+        if self.fast:
+            return
+        if self.w_memo is None:
+            index = self.memo_next
+            self.memo_next = index + 1
+            self.memo[w_obj] = index
+        else:
+            space = self.space
+            index = space.len_w(self.w_memo) + 1
+            space.setitem(self.w_memo, space.id(w_obj),
+                          space.newtuple([space.wrap(index), w_obj]))
+        builder = self.builder
+        if self.proto >= 1:
+            if index < 256:
+                builder.append(opcodes.BINPUT)
+                builder.append(chr(index))
+            else:
+                builder.append(opcodes.LONG_BINPUT)
+                pack_int32(builder, index)
+        else:
+            builder.append(opcodes.PUT)
+            builder.append(str(index))
+            builder.append('\n')
+
+    def write_get(self, index):
+        builder = self.builder
+        if self.proto >= 1:
+            if index < 256:
+                builder.append(opcodes.BINGET)
+                builder.append(chr(index))
+            else:
+                builder.append(opcodes.LONG_BINGET)
+                pack_int32(builder, index)
+        else:
+            builder.append(opcodes.GET)
+            builder.append(str(index))
+            builder.append('\n')
+
+    def in_memo(self, w_obj):
+        return not self.fast and self.memo_get(w_obj) > 0
+
+    # ---------- saving ----------
+
+    def save(self, w_obj):
+        space = self.space
+        if self.w_persistent_id is not None:
+            w_pid = space.call_function(self.w_persistent_id, w_obj)
+            if not space.is_none(w_pid):
+                self.save_pers(w_pid)
+                return
+        if not self.fast:
+            index = self.memo_get(w_obj)
+            if index > 0:
+                self.write_get(index)
+                return
+        w_type = space.type(w_obj)
+        if space.is_w(w_obj, space.w_None):
+            self.builder.append(opcodes.NONE)
+        elif space.is_w(w_type, space.w_bool):
+            self.save_bool(space.is_true(w_obj))
+        elif space.is_w(w_type, space.w_int):
+            self.save_int(w_obj)
+        elif space.is_w(w_type, space.w_long):
+            self.save_long(w_obj)
+        elif space.is_w(w_type, space.w_float):
+            self.save_float(w_obj)
+        elif space.is_w(w_type, space.w_str):
+            self.save_string(w_obj)
+        elif space.is_w(w_type, space.w_unicode):
+            self.save_unicode(w_obj)
+        elif space.is_w(w_type, space.w_tuple):
+            self.save_tuple(w_obj)
+        elif space.is_w(w_type, space.w_list):
+            self.save_list(w_obj)
+        elif space.is_w(w_type, space.w_dict):
+            self.save_dict(w_obj)
+        else:
+            self.save_other(w_obj, w_type)
+
+    def save_pers(self, w_pid):
+        if self.proto >= 1:
+            self.save(w_pid)
+            self.builder.append(opcodes.BINPERSID)
+        else:
+            self.builder.append(opcodes.PERSID)
+            self.builder.append(self.space.str_w(self.space.str(w_pid)))
+            self.builder.append('\n')
+
+    def save_bool(self, value):
+        if self.proto >= 2:
+            if value:
+                self.builder.append(opcodes.NEWTRUE)
+            else:
+                self.builder.append(opcodes.NEWFALSE)
+        else:
+            if value:
+                self.builder.append(opcodes.TRUE)
+            else:
+                self.builder.append(opcodes.FALSE)
+
+    def save_int(self, w_obj):
+        x = self.space.int_w(w_obj)
+        builder = self.builder
+        if self.proto >= 1:
+            if x >= 0:
+                if x <= 0xff:
+                    builder.append(opcodes.BININT1)
+                    builder.append(chr(x))
+                    return
+                if x <= 0xffff:
+                    builder.append(opcodes.BININT2)
+                    builder.append(chr(x & 0xff))
+                    builder.append(chr(x >> 8))
+                    return
+            if fits_int32(x):
+                builder.append(opcodes.BININT)
+                pack_int32(builder, x)
+                return
+        # text pickle, or int too big to fit in signed 4-byte format
+        builder.append(opcodes.INT)
+        builder.append(str(x))
+        builder.append('\n')
+
+    def save_long(self, w_obj):
+        space = self.space
+        builder = self.builder
+        if self.proto >= 2:
+            bigint = space.bigint_w(w_obj)
+            if bigint.sign == 0:
+                nbytes = 0
+            elif bigint.sign > 0:
+                nbytes = bigint.bit_length() // 8 + 1
+            else:
+                nbytes = bigint.invert().bit_length() // 8 + 1
+            if nbytes < 256:
+                builder.append(opcodes.LONG1)
+                builder.append(chr(nbytes))
+            else:
+                builder.append(opcodes.LONG4)
+                pack_int32(builder, nbytes)
+            if nbytes > 0:
+                builder.append(bigint.tobytes(nbytes, 'little', True))
+        else:
+            builder.append(opcodes.LONG)
+            builder.append(space.str_w(space.repr(w_obj)))
+            builder.append('\n')
+
+    def save_float(self, w_obj):
+        space = self.space
+        if self.proto >= 1:
+            self.builder.append(opcodes.BINFLOAT)
+            pack_float(self.builder, space.float_w(w_obj), 8, True)
+        else:
+            self.builder.append(opcodes.FLOAT)
+            self.builder.append(space.str_w(space.repr(w_obj)))
+            self.builder.append('\n')
+
+    def save_string(self, w_obj):
+        space = self.space
+        builder = self.builder
+        s = space.str_w(w_obj)
+        if self.proto >= 1:
+            n = len(s)
+            if n < 256:
+                builder.append(opcodes.SHORT_BINSTRING)
+                builder.append(chr(n))
+            else:
+                builder.append(opcodes.BINSTRING)
+                pack_int32(builder, n)
+            builder.append(s)
+        else:
+            builder.append(opcodes.STRING)
+            builder.append(space.str_w(space.repr(w_obj)))
+            builder.append('\n')
+        self.memoize(w_obj)
+
+    def save_unicode(self, w_obj):
+        space = self.space
+        builder = self.builder
+        if self.proto >= 1:
+            s = unicodehelper.encode_utf8(space, space.unicode_w(w_obj))
+            builder.append(opcodes.BINUNICODE)
+            pack_int32(builder, len(s))
+            builder.append(s)
+        else:
+            builder.append(opcodes.UNICODE)
+            builder.append(raw_unicode_escape_for_pickle(space, w_obj))
+            builder.append('\n')
+        self.memoize(w_obj)
+
+    def save_tuple(self, w_obj):
+        space = self.space
+        items_w = space.fixedview(w_obj)
+        n = len(items_w)
+        if n == 0:
+            if self.proto >= 1:
+                self.builder.append(opcodes.EMPTY_TUPLE)
+            else:
+                self.builder.append(opcodes.MARK)
+                self.builder.append(opcodes.TUPLE)
+            return
+        if n <= 3 and self.proto >= 2:
+            for w_item in items_w:
+                self.save(w_item)
+            # subtle: the tuple may have been memoized by a recursive
+            # reference from one of its items
+            if self.in_memo(w_obj):
+                for i in range(n):
+                    self.builder.append(opcodes.POP)
+                self.write_get(self.memo_get(w_obj))
+            else:
+                self.builder.append(opcodes.TUPLESIZE2CODE[n])
+                self.memoize(w_obj)
+            return
+        self.builder.append(opcodes.MARK)
+        for w_item in items_w:
+            self.save(w_item)
+        if self.in_memo(w_obj):
+            if self.proto >= 1:
+                self.builder.append(opcodes.POP_MARK)
+            else:
+                for i in range(n + 1):
+                    self.builder.append(opcodes.POP)
+            self.write_get(self.memo_get(w_obj))
+            return
+        self.builder.append(opcodes.TUPLE)
+        self.memoize(w_obj)
+
+    def save_list(self, w_obj):
+        if self.proto >= 1:
+            self.builder.append(opcodes.EMPTY_LIST)
+        else:
+            self.builder.append(opcodes.MARK)
+            self.builder.append(opcodes.LIST)
+        self.memoize(w_obj)
+        self.batch_appends(self.space.iter(w_obj))
+
+    def save_dict(self, w_obj):
+        if self.proto >= 1:
+            self.builder.append(opcodes.EMPTY_DICT)
+        else:
+            self.builder.append(opcodes.MARK)
+            self.builder.append(opcodes.DICT)
+        self.memoize(w_obj)
+        self.batch_setitems(self.space.call_method(w_obj, 'iteritems'))
+
+    def _next(self, w_iter):
+        space = self.space
+        try:
+            return space.next(w_iter)
+        except OperationError as e:
+            if not e.match(space, space.w_StopIteration):
+                raise
+            return None
+
+    def batch_appends(self, w_iter):
+        if self.proto == 0:
+            while True:
+                w_item = self._next(w_iter)
+                if w_item is None:
+                    return
+                self.save(w_item)
+                self.builder.append(opcodes.APPEND)
+        w_item = self._next(w_iter)
+        while w_item is not None:
+            w_next = self._next(w_iter)
+            if w_next is None:
+                # a single item: no need for MARK ... APPENDS
+                self.save(w_item)
+                self.builder.append(opcodes.APPEND)
+                return
+            self.builder.append(opcodes.MARK)
+            self.save(w_item)
+            self.save(w_next)
+            n = 2
+            while n < BATCHSIZE:
+                w_item = self._next(w_iter)
+                if w_item is None:
+                    break
+                self.save(w_item)
+                n += 1
+            else:
+                w_item = self._next(w_iter)
+            self.builder.append(opcodes.APPENDS)
+
+    def _save_pair(self, w_pair):
+        space = self.space
+        w_key, w_value = space.fixedview(w_pair, 2)
+        self.save(w_key)
+        self.save(w_value)
+
+    def batch_setitems(self, w_iter):
+        if self.proto == 0:
+            while True:
+                w_pair = self._next(w_iter)
+                if w_pair is None:
+                    return
+                self._save_pair(w_pair)
+                self.builder.append(opcodes.SETITEM)
+        w_pair = self._next(w_iter)
+        while w_pair is not None:
+            w_next = self._next(w_iter)
+            if w_next is None:
+                self._save_pair(w_pair)
+                self.builder.append(opcodes.SETITEM)
+                return
+            self.builder.append(opcodes.MARK)
+            self._save_pair(w_pair)
+            self._save_pair(w_next)
+            n = 2
+            while n < BATCHSIZE:
+                w_pair = self._next(w_iter)
+                if w_pair is None:
+                    break
+                self._save_pair(w_pair)
+                n += 1
+            else:
+                w_pair = self._next(w_iter)
+            self.builder.append(opcodes.SETITEMS)
+
+    # ---------- classes, functions and the reduce protocol ----------
+
+    def save_other(self, w_obj, w_type):
+        space = self.space
+        state = get_state(space)
+        if space.is_w(w_type, state.w_InstanceType):
+            # old-style instances: rare, done at app-level
+            space.call_method(self, 'save_inst', w_obj)
+            return
+        if (space.is_w(w_type, state.w_ClassType) or
+                space.is_w(w_type, state.w_FunctionType) or
+                space.is_w(w_type, state.w_BuiltinFunctionType)):
+            self.save_global(w_obj, None)
+            return
+        #
+        if space.isinstance_w(w_obj, space.w_type):
+            # a class, possibly with a custom metaclass
+            self.save_global(w_obj, None)
+            return
+        w_reduce = space.finditem(state.w_dispatch_table, w_type)
+        if w_reduce is not None:
+            w_rv = space.call_function(w_reduce, w_obj)
+        else:
+            w_reduce = space.findattr(w_obj, space.wrap('__reduce_ex__'))
+            if w_reduce is not None:
+                w_rv = space.call_function(w_reduce, space.wrap(self.proto))
+            else:
+                w_reduce = space.findattr(w_obj, space.wrap('__reduce__'))
+                if w_reduce is None:
+                    raise oefmt(state.w_PicklingError,
+                                "Can't pickle %N object: %R", w_type, w_obj)
+                w_rv = space.call_function(w_reduce)
+        #
+        if space.is_w(space.type(w_rv), space.w_str):
+            self.save_global(w_obj, w_rv)
+            return
+        if not space.is_w(space.type(w_rv), space.w_tuple):
+            raise oefmt(state.w_PicklingError,
+                        "%R must return string or tuple", w_reduce)
+        rv_w = space.fixedview(w_rv)
+        n = len(rv_w)
+        if not 2 <= n <= 5:
+            raise oefmt(state.w_PicklingError,
+                        "Tuple returned by %R must have two to five elements",
+                        w_reduce)
+        w_none = space.w_None
+        self.save_reduce(rv_w[0], rv_w[1],
+                         rv_w[2] if n > 2 else w_none,
+                         rv_w[3] if n > 3 else w_none,
+                         rv_w[4] if n > 4 else w_none, w_obj)
+
+    def save_reduce(self, w_func, w_args, w_state, w_listitems, w_dictitems,
+                    w_obj):
+        space = self.space
+        state = get_state(space)
+        if not space.isinstance_w(w_args, space.w_tuple):
+            raise oefmt(state.w_PicklingError,
+                        "args from reduce() should be a tuple")
+        if not space.is_true(space.callable(w_func)):
+            raise oefmt(state.w_PicklingError,
+                        "func from reduce should be callable")
+        builder = self.builder
+        if self.proto >= 2 and self._is_newobj(w_func):
+            args_w = space.fixedview(w_args)
+            if len(args_w) == 0:
+                raise oefmt(state.w_PicklingError,
+                            "__newobj__ arglist is empty")
+            w_cls = args_w[0]
+            if space.findattr(w_cls, space.wrap('__new__')) is None:
+                raise oefmt(state.w_PicklingError,
+                            "args[0] from __newobj__ args has no __new__")
+            if not space.is_w(w_cls, space.getattr(w_obj,
+                                                    space.wrap('__class__'))):
+                raise oefmt(state.w_PicklingError,
+                            "args[0] from __newobj__ args has the wrong class")
+            self.save(w_cls)
+            self.save(space.newtuple(args_w[1:]))
+            self.builder.append(opcodes.NEWOBJ)
+        else:
+            self.save(w_func)
+            self.save(w_args)
+            builder.append(opcodes.REDUCE)
+        self.memoize(w_obj)
+        if not space.is_none(w_listitems):
+            self.batch_appends(w_listitems)
+        if not space.is_none(w_dictitems):
+            self.batch_setitems(w_dictitems)
+        if not space.is_none(w_state):
+            self.save(w_state)
+            self.builder.append(opcodes.BUILD)
+
+    def _is_newobj(self, w_func):
+        space = self.space
+        w_name = space.findattr(w_func, space.wrap('__name__'))
+        return (w_name is not None and
+                space.isinstance_w(w_name, space.w_str) and
+                space.str_w(w_name) == '__newobj__')
+
+    def save_global(self, w_obj, w_name):
+        space = self.space
+        state = get_state(space)
+        if w_name is None:
+            w_name = space.getattr(w_obj, space.wrap('__name__'))
+        w_module = space.findattr(w_obj, space.wrap('__module__'))
+        if w_module is None or space.is_none(w_module):
+            w_module = space.call_method(self, 'whichmodule', w_obj, w_name)
+        module = space.str_w(w_module)
+        name = space.str_w(w_name)
+        try:
+            w_mod = space.call_function(state.w_import_module, w_module)
+            w_klass = space.getattr(w_mod, w_name)
+        except OperationError as e:
+            if not (e.match(space, space.w_ImportError) or
+                    e.match(space, space.w_KeyError) or
+                    e.match(space, space.w_AttributeError)):
+                raise
+            raise oefmt(state.w_PicklingError,
+                        "Can't pickle %R: it's not found as %s.%s",
+                        w_obj, module, name)
+        if not space.is_w(w_klass, w_obj):
+            raise oefmt(state.w_PicklingError,
+                        "Can't pickle %R: it's not the same object as %s.%s",
+                        w_obj, module, name)
+        builder = self.builder
+        if self.proto >= 2:
+            w_code = space.finditem(state.w_extension_registry,
+                                    space.newtuple([w_module, w_name]))
+            if w_code is not None:
+                code = space.int_w(w_code)
+                if code <= 0xff:
+                    builder.append(opcodes.EXT1)
+                    builder.append(chr(code))
+                elif code <= 0xffff:
+                    builder.append(opcodes.EXT2)
+                    builder.append(chr(code & 0xff))
+                    builder.append(chr(code >> 8))
+                else:
+                    builder.append(opcodes.EXT4)
+                    pack_int32(builder, code)
+                return
+        builder.append(opcodes.GLOBAL)
+        builder.append(module)
+        builder.append('\n')
+        builder.append(name)
+        builder.append('\n')
+        self.memoize(w_obj)
+
+
+def descr__new__(space, w_subtype, __args__):
+    w_self = space.allocate_instance(W_Pickler, w_subtype)
+    W_Pickler.__init__(space.interp_w(W_Pickler, w_self), space)
+    return w_self
+
+W_Pickler.typedef = TypeDef("_cpickle.Pickler",
+    __doc__ = """Pickler(file, protocol=0) or Pickler(protocol)
+
+Base class of cPickle.Pickler; the methods save_inst() and whichmodule()
+must be provided by the subclass.""",
+    __new__ = interp2app(descr__new__),
+    __init__ = interp2app(W_Pickler.descr_init),
+    dump = interp2app(W_Pickler.descr_dump),
+    write = interp2app(W_Pickler.descr_write),
+    save = interp2app(W_Pickler.descr_save),
+    memoize = interp2app(W_Pickler.descr_memoize),
+    clear_memo = interp2app(W_Pickler.descr_clear_memo),
+    getvalue = interp2app(W_Pickler.descr_getvalue),
+    memo = GetSetProperty(W_Pickler.descr_get_memo, W_Pickler.descr_set_memo),
+    fast = GetSetProperty(W_Pickler.descr_get_fast, W_Pickler.descr_set_fast),
+    bin = GetSetProperty(W_Pickler.descr_get_bin),
+    proto = GetSetProperty(W_Pickler.descr_get_proto),
+)
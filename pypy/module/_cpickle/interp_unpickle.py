@@ -0,0 +1,529 @@
+"""
+Interp-level implementation of the unpickling half of cPickle.
+
+The pickle is read either directly from a string or buffer, or from
+the read() and readline() methods of a file.  Old-style instances
+(INST and OBJ) and the extension registry (EXTn) are delegated to
+methods of the app-level subclass defined in lib_pypy/cPickle.py.
+"""
+
+from rpython.rlib import runicode
+from rpython.rlib.rbigint import rbigint
+from rpython.rlib.rstruct.ieee import unpack_float
+
+from pypy.interpreter import unicodehelper
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.pyparser.parsestring import PyString_DecodeEscape
+from pypy.interpreter.typedef import TypeDef
+from pypy.module._cpickle.state import get_state
+from pypy.module._cpickle import opcodes
+from pypy.module._cpickle.interp_pickle import HIGHEST_PROTOCOL
+
+
+READ_AHEAD = 8192
+
+
+def unpack_int32(s, pos):
+    last = ord(s[pos + 3])
+    if last >= 128:
+        last -= 256
+    return (ord(s[pos]) | (ord(s[pos + 1]) << 8) |
+            (ord(s[pos + 2]) << 16) | (last << 24))
+
+
+class W_Unpickler(W_Root):
+
+    def __init__(self, space):
+        self.space = space
+        self.w_file = None
+        self.data = ''          # the input, or the part read from the file
+        self.pos = 0
+        self.read_ahead = False
+        self.stack = []
+        self.marks = []
+        self.memo = {}          # {index: w_obj}
+
+    def descr_init(self, space, w_file):
+        if space.is_none(w_file):
+            self.w_file = None
+        else:
+            self.w_file = w_file
+
+    # ---------- app-level interface ----------
+
+    def descr_load(self, space):
+        """Read a pickled object representation from the open file.
+
+        Return the reconstituted object hierarchy specified in the file.
+        """
+        if self.w_file is None:
+            raise oefmt(space.w_ValueError, "no file to load from")
+        self.data = ''
+        self.pos = 0
+        self.read_ahead = self._can_read_ahead()
+        try:
+            return self.load()
+        finally:
+            if self.read_ahead:
+                self._give_back_unread()
+            self.read_ahead = False
+            self.data = ''
+            self.pos = 0
+
+    def descr_loads(self, space, w_data):
+        """Unpickle an object from a string or a buffer; the memo is
+        shared with the previous loads."""
+        w_file = self.w_file
+        self.w_file = None
+        self.data = space.bufferstr_w(w_data)
+        self.pos = 0
+        try:
+            return self.load()
+        finally:
+            self.w_file = w_file
+            self.data = ''
+
+    # ---------- reading the input ----------
+
+    def _read_from_file(self, meth, w_arg):
+        space = self.space
+        if w_arg is None:
+            w_res = space.call_method(self.w_file, meth)
+        else:
+            w_res = space.call_method(self.w_file, meth, w_arg)
+        return space.str_w(w_res)
+
+    def _can_read_ahead(self):
+        # the file is read by blocks of READ_AHEAD bytes only if what is
+        # read after the end of the pickle can be given back with seek()
+        space = self.space
+        if space.findattr(self.w_file, space.wrap('seek')) is None:
+            return False
+        try:
+            space.call_method(self.w_file, 'tell')
+        except OperationError, e:
+            if not e.match(space, space.w_Exception):
+                raise
+            return False      # e.g. a pipe
+        return True
+
+    def _give_back_unread(self):
+        unread = len(self.data) - self.pos
+        if unread > 0:
+            space = self.space
+            space.call_method(self.w_file, 'seek', space.wrap(-unread),
+                              space.wrap(1))
+
+    def _fill(self, size):
+        """Read at least 'size' more bytes from the file into 'data',
+        or less at the end of the file.  Returns False if there was
+        nothing more to read."""
+        s = self._read_from_file('read',
+                                 self.space.wrap(max(size, READ_AHEAD)))
+        if not s:
+            return False
+        pos = self.pos
+        assert pos >= 0
+        self.data = self.data[pos:] + s
+        self.pos = 0
+        return True
+
+    def read(self, n):
+        if self.read_ahead:
+            while len(self.data) - self.pos < n:
+                if not self._fill(n - (len(self.data) - self.pos)):
+                    raise OperationError(self.space.w_EOFError,
+                                         self.space.w_None)
+        elif self.w_file is not None:
+            s = self._read_from_file('read', self.space.wrap(n))
+            if len(s) < n:
+                raise OperationError(self.space.w_EOFError, self.space.w_None)
+            return s
+        pos = self.pos
+        end = pos + n
+        if end > len(self.data):
+            raise OperationError(self.space.w_EOFError, self.space.w_None)
+        self.pos = end
+        return self.data[pos:end]
+
+    def readline(self):
+        """Read a line and return it without the final newline."""
+        if self.read_ahead or self.w_file is None:
+            while True:
+                end = self.data.find('\n', self.pos)
+                if end >= 0:
+                    break
+                if not self.read_ahead or not self._fill(READ_AHEAD):
+                    raise OperationError(self.space.w_EOFError,
+                                         self.space.w_None)
+            pos = self.pos
+            self.pos = end + 1
+            return self.data[pos:end]
+        s = self._read_from_file('readline', None)
+        if not s.endswith('\n'):
+            raise OperationError(self.space.w_EOFError, self.space.w_None)
+        end = len(s) - 1
+        assert end >= 0
+        return s[:end]
+
+    def read_int32(self):
+        return unpack_int32(self.read(4), 0)
+
+    # ---------- the stack ----------
+
+    def push(self, w_obj):
+        self.stack.append(w_obj)
+
+    def pop(self):
+        if len(self.stack) <= self._last_mark():
+            raise self.error("unpickling stack underflow")
+        return self.stack.pop()
+
+    def top(self):
+        if len(self.stack) <= self._last_mark():
+            raise self.error("unpickling stack underflow")
+        return self.stack[-1]
+
+    def _last_mark(self):
+        if self.marks:
+            return self.marks[-1]
+        return 0
+
+    def pop_mark(self):
+        """Remove the topmost mark and return the items above it."""
+        if not self.marks:
+            raise self.error("could not find MARK")
+        k = self.marks.pop()
+        items_w = self.stack[k:]
+        del self.stack[k:]
+        return items_w
+
+    def error(self, msg):
+        state = get_state(self.space)
+        return OperationError(state.w_UnpicklingError, self.space.wrap(msg))
+
+    # ---------- the main loop ----------
+
+    def load(self):
+        self.stack = []
+        self.marks = []
+        while True:
+            key = self.read(1)[0]
+            if key == opcodes.STOP:
+                break
+            self.dispatch(key)
+        if len(self.stack) == 0:
+            raise self.error("unpickling stack underflow")
+        w_result = self.stack[-1]
+        self.stack = []
+        self.marks = []
+        return w_result
+
+    def dispatch(self, key):
+        space = self.space
+        if key == opcodes.MARK:
+            self.marks.append(len(self.stack))
+        elif key == opcodes.NONE:
+            self.push(space.w_None)
+        elif key == opcodes.NEWTRUE:
+            self.push(space.w_True)
+        elif key == opcodes.NEWFALSE:
+            self.push(space.w_False)
+        elif key == opcodes.BININT1:
+            self.push(space.wrap(ord(self.read(1)[0])))
+        elif key == opcodes.BININT2:
+            s = self.read(2)
+            self.push(space.wrap(ord(s[0]) | (ord(s[1]) << 8)))
+        elif key == opcodes.BININT:
+            self.push(space.wrap(self.read_int32()))
+        elif key == opcodes.INT:
+            self.load_int()
+        elif key == opcodes.LONG:
+            self.load_long()
+        elif key == opcodes.LONG1:
+            self.load_binlong(ord(self.read(1)[0]))
+        elif key == opcodes.LONG4:
+            self.load_binlong(self.read_int32())
+        elif key == opcodes.FLOAT:
+            w_s = space.wrap(self.readline())
+            self.push(space.call_function(space.w_float, w_s))
+        elif key == opcodes.BINFLOAT:
+            self.push(space.wrap(unpack_float(self.read(8), True)))
+        elif key == opcodes.SHORT_BINSTRING:
+            self.push(space.wrap(self.read(ord(self.read(1)[0]))))
+        elif key == opcodes.BINSTRING:
+            n = self.read_int32()
+            if n < 0:
+                raise self.error("BINSTRING pickle has negative byte count")
+            self.push(space.wrap(self.read(n)))
+        elif key == opcodes.STRING:
+            self.load_string()
+        elif key == opcodes.BINUNICODE:
+            n = self.read_int32()
+            if n < 0:
+                raise self.error("BINUNICODE pickle has negative byte count")
+            self.push(space.wrap(unicodehelper.decode_utf8(space,
+                                                           self.read(n))))
+        elif key == opcodes.UNICODE:
+            s = self.readline()
+            u, _ = runicode.str_decode_raw_unicode_escape(
+                s, len(s), 'strict', final=True,
+                errorhandler=unicodehelper.decode_error_handler(space))
+            self.push(space.wrap(u))
+        elif key == opcodes.EMPTY_TUPLE:
+            self.push(space.newtuple([]))
+        elif key == opcodes.TUPLE1:
+            w_a = self.pop()
+            self.push(space.newtuple([w_a]))
+        elif key == opcodes.TUPLE2:
+            w_b = self.pop()
+            w_a = self.pop()
+            self.push(space.newtuple([w_a, w_b]))
+        elif key == opcodes.TUPLE3:
+            w_c = self.pop()
+            w_b = self.pop()
+            w_a = self.pop()
+            self.push(space.newtuple([w_a, w_b, w_c]))
+        elif key == opcodes.TUPLE:
+            self.push(space.newtuple(self.pop_mark()))
+        elif key == opcodes.EMPTY_LIST:
+            self.push(space.newlist([]))
+        elif key == opcodes.LIST:
+            # copy: the lists returned by pop_mark() are also used to
+            # build tuples, so they must never be resized
+            self.push(space.newlist(self.pop_mark()[:]))
+        elif key == opcodes.EMPTY_DICT:
+            self.push(space.newdict())
+        elif key == opcodes.DICT:
+            items_w = self.pop_mark()
+            w_dict = space.newdict()
+            self.setitems(w_dict, items_w)
+            self.push(w_dict)
+        elif key == opcodes.APPEND:
+            w_value = self.pop()
+            self.extend(self.top(), [w_value])
+        elif key == opcodes.APPENDS:
+            items_w = self.pop_mark()
+            self.extend(self.top(), items_w)
+        elif key == opcodes.SETITEM:
+            w_value = self.pop()
+            w_key = self.pop()
+            space.setitem(self.top(), w_key, w_value)
+        elif key == opcodes.SETITEMS:
+            items_w = self.pop_mark()
+            self.setitems(self.top(), items_w)
+        elif key == opcodes.POP:
+            if len(self.stack) > self._last_mark():
+                self.stack.pop()
+            else:
+                # popping the MARK itself, as pickle.py does
+                self.pop_mark()
+        elif key == opcodes.POP_MARK:
+            self.pop_mark()
+        elif key == opcodes.DUP:
+            self.push(self.top())
+        elif key == opcodes.PUT:
+            self.memo[self.read_decimal()] = self.top()
+        elif key == opcodes.BINPUT:
+            self.memo[ord(self.read(1)[0])] = self.top()
+        elif key == opcodes.LONG_BINPUT:
+            self.memo[self.read_int32()] = self.top()
+        elif key == opcodes.GET:
+            self.load_get(self.read_decimal())
+        elif key == opcodes.BINGET:
+            self.load_get(ord(self.read(1)[0]))
+        elif key == opcodes.LONG_BINGET:
+            self.load_get(self.read_int32())
+        elif key == opcodes.GLOBAL:
+            module = self.readline()
+            name = self.readline()
+            self.push(self.find_class(module, name))
+        elif key == opcodes.REDUCE:
+            w_args = self.pop()
+            w_func = self.pop()
+            self.push(space.call(w_func, w_args))
+        elif key == opcodes.NEWOBJ:
+            w_args = self.pop()
+            w_cls = self.pop()
+            args_w = [w_cls] + space.fixedview(w_args)
+            w_new = space.getattr(w_cls, space.wrap('__new__'))
+            self.push(space.call(w_new, space.newtuple(args_w)))
+        elif key == opcodes.BUILD:
+            w_state = self.pop()
+            self.load_build(self.top(), w_state)
+        elif key == opcodes.INST:
+            module = self.readline()
+            name = self.readline()
+            w_klass = self.find_class(module, name)
+            self.instantiate(w_klass, self.pop_mark())
+        elif key == opcodes.OBJ:
+            items_w = self.pop_mark()
+            if len(items_w) == 0:
+                raise self.error("unpickling stack underflow")
+            self.instantiate(items_w[0], items_w[1:])
+        elif key == opcodes.EXT1:
+            self.get_extension(ord(self.read(1)[0]))
+        elif key == opcodes.EXT2:
+            s = self.read(2)
+            self.get_extension(ord(s[0]) | (ord(s[1]) << 8))
+        elif key == opcodes.EXT4:
+            self.get_extension(self.read_int32())
+        elif key == opcodes.PERSID:
+            self.persistent_load(space.wrap(self.readline()))
+        elif key == opcodes.BINPERSID:
+            self.persistent_load(self.pop())
+        elif key == opcodes.PROTO:
+            proto = ord(self.read(1)[0])
+            if proto > HIGHEST_PROTOCOL:
+                raise oefmt(space.w_ValueError,
+                            "unsupported pickle protocol: %d", proto)
+        else:
+            raise oefmt(get_state(space).w_UnpicklingError,
+                        "invalid load key, '%s'.", key)
+
+    # ---------- opcodes with more logic ----------
+
+    def read_decimal(self):
+        line = self.readline()
+        try:
+            return int(line)
+        except ValueError:
+            raise self.error("could not convert the memo key %s" % line)
+
+    def load_int(self):
+        space = self.space
+        line = self.readline()
+        if line == '01':
+            self.push(space.w_True)
+        elif line == '00':
+            self.push(space.w_False)
+        else:
+            # may be too large for an int on this platform
+            self.push(space.call_function(space.w_int, space.wrap(line)))
+
+    def load_long(self):
+        space = self.space
+        w_line = space.wrap(self.readline())
+        self.push(space.call_function(space.w_long, w_line, space.wrap(0)))
+
+    def load_binlong(self, n):
+        if n < 0:
+            raise self.error("LONG pickle has negative byte count")
+        if n == 0:
+            self.push(self.space.newlong(0))
+            return
+        bigint = rbigint.frombytes(self.read(n), 'little', True)
+        self.push(self.space.newlong_from_rbigint(bigint))
+
+    def load_string(self):
+        space = self.space
+        s = self.readline()
+        n = len(s)
+        if n < 2 or s[0] != s[n - 1] or (s[0] != "'" and s[0] != '"'):
+            raise oefmt(space.w_ValueError, "insecure string pickle")
+        end = n - 1
+        assert end >= 1
+        self.push(space.wrap(PyString_DecodeEscape(space, s[1:end],
+                                                   'strict', None)))
+
+    def load_get(self, index):
+        w_obj = self.memo.get(index, None)
+        if w_obj is None:
+            raise OperationError(self.space.w_KeyError,
+                                 self.space.wrap(index))
+        self.push(w_obj)
+
+    def extend(self, w_list, items_w):
+        space = self.space
+        if space.is_w(space.type(w_list), space.w_list):
+            space.call_method(w_list, 'extend', space.newtuple(items_w))
+        else:
+            for w_item in items_w:
+                space.call_method(w_list, 'append', w_item)
+
+    def setitems(self, w_dict, items_w):
+        space = self.space
+        if len(items_w) % 2 != 0:
+            raise self.error("odd number of items for SETITEMS")
+        for i in range(0, len(items_w), 2):
+            space.setitem(w_dict, items_w[i], items_w[i + 1])
+
+    def load_build(self, w_inst, w_state):
+        space = self.space
+        w_setstate = space.findattr(w_inst, space.wrap('__setstate__'))
+        if w_setstate is not None:
+            space.call_function(w_setstate, w_state)
+            return
+        w_slotstate = None
+        if (space.isinstance_w(w_state, space.w_tuple) and
+                space.len_w(w_state) == 2):
+            w_state, w_slotstate = space.fixedview(w_state, 2)
+        if space.is_true(w_state):
+            w_dict = space.getattr(w_inst, space.wrap('__dict__'))
+            w_iter = space.iter(space.call_method(w_state, 'iteritems'))
+            while True:
+                try:
+                    w_pair = space.next(w_iter)
+                except OperationError as e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    break
+                w_key, w_value = space.fixedview(w_pair, 2)
+                if space.is_w(space.type(w_key), space.w_str):
+                    w_key = space.new_interned_w_str(w_key)
+                space.setitem(w_dict, w_key, w_value)
+        if w_slotstate is not None and space.is_true(w_slotstate):
+            w_iter = space.iter(space.call_method(w_slotstate, 'iteritems'))
+            while True:
+                try:
+                    w_pair = space.next(w_iter)
+                except OperationError as e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    break
+                w_key, w_value = space.fixedview(w_pair, 2)
+                space.setattr(w_inst, w_key, w_value)
+
+    # ---------- delegated to app-level ----------
+
+    def find_class(self, module, name):
+        space = self.space
+        return space.call_method(self, 'find_class', space.wrap(module),
+                                 space.wrap(name))
+
+    def instantiate(self, w_klass, args_w):
+        space = self.space
+        self.push(space.call_method(self, '_instantiate', w_klass,
+                                    space.newtuple(args_w)))
+
+    def get_extension(self, code):
+        space = self.space
+        self.push(space.call_method(self, 'get_extension', space.wrap(code)))
+
+    def persistent_load(self, w_pid):
+        space = self.space
+        w_persistent_load = space.findattr(self, space.wrap('persistent_load'))
+        if w_persistent_load is None:
+            raise self.error("A load persistent id instruction was "
+                             "encountered, but no persistent_load function "
+                             "was specified.")
+        self.push(space.call_function(w_persistent_load, w_pid))
+
+
+def descr__new__(space, w_subtype, __args__):
+    w_self = space.allocate_instance(W_Unpickler, w_subtype)
+    W_Unpickler.__init__(space.interp_w(W_Unpickler, w_self), space)
+    return w_self
+
+W_Unpickler.typedef = TypeDef("_cpickle.Unpickler",
+    __doc__ = """Unpickler(file)
+
+Base class of cPickle.Unpickler; the methods find_class(), _instantiate()
+and get_extension() must be provided by the subclass.""",
+    __new__ = interp2app(descr__new__),
+    __init__ = interp2app(W_Unpickler.descr_init),
+    load = interp2app(W_Unpickler.descr_load),
+    loads = interp2app(W_Unpickler.descr_loads),
+)
@@ -0,0 +1,37 @@
+class PickleState(object):
+    """The app-level objects needed by the Pickler and the Unpickler.
+    They are only imported the first time they are needed: importing
+    copy_reg and pickle during translation would freeze them into the
+    translated pypy-c.
+    """
+
+    def __init__(self, space):
+        self.w_dispatch_table = None
+
+    def setup(self, space):
+        if self.w_dispatch_table is not None:
+            return
+        w_res = space.appexec([], """():
+            import copy_reg, pickle, types, sys
+            def import_module(name):
+                __import__(name)
+                return sys.modules[name]
+            return (copy_reg.dispatch_table, copy_reg._extension_registry,
+                    copy_reg._inverted_registry, copy_reg._extension_cache,
+                    pickle.PicklingError, pickle.UnpicklingError,
+                    types.InstanceType, types.ClassType, types.FunctionType,
+                    types.BuiltinFunctionType, import_module)
+        """)
+        (w_dispatch_table, self.w_extension_registry,
+         self.w_inverted_registry, self.w_extension_cache,
+         self.w_PicklingError, self.w_UnpicklingError,
+         self.w_InstanceType, self.w_ClassType, self.w_FunctionType,
+         self.w_BuiltinFunctionType,
+         self.w_import_module) = space.fixedview(w_res, 11)
+        self.w_dispatch_table = w_dispatch_table
+
+
+def get_state(space):
+    state = space.fromcache(PickleState)
+    state.setup(space)
+    return state
@@ -0,0 +1,267 @@
+class AppTestCPickle(object):
+    spaceconfig = {"usemodules": ["_cpickle", "struct", "binascii"]}
+
+    def setup_class(cls):
+        from rpython.tool.udir import udir
+        cls.w_tmpfile = cls.space.wrap(str(udir.join('test_cpickle.data')))
+        cls.w_pickletests = cls.space.appexec([], """():
+            class Point(object):
+                def __init__(self, x, y):
+                    self.x = x
+                    self.y = y
+                def __eq__(self, other):
+                    return (type(other) is Point and
+                            self.__dict__ == other.__dict__)
+            class OldStyle:
+                def __init__(self):
+                    self.a = 42
+            class MyList(list):
+                pass
+            import sys, types
+            mod = types.ModuleType('pickletests')
+            mod.Point = Point
+            mod.OldStyle = OldStyle
+            mod.MyList = MyList
+            for cls in [Point, OldStyle, MyList]:
+                cls.__module__ = 'pickletests'
+            sys.modules['pickletests'] = mod
+            return mod
+        """)
+
+    def test_uses_cpickle(self):
+        import cPickle, _cpickle
+        assert issubclass(cPickle.Pickler, _cpickle.Pickler)
+        assert issubclass(cPickle.Unpickler, _cpickle.Unpickler)
+
+    def test_roundtrip_basic(self):
+        import cPickle
+        values = [None, True, False, 0, 1, -1, 255, 256, 65535, 65536,
+                  -2**31, 2**31 - 1, 2**31, -2**31 - 1, 2**63 - 1, 0L, 1L,
+                  -1L, 2**100, -2**100, 255L, -128L, 3.25, -0.0, 1e300,
+                  '', 'abc', 'x' * 300, '\x00\n\'"\\', u'', u'abc',
+                  u'\u1234\\\n', (), (1,), (1, 2), (1, 2, 3), (1, 2, 3, 4),
+                  [], [1, 'a'], {}, {'a': 1, 2: [3]}, range(2500),
+                  dict.fromkeys(range(2500))]
+        for proto in [0, 1, 2]:
+            for value in values:
+                s = cPickle.dumps(value, proto)
+                res = cPickle.loads(s)
+                assert res == value
+                assert type(res) is type(value)
+
+    def test_same_output_as_pickle(self):
+        import cPickle, pickle
+        value = [1, 2L, 'abc', u'\xe9', (3.5, None, True), {'k': [None]}]
+        for proto in [0, 1, 2]:
+            s = cPickle.dumps(value, proto)
+            assert pickle.loads(s) == value
+            assert cPickle.loads(pickle.dumps(value, proto)) == value
+
+    def test_memo(self):
+        import cPickle
+        lst = [1, 2]
+        t = (lst, lst)
+        for proto in [0, 1, 2]:
+            res = cPickle.loads(cPickle.dumps(t, proto))
+            assert res == t
+            assert res[0] is res[1]
+
+    def test_recursive(self):
+        import cPickle
+        lst = []
+        lst.append(lst)
+        d = {}
+        d['self'] = d
+        t = ([],)
+        t[0].append(t)
+        for proto in [0, 1, 2]:
+            res = cPickle.loads(cPickle.dumps(lst, proto))
+            assert res[0] is res
+            res = cPickle.loads(cPickle.dumps(d, proto))
+            assert res['self'] is res
+            res = cPickle.loads(cPickle.dumps(t, proto))
+            assert res[0][0] is res
+
+    def test_memo_attribute(self):
+        import cPickle
+        lst = [1]
+        p = cPickle.Pickler(1)
+        p.dump(lst)
+        memo = p.memo
+        assert memo == {id(lst): (1, lst)}
+        assert p.memo is memo
+        # the dict is the memo used by the pickler
+        p.dump(lst)
+        assert p.getvalue().endswith('h\x01.')
+        memo.clear()
+        p.dump(lst)
+        assert p.getvalue().endswith(']q\x01K\x01a.')
+        assert memo == {id(lst): (1, lst)}
+        p.clear_memo()
+        assert memo == {}
+        p2 = cPickle.Pickler(1)
+        p2.memo = memo
+        p2.dump(lst)
+        assert memo == {id(lst): (1, lst)}
+        p2.dump([lst, 5])
+        assert cPickle.loads(p2.getvalue()) == [1]
+        assert memo[id(lst)] == (1, lst)
+        assert len(memo) == 2
+        p2.memo = {}
+        p2.dump(lst)
+        assert p2.getvalue().endswith(']q\x01K\x01a.')
+        raises(TypeError, setattr, p2, 'memo', [])
+
+    def test_memo_starts_at_one(self):
+        import cPickle
+        assert cPickle.dumps(['a'], 1) == ']q\x01U\x01aq\x02a.'
+        assert (cPickle.dumps(['a', 'b'], 1) ==
+                ']q\x01(U\x01aq\x02U\x01bq\x03e.')
+
+    def test_getvalue_and_file(self):
+        import cPickle, StringIO
+        p = cPickle.Pickler(2)
+        p.dump([1, 2])
+        p.dump('x')
+        data = p.getvalue()
+        f = StringIO.StringIO(data)
+        u = cPickle.Unpickler(f)
+        assert u.load() == [1, 2]
+        assert u.load() == 'x'
+        raises(EOFError, u.load)
+        f = StringIO.StringIO()
+        cPickle.dump(42, f, 2)
+        assert cPickle.Pickler(f).getvalue() is None
+        f.seek(0)
+        assert cPickle.load(f) == 42
+
+    def test_load_sequence_from_file(self):
+        import cPickle, StringIO, os
+        data = (cPickle.dumps([1, 'a'] * 3000, 0) + cPickle.dumps(42, 2) +
+                'rest\n')
+        for f in [StringIO.StringIO(data), open(self.tmpfile, 'w+b')]:
+            f.write(data)
+            f.seek(0)
+            u = cPickle.Unpickler(f)
+            assert u.load() == [1, 'a'] * 3000
+            # what was read ahead must be given back to the file
+            assert f.tell() == len(cPickle.dumps([1, 'a'] * 3000, 0))
+            assert cPickle.load(f) == 42
+            assert f.read() == 'rest\n'
+            raises(EOFError, u.load)
+            f.close()
+        # files that can't seek are read as needed
+        class Pipe(object):
+            def __init__(self, data):
+                self.data = data
+            def read(self, n):
+                s, self.data = self.data[:n], self.data[n:]
+                return s
+            def readline(self):
+                i = self.data.find('\n') + 1 or len(self.data)
+                s, self.data = self.data[:i], self.data[i:]
+                return s
+        for proto in [0, 2]:
+            f = Pipe(cPickle.dumps(['x', 5], proto) + 'rest')
+            assert cPickle.load(f) == ['x', 5]
+            assert f.data == 'rest'
+
+    def test_fast(self):
+        import cPickle
+        p = cPickle.Pickler(1)
+        p.fast = True
+        lst = [1]
+        p.dump([lst, lst])
+        assert cPickle.loads(p.getvalue()) == [[1], [1]]
+        assert 'q' not in p.getvalue()
+
+    def test_objects(self):
+        import cPickle
+        from pickletests import Point, OldStyle, MyList
+        for proto in [0, 1, 2]:
+            p = cPickle.loads(cPickle.dumps(Point(1, 'a'), proto))
+            assert p == Point(1, 'a')
+            o = cPickle.loads(cPickle.dumps(OldStyle(), proto))
+            assert o.__class__ is OldStyle
+            assert o.a == 42
+            l = MyList([1, 2])
+            l.foo = 'bar'
+            res = cPickle.loads(cPickle.dumps(l, proto))
+            assert type(res) is MyList
+            assert res == [1, 2]
+            assert res.foo == 'bar'
+            res = cPickle.loads(cPickle.dumps([Point, OldStyle, len], proto))
+            assert res == [Point, OldStyle, len]
+
+    def test_newobj(self):
+        import cPickle
+        from pickletests import Point
+        s = cPickle.dumps(Point(1, 2), 2)
+        assert '\x81' in s
+        assert 'copy_reg' not in s
+
+    def test_persistent_id(self):
+        import cPickle, StringIO
+        class Pickler(cPickle.Pickler):
+            def persistent_id(self, obj):
+                if obj == 'secret':
+                    return 'ID'
+        class Unpickler(cPickle.Unpickler):
+            def persistent_load(self, pid):
+                return 'found ' + pid
+        for proto in [0, 1, 2]:
+            f = StringIO.StringIO()
+            Pickler(f, proto).dump(['secret', 'other'])
+            f.seek(0)
+            assert Unpickler(f).load() == ['found ID', 'other']
+            f.seek(0)
+            raises(cPickle.UnpicklingError, cPickle.Unpickler(f).load)
+
+    def test_find_class_override(self):
+        import cPickle, StringIO
+        class Unpickler(cPickle.Unpickler):
+            def find_class(self, module, name):
+                return (module, name)
+        f = StringIO.StringIO(cPickle.dumps(len))
+        assert Unpickler(f).load() == ('__builtin__', 'len')
+
+    def test_extension_registry(self):
+        import cPickle, copy_reg
+        from pickletests import Point
+        copy_reg.add_extension('pickletests', 'Point', 0xf00f)
+        try:
+            s = cPickle.dumps(Point, 2)
+            assert s == '\x80\x02\x83\x0f\xf0.'
+            assert cPickle.loads(s) is Point
+        finally:
+            copy_reg.remove_extension('pickletests', 'Point', 0xf00f)
+
+    def test_dispatch_table(self):
+        import cPickle, copy_reg
+        class Foo(object):
+            pass
+        def reduce_foo(obj):
+            return (int, ('42',))
+        copy_reg.pickle(Foo, reduce_foo)
+        try:
+            assert cPickle.loads(cPickle.dumps(Foo(), 2)) == 42
+        finally:
+            del copy_reg.dispatch_table[Foo]
+
+    def test_errors(self):
+        import cPickle
+        raises(cPickle.PicklingError, cPickle.dumps, lambda: 42)
+        class Slots(object):
+            __slots__ = ['a']
+        raises(TypeError, cPickle.dumps, Slots())
+        raises(ValueError, cPickle.Pickler, 3)
+        raises(EOFError, cPickle.loads, '')
+        raises(EOFError, cPickle.loads, ']q\x01(K')
+        raises(cPickle.UnpicklingError, cPickle.loads, 'z')
+        raises(ValueError, cPickle.loads, '\x80\x03.')
+        raises(ValueError, cPickle.loads, "S'abc\n.")
+
+    def test_loads_buffer(self):
+        import cPickle
+        s = cPickle.dumps(['a', 12], 2)
+        assert cPickle.loads(buffer(s)) == ['a', 12]
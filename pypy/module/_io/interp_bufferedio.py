@@ -4,7 +4,7 @@ from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.typedef import (
     TypeDef, GetSetProperty, generic_new_descr, interp_attrproperty_w)
 from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
-from rpython.rlib.buffer import Buffer
+from rpython.rlib.buffer import Buffer, SubBuffer
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.rarithmetic import r_longlong, intmask
 from rpython.rlib import rposix
@@ -484,6 +484,67 @@ class BufferedMixin:
             self.pos = endpos
             return space.wrap(data)
 
+    def readinto_w(self, space, w_buffer):
+        self._check_init(space)
+        self._check_closed(space, "readinto of closed file")
+        rwbuffer = space.getarg_w('w*', w_buffer)
+        length = rwbuffer.getlength()
+        with self.lock:
+            written = self._readinto_generic(space, rwbuffer, length)
+        if written < 0:
+            return space.w_None
+        return space.wrap(written)
+
+    def _readinto_generic(self, space, rwbuffer, n):
+        """Like _read_generic(), but stores the data into rwbuffer.  Reads
+           larger than our buffer go straight from the raw stream into
+           rwbuffer.  Returns -1 if nothing could be read without
+           blocking."""
+        # Must run with the lock held!
+        assert n >= 0
+        written = self._readahead()
+        if written > n:
+            written = n
+        for i in range(written):
+            rwbuffer.setitem(i, self.buffer[self.pos + i])
+        self.pos += written
+        if written == n:
+            return written
+
+        # Flush the write buffer if necessary
+        if self.writable:
+            self._flush_and_rewind_unlocked(space)
+        self._reader_reset_buf()
+        self.pos = 0
+
+        # the positions in our buffer are r_int, but the offsets in
+        # rwbuffer must be plain ints
+        written = intmask(written)
+        remaining = n - written
+        while remaining > 0:
+            try:
+                if remaining > self.buffer_size:
+                    size = self._raw_readinto(
+                        space, SubBuffer(rwbuffer, written, remaining),
+                        remaining)
+                else:
+                    size = self._fill_buffer(space)
+                    if size > remaining:
+                        size = remaining
+                    assert size >= 0
+                    for i in range(size):
+                        rwbuffer.setitem(written + i, self.buffer[i])
+                    self.pos = size
+            except BlockingIOError:
+                if written == 0:
+                    return -1
+                break
+            if size == 0:
+                break
+            written += size
+            remaining -= size
+        return written
+
     def _read_all(self, space):
         "Read all the file, don't update the cache"
         # Must run with the lock held!
@@ -519,7 +580,11 @@ class BufferedMixin:
 
     def _raw_read(self, space, buffer, start, length):
         length = intmask(length)
-        w_buf = space.newbuffer(RawBuffer(buffer, start, length))
+        return self._raw_readinto(space, RawBuffer(buffer, start, length),
+                                  length)
+
+    def _raw_readinto(self, space, rwbuffer, length):
+        w_buf = space.newbuffer(rwbuffer)
         while True:
             try:
                 w_size = space.call_method(self.w_raw, "readinto", w_buf)
@@ -851,6 +916,7 @@ W_BufferedReader.typedef = TypeDef(
     read = interp2app(W_BufferedReader.read_w),
     peek = interp2app(W_BufferedReader.peek_w),
     read1 = interp2app(W_BufferedReader.read1_w),
+    readinto = interp2app(W_BufferedReader.readinto_w),
     raw = interp_attrproperty_w("w_raw", cls=W_BufferedReader),
     readline = interp2app(W_BufferedReader.readline_w),
 
@@ -1026,6 +1092,7 @@ W_BufferedRandom.typedef = TypeDef(
     read = interp2app(W_BufferedRandom.read_w),
     peek = interp2app(W_BufferedRandom.peek_w),
     read1 = interp2app(W_BufferedRandom.read1_w),
+    readinto = interp2app(W_BufferedRandom.readinto_w),
     readline = interp2app(W_BufferedRandom.readline_w),
 
     write = interp2app(W_BufferedRandom.write_w),
@@ -3,6 +3,9 @@ from pypy.interpreter.gateway import interp2app, unwrap_spec
 from pypy.interpreter.error import OperationError, wrap_oserror, wrap_oserror2
 from rpython.rlib.rarithmetic import r_longlong
 from rpython.rlib.rstring import StringBuilder
+from rpython.rlib.objectmodel import keepalive_until_here
+from rpython.rlib import rposix
+from rpython.rtyper.lltypesystem import lltype, rffi
 from os import O_RDONLY, O_WRONLY, O_RDWR, O_CREAT, O_TRUNC
 import sys, os, stat, errno
 from pypy.module._io.interp_iobase import W_RawIOBase, convert_size
@@ -369,14 +372,27 @@ class W_FileIO(W_RawIOBase):
         rwbuffer = space.getarg_w('w*', w_buffer)
         length = rwbuffer.getlength()
         try:
-            buf = os.read(self.fd, length)
+            target = rwbuffer.get_raw_address()
+        except ValueError:
+            target = lltype.nullptr(rffi.CCHARP.TO)
+        try:
+            if target:
+                # read directly into the memory of the array, mmap, ...
+                size = rposix.read_into(self.fd, target, length)
+                keepalive_until_here(rwbuffer)
+            else:
+                # read into a raw buffer and copy from there, without
+                # building an intermediate string
+                with lltype.scoped_alloc(rffi.CCHARP.TO, length) as buf:
+                    size = rposix.read_into(self.fd, buf, length)
+                    for i in range(size):
+                        rwbuffer.setitem(i, buf[i])
         except OSError, e:
             if e.errno == errno.EAGAIN:
                 return space.w_None
             raise wrap_oserror(space, e,
                                exception_name='w_IOError')
-        rwbuffer.setslice(0, buf)
-        return space.wrap(len(buf))
+        return space.wrap(size)
 
     def readall_w(self, space):
         self._check_closed(space)
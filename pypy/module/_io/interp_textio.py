@@ -8,6 +8,7 @@ from pypy.interpreter.typedef import (
     interp_attrproperty_w)
 from pypy.module._codecs import interp_codecs
 from pypy.module._io.interp_iobase import W_IOBase, convert_size, trap_eintr
+from rpython.rlib import runicode
 from rpython.rlib.rarithmetic import intmask, r_uint, r_ulonglong
 from rpython.rlib.rbigint import rbigint
 from rpython.rlib.rstring import UnicodeBuilder
@@ -22,10 +23,27 @@ SEEN_ALL  = SEEN_CR | SEEN_LF | SEEN_CRLF
 
 _WINDOWS = sys.platform == 'win32'
 
+# encodings that W_IncrementalNewlineDecoder can decode by itself, without
+# going through an app-level incremental decoder
+_FAST_ENCODINGS = {
+    'utf-8': 'utf-8', 'utf8': 'utf-8', 'u8': 'utf-8',
+    'latin-1': 'latin-1', 'latin1': 'latin-1', 'iso-8859-1': 'latin-1',
+    'iso8859-1': 'latin-1', 'l1': 'latin-1',
+    'ascii': 'ascii', 'us-ascii': 'ascii',
+}
+
+def _fast_encoding(encoding):
+    return _FAST_ENCODINGS.get(encoding.lower().replace('_', '-'), None)
+
+
 class W_IncrementalNewlineDecoder(W_Root):
     seennl = 0
     pendingcr = False
     w_decoder = None
+    # if set, the input bytes are decoded directly instead of by w_decoder
+    fast_encoding = None
+    fast_errors = None
+    pending_bytes = ''
 
     def __init__(self, space):
         self.w_newlines_dict = {
@@ -62,6 +80,10 @@ class W_IncrementalNewlineDecoder(W_Root):
             raise OperationError(space.w_ValueError, space.wrap(
                 "IncrementalNewlineDecoder.__init__ not called"))
 
+        if self.fast_encoding is not None:
+            input = space.bufferstr_w(w_input)
+            return space.wrap(self.decode_bytes(space, input, final))
+
         # decode input (with the eventual \r from a previous pass)
         if not space.is_w(self.w_decoder, space.w_None):
             w_output = space.call_method(self.w_decoder, "decode",
@@ -73,7 +95,37 @@ class W_IncrementalNewlineDecoder(W_Root):
             raise OperationError(space.w_TypeError, space.wrap(
                 "decoder should return a string result"))
 
-        output = space.unicode_w(w_output)
+        return space.wrap(self._translate(space.unicode_w(w_output), final))
+
+    def decode_bytes(self, space, input, final):
+        """Interp-level decode() for decoders with a fast_encoding."""
+        # '\r' can only come from a '\r' byte in these encodings, unless
+        # an error handler inserts one
+        maybe_cr = (self.pendingcr or self.fast_errors != 'strict' or
+                    input.find('\r') >= 0)
+        if self.pending_bytes:
+            input = self.pending_bytes + input
+            self.pending_bytes = ''
+        state = space.fromcache(interp_codecs.CodecState)
+        if self.fast_encoding == 'utf-8':
+            output, consumed = runicode.str_decode_utf_8(
+                input, len(input), self.fast_errors, final,
+                state.decode_error_handler, allow_surrogates=True)
+            if consumed < len(input):
+                # an incomplete sequence, wait for more input
+                assert consumed >= 0
+                self.pending_bytes = input[consumed:]
+        elif self.fast_encoding == 'latin-1':
+            output, _ = runicode.str_decode_latin_1(
+                input, len(input), self.fast_errors, final,
+                state.decode_error_handler)
+        else:
+            output, _ = runicode.str_decode_ascii(
+                input, len(input), self.fast_errors, final,
+                state.decode_error_handler)
+        return self._translate(output, final, maybe_cr)
+
+    def _translate(self, output, final, maybe_cr=True):
         output_len = len(output)
         if self.pendingcr and (final or output_len):
             output = u'\r' + output
@@ -91,7 +143,7 @@ class W_IncrementalNewlineDecoder(W_Root):
                 output_len -= 1
 
         if output_len == 0:
-            return space.wrap(u"")
+            return u""
 
         # Record which newlines are read and do newline translation if
         # desired, all in one pass.
@@ -101,8 +153,7 @@ class W_IncrementalNewlineDecoder(W_Root):
         # for the \r
         only_lf = False
         if seennl == SEEN_LF or seennl == 0:
-            only_lf = (output.find(u'\r') < 0)
-
+            only_lf = not maybe_cr or (output.find(u'\r') < 0)
         if only_lf:
             # If not already seen, quick scan for a possible "\n" character.
             # (there's nothing else to be done, even when in translation mode)
@@ -125,7 +176,11 @@ class W_IncrementalNewlineDecoder(W_Root):
                         i += 1
                     else:
                         seennl |= SEEN_CR
-        elif output.find(u'\r') >= 0:
+        elif not maybe_cr or output.find(u'\r') < 0:
+            # Nothing to translate, but still record the \n
+            if output.find(u'\n') >= 0:
+                seennl |= SEEN_LF
+        else:
             # Translate!
             builder = UnicodeBuilder(output_len)
             i = 0
@@ -146,16 +201,20 @@ class W_IncrementalNewlineDecoder(W_Root):
             output = builder.build()
 
         self.seennl |= seennl
-        return space.wrap(output)
+        return output
 
     def reset_w(self, space):
         self.seennl = 0
         self.pendingcr = False
+        self.pending_bytes = ''
         if self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
             space.call_method(self.w_decoder, "reset")
 
     def getstate_w(self, space):
-        if self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
+        if self.fast_encoding is not None:
+            w_buffer = space.wrap(self.pending_bytes)
+            flag = 0
+        elif self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
             w_state = space.call_method(self.w_decoder, "getstate")
             w_buffer, w_flag = space.unpackiterable(w_state, 2)
             flag = space.r_longlong_w(w_flag)
@@ -173,10 +232,26 @@ class W_IncrementalNewlineDecoder(W_Root):
         self.pendingcr = bool(flag & 1)
         flag >>= 1
 
-        if self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
+        if self.fast_encoding is not None:
+            self.pending_bytes = space.str_w(w_buffer)
+        elif self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
             w_state = space.newtuple([w_buffer, space.wrap(flag)])
             space.call_method(self.w_decoder, "setstate", w_state)
 
+def make_fast_newline_decoder(space, encoding, errors, translate):
+    """Return a W_IncrementalNewlineDecoder which decodes 'encoding' by
+    itself, or None if the encoding is not supported."""
+    fast_encoding = _fast_encoding(encoding)
+    if fast_encoding is None:
+        return None
+    decoder = W_IncrementalNewlineDecoder(space)
+    decoder.w_decoder = space.w_None
+    decoder.translate = translate
+    decoder.w_errors = space.wrap(errors)
+    decoder.fast_encoding = fast_encoding
+    decoder.fast_errors = errors
+    return decoder
+
 W_IncrementalNewlineDecoder.typedef = TypeDef(
     '_io.IncrementalNewlineDecoder',
     __new__ = generic_new_descr(W_IncrementalNewlineDecoder),
@@ -394,14 +469,22 @@ class W_TextIOWrapper(W_TextIOBase):
 
         # build the decoder object
         if space.is_true(space.call_method(w_buffer, "readable")):
-            w_codec = interp_codecs.lookup_codec(space,
-                                                 space.str_w(self.w_encoding))
-            self.w_decoder = space.call_method(w_codec,
-                                               "incrementaldecoder", w_errors)
-            if self.readuniversal:
-                self.w_decoder = space.call_function(
-                    space.gettypeobject(W_IncrementalNewlineDecoder.typedef),
-                    self.w_decoder, space.wrap(self.readtranslate))
+            self.w_decoder = None
+            if self.readuniversal and space.isinstance_w(w_errors,
+                                                         space.w_str):
+                self.w_decoder = make_fast_newline_decoder(
+                    space, space.str_w(self.w_encoding),
+                    space.str_w(w_errors), self.readtranslate)
+            if self.w_decoder is None:
+                w_codec = interp_codecs.lookup_codec(
+                    space, space.str_w(self.w_encoding))
+                self.w_decoder = space.call_method(
+                    w_codec, "incrementaldecoder", w_errors)
+                if self.readuniversal:
+                    self.w_decoder = space.call_function(
+                        space.gettypeobject(
+                            W_IncrementalNewlineDecoder.typedef),
+                        self.w_decoder, space.wrap(self.readtranslate))
 
         # build the encoder object
         if space.is_true(space.call_method(w_buffer, "writable")):
@@ -541,40 +624,64 @@ class W_TextIOWrapper(W_TextIOBase):
         if not self.w_decoder:
             raise OperationError(space.w_IOError, space.wrap("not readable"))
 
+        # utf-8, latin-1 and ascii are decoded at interp-level, without
+        # calling the decoder's methods
+        fast_decoder = self.w_decoder
+        if not (isinstance(fast_decoder, W_IncrementalNewlineDecoder) and
+                fast_decoder.fast_encoding is not None):
+            fast_decoder = None
+
         if self.telling:
             # To prepare for tell(), we need to snapshot a point in the file
             # where the decoder's input buffer is empty.
-            w_state = space.call_method(self.w_decoder, "getstate")
-            # Given this, we know there was a valid snapshot point
-            # len(dec_buffer) bytes ago with decoder state (b'', dec_flags).
-            w_dec_buffer, w_dec_flags = space.unpackiterable(w_state, 2)
-            dec_buffer = space.str_w(w_dec_buffer)
-            dec_flags = space.int_w(w_dec_flags)
+            if fast_decoder is not None:
+                dec_buffer = fast_decoder.pending_bytes
+                dec_flags = int(fast_decoder.pendingcr)
+            else:
+                w_state = space.call_method(self.w_decoder, "getstate")
+                # Given this, we know there was a valid snapshot point
+                # len(dec_buffer) bytes ago with decoder state
+                # (b'', dec_flags).
+                w_dec_buffer, w_dec_flags = space.unpackiterable(w_state, 2)
+                dec_buffer = space.str_w(w_dec_buffer)
+                dec_flags = space.int_w(w_dec_flags)
         else:
             dec_buffer = None
             dec_flags = 0
 
         # Read a chunk, decode it, and put the result in self._decoded_chars
-        w_input = space.call_method(self.w_buffer, "read1",
-                                    space.wrap(self.chunk_size))
+        from pypy.module._io.interp_bufferedio import W_BufferedReader
+        w_buffer = self.w_buffer
+        if (isinstance(w_buffer, W_BufferedReader) and
+                space.type(w_buffer) is space.gettypeobject(
+                    W_BufferedReader.typedef)):
+            w_input = w_buffer.read1_w(space, self.chunk_size)
+        else:
+            w_input = space.call_method(w_buffer, "read1",
+                                        space.wrap(self.chunk_size))
 
         if not space.isinstance_w(w_input, space.w_str):
             msg = "decoder getstate() should have returned a bytes " \
                   "object not '%T'"
             raise oefmt(space.w_TypeError, msg, w_input)
 
-        eof = space.len_w(w_input) == 0
-        w_decoded = space.call_method(self.w_decoder, "decode",
-                                      w_input, space.wrap(eof))
-        check_decoded(space, w_decoded)
-        self._set_decoded_chars(space.unicode_w(w_decoded))
-        if space.len_w(w_decoded) > 0:
+        input = space.str_w(w_input)
+        eof = len(input) == 0
+        if fast_decoder is not None:
+            decoded = fast_decoder.decode_bytes(space, input, eof)
+        else:
+            w_decoded = space.call_method(self.w_decoder, "decode",
+                                          w_input, space.wrap(eof))
+            check_decoded(space, w_decoded)
+            decoded = space.unicode_w(w_decoded)
+        self._set_decoded_chars(decoded)
+        if len(decoded) > 0:
             eof = False
 
         if self.telling:
             # At the snapshot point, len(dec_buffer) bytes before the read,
             # the next input to be decoded is dec_buffer + input_chunk.
-            next_input = dec_buffer + space.str_w(w_input)
+            next_input = dec_buffer + input
             self.snapshot = PositionSnapshot(dec_flags, next_input)
 
         return not eof
@@ -6,7 +6,7 @@ from pypy.interpreter.error import OperationError
 import py.test
 
 class AppTestBufferedReader:
-    spaceconfig = dict(usemodules=['_io'])
+    spaceconfig = dict(usemodules=['_io', 'array'])
 
     def setup_class(cls):
         tmpfile = udir.join('tmpfile')
@@ -150,6 +150,31 @@ class AppTestBufferedReader:
         f.close()
         assert a == 'a\nb\ncxxxxx'
 
+    def test_readinto_large(self):
+        import _io, array
+        data = ''.join([chr(i % 256) for i in range(5000)])
+        with _io.FileIO(self.tmpfile + '.large', 'w') as f:
+            f.write(data)
+        raw = _io.FileIO(self.tmpfile + '.large')
+        f = _io.BufferedReader(raw, buffer_size=64)
+        assert f.read(10) == data[:10]
+        # bigger than the buffer: goes directly into the array
+        a = array.array('c', 'x' * 1000)
+        assert f.readinto(a) == 1000
+        assert a.tostring() == data[10:1010]
+        assert raw.tell() == 1010
+        # smaller than the buffer: goes through it
+        b = bytearray(20)
+        assert f.readinto(b) == 20
+        assert b == data[1010:1030]
+        assert raw.tell() == 1010 + 64
+        assert f.tell() == 1030
+        b = bytearray(5000)
+        assert f.readinto(memoryview(b)) == 5000 - 1030
+        assert b[:5000 - 1030] == data[1030:]
+        assert f.readinto(b) == 0
+        f.close()
+
     def test_seek(self):
         import _io
         raw = _io.FileIO(self.tmpfile)
@@ -223,7 +248,7 @@ class AppTestBufferedReader:
         assert rawio.count == 4
 
 class AppTestBufferedReaderWithThreads(AppTestBufferedReader):
-    spaceconfig = dict(usemodules=['_io', 'thread'])
+    spaceconfig = dict(usemodules=['_io', 'array', 'thread'])
 
 
 class AppTestBufferedWriter:
@@ -3,7 +3,8 @@ import os
 
 
 class AppTestFileIO:
-    spaceconfig = dict(usemodules=['_io'] + (['fcntl'] if os.name != 'nt' else []))
+    spaceconfig = dict(usemodules=['_io', 'array', 'mmap'] +
+                                  (['fcntl'] if os.name != 'nt' else []))
 
     def setup_class(cls):
         tmpfile = udir.join('tmpfile')
@@ -154,6 +155,26 @@ class AppTestFileIO:
         f.close()
         assert a == 'a\nbxxxxxxx'
 
+    def test_readinto_raw_targets(self):
+        import _io, array, mmap
+        with _io.FileIO(self.tmpdir + '/readinto_raw', 'w') as f:
+            f.write('0123456789' * 10)
+        f = _io.FileIO(self.tmpdir + '/readinto_raw', 'r')
+        a = array.array('c', 'x' * 8)
+        assert f.readinto(a) == 8
+        assert a.tostring() == '01234567'
+        a = array.array('i', [0] * 4)
+        assert f.readinto(a) == 4 * a.itemsize
+        assert a.tostring() == ('8901234567' * 2)[:4 * a.itemsize]
+        m = mmap.mmap(-1, 200)
+        assert f.readinto(m) == 100 - 8 - 4 * a.itemsize
+        assert m[:4] == ('0123456789' * 10)[8 + 4 * a.itemsize:][:4]
+        assert m[100 - 8 - 4 * a.itemsize] == '\0'
+        assert f.readinto(m) == 0
+        m.close()
+        raises(ValueError, f.readinto, m)
+        f.close()
+
     def test_nonblocking_read(self):
         try:
             import os, fcntl
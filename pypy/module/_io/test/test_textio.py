@@ -252,6 +252,68 @@ class AppTestTextIO:
         t = _io.TextIOWrapper(NonbytesStream(u'a'))
         t.read() == u'a'
 
+    def test_read_utf8_chunks(self):
+        import _io
+        text = u'\xe9t\xe9\r\n\u20ac uro\r\nna\xefve\rlast\n\U00010000'
+        data = text.encode('utf-8')
+        expected = text.replace(u'\r\n', u'\n').replace(u'\r', u'\n')
+        for chunk_size in range(1, 12):
+            for bufsize in (1, 3, 8192):
+                raw = _io.BufferedReader(_io.BytesIO(data), bufsize)
+                t = _io.TextIOWrapper(raw, encoding='utf-8')
+                t._CHUNK_SIZE = chunk_size
+                lines = list(t)
+                assert u''.join(lines) == expected
+                assert len(lines) == 5
+                assert t.newlines == (u'\r', u'\n', u'\r\n')
+        t = _io.TextIOWrapper(_io.BytesIO(data), encoding='utf-8',
+                              newline='')
+        t._CHUNK_SIZE = 2
+        assert t.read() == text
+        t = _io.TextIOWrapper(_io.BytesIO('ab\xe9'), encoding='utf-8')
+        raises(UnicodeDecodeError, t.read)
+        t = _io.TextIOWrapper(_io.BytesIO('ab\xe9\n'), encoding='utf-8',
+                              errors='replace')
+        assert t.read() == u'ab\ufffd\n'
+
+    def test_read_latin1_ascii(self):
+        import _io
+        data = 'caf\xe9\r\nbar\r'
+        for encoding in ('latin-1', 'latin_1', 'iso-8859-1', 'ascii'):
+            t = _io.TextIOWrapper(_io.BytesIO(data), encoding=encoding,
+                                  errors='replace')
+            t._CHUNK_SIZE = 4
+            line = t.readline()
+            if encoding == 'ascii':
+                assert line == u'caf\ufffd\n'
+            else:
+                assert line == u'caf\xe9\n'
+            assert t.readline() == u'bar\n'
+            assert t.readline() == u''
+        t = _io.TextIOWrapper(_io.BytesIO(data), encoding='ascii')
+        raises(UnicodeDecodeError, t.read)
+
+    def test_tell_seek_utf8(self):
+        import _io
+        text = u'\xe9\xe9\r\n\u20ac\u20ac\n\xe9\r\nz'
+        for chunk_size in (1, 2, 3, 5, 128):
+            b = _io.BufferedRandom(_io.BytesIO(text.encode('utf-8')))
+            t = _io.TextIOWrapper(b, encoding='utf-8')
+            t._CHUNK_SIZE = chunk_size
+            positions = []
+            lines = []
+            while True:
+                positions.append(t.tell())
+                c = t.read(1)
+                if not c:
+                    break
+                lines.append(c)
+            assert u''.join(lines) == text.replace(u'\r\n', u'\n')
+            for i, pos in enumerate(positions[:-1]):
+                t.seek(pos)
+                assert t.read(1) == lines[i]
+                assert t.read() == u''.join(lines[i + 1:])
+
 
 class AppTestIncrementalNewlineDecoder:
     def test_newline_decoder(self):
@@ -1,6 +1,14 @@
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.runicode import str_decode_utf_8
+from rpython.rlib.rfloat import isinf, isnan
+from rpython.rlib.listsort import make_timsort_class
 from pypy.interpreter import unicodehelper
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.objspace.std.dictmultiobject import W_DictMultiObject
+from pypy.objspace.std.floatobject import W_FloatObject, float2string
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.listobject import W_ListObject
 
 
 HEX = '0123456789abcdef'
@@ -16,38 +24,18 @@ ESCAPE_BEFORE_SPACE = [ESCAPE_DICT.get(chr(_i), '\\u%04x' % _i)
                        for _i in range(32)]
 
 
-def raw_encode_basestring_ascii(space, w_string):
-    if space.isinstance_w(w_string, space.w_str):
-        s = space.str_w(w_string)
-        for i in range(len(s)):
-            c = s[i]
-            if c >= ' ' and c <= '~' and c != '"' and c != '\\':
-                pass
-            else:
-                first = i
-                break
+def _find_first_special(s):
+    # returns the index of the first char that needs escaping, or -1 if
+    # 's' is made only of non-special ascii chars
+    for i in range(len(s)):
+        c = s[i]
+        if c >= ' ' and c <= '~' and c != '"' and c != '\\':
+            pass
         else:
-            # the input is a string with only non-special ascii chars
-            return w_string
-
-        eh = unicodehelper.decode_error_handler(space)
-        u = str_decode_utf_8(
-                s, len(s), None, final=True, errorhandler=eh,
-                allow_surrogates=True)[0]
-        sb = StringBuilder(len(u))
-        sb.append_slice(s, 0, first)
-    else:
-        # We used to check if 'u' contains only safe characters, and return
-        # 'w_string' directly.  But this requires an extra pass over all
-        # characters, and the expected use case of this function, from
-        # json.encoder, will anyway re-encode a unicode result back to
-        # a string (with the ascii encoding).  This requires two passes
-        # over the characters.  So we may as well directly turn it into a
-        # string here --- only one pass.
-        u = space.unicode_w(w_string)
-        sb = StringBuilder(len(u))
-        first = 0
+            return i
+    return -1
 
+def _append_unicode_ascii(sb, u, first):
     for i in range(first, len(u)):
         c = u[i]
         if c <= u'~':
@@ -78,5 +66,394 @@ def raw_encode_basestring_ascii(space, w_string):
                 sb.append(HEX[(s2 >> 4) & 0x0f])
                 sb.append(HEX[s2 & 0x0f])
 
+def _append_str_ascii(space, sb, s, first):
+    # 's' is a utf-8 encoded string whose chars before 'first' don't need
+    # any escaping
+    eh = unicodehelper.decode_error_handler(space)
+    u = str_decode_utf_8(
+            s, len(s), None, final=True, errorhandler=eh,
+            allow_surrogates=True)[0]
+    sb.append_slice(s, 0, first)
+    # the prefix is pure ascii, so it has the same length in 'u'
+    _append_unicode_ascii(sb, u, first)
+
+
+def raw_encode_basestring_ascii(space, w_string):
+    if space.isinstance_w(w_string, space.w_str):
+        s = space.str_w(w_string)
+        first = _find_first_special(s)
+        if first < 0:
+            # the input is a string with only non-special ascii chars
+            return w_string
+        sb = StringBuilder(len(s))
+        _append_str_ascii(space, sb, s, first)
+    else:
+        # We used to check if 'u' contains only safe characters, and return
+        # 'w_string' directly.  But this requires an extra pass over all
+        # characters, and the expected use case of this function, from
+        # json.encoder, will anyway re-encode a unicode result back to
+        # a string (with the ascii encoding).  This requires two passes
+        # over the characters.  So we may as well directly turn it into a
+        # string here --- only one pass.
+        u = space.unicode_w(w_string)
+        sb = StringBuilder(len(u))
+        _append_unicode_ascii(sb, u, 0)
+
     res = sb.build()
     return space.wrap(res)
+
+
+ItemBaseTimSort = make_timsort_class()
+
+class ItemSort(ItemBaseTimSort):
+    """Sorts a list of (w_key, w_value) pairs by key, like
+    sorted(d.items(), key=lambda kv: kv[0]) at app-level."""
+    def __init__(self, space, list, listlength=None):
+        ItemBaseTimSort.__init__(self, list, listlength)
+        self.space = space
+
+    def lt(self, a, b):
+        return self.space.is_true(self.space.lt(a[0], b[0]))
+
+StrBaseTimSort = make_timsort_class()
+
+
+class JSONEncoder(object):
+    """Interp-level equivalent of the object walk done by
+    json.encoder.JSONEncoder.encode() for ensure_ascii=True and the
+    default 'utf-8' encoding.  The result is always a str."""
+
+    def __init__(self, space, w_default, skipkeys, check_circular,
+                 allow_nan, sort_keys, indent, item_separator,
+                 key_separator):
+        self.space = space
+        self.w_default = w_default
+        self.skipkeys = skipkeys
+        self.check_circular = check_circular
+        self.allow_nan = allow_nan
+        self.sort_keys = sort_keys
+        self.indent = indent          # -1 means no indentation
+        self.item_separator = item_separator
+        self.key_separator = key_separator
+        self.markers = {}
+        self.sb = StringBuilder()
+
+    # ____________________________________________________________
+    # scalars
+
+    def append_string(self, w_string):
+        space = self.space
+        sb = self.sb
+        if space.isinstance_w(w_string, space.w_str):
+            self.append_str(space.str_w(w_string))
+        else:
+            sb.append('"')
+            _append_unicode_ascii(sb, space.unicode_w(w_string), 0)
+            sb.append('"')
+
+    def append_str(self, s):
+        sb = self.sb
+        sb.append('"')
+        first = _find_first_special(s)
+        if first < 0:
+            sb.append(s)
+        else:
+            _append_str_ascii(self.space, sb, s, first)
+        sb.append('"')
+
+    def append_float(self, x):
+        if isnan(x):
+            text = 'NaN'
+        elif isinf(x):
+            if x > 0.0:
+                text = 'Infinity'
+            else:
+                text = '-Infinity'
+        else:
+            self.sb.append(float2string(x, 'r', 0))
+            return
+        if not self.allow_nan:
+            raise oefmt(self.space.w_ValueError,
+                "Out of range float values are not JSON compliant: %s",
+                float2string(x, 'r', 0))
+        self.sb.append(text)
+
+    def append_w_float(self, w_float):
+        space = self.space
+        x = space.float_w(w_float)
+        if type(w_float) is W_FloatObject or isnan(x) or isinf(x):
+            self.append_float(x)
+        else:
+            # subclasses of float may override __repr__
+            self.sb.append(space.str_w(space.repr(w_float)))
+
+    def append_w_int(self, w_int):
+        space = self.space
+        if type(w_int) is W_IntObject:
+            self.sb.append(str(space.int_w(w_int)))
+        else:
+            self.sb.append(space.str_w(space.str(w_int)))
+
+    # ____________________________________________________________
+    # containers
+
+    def mark(self, w_obj):
+        if self.check_circular:
+            if w_obj in self.markers:
+                raise oefmt(self.space.w_ValueError,
+                            "Circular reference detected")
+            self.markers[w_obj] = None
+
+    def unmark(self, w_obj):
+        if self.check_circular:
+            del self.markers[w_obj]
+
+    def emit_indent(self, level):
+        if self.indent >= 0:
+            self.sb.append('\n')
+            self.sb.append_multiple_char(' ', self.indent * level)
+
+    def emit_separator(self, level):
+        self.sb.append(self.item_separator)
+        self.emit_indent(level)
+
+    def encode_list(self, w_list, level):
+        space = self.space
+        if type(w_list) is W_ListObject:
+            # use the list strategies to walk the items without boxing them
+            intlist = w_list.getitems_int()
+            if intlist is not None:
+                self.encode_int_list(intlist, level)
+                return
+            floatlist = w_list.getitems_float()
+            if floatlist is not None:
+                self.encode_float_list(floatlist, level)
+                return
+            byteslist = w_list.getitems_bytes()
+            if byteslist is not None:
+                self.encode_bytes_list(byteslist, level)
+                return
+            items_w = w_list.getitems_copy()
+        elif space.is_w(space.type(w_list), space.w_tuple):
+            items_w = space.fixedview(w_list)
+        else:
+            # subclasses of list and tuple: go through their (possibly
+            # overridden) __iter__ method, as the app-level code does
+            items_w = []
+            w_iter = space.iter(w_list)
+            while True:
+                try:
+                    w_item = space.next(w_iter)
+                except OperationError, e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    break
+                items_w.append(w_item)
+        if not items_w:
+            self.sb.append('[]')
+            return
+        self.mark(w_list)
+        self.sb.append('[')
+        self.emit_indent(level + 1)
+        for i in range(len(items_w)):
+            if i > 0:
+                self.emit_separator(level + 1)
+            self.encode(items_w[i], level + 1)
+        self.emit_indent(level)
+        self.sb.append(']')
+        self.unmark(w_list)
+
+    def encode_int_list(self, intlist, level):
+        if not intlist:
+            self.sb.append('[]')
+            return
+        self.sb.append('[')
+        self.emit_indent(level + 1)
+        for i in range(len(intlist)):
+            if i > 0:
+                self.emit_separator(level + 1)
+            self.sb.append(str(intlist[i]))
+        self.emit_indent(level)
+        self.sb.append(']')
+
+    def encode_float_list(self, floatlist, level):
+        if not floatlist:
+            self.sb.append('[]')
+            return
+        self.sb.append('[')
+        self.emit_indent(level + 1)
+        for i in range(len(floatlist)):
+            if i > 0:
+                self.emit_separator(level + 1)
+            self.append_float(floatlist[i])
+        self.emit_indent(level)
+        self.sb.append(']')
+
+    def encode_bytes_list(self, byteslist, level):
+        if not byteslist:
+            self.sb.append('[]')
+            return
+        self.sb.append('[')
+        self.emit_indent(level + 1)
+        for i in range(len(byteslist)):
+            if i > 0:
+                self.emit_separator(level + 1)
+            self.append_str(byteslist[i])
+        self.emit_indent(level)
+        self.sb.append(']')
+
+    def encode_dict(self, w_dict, level):
+        space = self.space
+        if type(w_dict) is W_DictMultiObject:
+            if w_dict.length() == 0:
+                self.sb.append('{}')
+                return
+            if self.sort_keys:
+                keys = space.listview_bytes(w_dict)
+                if keys is not None:
+                    self.encode_dict_sorted_bytes(w_dict, keys, level)
+                    return
+            items = []
+            iterator = w_dict.iteritems()
+            while True:
+                w_key, w_value = iterator.next_item()
+                if w_key is None:
+                    break
+                items.append((w_key, w_value))
+        else:
+            # dict subclasses: go through their (possibly overridden)
+            # items() method, as the app-level code does
+            w_iter = space.iter(space.call_method(w_dict, 'items'))
+            items = []
+            while True:
+                try:
+                    w_item = space.next(w_iter)
+                except OperationError, e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    break
+                w_key, w_value = space.fixedview_unroll(w_item, 2)
+                items.append((w_key, w_value))
+            if not items:
+                self.sb.append('{}')
+                return
+        self.mark(w_dict)
+        if self.sort_keys:
+            ItemSort(space, items).sort()
+        self.sb.append('{')
+        self.emit_indent(level + 1)
+        first = True
+        for w_key, w_value in items:
+            if space.isinstance_w(w_key, space.w_basestring):
+                pass
+            elif space.isinstance_w(w_key, space.w_float):
+                pass
+            elif (space.is_w(w_key, space.w_True) or
+                  space.is_w(w_key, space.w_False) or
+                  space.is_w(w_key, space.w_None)):
+                pass
+            elif (space.isinstance_w(w_key, space.w_int) or
+                  space.isinstance_w(w_key, space.w_long)):
+                pass
+            elif self.skipkeys:
+                continue
+            else:
+                raise oefmt(space.w_TypeError, "key %R is not a string",
+                            w_key)
+            if first:
+                first = False
+            else:
+                self.emit_separator(level + 1)
+            self.encode_key(w_key)
+            self.sb.append(self.key_separator)
+            self.encode(w_value, level + 1)
+        self.emit_indent(level)
+        self.sb.append('}')
+        self.unmark(w_dict)
+
+    def encode_dict_sorted_bytes(self, w_dict, keys, level):
+        # fast path for sort_keys=True on dicts with only str keys
+        StrBaseTimSort(keys).sort()
+        self.mark(w_dict)
+        self.sb.append('{')
+        self.emit_indent(level + 1)
+        for i in range(len(keys)):
+            key = keys[i]
+            if i > 0:
+                self.emit_separator(level + 1)
+            self.append_str(key)
+            self.sb.append(self.key_separator)
+            w_value = w_dict.getitem_str(key)
+            if w_value is None or w_dict.length() != len(keys):
+                # the dict was changed by the encoding of a previous value
+                raise oefmt(self.space.w_RuntimeError,
+                            "dictionary changed size during iteration")
+            self.encode(w_value, level + 1)
+        self.emit_indent(level)
+        self.sb.append('}')
+        self.unmark(w_dict)
+
+    def encode_key(self, w_key):
+        space = self.space
+        if space.isinstance_w(w_key, space.w_basestring):
+            self.append_string(w_key)
+            return
+        self.sb.append('"')
+        if space.isinstance_w(w_key, space.w_float):
+            self.append_w_float(w_key)
+        elif space.is_w(w_key, space.w_True):
+            self.sb.append('true')
+        elif space.is_w(w_key, space.w_False):
+            self.sb.append('false')
+        elif space.is_w(w_key, space.w_None):
+            self.sb.append('null')
+        else:
+            self.append_w_int(w_key)
+        self.sb.append('"')
+
+    def encode(self, w_obj, level):
+        space = self.space
+        if space.isinstance_w(w_obj, space.w_basestring):
+            self.append_string(w_obj)
+        elif space.is_w(w_obj, space.w_None):
+            self.sb.append('null')
+        elif space.is_w(w_obj, space.w_True):
+            self.sb.append('true')
+        elif space.is_w(w_obj, space.w_False):
+            self.sb.append('false')
+        elif (space.isinstance_w(w_obj, space.w_int) or
+              space.isinstance_w(w_obj, space.w_long)):
+            self.append_w_int(w_obj)
+        elif space.isinstance_w(w_obj, space.w_float):
+            self.append_w_float(w_obj)
+        elif (space.isinstance_w(w_obj, space.w_list) or
+              space.isinstance_w(w_obj, space.w_tuple)):
+            self.encode_list(w_obj, level)
+        elif space.isinstance_w(w_obj, space.w_dict):
+            self.encode_dict(w_obj, level)
+        else:
+            self.mark(w_obj)
+            w_res = space.call_function(self.w_default, w_obj)
+            self.encode(w_res, level)
+            self.unmark(w_obj)
+
+
+@unwrap_spec(skipkeys=bool, check_circular=bool, allow_nan=bool,
+             sort_keys=bool, item_separator=str, key_separator=str)
+def encode(space, w_obj, w_default, skipkeys, check_circular, allow_nan,
+           sort_keys, w_indent, item_separator, key_separator):
+    """encode(obj, default, skipkeys, check_circular, allow_nan, sort_keys,
+              indent, item_separator, key_separator) -> str
+
+    Return the JSON representation of 'obj' as an ascii-only string, with
+    the same semantics as json.JSONEncoder(ensure_ascii=True).encode(obj).
+    """
+    if space.is_none(w_indent):
+        indent = -1
+    else:
+        indent = max(space.int_w(w_indent), 0)
+    encoder = JSONEncoder(space, w_default, skipkeys, check_circular,
+                          allow_nan, sort_keys, indent, item_separator,
+                          key_separator)
+    encoder.encode(w_obj, 0)
+    return space.wrap(encoder.sb.build())
@@ -13,7 +13,7 @@ def test_skip_whitespace():
     
 
 class AppTest(object):
-    spaceconfig = {"objspace.usemodules._pypyjson": True}
+    spaceconfig = {"usemodules": ['_pypyjson', 'struct', 'binascii']}
 
     def test_raise_on_unicode(self):
         import _pypyjson
@@ -208,3 +208,133 @@ class AppTest(object):
         assert check("a\"c") == "a\\\"c"
         assert check("\\\"\b\f\n\r\t") == '\\\\\\"\\b\\f\\n\\r\\t'
         assert check("\x07") == "\\u0007"
+
+    def test_encode(self):
+        import _pypyjson
+        def default(o):
+            raise TypeError(repr(o) + " is not JSON serializable")
+        def enc(obj, default=default, skipkeys=False, check_circular=True,
+                allow_nan=True, sort_keys=False, indent=None,
+                separators=(', ', ': ')):
+            res = _pypyjson.encode(obj, default, skipkeys, check_circular,
+                                   allow_nan, sort_keys, indent,
+                                   separators[0], separators[1])
+            assert type(res) is str
+            return res
+        assert enc(None) == 'null'
+        assert enc(True) == 'true'
+        assert enc(False) == 'false'
+        assert enc(42) == '42'
+        assert enc(-2**70) == '-1180591620717411303424'
+        assert enc(1.5) == '1.5'
+        assert enc(1e100) == '1e+100'
+        assert enc(float('nan')) == 'NaN'
+        assert enc(float('-inf')) == '-Infinity'
+        raises(ValueError, enc, float('inf'), allow_nan=False)
+        assert enc("a\"b") == '"a\\"b"'
+        assert enc(u"\u1234") == '"\\u1234"'
+        assert enc("\xc3\xa0") == '"\\u00e0"'
+        assert enc([]) == '[]'
+        assert enc({}) == '{}'
+        assert enc([1, 2, 3]) == '[1, 2, 3]'
+        assert enc([1.5, 2.0]) == '[1.5, 2.0]'
+        assert enc(["a", "b\n"]) == '["a", "b\\n"]'
+        assert enc(range(3)) == '[0, 1, 2]'
+        assert enc((1, "a", None, [True])) == '[1, "a", null, [true]]'
+        assert enc({"a": [1, 2]}) == '{"a": [1, 2]}'
+
+    def test_encode_list_subclass(self):
+        import _pypyjson
+        def enc(obj):
+            return _pypyjson.encode(obj, None, False, True, True, False,
+                                    None, ', ', ': ')
+        class L(list):
+            def __iter__(self):
+                return iter([7, 8])
+        class T(tuple):
+            def __iter__(self):
+                return iter(["x"])
+        assert enc(L([1, 2, 3])) == '[7, 8]'
+        assert enc(T((1, 2))) == '["x"]'
+        assert enc([L(), T()]) == '[[7, 8], ["x"]]'
+
+    def test_encode_dict_keys(self):
+        import _pypyjson
+        def enc(obj, skipkeys=False, sort_keys=True):
+            return _pypyjson.encode(obj, None, skipkeys, True, True,
+                                    sort_keys, None, ', ', ': ')
+        assert enc({"b": 1, "a": 2, "c": 3}) == '{"a": 2, "b": 1, "c": 3}'
+        assert enc({u"b": 1, u"a": 2}) == '{"a": 2, "b": 1}'
+        assert enc({2: 1, 1: 2}) == '{"1": 2, "2": 1}'
+        assert enc({1.5: 0}) == '{"1.5": 0}'
+        assert enc({True: 0}) == '{"true": 0}'
+        assert enc({None: 0}) == '{"null": 0}'
+        exc = raises(TypeError, enc, {(1,): 0})
+        assert str(exc.value) == "key (1,) is not a string"
+        assert enc({(1,): 0, "a": 1}, skipkeys=True) == '{"a": 1}'
+        class D(dict):
+            def items(self):
+                return [("x", 5)]
+        assert enc(D(a=1)) == '{"x": 5}'
+
+    def test_encode_indent_separators(self):
+        import _pypyjson
+        def enc(obj, indent, separators):
+            return _pypyjson.encode(obj, None, False, True, True, True,
+                                    indent, separators[0], separators[1])
+        assert enc({"a": [1, {}], "b": 2}, 2, (',', ': ')) == (
+            '{\n  "a": [\n    1,\n    {}\n  ],\n  "b": 2\n}')
+        assert enc([1, 2], 0, (',', ':')) == '[\n1,\n2\n]'
+        assert enc({"a": [1, 2]}, None, (',', ':')) == '{"a":[1,2]}'
+
+    def test_encode_default_and_circular(self):
+        import _pypyjson
+        class A(object):
+            pass
+        def default(o):
+            if isinstance(o, A):
+                return ["A"]
+            raise TypeError("not serializable")
+        def enc(obj, check_circular=True):
+            return _pypyjson.encode(obj, default, False, check_circular,
+                                    True, False, None, ', ', ': ')
+        assert enc([A(), {"x": A()}]) == '[["A"], {"x": ["A"]}]'
+        raises(TypeError, enc, object())
+        l = [1]
+        l.append(l)
+        exc = raises(ValueError, enc, l)
+        assert str(exc.value) == "Circular reference detected"
+        d = {}
+        d["d"] = d
+        raises(ValueError, enc, d)
+        a = A()
+        assert enc([a, a]) == '[["A"], ["A"]]'
+
+    def test_encode_dict_changed_by_default(self):
+        import _pypyjson
+        class A(object):
+            pass
+        d = {"a": A(), "b": 1, "c": 2}
+        def default(o):
+            d.pop("c", None)
+            d["b"] = 3
+            return None
+        def enc(obj):
+            return _pypyjson.encode(obj, default, False, True, True, True,
+                                    None, ', ', ': ')
+        exc = raises(RuntimeError, enc, d)
+        assert str(exc.value) == "dictionary changed size during iteration"
+        d = {"a": A(), "b": 1}
+        assert enc(d) == '{"a": null, "b": 3}'
+
+    def test_json_encode_overridden_iterencode(self):
+        import json
+        class E(json.JSONEncoder):
+            def iterencode(self, o, _one_shot=False):
+                yield '<'
+                for chunk in json.JSONEncoder.iterencode(self, o):
+                    yield chunk
+                yield '>'
+        assert E().encode([1, "a"]) == '<[1, "a"]>'
+        assert json.dumps([1, "a"], cls=E) == '<[1, "a"]>'
+        assert json.JSONEncoder().encode([1, "a"]) == '[1, "a"]'
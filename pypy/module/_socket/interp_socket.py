@@ -495,6 +495,59 @@ class W_Socket(W_Root):
         except SocketError as e:
             raise converted_error(space, e)
 
+    @unwrap_spec(flags=int)
+    def recvmmsg_into_w(self, space, w_buffers, flags=0):
+        """recvmmsg_into(buffers[, flags]) -> list of (nbytes, address info)
+
+        Receive several datagrams with a single system call, each one into
+        the next writable buffer of the list 'buffers'.  Waits until at
+        least one datagram is available, then returns all the queued ones,
+        up to len(buffers).  Datagrams longer than their buffer are
+        truncated.  Buffers exposing raw memory, like array.array, are
+        filled directly; the others, like bytearray, get a copy.
+        """
+        rwbuffers = [space.getarg_w('w*', w_buffer)
+                     for w_buffer in space.listview(w_buffers)]
+        try:
+            results = self.sock.recvmmsg_into(rwbuffers, flags)
+            results_w = [None] * len(results)
+            for i in range(len(results)):
+                nbytes, addr = results[i]
+                if addr:
+                    w_addr = addr_as_object(addr, self.sock.fd, space)
+                else:
+                    w_addr = space.w_None
+                results_w[i] = space.newtuple([space.wrap(nbytes), w_addr])
+        except SocketError as e:
+            raise converted_error(space, e)
+        return space.newlist(results_w)
+
+    @unwrap_spec(flags=int)
+    def sendmmsg_w(self, space, w_buffers, flags=0, w_addresses=None):
+        """sendmmsg(buffers[, flags[, addresses]]) -> count
+
+        Send each string or buffer of the list 'buffers' as a separate
+        datagram, with a single system call.  'addresses' is a list of
+        destination addresses, one per buffer, for sockets that are not
+        connected.  Return the number of datagrams sent; this may be less
+        than len(buffers) if the network is busy.
+        """
+        buffers = [space.getarg_w('s*', w_buffer)
+                   for w_buffer in space.listview(w_buffers)]
+        try:
+            if w_addresses is None or space.is_w(w_addresses, space.w_None):
+                addresses = None
+            else:
+                addresses = [self.addr_from_object(space, w_addr)
+                             for w_addr in space.listview(w_addresses)]
+                if len(addresses) != len(buffers):
+                    raise oefmt(space.w_ValueError,
+                                "sendmmsg() needs one address per buffer")
+            count = self.sock.sendmmsg(buffers, flags, addresses)
+        except SocketError as e:
+            raise converted_error(space, e)
+        return space.wrap(count)
+
     @unwrap_spec(cmd=int)
     def ioctl_w(self, space, cmd, w_option):
         from rpython.rtyper.lltypesystem import rffi, lltype
@@ -646,6 +699,8 @@ for name in ('dup',):
         socketmethodnames.remove(name)
 if hasattr(rsocket._c, 'WSAIoctl'):
     socketmethodnames.append('ioctl')
+if rsocket._c.HAVE_MMSG:
+    socketmethodnames.extend(['recvmmsg_into', 'sendmmsg'])
 
 socketmethods = {}
 for methodname in socketmethodnames:
@@ -614,6 +614,43 @@ class AppTestSocket:
         finally:
             os.chdir(oldcwd)
 
+    def test_mmsg(self):
+        import _socket, array
+        if not hasattr(_socket.socket, 'recvmmsg_into'):
+            skip('no recvmmsg() and sendmmsg()')
+        s1 = _socket.socket(_socket.AF_INET, _socket.SOCK_DGRAM)
+        s1.bind(('127.0.0.1', 0))
+        s2 = _socket.socket(_socket.AF_INET, _socket.SOCK_DGRAM)
+        s2.bind(('127.0.0.1', 0))
+        addr1 = s1.getsockname()
+        count = s2.sendmmsg(['hello', buffer('world!'), u'xyz'], 0,
+                           [addr1] * 3)
+        assert count == 3
+        raises(ValueError, s2.sendmmsg, ['a', 'b'], 0, [addr1])
+        raises(TypeError, s2.sendmmsg, [None], 0, [addr1])
+
+        pool = bytearray(20)
+        buffers = [memoryview(pool)[0:10], array.array('c', ' ' * 3),
+                   bytearray(10)]
+        result = s1.recvmmsg_into(buffers)
+        assert result == [(5, s2.getsockname()), (3, s2.getsockname()),
+                          (3, s2.getsockname())]
+        assert pool[:5] == 'hello'
+        assert buffers[1].tostring() == 'wor'     # truncated
+        assert buffers[2][:3] == 'xyz'
+        raises(TypeError, s1.recvmmsg_into, ['immutable'])
+
+        s2.connect(addr1)
+        assert s2.sendmmsg([array.array('c', 'abc')]) == 1
+        s1.settimeout(5.0)
+        buffers = [bytearray(10), bytearray(10)]
+        assert s1.recvmmsg_into(buffers) == [(3, s2.getsockname())]
+        assert buffers[0][:3] == 'abc'
+        s1.settimeout(0.0)
+        raises(_socket.error, s1.recvmmsg_into, buffers)
+        s1.close()
+        s2.close()
+
 
 class AppTestPacket:
     def setup_class(cls):
@@ -12,7 +12,7 @@ from rpython.rlib import jit
 #
 # Constants and exposed functions
 
-from rpython.rlib.rsre import rsre_core
+from rpython.rlib.rsre import rsre_core, rsre_dfa
 from rpython.rlib.rsre.rsre_char import MAGIC, CODESIZE, MAXREPEAT, getlower, set_unicode_db
 
 
@@ -75,13 +75,13 @@ def import_re(space):
 
 def matchcontext(space, ctx):
     try:
-        return rsre_core.match_context(ctx)
+        return rsre_dfa.match_context(ctx)
     except rsre_core.Error, e:
         raise OperationError(space.w_RuntimeError, space.wrap(e.msg))
 
 def searchcontext(space, ctx):
     try:
-        return rsre_core.search_context(ctx)
+        return rsre_dfa.search_context(ctx)
     except rsre_core.Error, e:
         raise OperationError(space.w_RuntimeError, space.wrap(e.msg))
 
@@ -90,7 +90,8 @@ def searchcontext(space, ctx):
 # SRE_Pattern class
 
 class W_SRE_Pattern(W_Root):
-    _immutable_fields_ = ["code", "flags", "num_groups", "w_groupindex"]
+    _immutable_fields_ = ["code", "flags", "num_groups", "w_groupindex",
+                          "dfa"]
 
     def cannot_copy_w(self):
         space = self.space
@@ -111,8 +112,8 @@ class W_SRE_Pattern(W_Root):
                 pos = len(unicodestr)
             if endpos > len(unicodestr):
                 endpos = len(unicodestr)
-            return rsre_core.UnicodeMatchContext(self.code, unicodestr,
-                                                 pos, endpos, self.flags)
+            ctx = rsre_core.UnicodeMatchContext(self.code, unicodestr,
+                                                pos, endpos, self.flags)
         else:
             buf = space.readbuf_w(w_string)
             size = buf.getlength()
@@ -121,8 +122,10 @@ class W_SRE_Pattern(W_Root):
                 pos = size
             if endpos > size:
                 endpos = size
-            return rsre_core.BufMatchContext(self.code, buf,
-                                             pos, endpos, self.flags)
+            ctx = rsre_core.BufMatchContext(self.code, buf,
+                                            pos, endpos, self.flags)
+        ctx.dfa = self.dfa
+        return ctx
 
     def getmatch(self, ctx, found):
         if found:
@@ -298,6 +301,9 @@ def SRE_Pattern__new__(space, w_subtype, w_pattern, flags, w_code,
     srepat.w_pattern = w_pattern      # the original uncompiled pattern
     srepat.flags = flags
     srepat.code = code
+    # patterns with alternatives or general repeats are searched with a
+    # DFA if possible, to avoid the worst cases of backtracking
+    srepat.dfa = rsre_dfa.compile_dfa(code, flags)
     srepat.num_groups = groups
     srepat.w_groupindex = w_groupindex
     srepat.w_indexgroup = w_indexgroup
@@ -999,3 +999,17 @@ class AppTestOptimizations:
         import re
         assert re.search(".+ab", "wowowowawoabwowo")
         assert None == re.search(".+ab", "wowowaowowo")
+
+    def test_dfa_search(self):
+        import re
+        # searched with a DFA: these would backtrack exponentially
+        r = re.compile(r"(?:a|aa)*b|(?:x|xx)*y")
+        assert r.search("a" * 40) is None
+        assert r.match("xxxxy").span() == (0, 5)
+        r = re.compile(r"\b(?:GET|POST|PUT) (/\w*)+? HTTP/(\d)")
+        s = "x POST /a/b HTTP/1 GET / HTTP/2 PUT /c HTTP"
+        assert [m.groups() for m in r.finditer(s)] == [("/b", "1"),
+                                                      ("/", "2")]
+        assert [m.span() for m in r.finditer(s)] == [(2, 18), (19, 31)]
+        assert r.findall(unicode(s)) == [(u"/b", u"1"), (u"/", u"2")]
+        assert re.sub(r"(?:ab|cd)+", "-", "xabcdyabz") == "x-y-z"
@@ -10,6 +10,8 @@ class Module(MixedModule):
     interpleveldefs = {
         'enable': 'interp_vmprof.enable',
         'disable': 'interp_vmprof.disable',
+        'enable_buffer': 'interp_vmprof.enable_buffer',
+        'read_buffer': 'interp_vmprof.read_buffer',
     }
 
     def setup_after_space_initialization(self):
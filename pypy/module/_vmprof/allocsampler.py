@@ -0,0 +1,25 @@
+"""
+Memory sampling for _vmprof.  This module does not depend on the C part
+of vmprof, so that it can be tested untranslated.
+"""
+
+
+class AllocationSampler(object):
+    """Called by the GC hooks after each minor collection with the number
+    of bytes that were allocated in the nursery since the previous one:
+    calls write_sample() with the allocated size once at least 'period'
+    bytes have been allocated since the last sample.  Forced collections
+    and nursery resizes are taken into account, because the size comes
+    from the GC and not from the nursery size.
+    """
+
+    def __init__(self, period, write_sample):
+        self.period = period
+        self.allocated = 0
+        self.write_sample = write_sample
+
+    def on_gc_minor(self, allocated_bytes):
+        self.allocated += allocated_bytes
+        if self.allocated >= self.period:
+            self.write_sample(self.allocated)
+            self.allocated = 0
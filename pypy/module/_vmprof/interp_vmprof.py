@@ -12,6 +12,8 @@ from pypy.interpreter.error import oefmt, wrap_oserror, OperationError
 from pypy.interpreter.gateway import unwrap_spec
 from pypy.interpreter.pyframe import PyFrame
 from pypy.interpreter.pycode import PyCode
+from pypy.module.gc.hook import LowLevelGcHooks
+from pypy.module._vmprof.allocsampler import AllocationSampler
 
 ROOT = py.path.local(__file__).join('..')
 SRC = ROOT.join('src')
@@ -74,6 +76,20 @@ vmprof_disable = rffi.llexternal("vmprof_disable", [], rffi.INT,
                                  compilation_info=eci,
                                 save_err=rffi.RFFI_SAVE_ERRNO)
 
+vmprof_enable_buffer = rffi.llexternal("vmprof_enable_buffer",
+                                       [rffi.LONG, rffi.LONG], rffi.INT,
+                                       compilation_info=eci,
+                                       save_err=rffi.RFFI_SAVE_ERRNO)
+vmprof_read_buffer = rffi.llexternal("vmprof_read_buffer",
+                                     [rffi.CCHARP, rffi.LONG], rffi.LONG,
+                                     compilation_info=eci, releasegil=False)
+vmprof_free_buffer = rffi.llexternal("vmprof_free_buffer", [], lltype.Void,
+                                     compilation_info=eci, releasegil=False)
+# called from the GC hooks, in the middle of a minor collection
+vmprof_write_memory_sample = rffi.llexternal(
+    "vmprof_write_memory_sample", [lltype.Signed], lltype.Void,
+    compilation_info=eci, _nowrapper=True)
+
 vmprof_register_virtual_function = rffi.llexternal(
     "vmprof_register_virtual_function",
     [rffi.CCHARP, rffi.VOIDP, rffi.VOIDP], lltype.Void,
@@ -126,20 +142,35 @@ def try_cast_to_pycode(gcref):
     return rgc.try_cast_gcref_to_instance(PyCode, gcref)
 
 MAX_CODES = 1000
+READ_CHUNK = 65536
+
+
+def write_memory_sample(allocated):
+    # called from the GC hooks, see AllocationSampler
+    if we_are_translated():
+        vmprof_write_memory_sample(allocated)
+
 
 class VMProf(object):
     def __init__(self):
         self.is_enabled = False
         self.ever_enabled = False
         self.fileno = -1
+        self.buffered = False
+        self.pending_data = StringBuilder()
         self.current_codes = []
 
-    def enable(self, space, fileno, period_usec):
+    def enable(self, space, fileno, period_usec, memory_period=0,
+               buffer_size=0):
+        """Start profiling into 'fileno', or into a ring buffer of
+        'buffer_size' bytes if 'fileno' is -1."""
         if self.is_enabled:
             raise oefmt(space.w_ValueError, "_vmprof already enabled")
         self.fileno = fileno
+        self.buffered = fileno == -1
+        self._reset_pending()
         self.is_enabled = True
-        self.write_header(fileno, period_usec)
+        self.write_header(period_usec)
         if not self.ever_enabled:
             if we_are_translated():
                 pypy_vmprof_init()
@@ -148,20 +179,29 @@ class VMProf(object):
         space.register_code_callback(vmprof_register_code)
         if we_are_translated():
             # does not work untranslated
-            res = vmprof_enable(fileno, period_usec, 0,
-                                lltype.nullptr(rffi.CCHARP.TO), 0)
+            if self.buffered:
+                res = vmprof_enable_buffer(period_usec, buffer_size)
+            else:
+                res = vmprof_enable(fileno, period_usec, 0,
+                                    lltype.nullptr(rffi.CCHARP.TO), 0)
         else:
             res = 0
         if res == -1:
+            self.is_enabled = False
+            space.register_code_callback(None)
             raise wrap_oserror(space, OSError(rposix.get_saved_errno(),
                                               "_vmprof.enable"))
+        if memory_period > 0:
+            gchooks = space.fromcache(LowLevelGcHooks)
+            gchooks.allocation_sampler = AllocationSampler(
+                memory_period, write_memory_sample)
 
     def gather_all_code_objs(self, space):
         all_code_objs = rgc.do_get_objects(try_cast_to_pycode)
         for code in all_code_objs:
             self.register_code(space, code)
 
-    def write_header(self, fileno, period_usec):
+    def write_header(self, period_usec):
         assert period_usec > 0
         b = StringBuilder()
         write_long_to_string_builder(0, b)
@@ -172,10 +212,29 @@ class VMProf(object):
         b.append('\x04') # interp name
         b.append(chr(len('pypy')))
         b.append('pypy')
-        os.write(fileno, b.build())
+        if self.buffered:
+            self._append_pending(b.build())
+        else:
+            self.write(b.build())
+
+    def write(self, data):
+        if self.buffered:
+            # the names of the code objects are kept out of the ring
+            # buffer: without them, the samples cannot be read at all.
+            # So they are never dropped, and read_buffer() returns them
+            # before the samples.
+            self._append_pending(data)
+        else:
+            os.write(self.fileno, data)
+
+    def _append_pending(self, data):
+        self.pending_data.append(data)
+
+    def _reset_pending(self):
+        self.pending_data = StringBuilder()
 
     def register_code(self, space, code):
-        if self.fileno == -1:
+        if not self.is_enabled:
             raise OperationError(space.w_RuntimeError,
                                  space.wrap("vmprof not running"))
         self.current_codes.append(code)
@@ -190,13 +249,54 @@ class VMProf(object):
             write_long_to_string_builder(code._unique_id, b)
             write_long_to_string_builder(len(name), b)
             b.append(name)
-        os.write(self.fileno, b.build())
+        self.write(b.build())
         self.current_codes = []
 
+    def read_buffer(self, space):
+        """Return all the data produced since the previous call."""
+        if not self.buffered:
+            raise oefmt(space.w_ValueError,
+                        "_vmprof is not profiling into a buffer")
+        if self.is_enabled:
+            self._flush_codes(space)
+            self._read_ring_buffer()
+        b = self.pending_data
+        self._reset_pending()
+        return space.wrap(b.build())
+
+    def _read_ring_buffer(self):
+        if not we_are_translated():
+            return     # the ring buffer is not used untranslated
+        with rffi.scoped_alloc_buffer(READ_CHUNK) as buf:
+            while True:
+                size = vmprof_read_buffer(buf.raw, READ_CHUNK)
+                if size <= 0:
+                    break
+                self._append_pending(buf.str(size))
+
+    def write_trailer(self):
+        # like close_profile() in vmprof.c: the trailer marker, followed
+        # by the memory map of the process.  Only called in buffer mode,
+        # and never dropped.
+        self._append_pending('\x03')
+        try:
+            fd = os.open('/proc/self/maps', os.O_RDONLY, 0)
+        except OSError:
+            return
+        try:
+            while True:
+                data = os.read(fd, READ_CHUNK)
+                if not data:
+                    break
+                self._append_pending(data)
+        finally:
+            os.close(fd)
+
     def disable(self, space):
         if not self.is_enabled:
             raise oefmt(space.w_ValueError, "_vmprof not enabled")
         self.is_enabled = False
+        space.fromcache(LowLevelGcHooks).allocation_sampler = None
         space.register_code_callback(None)
         self._flush_codes(space)
         self.fileno = -1
@@ -208,6 +308,13 @@ class VMProf(object):
         if res == -1:
             raise wrap_oserror(space, OSError(rposix.get_saved_errno(),
                                               "_vmprof.disable"))
+        if self.buffered:
+            # move what is left in the ring buffer to 'pending_data',
+            # which read_buffer() returns until the next enable()
+            self._read_ring_buffer()
+            if we_are_translated():
+                vmprof_free_buffer()
+            self.write_trailer()
 
 def vmprof_register_code(space, code):
     from pypy.module._vmprof import Module
@@ -215,12 +322,7 @@ def vmprof_register_code(space, code):
     assert isinstance(mod_vmprof, Module)
     mod_vmprof.vmprof.register_code(space, code)
 
-@unwrap_spec(fileno=int, period=float)
-def enable(space, fileno, period=0.01):   # default 100 Hz
-    from pypy.module._vmprof import Module
-    mod_vmprof = space.getbuiltinmodule('_vmprof')
-    assert isinstance(mod_vmprof, Module)
-    #
+def _get_period_usec(space, period):
     try:
         period_usec = ovfcheck_float_to_int(period * 1000000.0 + 0.5)
         if period_usec <= 0 or period_usec >= 1e6:
@@ -229,8 +331,64 @@ def enable(space, fileno, period=0.01):   # default 100 Hz
     except (ValueError, OverflowError):
         raise OperationError(space.w_ValueError,
                              space.wrap("'period' too large or non positive"))
+    return period_usec
+
+def _check_memory_period(space, memory):
+    if memory < 0:
+        raise oefmt(space.w_ValueError, "'memory' must be non negative")
+
+@unwrap_spec(fileno=int, period=float, memory=int)
+def enable(space, fileno, period=0.01, memory=0):   # default 100 Hz
+    """enable(fileno, period=0.01, memory=0)
+
+    Start writing the profile to the file descriptor 'fileno', taking a
+    sample of the stack every 'period' seconds of CPU time.  If 'memory'
+    is not zero, also take a sample each time about 'memory' bytes have
+    been allocated (the precision is the size of the nursery).
+    """
+    from pypy.module._vmprof import Module
+    mod_vmprof = space.getbuiltinmodule('_vmprof')
+    assert isinstance(mod_vmprof, Module)
+    #
+    if fileno < 0:
+        raise oefmt(space.w_ValueError, "invalid file descriptor")
+    period_usec = _get_period_usec(space, period)
+    _check_memory_period(space, memory)
+    #
+    mod_vmprof.vmprof.enable(space, fileno, period_usec, memory)
+
+@unwrap_spec(size=int, period=float, memory=int)
+def enable_buffer(space, size, period=0.01, memory=0):
+    """enable_buffer(size, period=0.01, memory=0)
+
+    Like enable(), but write the profile into a ring buffer of 'size'
+    bytes, from which read_buffer() returns it while the profiler is
+    running.  The samples taken while the buffer is full are lost.  The
+    names of the code objects are not written to the ring buffer, so they
+    are never lost.
+    """
+    from pypy.module._vmprof import Module
+    mod_vmprof = space.getbuiltinmodule('_vmprof')
+    assert isinstance(mod_vmprof, Module)
+    #
+    if size <= 0:
+        raise oefmt(space.w_ValueError, "'size' must be positive")
+    period_usec = _get_period_usec(space, period)
+    _check_memory_period(space, memory)
     #
-    mod_vmprof.vmprof.enable(space, fileno, period_usec)
+    mod_vmprof.vmprof.enable(space, -1, period_usec, memory, size)
+
+def read_buffer(space):
+    """read_buffer() -> str
+
+    Return the part of the profile produced since the previous call,
+    after enable_buffer().  After disable(), this returns the end of the
+    profile, until the next enable_buffer().
+    """
+    from pypy.module._vmprof import Module
+    mod_vmprof = space.getbuiltinmodule('_vmprof')
+    assert isinstance(mod_vmprof, Module)
+    return mod_vmprof.vmprof.read_buffer(space)
 
 def disable(space):
     from pypy.module._vmprof import Module
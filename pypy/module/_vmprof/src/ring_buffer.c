@@ -0,0 +1,68 @@
+/* The ring buffer of the buffer mode, see vmprof_enable_buffer().  This
+ * file is included by vmprof.c, and does not need libunwind, so that it
+ * can be tested on its own.
+ *
+ * The positions only increase; the signal handler is the only writer
+ * and vmprof_read_buffer() the only reader.
+ */
+
+static char *ring_buffer = NULL;
+static long ring_size = 0;
+static volatile long ring_write_pos = 0;
+static volatile long ring_read_pos = 0;
+
+static void ring_append(const char *data, long size) {
+    long wpos = ring_write_pos;
+    long start, first;
+    if (size > ring_size - (wpos - ring_read_pos)) {
+        return;    // buffer full: drop the whole record
+    }
+    start = wpos % ring_size;
+    first = ring_size - start;
+    if (first > size)
+        first = size;
+    memcpy(ring_buffer + start, data, first);
+    memcpy(ring_buffer, data + first, size - first);
+    __sync_synchronize();
+    ring_write_pos = wpos + size;
+}
+
+static int open_ring_buffer(long buffer_size) {
+    char *buffer = malloc(buffer_size);
+    if (buffer == NULL) {
+        errno = ENOMEM;
+        return -1;
+    }
+    free(ring_buffer);
+    ring_size = buffer_size;
+    ring_write_pos = 0;
+    ring_read_pos = 0;
+    ring_buffer = buffer;
+    return 0;
+}
+
+long vmprof_read_buffer(char *dst, long size) {
+    long rpos = ring_read_pos;
+    long avail, start, first;
+    if (ring_buffer == NULL)
+        return 0;
+    avail = ring_write_pos - rpos;
+    __sync_synchronize();
+    if (avail > size)
+        avail = size;
+    start = rpos % ring_size;
+    first = ring_size - start;
+    if (first > avail)
+        first = avail;
+    memcpy(dst, ring_buffer + start, first);
+    memcpy(dst + first, ring_buffer, avail - first);
+    __sync_synchronize();
+    ring_read_pos = rpos + avail;
+    return avail;
+}
+
+void vmprof_free_buffer(void) {
+    free(ring_buffer);
+    ring_buffer = NULL;
+    ring_size = 0;
+}
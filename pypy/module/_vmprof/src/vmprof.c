@@ -19,6 +19,7 @@
 #include "getpc.h"      // should be first to get the _GNU_SOURCE dfn
 #include <signal.h>
 #include <stdio.h>
+#include <stdlib.h>
 #include <string.h>
 #include <stddef.h>
 #include <assert.h>
@@ -48,6 +49,11 @@ static ptrdiff_t mainloop_sp_offset;
 static vmprof_get_virtual_ip_t mainloop_get_virtual_ip;
 static long last_period_usec = 0;
 static int atfork_hook_installed = 0;
+static int profile_running = 0;
+
+/* in buffer mode, the profile is written into a ring buffer instead
+   of into 'profile_file' */
+#include "ring_buffer.c"
 
 
 /* *************************************************************
@@ -58,6 +64,15 @@ static int atfork_hook_installed = 0;
 #define MARKER_STACKTRACE '\x01'
 #define MARKER_VIRTUAL_IP '\x02'
 #define MARKER_TRAILER '\x03'
+#define MARKER_MEMORY_SAMPLE '\x05'
+
+static void prof_flush(void) {
+    if (ring_buffer != NULL)
+        ring_append(profile_write_buffer, profile_buffer_position);
+    else
+        write(profile_file, profile_write_buffer, profile_buffer_position);
+    profile_buffer_position = 0;
+}
 
 static void prof_word(long x) {
 	((long*)(profile_write_buffer + profile_buffer_position))[0] = x;
@@ -84,8 +99,18 @@ static void prof_write_stacktrace(void** stack, int depth, int count) {
     prof_word(depth);
     for(i=0; i<depth; i++)
         prof_word((long)stack[i]);
-    write(profile_file, profile_write_buffer, profile_buffer_position);
-    profile_buffer_position = 0;
+    prof_flush();
+}
+
+static void prof_write_memory_sample(void** stack, int depth, long bytes) {
+    int i;
+
+	profile_write_buffer[profile_buffer_position++] = MARKER_MEMORY_SAMPLE;
+    prof_word(bytes);
+    prof_word(depth);
+    for(i=0; i<depth; i++)
+        prof_word((long)stack[i]);
+    prof_flush();
 }
 
 
@@ -237,6 +262,8 @@ static int open_profile(int fd, long period_usec, int write_header, char *s,
 	}
 	profile_buffer_position = 0;
     profile_file = fd;
+    free(ring_buffer);
+    ring_buffer = NULL;
 	if (write_header)
 		prof_header(period_usec);
 	if (s)
@@ -365,22 +392,81 @@ int vmprof_enable(int fd, long period_usec, int write_header, char *s,
     if (install_pthread_atfork_hooks() == -1) {
         return -1;
     }
+    profile_running = 1;
+	return 0;
+}
+
+int vmprof_enable_buffer(long period_usec, long buffer_size)
+{
+    int handler_installed = 0, timer_installed = 0, saved_errno;
+    assert(period_usec > 0);
+    assert(buffer_size > 0);
+    if (open_ring_buffer(buffer_size) == -1) {
+		return -1;
+	}
+    profile_buffer_position = 0;
+    if (install_sigprof_handler() == -1) {
+        goto error;
+	}
+    handler_installed = 1;
+    if (install_sigprof_timer(period_usec) == -1) {
+        goto error;
+	}
+    timer_installed = 1;
+    if (install_pthread_atfork_hooks() == -1) {
+        goto error;
+    }
+    profile_running = 1;
 	return 0;
+
+ error:
+    // undo what was done above, keeping the errno of the failure
+    saved_errno = errno;
+    if (timer_installed)
+        remove_sigprof_timer();
+    if (handler_installed)
+        remove_sigprof_handler();
+    vmprof_free_buffer();
+    errno = saved_errno;
+    return -1;
 }
 
 int vmprof_disable(void) {
+    profile_running = 0;
     if (remove_sigprof_timer() == -1) {
 		return -1;
 	}
     if (remove_sigprof_handler() == -1) {
 		return -1;
 	}
+    if (ring_buffer != NULL) {
+        // the ring buffer stays readable until vmprof_free_buffer()
+        return 0;
+    }
     if (close_profile() == -1) {
 		return -1;
 	}
 	return 0;
 }
 
+void vmprof_write_memory_sample(long bytes) {
+    /* Called by the GC hooks outside any signal handler, so SIGPROF is
+       blocked while we use the shared write buffer. */
+    void* stack[MAX_STACK_DEPTH];
+    unw_context_t uc;
+    sigset_t mask, oldmask;
+    int depth;
+    if (!profile_running)
+        return;
+    sigemptyset(&mask);
+    sigaddset(&mask, SIGPROF);
+    pthread_sigmask(SIG_BLOCK, &mask, &oldmask);
+    unw_getcontext(&uc);
+    depth = get_stack_trace(stack, MAX_STACK_DEPTH, (ucontext_t*)&uc);
+    prof_write_memory_sample(stack, depth, bytes);
+    pthread_sigmask(SIG_SETMASK, &oldmask, NULL);
+}
+
 void vmprof_register_virtual_function(const char* name, void* start, void* end) {
 	// XXX unused by pypy
     // for now *end is simply ignored
@@ -16,6 +16,16 @@ int vmprof_enable(int fd, long period_usec, int write_header, char* vips,
 				  int vips_len);
 int vmprof_disable(void);
 
+// buffer mode: the profile goes to a ring buffer of 'buffer_size' bytes,
+// which is read with vmprof_read_buffer() while the profiler is running
+int vmprof_enable_buffer(long period_usec, long buffer_size);
+long vmprof_read_buffer(char *dst, long size);
+void vmprof_free_buffer(void);
+
+// record the current stack with the number of bytes allocated since the
+// previous memory sample
+void vmprof_write_memory_sample(long bytes);
+
 // XXX: this should be part of _vmprof (the CPython extension), not vmprof (the library)
 void vmprof_set_tramp_range(void* start, void* end);
 
@@ -70,3 +70,53 @@ class AppTestVMProf(object):
         raises(ValueError, _vmprof.enable, 999, 1e300)
         raises(ValueError, _vmprof.enable, 999, 1e300 * 1e300)
         raises(ValueError, _vmprof.enable, 999, (1e300*1e300) / (1e300*1e300))
+
+    def test_enable_buffer(self):
+        import _vmprof
+        raises(ValueError, _vmprof.read_buffer)
+        raises(ValueError, _vmprof.enable_buffer, 0)
+        raises(ValueError, _vmprof.enable_buffer, 4096, 0)
+        _vmprof.enable_buffer(65536)
+        raises(ValueError, _vmprof.enable, self.tmpfileno)
+        s = _vmprof.read_buffer()
+        assert s[5 * 8 + 2:].startswith('pypy') or \
+               s[5 * 4 + 2:].startswith('pypy')
+
+        exec """def foo3():
+            pass
+        """ in {}
+
+        s2 = _vmprof.read_buffer()
+        assert "py:foo3:" in s2
+        assert "py:foo3:" not in s
+        _vmprof.disable()
+        s3 = _vmprof.read_buffer()
+        assert '\x03' in s3
+        assert _vmprof.read_buffer() == ''
+
+    def test_enable_memory(self):
+        import _vmprof
+        raises(ValueError, _vmprof.enable, self.tmpfileno, 0.01, -1)
+        raises(ValueError, _vmprof.enable_buffer, 4096, 0.01, -1)
+        _vmprof.enable(self.tmpfileno, 0.01, 1000000)
+        _vmprof.disable()
+
+    def test_buffer_is_bounded(self):
+        import _vmprof
+        _vmprof.enable_buffer(4096)
+        try:
+            d = {}
+            for i in range(200):
+                exec "def bounded%d():\n    pass\n" % i in d
+            s = _vmprof.read_buffer()
+        finally:
+            _vmprof.disable()
+        # the code names are not in the ring buffer: they are never
+        # dropped, even when they don't fit in it
+        assert 'pypy' in s
+        assert 'py:bounded0:' in s
+        assert 'py:bounded199:' in s
+        assert len(s) > 4096
+        s = _vmprof.read_buffer()
+        assert s.startswith('\x03')
+
@@ -0,0 +1,23 @@
+from pypy.module._vmprof.allocsampler import AllocationSampler
+
+
+def test_allocation_sampler():
+    samples = []
+    sampler = AllocationSampler(1000, samples.append)
+    for allocated, expected in [(300, 300), (300, 600), (300, 900),
+                                (300, 0), (300, 300)]:
+        sampler.on_gc_minor(allocated)
+        assert sampler.allocated == expected
+    assert samples == [1200]
+
+def test_forced_collections():
+    # gc.collect() and a smaller nursery report fewer bytes per minor
+    # collection: they must not count as full nurseries
+    samples = []
+    sampler = AllocationSampler(1000, samples.append)
+    for allocated in [10, 0, 50, 940]:
+        sampler.on_gc_minor(allocated)
+    assert samples == [1000]
+    sampler.on_gc_minor(5000)
+    assert samples == [1000, 5000]
+    assert sampler.allocated == 0
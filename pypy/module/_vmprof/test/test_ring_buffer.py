@@ -0,0 +1,81 @@
+import py
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+
+srcdir = py.path.local(__file__).join("..", "..", "src")
+
+# ring_buffer.c does not need libunwind, unlike the rest of vmprof.c
+eci = ExternalCompilationInfo(
+    post_include_bits=["""
+        RPY_EXTERN void test_ring_append(char *data, long size);
+        RPY_EXTERN int test_open_ring_buffer(long buffer_size);
+        RPY_EXTERN long vmprof_read_buffer(char *dst, long size);
+        RPY_EXTERN void vmprof_free_buffer(void);
+    """],
+    separate_module_sources=["""
+        #include <errno.h>
+        #include <stdlib.h>
+        #include <string.h>
+    """ + srcdir.join("ring_buffer.c").read() + """
+        void test_ring_append(char *data, long size) {
+            ring_append(data, size);
+        }
+        int test_open_ring_buffer(long buffer_size) {
+            return open_ring_buffer(buffer_size);
+        }
+    """])
+
+ring_append = rffi.llexternal("test_ring_append", [rffi.CCHARP, rffi.LONG],
+                              lltype.Void, compilation_info=eci)
+open_ring_buffer = rffi.llexternal("test_open_ring_buffer", [rffi.LONG],
+                                   rffi.INT, compilation_info=eci)
+vmprof_read_buffer = rffi.llexternal("vmprof_read_buffer",
+                                     [rffi.CCHARP, rffi.LONG], rffi.LONG,
+                                     compilation_info=eci)
+vmprof_free_buffer = rffi.llexternal("vmprof_free_buffer", [], lltype.Void,
+                                     compilation_info=eci)
+
+
+def append(data):
+    with rffi.scoped_str2charp(data) as p:
+        ring_append(p, len(data))
+
+def read(size=100):
+    with rffi.scoped_alloc_buffer(size) as buf:
+        n = vmprof_read_buffer(buf.raw, size)
+        return buf.str(n)
+
+
+class TestRingBuffer(object):
+    def teardown_method(self, meth):
+        vmprof_free_buffer()
+
+    def test_no_buffer(self):
+        assert read() == ''
+
+    def test_append_read(self):
+        assert open_ring_buffer(10) == 0
+        append("abcd")
+        append("ef")
+        assert read(3) == 'abc'
+        assert read() == 'def'
+        assert read() == ''
+
+    def test_wraps_around(self):
+        assert open_ring_buffer(10) == 0
+        for i in range(20):
+            append("%d234" % (i % 10))
+            assert read() == "%d234" % (i % 10)
+
+    def test_full(self):
+        assert open_ring_buffer(10) == 0
+        append("abcd")
+        append("efgh")
+        append("ijkl")     # dropped, does not fit
+        append("mn")
+        assert read(2) == 'ab'
+        append("opqr")     # dropped
+        append("op")
+        assert read() == 'cdefghmnop'
+        append("0123456789")
+        assert read() == '0123456789'
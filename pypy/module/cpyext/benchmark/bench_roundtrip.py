@@ -0,0 +1,74 @@
+"""Times typical C-API round trips: every call converts objects from the
+interpreter to PyObjects and back.  Build the extension first with
+
+    python setup.py build_ext -i
+
+and run this file with the same interpreter.
+
+Only instances of user-defined classes (with mapdict) and type objects
+store their PyObject on themselves.  Ints, strs, tuples, lists and the
+other built-in objects still find it in the py_objects_w2r dictionary:
+converting them to a PyObject costs a dict lookup, which is what
+sum_list mostly measures.  PyObject to interpreter object is a field
+load for all of them.
+"""
+import sys, time
+import roundtrip
+
+N = 1000000
+
+class A(object):
+    def __init__(self):
+        self.x = 42
+
+def bench_identity():
+    f = roundtrip.identity
+    objs = [A() for i in range(100)]
+    for i in xrange(N // 100):
+        for obj in objs:
+            f(obj)
+
+def bench_new_objects():
+    f = roundtrip.identity
+    for i in xrange(N):
+        f(A())
+
+def bench_first_item():
+    f = roundtrip.first_item
+    lst = [A()]
+    for i in xrange(N):
+        f(lst)
+
+def bench_sum_list():
+    f = roundtrip.sum_list
+    lst = range(1000)
+    for i in xrange(N // 1000):
+        f(lst)
+
+def bench_get_attr():
+    f = roundtrip.get_attr
+    a = A()
+    for i in xrange(N):
+        f(a, 'x')
+
+def bench_call_back():
+    f = roundtrip.call_back
+    g = lambda x: x
+    a = A()
+    for i in xrange(N):
+        f(g, a)
+
+BENCHMARKS = [bench_identity, bench_new_objects, bench_first_item,
+              bench_sum_list, bench_get_attr, bench_call_back]
+
+def main(names):
+    for bench in BENCHMARKS:
+        name = bench.__name__[len('bench_'):]
+        if names and name not in names:
+            continue
+        t0 = time.time()
+        bench()
+        print '%-15s %.3f s' % (name, time.time() - t0)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,76 @@
+#include <Python.h>
+
+/* Small functions that make the usual C-API round trips: objects go
+   from the interpreter to C and back, with as little work as possible
+   done on the C side. */
+
+static PyObject *
+identity(PyObject *self, PyObject *arg)
+{
+    Py_INCREF(arg);
+    return arg;
+}
+
+static PyObject *
+first_item(PyObject *self, PyObject *seq)
+{
+    if (!PyList_Check(seq) || PyList_GET_SIZE(seq) == 0) {
+        PyErr_SetString(PyExc_TypeError, "non-empty list expected");
+        return NULL;
+    }
+    seq = PyList_GET_ITEM(seq, 0);
+    Py_INCREF(seq);
+    return seq;
+}
+
+static PyObject *
+sum_list(PyObject *self, PyObject *seq)
+{
+    Py_ssize_t i, n;
+    long total = 0;
+    if (!PyList_Check(seq)) {
+        PyErr_SetString(PyExc_TypeError, "list expected");
+        return NULL;
+    }
+    n = PyList_GET_SIZE(seq);
+    for (i = 0; i < n; i++) {
+        long x = PyInt_AsLong(PyList_GET_ITEM(seq, i));
+        if (x == -1 && PyErr_Occurred())
+            return NULL;
+        total += x;
+    }
+    return PyInt_FromLong(total);
+}
+
+static PyObject *
+get_attr(PyObject *self, PyObject *args)
+{
+    PyObject *obj, *name;
+    if (!PyArg_ParseTuple(args, "OO", &obj, &name))
+        return NULL;
+    return PyObject_GetAttr(obj, name);
+}
+
+static PyObject *
+call_back(PyObject *self, PyObject *args)
+{
+    PyObject *func, *arg;
+    if (!PyArg_ParseTuple(args, "OO", &func, &arg))
+        return NULL;
+    return PyObject_CallFunctionObjArgs(func, arg, NULL);
+}
+
+static PyMethodDef roundtrip_methods[] = {
+    {"identity", identity, METH_O, NULL},
+    {"first_item", first_item, METH_O, NULL},
+    {"sum_list", sum_list, METH_O, NULL},
+    {"get_attr", get_attr, METH_VARARGS, NULL},
+    {"call_back", call_back, METH_VARARGS, NULL},
+    {NULL, NULL, 0, NULL}
+};
+
+PyMODINIT_FUNC
+initroundtrip(void)
+{
+    Py_InitModule("roundtrip", roundtrip_methods);
+}
@@ -0,0 +1,4 @@
+from distutils.core import setup, Extension
+
+setup(name='roundtrip',
+      ext_modules=[Extension('roundtrip', ['roundtrip.c'])])
@@ -194,6 +194,7 @@ def PyObject_Init(space, obj, type):
         PyErr_NoMemory(space)
     obj.c_ob_type = type
     obj.c_ob_refcnt = 1
+    obj.c_ob_pypy_link = 0
     return obj
 
 @cpython_api([PyVarObject, PyTypeObjectPtr, Py_ssize_t], PyObject)
@@ -134,11 +134,22 @@ def get_typedescr(typedef):
 #________________________________________________________
 # refcounted object support
 
+class CpyextLink(W_Root):
+    """The PyObject of an interpreter object.  It is stored on the
+    interpreter object itself with setcpyextlink(), or in
+    RefcountState.py_objects_w2r for objects that have no room for it.
+    In the other direction, the ob_pypy_link field of the PyObject is an
+    index (plus one) into RefcountState.linked_w.
+    """
+    def __init__(self, pyobj):
+        self.pyobj = pyobj
+
 class RefcountState:
     def __init__(self, space):
         self.space = space
-        self.py_objects_w2r = {} # { w_obj -> raw PyObject }
-        self.py_objects_r2w = {} # { addr of raw PyObject -> w_obj }
+        self.py_objects_w2r = {} # { w_obj -> CpyextLink }, fallback only
+        self.linked_w = []       # [ w_obj ], see CpyextLink
+        self.free_links = []     # free indices in linked_w
 
         self.lifeline_dict = RWeakKeyDictionary(W_Root, PyOLifeline)
 
@@ -152,19 +163,73 @@ class RefcountState:
 
     def _cleanup_(self):
         assert self.borrow_mapping == {None: {}}
-        self.py_objects_r2w.clear() # is not valid anymore after translation
-
-    def init_r2w_from_w2r(self):
-        """Rebuilds the dict py_objects_r2w on startup"""
-        for w_obj, obj in self.py_objects_w2r.items():
-            ptr = rffi.cast(ADDR, obj)
-            self.py_objects_r2w[ptr] = w_obj
 
     def print_refcounts(self):
         print "REFCOUNTS"
-        for w_obj, obj in self.py_objects_w2r.items():
+        for w_obj, obj in self.linked_objects():
             print "%r: %i" % (w_obj, obj.c_ob_refcnt)
 
+    def linked_objects(self):
+        """NOT_RPYTHON: returns the list of (w_obj, PyObject) pairs"""
+        result = []
+        for index, w_obj in enumerate(self.linked_w):
+            if w_obj is not None:
+                py_obj = self.get_link(w_obj).pyobj
+                if py_obj.c_ob_pypy_link == index + 1:
+                    result.append((w_obj, py_obj))
+        return result
+
+    def get_link(self, w_obj):
+        # only mapdict instances and type objects have room for the link;
+        # the built-in objects (ints, strs, tuples, lists...) don't, to
+        # keep them small when cpyext is not used, so they go through
+        # the dictionary
+        link = w_obj.getcpyextlink()
+        if link is None:
+            link = self.py_objects_w2r.get(w_obj, None)
+        return link
+
+    def get_pyobj(self, w_obj):
+        """Returns the PyObject tied to w_obj, or NULL"""
+        link = self.get_link(w_obj)
+        if link is None:
+            return lltype.nullptr(PyObject.TO)
+        return link.pyobj
+
+    def link(self, w_obj, py_obj):
+        link = self.get_link(w_obj)
+        if link is None:
+            link = CpyextLink(py_obj)
+            if not w_obj.setcpyextlink(link):
+                self.py_objects_w2r[w_obj] = link
+        else:
+            # a replaced PyObject still leads back to w_obj, like the
+            # static objects of api.py which replace the bootstrap ones
+            link.pyobj = py_obj
+        if py_obj: # init_typeobject() bootstraps with NULL references
+            if self.free_links:
+                index = self.free_links.pop()
+                self.linked_w[index] = w_obj
+            else:
+                index = len(self.linked_w)
+                self.linked_w.append(w_obj)
+            py_obj.c_ob_pypy_link = index + 1
+
+    def unlink(self, py_obj):
+        """Unties a PyObject from its interpreter object, which is
+        returned.  Returns None if the PyObject was not tied to anything.
+        """
+        index = py_obj.c_ob_pypy_link - 1
+        if index < 0:
+            return None
+        py_obj.c_ob_pypy_link = 0
+        w_obj = self.linked_w[index]
+        self.linked_w[index] = None
+        self.free_links.append(index)
+        if not w_obj.setcpyextlink(None):
+            del self.py_objects_w2r[w_obj]
+        return w_obj
+
     def get_from_lifeline(self, w_obj):
         lifeline = self.lifeline_dict.get(w_obj)
         if lifeline is not None: # make old PyObject ready for use in C code
@@ -224,7 +289,7 @@ class RefcountState:
 
     def forget_borrowee(self, w_obj):
         "De-register an object from the list of borrowed references"
-        ref = self.py_objects_w2r.get(w_obj, lltype.nullptr(PyObject.TO))
+        ref = self.get_pyobj(w_obj)
         if not ref:
             if DEBUG_REFCOUNT:
                 print >>sys.stderr, "Borrowed object is already gone!"
@@ -271,16 +336,13 @@ def track_reference(space, py_obj, w_obj, replace=False):
     Ties together a PyObject and an interpreter object.
     """
     # XXX looks like a PyObject_GC_TRACK
-    ptr = rffi.cast(ADDR, py_obj)
     state = space.fromcache(RefcountState)
     if DEBUG_REFCOUNT:
         debug_refcount("MAKREF", py_obj, w_obj)
         if not replace:
-            assert w_obj not in state.py_objects_w2r
-        assert ptr not in state.py_objects_r2w
-    state.py_objects_w2r[w_obj] = py_obj
-    if ptr: # init_typeobject() bootstraps with NULL references
-        state.py_objects_r2w[ptr] = w_obj
+            assert not state.get_pyobj(w_obj)
+        assert not py_obj or py_obj.c_ob_pypy_link == 0
+    state.link(w_obj, py_obj)
 
 def make_ref(space, w_obj):
     """
@@ -290,12 +352,12 @@ def make_ref(space, w_obj):
         return lltype.nullptr(PyObject.TO)
     assert isinstance(w_obj, W_Root)
     state = space.fromcache(RefcountState)
-    try:
-        py_obj = state.py_objects_w2r[w_obj]
-    except KeyError:
+    link = state.get_link(w_obj)
+    if link is None:
         py_obj = create_ref(space, w_obj)
         track_reference(space, py_obj, w_obj)
     else:
+        py_obj = link.pyobj
         Py_IncRef(space, py_obj)
     return py_obj
 
@@ -308,13 +370,10 @@ def from_ref(space, ref):
     assert lltype.typeOf(ref) == PyObject
     if not ref:
         return None
-    state = space.fromcache(RefcountState)
-    ptr = rffi.cast(ADDR, ref)
-
-    try:
-        return state.py_objects_r2w[ptr]
-    except KeyError:
-        pass
+    index = ref.c_ob_pypy_link - 1
+    if index >= 0:
+        state = space.fromcache(RefcountState)
+        return state.linked_w[index]
 
     # This reference is not yet a real interpreter object.
     # Realize it.
@@ -338,18 +397,15 @@ def Py_DecRef(space, obj):
         debug_refcount("DECREF", obj, obj.c_ob_refcnt, frame_stackdepth=3)
     if obj.c_ob_refcnt == 0:
         state = space.fromcache(RefcountState)
-        ptr = rffi.cast(ADDR, obj)
-        if ptr not in state.py_objects_r2w:
+        w_obj = state.unlink(obj)
+        if w_obj is None:
             # this is a half-allocated object, lets call the deallocator
-            # without modifying the r2w/w2r dicts
+            # directly
             _Py_Dealloc(space, obj)
         else:
-            w_obj = state.py_objects_r2w[ptr]
-            del state.py_objects_r2w[ptr]
             w_type = space.type(w_obj)
             if not w_type.is_cpytype():
                 _Py_Dealloc(space, obj)
-            del state.py_objects_w2r[w_obj]
             # if the object was a container for borrowed references
             state.delete_borrower(w_obj)
     else:
@@ -371,6 +427,7 @@ def Py_IncRef(space, obj):
 @cpython_api([PyObject], lltype.Void)
 def _Py_NewReference(space, obj):
     obj.c_ob_refcnt = 1
+    obj.c_ob_pypy_link = 0
     w_type = from_ref(space, rffi.cast(PyObject, obj.c_ob_type))
     assert isinstance(w_type, W_TypeObject)
     get_typedescr(w_type.instancetypedef).realize(space, obj)
@@ -1,4 +1,3 @@
-from rpython.rlib.objectmodel import we_are_translated
 from rpython.rtyper.lltypesystem import rffi, lltype
 from pypy.interpreter.error import OperationError
 from rpython.rtyper.lltypesystem import lltype
@@ -74,13 +73,9 @@ class State:
         "This function is called when the program really starts"
 
         from pypy.module.cpyext.typeobject import setup_new_method_def
-        from pypy.module.cpyext.pyobject import RefcountState
         from pypy.module.cpyext.api import INIT_FUNCTIONS
 
         setup_new_method_def(space)
-        if we_are_translated():
-            refcountstate = space.fromcache(RefcountState)
-            refcountstate.init_r2w_from_w2r()
 
         for func in INIT_FUNCTIONS:
             func(space)
@@ -94,7 +94,7 @@ def compile_extension_module(space, modname, **kwds):
 def freeze_refcnts(self):
     state = self.space.fromcache(RefcountState)
     self.frozen_refcounts = {}
-    for w_obj, obj in state.py_objects_w2r.iteritems():
+    for w_obj, obj in state.linked_objects():
         self.frozen_refcounts[w_obj] = obj.c_ob_refcnt
     #state.print_refcounts()
     self.frozen_ll2callocations = set(ll2ctypes.ALLOCATED.values())
@@ -114,7 +114,7 @@ class LeakCheckingTest(object):
         import gc; gc.collect()
         # Clear all lifelines, objects won't resurrect
         for w_obj, obj in state.lifeline_dict._dict.items():
-            if w_obj not in state.py_objects_w2r:
+            if not state.get_pyobj(w_obj):
                 state.lifeline_dict.set(w_obj, None)
             del obj
         import gc; gc.collect()
@@ -140,7 +140,7 @@ class LeakCheckingTest(object):
         lost_objects_w = identity_dict()
         lost_objects_w.update((key, None) for key in self.frozen_refcounts.keys())
 
-        for w_obj, obj in state.py_objects_w2r.iteritems():
+        for w_obj, obj in state.linked_objects():
             base_refcnt = self.frozen_refcounts.get(w_obj)
             delta = obj.c_ob_refcnt
             if base_refcnt is not None:
@@ -204,6 +204,32 @@ class TestObject(BaseApiTest):
         assert space.isinstance_w(w_dir, space.w_list)
         assert space.is_true(space.contains(w_dir, space.wrap('modules')))
 
+    def test_link(self, space, api):
+        from pypy.module.cpyext.pyobject import (
+            RefcountState, make_ref, from_ref, Py_DecRef)
+        state = space.fromcache(RefcountState)
+        w_obj = space.newlist([space.wrap(1)])
+        assert not state.get_pyobj(w_obj)
+        ref = make_ref(space, w_obj)
+        assert ref.c_ob_pypy_link > 0
+        assert state.get_pyobj(w_obj) == ref
+        assert from_ref(space, ref) is w_obj
+        assert make_ref(space, w_obj) == ref
+        assert ref.c_ob_refcnt == 2
+        Py_DecRef(space, ref)
+        Py_DecRef(space, ref)
+        assert not state.get_pyobj(w_obj)
+        # type objects keep the link on themselves
+        w_type = space.appexec([], """():
+            class A(object):
+                pass
+            return A""")
+        ref = make_ref(space, w_type)
+        assert w_type not in state.py_objects_w2r
+        assert w_type.getcpyextlink().pyobj == ref
+        assert from_ref(space, ref) is w_type
+        Py_DecRef(space, ref)
+
 class AppTestObject(AppTestCpythonExtensionBase):
     def setup_class(cls):
         AppTestCpythonExtensionBase.setup_class.im_func(cls)
@@ -0,0 +1,307 @@
+from rpython.memory.gc.hook import GcHooks
+from rpython.memory.gc import incminimark
+from rpython.rlib.rarithmetic import r_uint, r_longlong, longlongmax
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.typedef import TypeDef, interp_attrproperty
+from pypy.interpreter.typedef import GetSetProperty
+from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.executioncontext import AsyncAction
+
+
+class LowLevelGcHooks(GcHooks):
+    """The hooks called by the GC.  They only accumulate the numbers in
+    the actions below and fire them: the app-level callbacks are invoked
+    later, between two bytecodes, with all the events that occurred in
+    the meantime.
+    """
+
+    def __init__(self, space):
+        self.space = space
+        self.w_hooks = space.fromcache(W_AppLevelHooks)
+        # set by _vmprof when it takes memory samples
+        self.allocation_sampler = None
+
+    def is_gc_minor_enabled(self):
+        return (self.w_hooks.gc_minor_enabled or
+                self.allocation_sampler is not None)
+
+    def is_gc_collect_step_enabled(self):
+        return self.w_hooks.gc_collect_step_enabled
+
+    def is_gc_collect_enabled(self):
+        return self.w_hooks.gc_collect_enabled
+
+    def on_gc_minor(self, duration, total_memory_used, surviving_bytes,
+                    pinned_objects, allocated_bytes):
+        if self.allocation_sampler is not None:
+            self.allocation_sampler.on_gc_minor(allocated_bytes)
+            if not self.w_hooks.gc_minor_enabled:
+                return
+        action = self.w_hooks.gc_minor
+        action.count += 1
+        action.add_duration(duration)
+        action.total_memory_used = total_memory_used
+        action.surviving_bytes += surviving_bytes
+        action.pinned_objects = pinned_objects
+        action.fire()
+
+    def on_gc_collect_step(self, duration, oldstate, newstate):
+        action = self.w_hooks.gc_collect_step
+        if action.count == 0:
+            action.oldstate = oldstate
+        action.count += 1
+        action.add_duration(duration)
+        action.newstate = newstate
+        action.fire()
+
+    def on_gc_collect(self, num_major_collects,
+                      arenas_count_before, arenas_count_after,
+                      arenas_bytes, rawmalloc_bytes_before,
+                      rawmalloc_bytes_after):
+        action = self.w_hooks.gc_collect
+        if action.count == 0:
+            action.arenas_count_before = arenas_count_before
+            action.rawmalloc_bytes_before = rawmalloc_bytes_before
+        action.count += 1
+        action.num_major_collects = num_major_collects
+        action.arenas_count_after = arenas_count_after
+        action.arenas_bytes = arenas_bytes
+        action.rawmalloc_bytes_after = rawmalloc_bytes_after
+        action.fire()
+
+
+class W_AppLevelHooks(W_Root):
+
+    def __init__(self, space):
+        self.space = space
+        self.gc_minor_enabled = False
+        self.gc_collect_step_enabled = False
+        self.gc_collect_enabled = False
+        self.gc_minor = GcMinorHookAction(space)
+        self.gc_collect_step = GcCollectStepHookAction(space)
+        self.gc_collect = GcCollectHookAction(space)
+
+    def descr_get_on_gc_minor(self, space):
+        return self.gc_minor.w_callable
+
+    def descr_set_on_gc_minor(self, space, w_obj):
+        self.gc_minor_enabled = not space.is_none(w_obj)
+        self.gc_minor.w_callable = w_obj
+
+    def descr_get_on_gc_collect_step(self, space):
+        return self.gc_collect_step.w_callable
+
+    def descr_set_on_gc_collect_step(self, space, w_obj):
+        self.gc_collect_step_enabled = not space.is_none(w_obj)
+        self.gc_collect_step.w_callable = w_obj
+
+    def descr_get_on_gc_collect(self, space):
+        return self.gc_collect.w_callable
+
+    def descr_set_on_gc_collect(self, space, w_obj):
+        self.gc_collect_enabled = not space.is_none(w_obj)
+        self.gc_collect.w_callable = w_obj
+
+    def descr_set(self, space, w_obj):
+        """set(obj): use the attributes 'on_gc_minor', 'on_gc_collect_step'
+        and 'on_gc_collect' of 'obj' as the hooks; missing attributes
+        disable the corresponding hook."""
+        w_none = space.w_None
+        self.descr_set_on_gc_minor(space, space.findattr(
+            w_obj, space.wrap('on_gc_minor')) or w_none)
+        self.descr_set_on_gc_collect_step(space, space.findattr(
+            w_obj, space.wrap('on_gc_collect_step')) or w_none)
+        self.descr_set_on_gc_collect(space, space.findattr(
+            w_obj, space.wrap('on_gc_collect')) or w_none)
+
+    def descr_reset(self, space):
+        """reset(): disable all the hooks."""
+        self.descr_set_on_gc_minor(space, space.w_None)
+        self.descr_set_on_gc_collect_step(space, space.w_None)
+        self.descr_set_on_gc_collect(space, space.w_None)
+
+
+class GcHookAction(AsyncAction):
+    """Base class for the actions that call an app-level hook with the
+    statistics accumulated since the previous call."""
+
+    def __init__(self, space):
+        AsyncAction.__init__(self, space)
+        self.w_callable = space.w_None
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.duration = r_longlong(0)
+        self.duration_min = r_longlong(longlongmax)
+        self.duration_max = r_longlong(0)
+
+    def add_duration(self, duration):
+        self.duration += duration
+        if duration < self.duration_min:
+            self.duration_min = duration
+        if duration > self.duration_max:
+            self.duration_max = duration
+
+    def perform(self, ec, frame):
+        if self.count == 0:
+            return
+        w_stats = self.make_stats()
+        self.reset()
+        w_callable = self.w_callable
+        if not self.space.is_none(w_callable):
+            self.space.call_function(w_callable, w_stats)
+
+    def make_stats(self):
+        raise NotImplementedError
+
+
+class GcMinorHookAction(GcHookAction):
+
+    def reset(self):
+        GcHookAction.reset(self)
+        self.total_memory_used = r_uint(0)
+        self.surviving_bytes = 0
+        self.pinned_objects = 0
+
+    def make_stats(self):
+        return W_GcMinorStats(self.count, self.duration, self.duration_min,
+                              self.duration_max, self.total_memory_used,
+                              self.surviving_bytes, self.pinned_objects)
+
+
+class GcCollectStepHookAction(GcHookAction):
+
+    def reset(self):
+        GcHookAction.reset(self)
+        self.oldstate = 0
+        self.newstate = 0
+
+    def make_stats(self):
+        return W_GcCollectStepStats(self.count, self.duration,
+                                    self.duration_min, self.duration_max,
+                                    self.oldstate, self.newstate)
+
+
+class GcCollectHookAction(GcHookAction):
+
+    def reset(self):
+        GcHookAction.reset(self)
+        self.num_major_collects = 0
+        self.arenas_count_before = 0
+        self.arenas_count_after = 0
+        self.arenas_bytes = r_uint(0)
+        self.rawmalloc_bytes_before = r_uint(0)
+        self.rawmalloc_bytes_after = r_uint(0)
+
+    def make_stats(self):
+        return W_GcCollectStats(self.count, self.num_major_collects,
+                                self.arenas_count_before,
+                                self.arenas_count_after, self.arenas_bytes,
+                                self.rawmalloc_bytes_before,
+                                self.rawmalloc_bytes_after)
+
+
+class W_GcMinorStats(W_Root):
+
+    def __init__(self, count, duration, duration_min, duration_max,
+                 total_memory_used, surviving_bytes, pinned_objects):
+        self.count = count
+        self.duration = duration
+        self.duration_min = duration_min
+        self.duration_max = duration_max
+        self.total_memory_used = total_memory_used
+        self.surviving_bytes = surviving_bytes
+        self.pinned_objects = pinned_objects
+
+
+class W_GcCollectStepStats(W_Root):
+
+    def __init__(self, count, duration, duration_min, duration_max,
+                 oldstate, newstate):
+        self.count = count
+        self.duration = duration
+        self.duration_min = duration_min
+        self.duration_max = duration_max
+        self.oldstate = oldstate
+        self.newstate = newstate
+
+
+class W_GcCollectStats(W_Root):
+
+    def __init__(self, count, num_major_collects,
+                 arenas_count_before, arenas_count_after, arenas_bytes,
+                 rawmalloc_bytes_before, rawmalloc_bytes_after):
+        self.count = count
+        self.num_major_collects = num_major_collects
+        self.arenas_count_before = arenas_count_before
+        self.arenas_count_after = arenas_count_after
+        self.arenas_bytes = arenas_bytes
+        self.rawmalloc_bytes_before = rawmalloc_bytes_before
+        self.rawmalloc_bytes_after = rawmalloc_bytes_after
+        self.total_memory_used = arenas_bytes + rawmalloc_bytes_after
+
+
+W_AppLevelHooks.typedef = TypeDef(
+    "GcHooks",
+    on_gc_minor = GetSetProperty(
+        W_AppLevelHooks.descr_get_on_gc_minor,
+        W_AppLevelHooks.descr_set_on_gc_minor),
+    on_gc_collect_step = GetSetProperty(
+        W_AppLevelHooks.descr_get_on_gc_collect_step,
+        W_AppLevelHooks.descr_set_on_gc_collect_step),
+    on_gc_collect = GetSetProperty(
+        W_AppLevelHooks.descr_get_on_gc_collect,
+        W_AppLevelHooks.descr_set_on_gc_collect),
+    set = interp2app(W_AppLevelHooks.descr_set),
+    reset = interp2app(W_AppLevelHooks.descr_reset),
+    )
+W_AppLevelHooks.typedef.acceptable_as_base_class = False
+
+W_GcMinorStats.typedef = TypeDef(
+    "GcMinorStats",
+    count = interp_attrproperty("count", cls=W_GcMinorStats),
+    duration = interp_attrproperty("duration", cls=W_GcMinorStats),
+    duration_min = interp_attrproperty("duration_min", cls=W_GcMinorStats),
+    duration_max = interp_attrproperty("duration_max", cls=W_GcMinorStats),
+    total_memory_used = interp_attrproperty("total_memory_used",
+                                            cls=W_GcMinorStats),
+    surviving_bytes = interp_attrproperty("surviving_bytes",
+                                          cls=W_GcMinorStats),
+    pinned_objects = interp_attrproperty("pinned_objects",
+                                         cls=W_GcMinorStats),
+    )
+W_GcMinorStats.typedef.acceptable_as_base_class = False
+
+W_GcCollectStepStats.typedef = TypeDef(
+    "GcCollectStepStats",
+    count = interp_attrproperty("count", cls=W_GcCollectStepStats),
+    duration = interp_attrproperty("duration", cls=W_GcCollectStepStats),
+    duration_min = interp_attrproperty("duration_min",
+                                       cls=W_GcCollectStepStats),
+    duration_max = interp_attrproperty("duration_max",
+                                       cls=W_GcCollectStepStats),
+    oldstate = interp_attrproperty("oldstate", cls=W_GcCollectStepStats),
+    newstate = interp_attrproperty("newstate", cls=W_GcCollectStepStats),
+    GC_STATES = tuple(incminimark.GC_STATES),
+    )
+W_GcCollectStepStats.typedef.acceptable_as_base_class = False
+
+W_GcCollectStats.typedef = TypeDef(
+    "GcCollectStats",
+    count = interp_attrproperty("count", cls=W_GcCollectStats),
+    num_major_collects = interp_attrproperty("num_major_collects",
+                                             cls=W_GcCollectStats),
+    arenas_count_before = interp_attrproperty("arenas_count_before",
+                                              cls=W_GcCollectStats),
+    arenas_count_after = interp_attrproperty("arenas_count_after",
+                                             cls=W_GcCollectStats),
+    arenas_bytes = interp_attrproperty("arenas_bytes", cls=W_GcCollectStats),
+    rawmalloc_bytes_before = interp_attrproperty("rawmalloc_bytes_before",
+                                                 cls=W_GcCollectStats),
+    rawmalloc_bytes_after = interp_attrproperty("rawmalloc_bytes_after",
+                                                cls=W_GcCollectStats),
+    total_memory_used = interp_attrproperty("total_memory_used",
+                                            cls=W_GcCollectStats),
+    )
+W_GcCollectStats.typedef.acceptable_as_base_class = False
@@ -1,5 +1,5 @@
 from pypy.interpreter.gateway import unwrap_spec
-from pypy.interpreter.error import OperationError
+from pypy.interpreter.error import OperationError, oefmt
 from rpython.rlib import rgc
 
 
@@ -18,6 +18,71 @@ def collect(space, generation=0):
     rgc.collect()
     return space.wrap(0)
 
+def collect_step(space):
+    """Do a single step of the incremental major collection, starting a
+    new major collection if none is in progress.  Returns True if this
+    step finished a major collection.  Useful to do the GC work during
+    idle time instead of in the middle of latency-sensitive code.
+    """
+    return space.newbool(rgc.collect_step())
+
+# ____________________________________________________________
+
+# {name: (rgc index, is_float)}
+GC_PARAMS = {
+    'nursery_size':   (rgc.GC_PARAM_NURSERY_SIZE, False),
+    'major_collect':  (rgc.GC_PARAM_MAJOR_COLLECT, True),
+    'increment_step': (rgc.GC_PARAM_INCREMENT_STEP, False),
+    'min_heap_size':  (rgc.GC_PARAM_MIN_HEAP_SIZE, False),
+    'max_heap_size':  (rgc.GC_PARAM_MAX_HEAP_SIZE, False),
+}
+
+def _get_gc_param(space, name):
+    try:
+        return GC_PARAMS[name]
+    except KeyError:
+        raise oefmt(space.w_ValueError, "unknown GC parameter '%s'", name)
+
+@unwrap_spec(name=str)
+def get_param(space, name):
+    """Return the current value of a GC tuning parameter: 'nursery_size',
+    'increment_step', 'min_heap_size' or 'max_heap_size' (in bytes, 0
+    meaning no limit for the latter), or 'major_collect' (a float).
+    """
+    index, is_float = _get_gc_param(space, name)
+    value = rgc.get_gc_param(index)
+    if value < 0.0:
+        raise oefmt(space.w_RuntimeError,
+                    "the GC has no '%s' parameter", name)
+    if is_float:
+        return space.newfloat(value)
+    return space.newint(int(value))
+
+@unwrap_spec(name=str)
+def set_param(space, name, w_value):
+    """Change a GC tuning parameter while the program runs; see
+    get_param() for the names.  They are the same as the PYPY_GC_NURSERY,
+    PYPY_GC_MAJOR_COLLECT, PYPY_GC_INCREMENT_STEP, PYPY_GC_MIN and
+    PYPY_GC_MAX environment variables.  The new nursery size is used
+    after the next minor collection, and the heap sizes and the
+    major_collect factor after the next major collection.
+    """
+    index, is_float = _get_gc_param(space, name)
+    if is_float:
+        value = space.float_w(w_value)
+        if not value > 1.0:
+            raise oefmt(space.w_ValueError, "'%s' must be larger than 1.0",
+                        name)
+    else:
+        value = float(space.int_w(w_value))
+        if value < 0.0:
+            raise oefmt(space.w_ValueError, "'%s' cannot be negative", name)
+    if not rgc.set_gc_param(index, value):
+        raise oefmt(space.w_RuntimeError,
+                    "the GC refused to set '%s' to %R", name, w_value)
+
+# ____________________________________________________________
+
 def enable(space):
     """Non-recursive version.  Enable finalizers now.
     If they were already enabled, no-op.
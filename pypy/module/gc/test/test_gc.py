@@ -70,6 +70,27 @@ class AppTestGC(object):
         gc.enable()
         assert gc.isenabled()
 
+    def test_collect_step(self):
+        import gc
+        res = gc.collect_step()
+        assert res is True or res is False
+
+    def test_params(self):
+        import gc
+        gc.set_param('nursery_size', 4 * 1024 * 1024)
+        assert gc.get_param('nursery_size') == 4 * 1024 * 1024
+        gc.set_param('increment_step', 1024 * 1024)
+        assert gc.get_param('increment_step') == 1024 * 1024
+        gc.set_param('major_collect', 2.5)
+        assert gc.get_param('major_collect') == 2.5
+        gc.set_param('max_heap_size', 0)
+        assert gc.get_param('max_heap_size') == 0
+        raises(ValueError, gc.get_param, 'foo')
+        raises(ValueError, gc.set_param, 'foo', 42)
+        raises(ValueError, gc.set_param, 'major_collect', 0.5)
+        raises(ValueError, gc.set_param, 'nursery_size', -1)
+        raises(TypeError, gc.set_param, 'nursery_size', 1.5)
+
 
 class AppTestGcDumpHeap(object):
     pytestmark = py.test.mark.xfail(run=False)
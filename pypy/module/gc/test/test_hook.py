@@ -0,0 +1,124 @@
+from rpython.rlib.rarithmetic import r_uint
+from pypy.module.gc.hook import LowLevelGcHooks
+from pypy.interpreter.baseobjspace import ObjSpace
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+
+
+class AppTestGcHooks(object):
+
+    def setup_class(cls):
+        space = cls.space
+        gchooks = space.fromcache(LowLevelGcHooks)
+
+        @unwrap_spec(ObjSpace, int, r_uint, int, int)
+        def fire_gc_minor(space, duration, total_memory_used,
+                          surviving_bytes, pinned_objects):
+            if gchooks.is_gc_minor_enabled():
+                gchooks.on_gc_minor(duration, total_memory_used,
+                                    surviving_bytes, pinned_objects, 0)
+
+        @unwrap_spec(ObjSpace, int, int, int)
+        def fire_gc_collect_step(space, duration, oldstate, newstate):
+            if gchooks.is_gc_collect_step_enabled():
+                gchooks.on_gc_collect_step(duration, oldstate, newstate)
+
+        @unwrap_spec(ObjSpace, int, int, int, r_uint, r_uint, r_uint)
+        def fire_gc_collect(space, a, b, c, d, e, f):
+            if gchooks.is_gc_collect_enabled():
+                gchooks.on_gc_collect(a, b, c, d, e, f)
+
+        @unwrap_spec(ObjSpace)
+        def fire_many(space):
+            gchooks.on_gc_minor(5, r_uint(100), 10, 0, 0)
+            gchooks.on_gc_minor(3, r_uint(200), 20, 1, 0)
+            gchooks.on_gc_collect_step(7, 0, 1)
+            gchooks.on_gc_collect_step(9, 1, 2)
+
+        cls.w_fire_gc_minor = space.wrap(interp2app(fire_gc_minor))
+        cls.w_fire_gc_collect_step = space.wrap(
+            interp2app(fire_gc_collect_step))
+        cls.w_fire_gc_collect = space.wrap(interp2app(fire_gc_collect))
+        cls.w_fire_many = space.wrap(interp2app(fire_many))
+
+    def test_default(self):
+        import gc
+        assert gc.hooks.on_gc_minor is None
+        assert gc.hooks.on_gc_collect_step is None
+        assert gc.hooks.on_gc_collect is None
+
+    def test_on_gc_minor(self):
+        import gc
+        lst = []
+        def on_gc_minor(stats):
+            lst.append((stats.count, stats.duration, stats.total_memory_used,
+                        stats.surviving_bytes, stats.pinned_objects))
+        gc.hooks.on_gc_minor = on_gc_minor
+        self.fire_gc_minor(10, 20, 30, 1)
+        self.fire_gc_minor(40, 50, 60, 2)
+        assert lst == [
+            (1, 10, 20, 30, 1),
+            (1, 40, 50, 60, 2),
+            ]
+        gc.hooks.on_gc_minor = None
+        self.fire_gc_minor(70, 80, 90, 3)  # won't fire because the hook is off
+        assert len(lst) == 2
+
+    def test_on_gc_collect_step(self):
+        import gc
+        lst = []
+        def on_gc_collect_step(stats):
+            lst.append((stats.count, stats.duration,
+                        stats.GC_STATES[stats.oldstate],
+                        stats.GC_STATES[stats.newstate]))
+        gc.hooks.on_gc_collect_step = on_gc_collect_step
+        self.fire_gc_collect_step(10, 0, 1)
+        self.fire_gc_collect_step(40, 1, 2)
+        assert lst == [
+            (1, 10, 'SCANNING', 'MARKING'),
+            (1, 40, 'MARKING', 'SWEEPING'),
+            ]
+        gc.hooks.on_gc_collect_step = None
+        self.fire_gc_collect_step(70, 2, 3)
+        assert len(lst) == 2
+
+    def test_on_gc_collect(self):
+        import gc
+        lst = []
+        def on_gc_collect(stats):
+            lst.append((stats.count, stats.num_major_collects,
+                        stats.arenas_count_before, stats.arenas_count_after,
+                        stats.arenas_bytes, stats.rawmalloc_bytes_before,
+                        stats.rawmalloc_bytes_after, stats.total_memory_used))
+        gc.hooks.on_gc_collect = on_gc_collect
+        self.fire_gc_collect(1, 2, 3, 4, 5, 6)
+        self.fire_gc_collect(7, 8, 9, 10, 11, 12)
+        assert lst == [
+            (1, 1, 2, 3, 4, 5, 6, 10),
+            (1, 7, 8, 9, 10, 11, 12, 22),
+            ]
+        gc.hooks.on_gc_collect = None
+        self.fire_gc_collect(42, 42, 42, 42, 42, 42)
+        assert len(lst) == 2
+
+    def test_events_are_batched(self):
+        import gc
+        minors = []
+        steps = []
+        class MyHooks(object):
+            def on_gc_minor(self, stats):
+                minors.append((stats.count, stats.duration,
+                               stats.duration_min, stats.duration_max,
+                               stats.total_memory_used,
+                               stats.surviving_bytes,
+                               stats.pinned_objects))
+            def on_gc_collect_step(self, stats):
+                steps.append((stats.count, stats.duration,
+                              stats.oldstate, stats.newstate))
+        gc.hooks.set(MyHooks())
+        assert gc.hooks.on_gc_collect is None
+        self.fire_many()
+        assert minors == [(2, 8, 3, 5, 200, 30, 1)]
+        assert steps == [(2, 16, 0, 2)]
+        gc.hooks.reset()
+        assert gc.hooks.on_gc_minor is None
+        assert gc.hooks.on_gc_collect_step is None
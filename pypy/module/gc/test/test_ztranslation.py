@@ -1,4 +1,26 @@
 from pypy.objspace.fake.checkmodule import checkmodule
 
 def test_checkmodule():
-    checkmodule('gc')
+    from rpython.rlib.nonconst import NonConstant
+    from rpython.rlib.rarithmetic import r_uint
+    from pypy.module.gc.hook import LowLevelGcHooks
+
+    def fire_hooks(space):
+        # the hooks are normally called only by the GC
+        gchooks = space.fromcache(LowLevelGcHooks)
+        if NonConstant(False):
+            gchooks.on_gc_minor(NonConstant(-42), NonConstant(r_uint(42)),
+                                NonConstant(-42), NonConstant(-42),
+                                NonConstant(-42))
+            gchooks.on_gc_collect_step(NonConstant(-42), NonConstant(-42),
+                                       NonConstant(-42))
+            gchooks.on_gc_collect(NonConstant(-42), NonConstant(-42),
+                                  NonConstant(-42), NonConstant(r_uint(42)),
+                                  NonConstant(r_uint(42)),
+                                  NonConstant(r_uint(42)))
+            # and the actions are normally performed by the dispatcher
+            w_hooks = gchooks.w_hooks
+            w_hooks.gc_minor.perform(None, None)
+            w_hooks.gc_collect_step.perform(None, None)
+            w_hooks.gc_collect.perform(None, None)
+    checkmodule('gc', extra_func=fire_hooks)
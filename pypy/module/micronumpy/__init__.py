@@ -22,6 +22,8 @@ class MultiArrayModule(MixedModule):
         'dot': 'arrayops.dot',
         'result_type': 'arrayops.result_type',
         'where': 'arrayops.where',
+        'lazy': 'lazy.lazy',
+        'lazyarray': 'lazy.W_LazyArray',
 
         'set_string_function': 'appbridge.set_string_function',
         'typeinfo': 'descriptor.get_dtype_cache(space).w_typeinfo',
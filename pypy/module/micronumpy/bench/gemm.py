@@ -0,0 +1,31 @@
+import sys
+import time
+
+try:
+    import numpypy as numpy
+except ImportError:
+    import numpy
+
+# set PYPY_NUMPY_DOT_THREADS to try the multi-threaded kernel
+
+def main(n, r):
+    for dtype in ['float32', 'float64', 'complex64', 'complex128']:
+        x = (numpy.arange(n * n) % 17).reshape(n, n).astype(dtype)
+        y = (numpy.arange(n * n) % 13).reshape(n, n).astype(dtype)
+        for name, a, b in [('contiguous', x, y), ('transposed', x, y.T)]:
+            t0 = time.time()
+            for _ in xrange(r):
+                numpy.dot(a, b)
+            t1 = time.time()
+            gflops = 2.0 * n * n * n * r / (t1 - t0) / 1e9
+            if dtype.startswith('complex'):
+                gflops *= 4
+            print '%-10s %-10s %d runs, %.2f seconds, %.2f GFlop/s' % (
+                dtype, name, r, t1 - t0, gflops)
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+try:
+    r = int(sys.argv[2])
+except IndexError:
+    r = 1
+main(n, r)
@@ -0,0 +1,23 @@
+import time
+
+try:
+    import numpypy as numpy
+except ImportError:
+    import numpy
+
+def f(a, b, c, d, e):
+    return a * b + c * d - e
+
+def main(n=10000000, repeat=10):
+    a, b, c, d, e = [numpy.arange(float(n)) for i in range(5)]
+    t0 = time.time()
+    for i in range(repeat):
+        f(a, b, c, d, e)
+    t1 = time.time()
+    print 'eager: %.3fs' % (t1 - t0)
+    if hasattr(numpy, 'lazy'):
+        for i in range(repeat):
+            f(numpy.lazy(a), b, c, d, e).eval()
+        print 'lazy:  %.3fs' % (time.time() - t1)
+
+main()
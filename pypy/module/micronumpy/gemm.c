@@ -0,0 +1,269 @@
+/* Cache-blocked matrix multiply for micronumpy's dot().
+ *
+ * Computes C = A * B for an (m x k) matrix A and a (k x n) matrix B.
+ * All strides are given in elements, not bytes, and may be zero or
+ * negative.  B is copied panel by panel into a contiguous buffer small
+ * enough to stay in the L2 cache; every row of A is then multiplied
+ * against the panel with a unit-stride inner loop that the C compiler
+ * can vectorize.
+ *
+ * If PYPY_NUMPY_DOT_THREADS is set to a number larger than 1, big
+ * products are split by blocks of rows of C over that many threads.
+ * The caller releases the GIL, so the kernel must not touch any
+ * GC-managed object.
+ */
+
+#include <stdlib.h>
+#include <string.h>
+#include "src/precommondefs.h"
+#include "gemm.h"
+
+#ifndef _WIN32
+#  include <pthread.h>
+#  define GEMM_HAVE_THREADS
+#endif
+
+#define GEMM_KC  128    /* rows of a packed panel of B */
+#define GEMM_NC  256    /* columns of a packed panel of B */
+#define GEMM_MR  32     /* granularity of the rows given to each thread */
+
+/* don't bother starting threads below this many multiply-adds */
+#define GEMM_THREAD_THRESHOLD  (1L << 21)
+#define GEMM_MAX_THREADS  64
+
+/* must match the values used in gemm.py */
+#define GEMM_FLOAT32    0
+#define GEMM_FLOAT64    1
+#define GEMM_COMPLEX64  2
+#define GEMM_COMPLEX128 3
+
+struct gemm_args {
+    int kind;
+    long m, n, k;
+    char *a; long a_rs, a_cs;
+    char *b; long b_rs, b_cs;
+    char *c; long c_rs, c_cs;
+    long row_start, row_stop;
+    int result;
+};
+
+#define MIN(x, y)  ((x) < (y) ? (x) : (y))
+
+#define GEMM_REAL(NAME, T)                                                  \
+static int NAME(struct gemm_args *g)                                        \
+{                                                                           \
+    const T *a = (const T *)g->a, *b = (const T *)g->b;                     \
+    T *c = (T *)g->c;                                                       \
+    T acc[GEMM_NC];                                                         \
+    T *panel;                                                               \
+    long i, j, p, pp, jj, kc, nc;                                           \
+                                                                            \
+    for (i = g->row_start; i < g->row_stop; i++)                            \
+        for (j = 0; j < g->n; j++)                                          \
+            c[i * g->c_rs + j * g->c_cs] = 0;                               \
+    if (g->k == 0)                                                          \
+        return 0;                                                           \
+    panel = malloc(sizeof(T) * GEMM_KC * GEMM_NC);                          \
+    if (panel == NULL)                                                      \
+        return -1;                                                          \
+    for (pp = 0; pp < g->k; pp += GEMM_KC) {                                \
+        kc = MIN(GEMM_KC, g->k - pp);                                       \
+        for (jj = 0; jj < g->n; jj += GEMM_NC) {                            \
+            nc = MIN(GEMM_NC, g->n - jj);                                   \
+            for (p = 0; p < kc; p++) {                                      \
+                const T *brow = b + (pp + p) * g->b_rs + jj * g->b_cs;      \
+                T *dst = panel + p * nc;                                    \
+                if (g->b_cs == 1)                                           \
+                    memcpy(dst, brow, sizeof(T) * nc);                      \
+                else                                                        \
+                    for (j = 0; j < nc; j++)                                \
+                        dst[j] = brow[j * g->b_cs];                         \
+            }                                                               \
+            for (i = g->row_start; i < g->row_stop; i++) {                  \
+                const T *arow = a + i * g->a_rs + pp * g->a_cs;             \
+                T *crow = c + i * g->c_rs + jj * g->c_cs;                   \
+                for (j = 0; j < nc; j++)                                    \
+                    acc[j] = 0;                                             \
+                for (p = 0; p < kc; p++) {                                  \
+                    const T aip = arow[p * g->a_cs];                        \
+                    const T *prow = panel + p * nc;                         \
+                    for (j = 0; j < nc; j++)                                \
+                        acc[j] += aip * prow[j];                            \
+                }                                                           \
+                for (j = 0; j < nc; j++)                                    \
+                    crow[j * g->c_cs] += acc[j];                            \
+            }                                                               \
+        }                                                                   \
+    }                                                                       \
+    free(panel);                                                            \
+    return 0;                                                               \
+}
+
+/* complex numbers are stored as (real, imag) pairs of T; the strides
+   count complex elements */
+#define GEMM_COMPLEX(NAME, T)                                               \
+static int NAME(struct gemm_args *g)                                        \
+{                                                                           \
+    const T *a = (const T *)g->a, *b = (const T *)g->b;                     \
+    T *c = (T *)g->c;                                                       \
+    T acc[2 * GEMM_NC];                                                     \
+    T *panel;                                                               \
+    long i, j, p, pp, jj, kc, nc;                                           \
+                                                                            \
+    for (i = g->row_start; i < g->row_stop; i++)                            \
+        for (j = 0; j < g->n; j++) {                                        \
+            T *cij = c + 2 * (i * g->c_rs + j * g->c_cs);                   \
+            cij[0] = 0;                                                     \
+            cij[1] = 0;                                                     \
+        }                                                                   \
+    if (g->k == 0)                                                          \
+        return 0;                                                           \
+    panel = malloc(sizeof(T) * 2 * GEMM_KC * GEMM_NC);                      \
+    if (panel == NULL)                                                      \
+        return -1;                                                          \
+    for (pp = 0; pp < g->k; pp += GEMM_KC) {                                \
+        kc = MIN(GEMM_KC, g->k - pp);                                       \
+        for (jj = 0; jj < g->n; jj += GEMM_NC) {                            \
+            nc = MIN(GEMM_NC, g->n - jj);                                   \
+            for (p = 0; p < kc; p++) {                                      \
+                const T *brow = b + 2 * ((pp + p) * g->b_rs + jj * g->b_cs);\
+                T *dst = panel + 2 * p * nc;                                \
+                if (g->b_cs == 1)                                           \
+                    memcpy(dst, brow, sizeof(T) * 2 * nc);                  \
+                else                                                        \
+                    for (j = 0; j < nc; j++) {                              \
+                        dst[2 * j] = brow[2 * j * g->b_cs];                 \
+                        dst[2 * j + 1] = brow[2 * j * g->b_cs + 1];         \
+                    }                                                       \
+            }                                                               \
+            for (i = g->row_start; i < g->row_stop; i++) {                  \
+                const T *arow = a + 2 * (i * g->a_rs + pp * g->a_cs);       \
+                T *crow = c + 2 * (i * g->c_rs + jj * g->c_cs);             \
+                for (j = 0; j < 2 * nc; j++)                                \
+                    acc[j] = 0;                                             \
+                for (p = 0; p < kc; p++) {                                  \
+                    const T ar = arow[2 * p * g->a_cs];                     \
+                    const T ai = arow[2 * p * g->a_cs + 1];                 \
+                    const T *prow = panel + 2 * p * nc;                     \
+                    for (j = 0; j < nc; j++) {                              \
+                        const T br = prow[2 * j], bi = prow[2 * j + 1];     \
+                        acc[2 * j] += ar * br - ai * bi;                    \
+                        acc[2 * j + 1] += ar * bi + ai * br;                \
+                    }                                                       \
+                }                                                           \
+                for (j = 0; j < nc; j++) {                                  \
+                    crow[2 * j * g->c_cs] += acc[2 * j];                    \
+                    crow[2 * j * g->c_cs + 1] += acc[2 * j + 1];            \
+                }                                                           \
+            }                                                               \
+        }                                                                   \
+    }                                                                       \
+    free(panel);                                                            \
+    return 0;                                                               \
+}
+
+GEMM_REAL(gemm_float32, float)
+GEMM_REAL(gemm_float64, double)
+GEMM_COMPLEX(gemm_complex64, float)
+GEMM_COMPLEX(gemm_complex128, double)
+
+static int gemm_rows(struct gemm_args *g)
+{
+    switch (g->kind) {
+    case GEMM_FLOAT32:    return gemm_float32(g);
+    case GEMM_FLOAT64:    return gemm_float64(g);
+    case GEMM_COMPLEX64:  return gemm_complex64(g);
+    case GEMM_COMPLEX128: return gemm_complex128(g);
+    default:              return -1;
+    }
+}
+
+#ifdef GEMM_HAVE_THREADS
+static long gemm_threads = -1;
+
+static long gemm_get_threads(void)
+{
+    if (gemm_threads < 0) {
+        char *env = getenv("PYPY_NUMPY_DOT_THREADS");
+        long n = env ? atol(env) : 1;
+        if (n < 1)
+            n = 1;
+        if (n > GEMM_MAX_THREADS)
+            n = GEMM_MAX_THREADS;
+        gemm_threads = n;
+    }
+    return gemm_threads;
+}
+
+static void *gemm_thread_main(void *arg)
+{
+    struct gemm_args *g = (struct gemm_args *)arg;
+    g->result = gemm_rows(g);
+    return NULL;
+}
+
+static int gemm_parallel(struct gemm_args *g, long nthreads)
+{
+    struct gemm_args args[GEMM_MAX_THREADS];
+    pthread_t threads[GEMM_MAX_THREADS];
+    int started[GEMM_MAX_THREADS];
+    long t, chunk;
+    int result;
+
+    /* hand out whole blocks of GEMM_MR rows; the first block is done
+       by the calling thread */
+    chunk = (g->m + nthreads - 1) / nthreads;
+    chunk = (chunk + GEMM_MR - 1) / GEMM_MR * GEMM_MR;
+    for (t = 1; t < nthreads; t++) {
+        args[t] = *g;
+        args[t].row_start = MIN(g->m, t * chunk);
+        args[t].row_stop = MIN(g->m, (t + 1) * chunk);
+        args[t].result = 0;
+        started[t] = 0;
+        if (args[t].row_start == args[t].row_stop)
+            continue;
+        started[t] = pthread_create(&threads[t], NULL, gemm_thread_main,
+                                    &args[t]) == 0;
+        if (!started[t])
+            /* do this block ourselves */
+            args[t].result = gemm_rows(&args[t]);
+    }
+    g->row_stop = MIN(g->m, chunk);
+    result = gemm_rows(g);
+    for (t = 1; t < nthreads; t++) {
+        if (started[t])
+            pthread_join(threads[t], NULL);
+        if (args[t].result < 0)
+            result = -1;
+    }
+    return result;
+}
+#endif
+
+/* Returns 0 on success, or -1 if the kind is unknown or we ran out of
+   memory.  In the latter case the content of C is undefined. */
+int pypy_numpy_gemm(int kind, long m, long n, long k,
+                    char *a, long a_rs, long a_cs,
+                    char *b, long b_rs, long b_cs,
+                    char *c, long c_rs, long c_cs)
+{
+    struct gemm_args g;
+    g.kind = kind;
+    g.m = m; g.n = n; g.k = k;
+    g.a = a; g.a_rs = a_rs; g.a_cs = a_cs;
+    g.b = b; g.b_rs = b_rs; g.b_cs = b_cs;
+    g.c = c; g.c_rs = c_rs; g.c_cs = c_cs;
+    g.row_start = 0;
+    g.row_stop = m;
+    g.result = 0;
+#ifdef GEMM_HAVE_THREADS
+    if (m > GEMM_MR && (double)m * n * k >= GEMM_THREAD_THRESHOLD) {
+        long nthreads = gemm_get_threads();
+        if (nthreads > (m + GEMM_MR - 1) / GEMM_MR)
+            nthreads = (m + GEMM_MR - 1) / GEMM_MR;
+        if (nthreads > 1)
+            return gemm_parallel(&g, nthreads);
+    }
+#endif
+    return gemm_rows(&g);
+}
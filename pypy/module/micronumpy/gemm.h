@@ -0,0 +1,4 @@
+RPY_EXTERN int pypy_numpy_gemm(int, long, long, long,
+                               char *, long, long,
+                               char *, long, long,
+                               char *, long, long);
@@ -0,0 +1,121 @@
+"""
+Fast path for dot() on 1-d and 2-d float and complex arrays, using the
+cache-blocked kernel in gemm.c instead of the generic loop.multidim_dot.
+"""
+import py
+
+from rpython.rlib.objectmodel import keepalive_until_here
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.translator import cdir
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+
+from pypy.module.micronumpy import support, constants as NPY
+
+cwd = py.path.local(__file__).dirpath()
+eci = ExternalCompilationInfo(
+    includes=[cwd.join('gemm.h')],
+    include_dirs=[str(cwd), cdir],
+    separate_module_files=[cwd.join('gemm.c')])
+
+# the GIL is released while multiplying: the kernel only reads and
+# writes the raw storage of the arrays, which we keep alive
+pypy_numpy_gemm = rffi.llexternal(
+    'pypy_numpy_gemm',
+    [rffi.INT, rffi.LONG, rffi.LONG, rffi.LONG,
+     rffi.CCHARP, rffi.LONG, rffi.LONG,
+     rffi.CCHARP, rffi.LONG, rffi.LONG,
+     rffi.CCHARP, rffi.LONG, rffi.LONG],
+    rffi.INT, compilation_info=eci, sandboxsafe=True, releasegil=True)
+
+# must match the values in gemm.c
+GEMM_FLOAT32 = 0
+GEMM_FLOAT64 = 1
+GEMM_COMPLEX64 = 2
+GEMM_COMPLEX128 = 3
+
+
+def _get_kind(dtype):
+    if not dtype.is_native():
+        return -1
+    if dtype.num == NPY.FLOAT:
+        return GEMM_FLOAT32
+    if dtype.num == NPY.DOUBLE:
+        return GEMM_FLOAT64
+    if dtype.num == NPY.CFLOAT:
+        return GEMM_COMPLEX64
+    if dtype.num == NPY.CDOUBLE:
+        return GEMM_COMPLEX128
+    return -1
+
+
+def _get_address(arr):
+    with arr.implementation as storage:
+        addr = support.get_storage_as_int(storage, arr.get_start())
+    return rffi.cast(rffi.CCHARP, addr)
+
+
+def dot(left, right, result, dtype):
+    """ Compute result = dot(left, right) for operands of at most two
+    dimensions which already have the result dtype.  Returns False,
+    without touching result, if the operands are not supported.  Raises
+    MemoryError if the C code could not allocate its buffers: result may
+    then have been partly written, e.g. by some of the threads.
+    """
+    kind = _get_kind(dtype)
+    if kind < 0:
+        return False
+    if left.get_dtype() is not dtype or right.get_dtype() is not dtype:
+        return False
+    left_ndims = left.ndims()
+    right_ndims = right.ndims()
+    if left_ndims > 2 or right_ndims > 2:
+        return False
+    elsize = dtype.elsize
+    for arr in [left, right, result]:
+        for stride in arr.implementation.get_strides():
+            if stride % elsize != 0:
+                return False
+    left_shape = left.get_shape()
+    left_strides = left.implementation.get_strides()
+    right_shape = right.get_shape()
+    right_strides = right.implementation.get_strides()
+    res_strides = result.implementation.get_strides()
+    # treat a 1-d left operand as a single row, and a 1-d right operand
+    # as a single column
+    if left_ndims == 2:
+        m = left_shape[0]
+        k = left_shape[1]
+        a_rs = left_strides[0]
+        a_cs = left_strides[1]
+    else:
+        m = 1
+        k = left_shape[0]
+        a_rs = 0
+        a_cs = left_strides[0]
+    if right_ndims == 2:
+        n = right_shape[1]
+        b_rs = right_strides[0]
+        b_cs = right_strides[1]
+    else:
+        n = 1
+        b_rs = right_strides[0]
+        b_cs = 0
+    if left_ndims == 2 and right_ndims == 2:
+        c_rs = res_strides[0]
+        c_cs = res_strides[1]
+    elif left_ndims == 2:
+        c_rs = res_strides[0]
+        c_cs = 0
+    else:
+        c_rs = 0
+        c_cs = res_strides[0]
+    res = pypy_numpy_gemm(rffi.cast(rffi.INT, kind), m, n, k,
+                          _get_address(left), a_rs // elsize, a_cs // elsize,
+                          _get_address(right), b_rs // elsize, b_cs // elsize,
+                          _get_address(result), c_rs // elsize, c_cs // elsize)
+    keepalive_until_here(left)
+    keepalive_until_here(right)
+    keepalive_until_here(result)
+    if rffi.cast(lltype.Signed, res) != 0:
+        raise MemoryError
+    return True
@@ -0,0 +1,455 @@
+""" Lazily evaluated array expressions.
+
+lazy(a) returns a lazyarray.  Arithmetic on it, as well as calling a ufunc
+with one or two inputs on it, does not compute anything: it builds a tree
+of Nodes, with the arrays and scalars it reads as arguments.  The tree is
+only evaluated when the result is needed, e.g. by eval(), __array__() or
+by passing it to any function that expects an array.  This is done by
+loop.call_lazy() in a single pass over all the arguments, so that
+'a * b + c * d - e' makes no temporary array.
+
+Note that the arrays are read when the result is computed, not when the
+expression is built.  Trees are kept small, see MAX_TREE_SIZE.
+"""
+
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+from rpython.tool.sourcetools import func_with_new_name
+from pypy.module.micronumpy import boxes, loop
+from pypy.module.micronumpy.base import W_NDimArray, convert_to_array
+from pypy.module.micronumpy.strides import shape_agreement_shapes
+
+# The number of nodes of a tree is bounded: an expression that reads a
+# lazyarray with more than MAX_TREE_SIZE // 2 nodes computes it first.
+# Otherwise a loop like 'acc = acc + b' would build ever larger trees,
+# each of them a new green key for the JIT.
+MAX_TREE_SIZE = 31
+# intern_node() forgets all the nodes when it has more than this
+MAX_INTERNED_NODES = 1000
+
+
+class Node(object):
+    """ A node of the tree of a lazy expression.  Nodes are interned, see
+    intern_node(), and used as a green in loop.call_lazy().
+    """
+    _immutable_fields_ = ['key', 'size']
+
+    def eval(self, space, iters, states, args_w):
+        """ Returns the value of this node for the current element, as a
+        box of the node's result dtype.
+        """
+        raise NotImplementedError
+
+    def shifted(self, space, offset):
+        """ Returns the same node, but with all the leaves reading the
+        arguments starting at 'offset'.
+        """
+        raise NotImplementedError
+
+
+class ArrayLeaf(Node):
+    _immutable_fields_ = ['index']
+
+    def __init__(self, index):
+        self.index = index
+        self.key = 'a%d' % index
+        self.size = 1
+
+    def eval(self, space, iters, states, args_w):
+        return iters[self.index].getitem(states[self.index])
+
+    def shifted(self, space, offset):
+        return intern_node(space, ArrayLeaf(self.index + offset))
+
+
+class ScalarLeaf(Node):
+    _immutable_fields_ = ['index']
+
+    def __init__(self, index):
+        self.index = index
+        self.key = 's%d' % index
+        self.size = 1
+
+    def eval(self, space, iters, states, args_w):
+        w_val = args_w[self.index]
+        assert isinstance(w_val, boxes.W_GenericBox)
+        return w_val
+
+    def shifted(self, space, offset):
+        return intern_node(space, ScalarLeaf(self.index + offset))
+
+
+class Call1(Node):
+    _immutable_fields_ = ['func', 'name', 'calc_dtype', 'res_dtype', 'child']
+
+    def __init__(self, func, name, calc_dtype, res_dtype, child):
+        self.func = func
+        self.name = name
+        self.calc_dtype = calc_dtype
+        self.res_dtype = res_dtype
+        self.child = child
+        self.key = '%s:%d:%d(%s)' % (name, calc_dtype.num, res_dtype.num,
+                                     child.key)
+        self.size = child.size + 1
+
+    def eval(self, space, iters, states, args_w):
+        calc_dtype = self.calc_dtype
+        w_val = self.child.eval(space, iters, states, args_w)
+        w_val = self.func(calc_dtype, w_val.convert_to(space, calc_dtype))
+        return w_val.convert_to(space, self.res_dtype)
+
+    def shifted(self, space, offset):
+        return intern_node(space, Call1(self.func, self.name, self.calc_dtype,
+                                        self.res_dtype,
+                                        self.child.shifted(space, offset)))
+
+
+class Call2(Node):
+    _immutable_fields_ = ['func', 'name', 'calc_dtype', 'res_dtype',
+                          'left', 'right']
+
+    def __init__(self, func, name, calc_dtype, res_dtype, left, right):
+        self.func = func
+        self.name = name
+        self.calc_dtype = calc_dtype
+        self.res_dtype = res_dtype
+        self.left = left
+        self.right = right
+        self.key = '%s:%d:%d(%s,%s)' % (name, calc_dtype.num, res_dtype.num,
+                                        left.key, right.key)
+        self.size = left.size + right.size + 1
+
+    def eval(self, space, iters, states, args_w):
+        calc_dtype = self.calc_dtype
+        w_left = self.left.eval(space, iters, states, args_w)
+        w_right = self.right.eval(space, iters, states, args_w)
+        w_val = self.func(calc_dtype, w_left.convert_to(space, calc_dtype),
+                          w_right.convert_to(space, calc_dtype))
+        return w_val.convert_to(space, self.res_dtype)
+
+    def shifted(self, space, offset):
+        return intern_node(space, Call2(self.func, self.name, self.calc_dtype,
+                                        self.res_dtype,
+                                        self.left.shifted(space, offset),
+                                        self.right.shifted(space, offset)))
+
+
+class NodeCache(object):
+    def __init__(self, space):
+        self.nodes = {}
+
+def intern_node(space, node):
+    # two expressions of the same shape must share their tree, otherwise
+    # the JIT would compile a new loop every time an expression is built
+    nodes = space.fromcache(NodeCache).nodes
+    try:
+        return nodes[node.key]
+    except KeyError:
+        if len(nodes) >= MAX_INTERNED_NODES:
+            nodes.clear()
+        nodes[node.key] = node
+        return node
+
+
+def is_supported(dtype):
+    return (dtype.is_bool() or dtype.is_int() or dtype.is_float() or
+            dtype.is_complex())
+
+
+class Operand(object):
+    """ An argument of call1() or call2(): either a scalar, or an
+    expression made of 'tree' and 'args_w'.
+    """
+    w_scalar = None
+    w_lazy = None
+    tree = None
+    args_w = None
+
+    def __init__(self, space, w_obj):
+        if (isinstance(w_obj, W_LazyArray) and w_obj.w_result is None
+                and w_obj.tree.size > MAX_TREE_SIZE // 2):
+            w_obj.force(space)
+        if isinstance(w_obj, W_LazyArray) and w_obj.w_result is None:
+            self.w_lazy = w_obj
+            self.tree = w_obj.tree
+            self.args_w = w_obj.args_w
+            self.shape = w_obj.shape
+            self.dtype = w_obj.dtype
+            return
+        if isinstance(w_obj, W_LazyArray):
+            w_obj = w_obj.w_result
+        else:
+            from pypy.module.micronumpy.ctors import numpify
+            w_obj = numpify(space, w_obj)
+        if isinstance(w_obj, W_NDimArray) and w_obj.is_scalar():
+            w_obj = w_obj.get_scalar_value()
+        if isinstance(w_obj, boxes.W_GenericBox):
+            self.w_scalar = w_obj
+            self.shape = []
+            self.dtype = w_obj.get_dtype(space)
+        else:
+            assert isinstance(w_obj, W_NDimArray)
+            self.tree = intern_node(space, ArrayLeaf(0))
+            self.args_w = [w_obj]
+            self.shape = w_obj.get_shape()
+            self.dtype = w_obj.get_dtype()
+
+    def is_scalar(self):
+        return self.w_scalar is not None
+
+    def get_tree(self, space, args_w, calc_dtype):
+        """ Adds the arguments of this operand to 'args_w', and returns
+        the tree reading them from there.
+        """
+        offset = len(args_w)
+        if self.w_scalar is not None:
+            args_w.append(self.w_scalar.convert_to(space, calc_dtype))
+            return intern_node(space, ScalarLeaf(offset))
+        args_w.extend(self.args_w)
+        if offset == 0:
+            return self.tree
+        return self.tree.shifted(space, offset)
+
+    def get_w_value(self, space):
+        if self.w_scalar is not None:
+            return self.w_scalar
+        if self.w_lazy is not None:
+            return self.w_lazy.force(space)
+        return self.args_w[0]
+
+
+def call1(space, ufunc, w_obj):
+    operand = Operand(space, w_obj)
+    calc_dtype = ufunc.find_calc_dtype(space, operand.dtype)
+    res_dtype = ufunc.find_res_dtype(space, calc_dtype)
+    args_w = []
+    child = operand.get_tree(space, args_w, calc_dtype)
+    tree = intern_node(space, Call1(ufunc.func, ufunc.name, calc_dtype,
+                                    res_dtype, child))
+    return W_LazyArray(tree, args_w, operand.shape, res_dtype)
+
+def call2(space, ufunc, w_lhs, w_rhs):
+    lhs = Operand(space, w_lhs)
+    rhs = Operand(space, w_rhs)
+    if not (is_supported(lhs.dtype) and is_supported(rhs.dtype)):
+        # e.g. comparing with a string: compute it now, like ndarray does
+        return ufunc.call(space, [lhs.get_w_value(space),
+                                  rhs.get_w_value(space)], None, None, None)
+    calc_dtype = ufunc.find_calc_dtype(space, lhs.dtype, rhs.dtype,
+                                       lhs.is_scalar(), rhs.is_scalar())
+    res_dtype = ufunc.find_res_dtype(space, calc_dtype)
+    shape = shape_agreement_shapes(space, lhs.shape, rhs.shape)
+    args_w = []
+    left = lhs.get_tree(space, args_w, calc_dtype)
+    right = rhs.get_tree(space, args_w, calc_dtype)
+    tree = intern_node(space, Call2(ufunc.func, ufunc.name, calc_dtype,
+                                    res_dtype, left, right))
+    return W_LazyArray(tree, args_w, shape, res_dtype)
+
+
+class W_LazyArray(W_Root):
+    _attrs_ = ['tree', 'args_w', 'shape', 'dtype', 'w_result']
+
+    def __init__(self, tree, args_w, shape, dtype):
+        self.tree = tree
+        self.args_w = args_w
+        self.shape = shape
+        self.dtype = dtype
+        self.w_result = None
+
+    def force(self, space):
+        """ Computes the result, once.  Returns an ndarray.
+        """
+        if self.w_result is None:
+            out = W_NDimArray.from_shape(space, self.shape, self.dtype,
+                                         zero=False)
+            loop.call_lazy(space, self.shape, self.tree, self.dtype,
+                           self.args_w, out)
+            self.w_result = out
+            # don't keep the arguments alive any more
+            self.tree = None
+            self.args_w = None
+        return self.w_result
+
+    def descr_eval(self, space, w_out=None):
+        if space.is_none(w_out):
+            return self.force(space)
+        if not isinstance(w_out, W_NDimArray):
+            raise oefmt(space.w_TypeError, 'output must be an array')
+        if self.w_result is not None:
+            w_out.implementation.setslice(space, self.w_result)
+            return w_out
+        shape_agreement_shapes(space, self.shape, w_out.get_shape(),
+                               broadcast_down=False)
+        return loop.call_lazy(space, w_out.get_shape(), self.tree,
+                              w_out.get_dtype(), self.args_w, w_out)
+
+    def descr___array__(self, space, w_dtype=None):
+        if not space.is_none(w_dtype):
+            raise OperationError(space.w_NotImplementedError, space.wrap(
+                "__array__(dtype) not implemented"))
+        return self.force(space)
+
+    def descr_get_shape(self, space):
+        return space.newtuple([space.wrap(i) for i in self.shape])
+
+    def descr_get_dtype(self, space):
+        return self.dtype
+
+    def descr_get_ndim(self, space):
+        return space.wrap(len(self.shape))
+
+    def descr_len(self, space):
+        if len(self.shape):
+            return space.wrap(self.shape[0])
+        raise OperationError(space.w_TypeError, space.wrap(
+            "len() of unsized object"))
+
+    def descr_repr(self, space):
+        return space.repr(self.force(space))
+
+    def descr_str(self, space):
+        return space.str(self.force(space))
+
+    def descr_getitem(self, space, w_idx):
+        return space.getitem(self.force(space), w_idx)
+
+    def descr_iter(self, space):
+        return space.iter(self.force(space))
+
+    def descr___nonzero__(self, space):
+        return space.wrap(space.is_true(self.force(space)))
+
+    def _unaryop_impl(ufunc_name):
+        def impl(self, space):
+            from pypy.module.micronumpy import ufuncs
+            return call1(space, getattr(ufuncs.get(space), ufunc_name), self)
+        return func_with_new_name(impl, "unaryop_%s_impl" % ufunc_name)
+
+    descr_pos = _unaryop_impl("positive")
+    descr_neg = _unaryop_impl("negative")
+    descr_abs = _unaryop_impl("absolute")
+    descr_invert = _unaryop_impl("invert")
+
+    def _binop_impl(ufunc_name):
+        def impl(self, space, w_other):
+            from pypy.module.micronumpy import ufuncs
+            return call2(space, getattr(ufuncs.get(space), ufunc_name),
+                         self, w_other)
+        return func_with_new_name(impl, "binop_%s_impl" % ufunc_name)
+
+    descr_add = _binop_impl("add")
+    descr_sub = _binop_impl("subtract")
+    descr_mul = _binop_impl("multiply")
+    descr_div = _binop_impl("divide")
+    descr_truediv = _binop_impl("true_divide")
+    descr_floordiv = _binop_impl("floor_divide")
+    descr_mod = _binop_impl("mod")
+    descr_pow = _binop_impl("power")
+    descr_lshift = _binop_impl("left_shift")
+    descr_rshift = _binop_impl("right_shift")
+    descr_and = _binop_impl("bitwise_and")
+    descr_or = _binop_impl("bitwise_or")
+    descr_xor = _binop_impl("bitwise_xor")
+
+    descr_eq = _binop_impl("equal")
+    descr_ne = _binop_impl("not_equal")
+    descr_lt = _binop_impl("less")
+    descr_le = _binop_impl("less_equal")
+    descr_gt = _binop_impl("greater")
+    descr_ge = _binop_impl("greater_equal")
+
+    def _binop_right_impl(ufunc_name):
+        def impl(self, space, w_other):
+            from pypy.module.micronumpy import ufuncs
+            return call2(space, getattr(ufuncs.get(space), ufunc_name),
+                         w_other, self)
+        return func_with_new_name(impl, "binop_right_%s_impl" % ufunc_name)
+
+    descr_radd = _binop_right_impl("add")
+    descr_rsub = _binop_right_impl("subtract")
+    descr_rmul = _binop_right_impl("multiply")
+    descr_rdiv = _binop_right_impl("divide")
+    descr_rtruediv = _binop_right_impl("true_divide")
+    descr_rfloordiv = _binop_right_impl("floor_divide")
+    descr_rmod = _binop_right_impl("mod")
+    descr_rpow = _binop_right_impl("power")
+    descr_rlshift = _binop_right_impl("left_shift")
+    descr_rrshift = _binop_right_impl("right_shift")
+    descr_rand = _binop_right_impl("bitwise_and")
+    descr_ror = _binop_right_impl("bitwise_or")
+    descr_rxor = _binop_right_impl("bitwise_xor")
+
+
+def lazy(space, w_obj):
+    """lazy(a)
+
+    Returns a lazyarray wrapping 'a'.  Operations on it are only computed
+    when their result is needed, in a single pass for a whole expression.
+    """
+    if isinstance(w_obj, W_LazyArray):
+        return w_obj
+    w_arr = convert_to_array(space, w_obj)
+    if not is_supported(w_arr.get_dtype()):
+        raise oefmt(space.w_TypeError,
+                    "lazy evaluation is only supported for numeric arrays")
+    return W_LazyArray(intern_node(space, ArrayLeaf(0)), [w_arr],
+                       w_arr.get_shape(), w_arr.get_dtype())
+
+
+W_LazyArray.typedef = TypeDef("numpy.lazyarray",
+    __len__ = interp2app(W_LazyArray.descr_len),
+    __getitem__ = interp2app(W_LazyArray.descr_getitem),
+    __iter__ = interp2app(W_LazyArray.descr_iter),
+    __repr__ = interp2app(W_LazyArray.descr_repr),
+    __str__ = interp2app(W_LazyArray.descr_str),
+    __nonzero__ = interp2app(W_LazyArray.descr___nonzero__),
+    __array__ = interp2app(W_LazyArray.descr___array__),
+
+    __pos__ = interp2app(W_LazyArray.descr_pos),
+    __neg__ = interp2app(W_LazyArray.descr_neg),
+    __abs__ = interp2app(W_LazyArray.descr_abs),
+    __invert__ = interp2app(W_LazyArray.descr_invert),
+
+    __add__ = interp2app(W_LazyArray.descr_add),
+    __sub__ = interp2app(W_LazyArray.descr_sub),
+    __mul__ = interp2app(W_LazyArray.descr_mul),
+    __div__ = interp2app(W_LazyArray.descr_div),
+    __truediv__ = interp2app(W_LazyArray.descr_truediv),
+    __floordiv__ = interp2app(W_LazyArray.descr_floordiv),
+    __mod__ = interp2app(W_LazyArray.descr_mod),
+    __pow__ = interp2app(W_LazyArray.descr_pow),
+    __lshift__ = interp2app(W_LazyArray.descr_lshift),
+    __rshift__ = interp2app(W_LazyArray.descr_rshift),
+    __and__ = interp2app(W_LazyArray.descr_and),
+    __or__ = interp2app(W_LazyArray.descr_or),
+    __xor__ = interp2app(W_LazyArray.descr_xor),
+
+    __radd__ = interp2app(W_LazyArray.descr_radd),
+    __rsub__ = interp2app(W_LazyArray.descr_rsub),
+    __rmul__ = interp2app(W_LazyArray.descr_rmul),
+    __rdiv__ = interp2app(W_LazyArray.descr_rdiv),
+    __rtruediv__ = interp2app(W_LazyArray.descr_rtruediv),
+    __rfloordiv__ = interp2app(W_LazyArray.descr_rfloordiv),
+    __rmod__ = interp2app(W_LazyArray.descr_rmod),
+    __rpow__ = interp2app(W_LazyArray.descr_rpow),
+    __rlshift__ = interp2app(W_LazyArray.descr_rlshift),
+    __rrshift__ = interp2app(W_LazyArray.descr_rrshift),
+    __rand__ = interp2app(W_LazyArray.descr_rand),
+    __ror__ = interp2app(W_LazyArray.descr_ror),
+    __rxor__ = interp2app(W_LazyArray.descr_rxor),
+
+    __eq__ = interp2app(W_LazyArray.descr_eq),
+    __ne__ = interp2app(W_LazyArray.descr_ne),
+    __lt__ = interp2app(W_LazyArray.descr_lt),
+    __le__ = interp2app(W_LazyArray.descr_le),
+    __gt__ = interp2app(W_LazyArray.descr_gt),
+    __ge__ = interp2app(W_LazyArray.descr_ge),
+
+    shape = GetSetProperty(W_LazyArray.descr_get_shape),
+    dtype = GetSetProperty(W_LazyArray.descr_get_dtype),
+    ndim = GetSetProperty(W_LazyArray.descr_get_ndim),
+    eval = interp2app(W_LazyArray.descr_eval),
+)
@@ -100,6 +100,40 @@ def call1(space, shape, func, calc_dtype, res_dtype, w_obj, out):
         obj_state = obj_iter.next(obj_state)
     return out
 
+call_lazy_driver = jit.JitDriver(
+    name='numpy_call_lazy',
+    greens=['shapelen', 'nargs', 'tree', 'res_dtype'],
+    reds='auto')
+
+def call_lazy(space, shape, tree, res_dtype, args_w, out):
+    # evaluates a whole tree of lazy.Node in a single pass.  'args_w'
+    # contains the arrays read by the ArrayLeafs, and the scalars, already
+    # converted, returned by the ScalarLeafs.  The tree is interned, so it
+    # is a reasonable green: we get one loop per shape of expression.
+    nargs = len(args_w)
+    iters = [None] * nargs
+    states = [None] * nargs
+    for i in range(nargs):
+        w_arg = args_w[i]
+        if isinstance(w_arg, W_NDimArray):
+            arg_iter, arg_state = w_arg.create_iter(shape)
+            arg_iter.track_index = False
+            iters[i] = arg_iter
+            states[i] = arg_state
+    out_iter, out_state = out.create_iter(shape)
+    shapelen = len(shape)
+    while not out_iter.done(out_state):
+        call_lazy_driver.jit_merge_point(shapelen=shapelen, nargs=nargs,
+                                         tree=tree, res_dtype=res_dtype)
+        w_val = tree.eval(space, iters, states, args_w)
+        out_iter.setitem(out_state, w_val.convert_to(space, res_dtype))
+        for i in range(nargs):
+            arg_iter = iters[i]
+            if arg_iter is not None:
+                states[i] = arg_iter.next(states[i])
+        out_state = out_iter.next(out_state)
+    return out
+
 call_many_to_one_driver = jit.JitDriver(
     name='numpy_call_many_to_one',
     greens=['shapelen', 'nin', 'func', 'res_dtype'],
@@ -9,7 +9,7 @@ from rpython.rlib.rawstorage import RAW_STORAGE_PTR
 from rpython.rtyper.lltypesystem import rffi
 from rpython.tool.sourcetools import func_with_new_name
 from pypy.module.micronumpy import descriptor, ufuncs, boxes, arrayops, loop, \
-    support, constants as NPY
+    support, gemm, constants as NPY
 from pypy.module.micronumpy.appbridge import get_appbridge_cache
 from pypy.module.micronumpy.arrayops import repeat, choose, put
 from pypy.module.micronumpy.base import W_NDimArray, convert_to_array, \
@@ -1030,6 +1030,8 @@ class __extend__(W_NDimArray):
             w_res.fill(space, self.get_dtype().coerce(space, None))
         else:
             w_res = W_NDimArray.from_shape(space, out_shape, dtype, w_instance=self)
+        if gemm.dot(self, other, w_res, dtype):
+            return w_res
         # This is the place to add fpypy and blas
         return loop.multidim_dot(space, self, other, w_res, dtype,
                                  other_critical_dim)
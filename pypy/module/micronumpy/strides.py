@@ -238,7 +238,12 @@ def shape_agreement(space, shape1, w_arr2, broadcast_down=True):
     if w_arr2 is None:
         return shape1
     assert isinstance(w_arr2, W_NDimArray)
-    shape2 = w_arr2.get_shape()
+    return shape_agreement_shapes(space, shape1, w_arr2.get_shape(),
+                                  broadcast_down)
+
+
+@jit.unroll_safe
+def shape_agreement_shapes(space, shape1, shape2, broadcast_down=True):
     ret = _shape_agreement(shape1, shape2)
     if len(ret) < max(len(shape1), len(shape2)):
         raise OperationError(space.w_ValueError,
@@ -122,6 +122,39 @@ class AppTestNumSupport(BaseNumpyAppTest):
         exc = raises(ValueError, dot, a, b, out)
         assert exc.value[0] == ('output array is not acceptable (must have the '
                                 'right type, nr dimensions, and be a C-Array)')
+        a = a.astype(float)
+        out = arange(9, dtype=float).reshape(3, 3)
+        c = dot(a, b.astype(float), out=out)
+        assert c is out
+        assert (c == [[42, 48, 54], [114, 136, 158], [186, 224, 262]]).all()
+
+    def test_dot_blocked(self):
+        # bigger than the blocks of the kernel used for float and complex
+        from numpy import arange, dot, array, zeros
+        for dtype in ['float32', 'complex128']:
+            fa = (arange(3 * 130) % 7).reshape(3, 130).astype(dtype)
+            fb = (arange(260) - arange(130).reshape(130, 1)).astype(dtype)
+            if dtype.startswith('complex'):
+                fa = fa + fa * 1j
+            c = dot(fa, fb)
+            assert c.shape == (3, 260)
+            assert c.dtype == dtype
+            for i, j in [(0, 0), (2, 259), (1, 128), (0, 255), (1, 256)]:
+                assert c[i, j] == (fa[i] * fb[:, j]).sum()
+            assert (dot(fa, fb[:, 5]) == c[:, 5]).all()
+            assert (dot(fa[1], fb) == c[1]).all()
+        # non-contiguous and reversed operands
+        a = arange(60.0).reshape(6, 10)
+        b = arange(40.0).reshape(10, 4)
+        c = dot(a, b)
+        assert (dot(a[::-1], b) == c[::-1]).all()
+        assert (dot(a, b[:, ::2]) == c[:, ::2]).all()
+        assert (dot(b.T, a.T) == c.T).all()
+        out = zeros((4, 6))
+        dot(b.T, a.T, out=out)
+        assert (out == c.T).all()
+        b = array([1.0, 2.0, 3.0], dtype='>f8')
+        assert (dot(array([[1.0, 1.0, 1.0]], dtype='>f8'), b) == [6.0]).all()
 
     def test_choose_basic(self):
         from numpy import array
@@ -0,0 +1,132 @@
+from pypy.interpreter.gateway import interp2app
+from pypy.module.micronumpy.lazy import MAX_TREE_SIZE
+from pypy.module.micronumpy.test.test_base import BaseNumpyAppTest
+
+
+class AppTestLazy(BaseNumpyAppTest):
+    def setup_class(cls):
+        BaseNumpyAppTest.setup_class.im_func(cls)
+        def tree_size(space, w_lazy):
+            return space.wrap(w_lazy.tree.size)
+        cls.w_tree_size = cls.space.wrap(interp2app(tree_size))
+        cls.w_max_tree_size = cls.space.wrap(MAX_TREE_SIZE)
+
+    def test_simple(self):
+        from numpy import lazy, lazyarray, arange, ndarray
+        a = arange(10.0)
+        b = arange(10.0) * 2
+        c = lazy(a) * b + a * 3 - 1
+        assert type(c) is lazyarray
+        assert c.shape == (10,)
+        assert c.dtype == a.dtype
+        assert c.ndim == 1
+        assert len(c) == 10
+        res = c.eval()
+        assert type(res) is ndarray
+        assert (res == a * b + a * 3 - 1).all()
+        assert c.eval() is res
+        assert c[3] == res[3]
+        assert list(c) == list(res)
+
+    def test_ufuncs(self):
+        from numpy import lazy, lazyarray, arange, sin, add, sqrt, array
+        a = arange(5.0)
+        c = sin(lazy(a)) + 2
+        assert type(c) is lazyarray
+        assert (array(c) == sin(a) + 2).all()
+        c = add(1, sqrt(lazy(a)))
+        assert type(c) is lazyarray
+        assert (c.eval() == 1 + sqrt(a)).all()
+        assert (abs(-lazy(a)).eval() == a).all()
+        assert (-lazy(arange(5)) == -arange(5)).eval().all()
+
+    def test_dtypes(self):
+        from numpy import lazy, arange, array
+        a = arange(5, dtype='int32')
+        c = lazy(a) + 1
+        assert c.dtype == 'int32'
+        assert (c.eval() == a + 1).all()
+        c = lazy(a) / 2.0
+        assert c.dtype == 'float64'
+        assert (c.eval() == a / 2.0).all()
+        c = lazy(a) + array([1.5, 2.5, 3.5, 4.5, 5.5], dtype='float32')
+        assert c.dtype == (a + array([1.5], dtype='float32')).dtype
+        c = lazy(a) > 2
+        assert c.dtype == bool
+        assert list(c.eval()) == [False, False, False, True, True]
+        assert (lazy(a) + 1j).dtype == 'complex128'
+        raises(TypeError, "lazy(arange(3.0)) & 1")
+        raises(TypeError, lazy, array(['abc']))
+
+    def test_broadcast(self):
+        from numpy import lazy, arange
+        a = arange(6.0).reshape(2, 3)
+        b = arange(3.0)
+        c = lazy(a) * b + lazy(b)
+        assert c.shape == (2, 3)
+        assert (c.eval() == a * b + b).all()
+        c = 1 - lazy(b.reshape(3, 1)) * a[0]
+        assert c.shape == (3, 3)
+        assert (c.eval() == 1 - b.reshape(3, 1) * a[0]).all()
+        raises(ValueError, "lazy(a) + arange(4)")
+
+    def test_out(self):
+        from numpy import lazy, arange, zeros
+        a = arange(4.0)
+        out = zeros(4, dtype=int)
+        c = lazy(a) * 2
+        assert c.eval(out=out) is out
+        assert list(out) == [0, 2, 4, 6]
+        out2 = zeros((2, 4))
+        c.eval(out2)
+        assert (out2 == [a * 2, a * 2]).all()
+        raises(ValueError, c.eval, zeros(3))
+        c.eval()
+        out = zeros(4)
+        c.eval(out)
+        assert list(out) == [0, 2, 4, 6]
+
+    def test_reads_at_eval_time(self):
+        from numpy import lazy, arange
+        a = arange(3)
+        c = lazy(a) + a
+        a[0] = 10
+        assert list(c.eval()) == [20, 2, 4]
+        a[0] = 0
+        assert list(c.eval()) == [20, 2, 4]
+
+    def test_forced_operand(self):
+        from numpy import lazy, arange
+        a = arange(3)
+        c = lazy(a) + 1
+        c.eval()
+        d = c * c
+        assert list(d.eval()) == [1, 4, 9]
+        assert (lazy(a) == 'abc') is False
+        assert (lazy(a) + lazy(a)).eval().tolist() == [0, 2, 4]
+
+    def test_scalars(self):
+        from numpy import lazy, arange, array, float32
+        a = arange(3, dtype='float32')
+        c = lazy(a) * float32(2) + array(1.5)
+        assert c.dtype == 'float32'
+        assert c.eval().tolist() == [1.5, 3.5, 5.5]
+        c = 2 ** lazy(a)
+        assert c.eval().tolist() == [1.0, 2.0, 4.0]
+        assert repr(lazy(a) + 1) == repr(a + 1)
+        assert str(lazy(a) + 1) == str(a + 1)
+        assert bool(lazy(array([1])))
+        raises(ValueError, bool, lazy(a))
+
+    def test_long_chain(self):
+        from numpy import lazy, arange
+        a = arange(5.0)
+        b = arange(5.0) + 1
+        acc = lazy(a)
+        for i in range(200):
+            acc = acc + b
+        assert acc.eval().tolist() == [x + 200 * (x + 1) for x in range(5)]
+        acc = lazy(a)
+        for i in range(100):
+            acc = acc * 2 + acc
+            assert self.tree_size(acc) <= self.max_tree_size
@@ -6,11 +6,12 @@ from pypy.interpreter.argument import Arguments
 from rpython.rlib import jit
 from rpython.rlib.rarithmetic import LONG_BIT, maxint
 from rpython.tool.sourcetools import func_with_new_name
-from pypy.module.micronumpy import boxes, loop, constants as NPY
+from pypy.module.micronumpy import boxes, lazy, loop, constants as NPY
 from pypy.module.micronumpy.descriptor import (get_dtype_cache,
             variable_dtype, decode_w_dtype)
 from pypy.module.micronumpy.base import convert_to_array, W_NDimArray
 from pypy.module.micronumpy.ctors import numpify
+from pypy.module.micronumpy.lazy import W_LazyArray
 from pypy.module.micronumpy.nditer import W_NDIter, coalesce_iter
 from pypy.module.micronumpy.strides import shape_agreement
 from pypy.module.micronumpy.support import _parse_signature, product, get_storage_as_int
@@ -337,15 +338,7 @@ class W_Ufunc1(W_Ufunc):
         self.func = func
         self.bool_result = bool_result
 
-    def call(self, space, args_w, sig, casting, extobj):
-        w_obj = args_w[0]
-        out = None
-        if len(args_w) > 1:
-            out = args_w[1]
-            if space.is_w(out, space.w_None):
-                out = None
-        w_obj = numpify(space, w_obj)
-        dtype = _get_dtype(space, w_obj)
+    def find_calc_dtype(self, space, dtype):
         if dtype.is_flexible():
             raise OperationError(space.w_TypeError,
                       space.wrap('Not implemented for this type'))
@@ -354,10 +347,33 @@ class W_Ufunc1(W_Ufunc):
                 not self.allow_complex and dtype.is_complex()):
             raise oefmt(space.w_TypeError,
                 "ufunc %s not supported for the input type", self.name)
-        calc_dtype = find_unaryop_result_dtype(space,
+        return find_unaryop_result_dtype(space,
                                   dtype,
                                   promote_to_float=self.promote_to_float,
                                   promote_bools=self.promote_bools)
+
+    def find_res_dtype(self, space, calc_dtype):
+        if self.bool_result:
+            return get_dtype_cache(space).w_booldtype
+        if self.complex_to_float and calc_dtype.is_complex():
+            if calc_dtype.num == NPY.CFLOAT:
+                return get_dtype_cache(space).w_float32dtype
+            else:
+                return get_dtype_cache(space).w_float64dtype
+        return calc_dtype
+
+    def call(self, space, args_w, sig, casting, extobj):
+        w_obj = args_w[0]
+        out = None
+        if len(args_w) > 1:
+            out = args_w[1]
+            if space.is_w(out, space.w_None):
+                out = None
+        if out is None and isinstance(w_obj, W_LazyArray):
+            return lazy.call1(space, self, w_obj)
+        w_obj = numpify(space, w_obj)
+        dtype = _get_dtype(space, w_obj)
+        calc_dtype = self.find_calc_dtype(space, dtype)
         if out is not None:
             if not isinstance(out, W_NDimArray):
                 raise oefmt(space.w_TypeError, 'output must be an array')
@@ -365,15 +381,8 @@ class W_Ufunc1(W_Ufunc):
             #if not w_obj.get_dtype().can_cast_to(res_dtype):
             #    raise oefmt(space.w_TypeError,
             #        "Cannot cast ufunc %s output from dtype('%s') to dtype('%s') with casting rule 'same_kind'", self.name, w_obj.get_dtype().name, res_dtype.name)
-        elif self.bool_result:
-            res_dtype = get_dtype_cache(space).w_booldtype
         else:
-            res_dtype = calc_dtype
-            if self.complex_to_float and calc_dtype.is_complex():
-                if calc_dtype.num == NPY.CFLOAT:
-                    res_dtype = get_dtype_cache(space).w_float32dtype
-                else:
-                    res_dtype = get_dtype_cache(space).w_float64dtype
+            res_dtype = self.find_res_dtype(space, calc_dtype)
         if w_obj.is_scalar():
             w_val = self.func(calc_dtype,
                               w_obj.get_scalar_value().convert_to(space, calc_dtype))
@@ -424,6 +433,33 @@ class W_Ufunc2(W_Ufunc):
             return True
         return False
 
+    def find_calc_dtype(self, space, w_ldtype, w_rdtype, lhs_is_scalar,
+                        rhs_is_scalar):
+        if self.are_common_types(w_ldtype, w_rdtype):
+            if not lhs_is_scalar and rhs_is_scalar:
+                w_rdtype = w_ldtype
+            elif lhs_is_scalar and not rhs_is_scalar:
+                w_ldtype = w_rdtype
+        calc_dtype = find_binop_result_dtype(space,
+            w_ldtype, w_rdtype,
+            promote_to_float=self.promote_to_float,
+            promote_bools=self.promote_bools)
+        if (self.int_only and (not (w_ldtype.is_int() or w_ldtype.is_object()) or
+                               not (w_rdtype.is_int() or w_rdtype.is_object()) or
+                               not (calc_dtype.is_int() or calc_dtype.is_object())) or
+                not self.allow_bool and (w_ldtype.is_bool() or
+                                         w_rdtype.is_bool()) or
+                not self.allow_complex and (w_ldtype.is_complex() or
+                                            w_rdtype.is_complex())):
+            raise oefmt(space.w_TypeError,
+                "ufunc '%s' not supported for the input types", self.name)
+        return calc_dtype
+
+    def find_res_dtype(self, space, calc_dtype):
+        if self.comparison_func:
+            return get_dtype_cache(space).w_booldtype
+        return calc_dtype
+
     @jit.unroll_safe
     def call(self, space, args_w, sig, casting, extobj):
         w_obj = args_w[0]
@@ -432,6 +468,9 @@ class W_Ufunc2(W_Ufunc):
         else:
             [w_lhs, w_rhs] = args_w
             w_out = None
+        if (space.is_none(w_out) and (isinstance(w_lhs, W_LazyArray) or
+                                      isinstance(w_rhs, W_LazyArray))):
+            return lazy.call2(space, self, w_lhs, w_rhs)
         w_lhs = numpify(space, w_lhs)
         w_rhs = numpify(space, w_rhs)
         w_ldtype = _get_dtype(space, w_lhs)
@@ -465,24 +504,8 @@ class W_Ufunc2(W_Ufunc):
                             w_rdtype.get_name(), w_ldtype.get_name(),
                             self.name)
 
-        if self.are_common_types(w_ldtype, w_rdtype):
-            if not w_lhs.is_scalar() and w_rhs.is_scalar():
-                w_rdtype = w_ldtype
-            elif w_lhs.is_scalar() and not w_rhs.is_scalar():
-                w_ldtype = w_rdtype
-        calc_dtype = find_binop_result_dtype(space,
-            w_ldtype, w_rdtype,
-            promote_to_float=self.promote_to_float,
-            promote_bools=self.promote_bools)
-        if (self.int_only and (not (w_ldtype.is_int() or w_ldtype.is_object()) or
-                               not (w_rdtype.is_int() or w_rdtype.is_object()) or
-                               not (calc_dtype.is_int() or calc_dtype.is_object())) or
-                not self.allow_bool and (w_ldtype.is_bool() or
-                                         w_rdtype.is_bool()) or
-                not self.allow_complex and (w_ldtype.is_complex() or
-                                            w_rdtype.is_complex())):
-            raise oefmt(space.w_TypeError,
-                "ufunc '%s' not supported for the input types", self.name)
+        calc_dtype = self.find_calc_dtype(space, w_ldtype, w_rdtype,
+                                          w_lhs.is_scalar(), w_rhs.is_scalar())
         if space.is_none(w_out):
             out = None
         elif not isinstance(w_out, W_NDimArray):
@@ -490,10 +513,7 @@ class W_Ufunc2(W_Ufunc):
         else:
             out = w_out
             calc_dtype = out.get_dtype()
-        if self.comparison_func:
-            res_dtype = get_dtype_cache(space).w_booldtype
-        else:
-            res_dtype = calc_dtype
+        res_dtype = self.find_res_dtype(space, calc_dtype)
         if w_lhs.is_scalar() and w_rhs.is_scalar():
             arr = self.func(calc_dtype,
                 w_lhs.get_scalar_value().convert_to(space, calc_dtype),
@@ -1,5 +1,6 @@
 from pypy.interpreter.mixedmodule import MixedModule
 from rpython.rtyper.module.ll_os import RegisterOs
+from rpython.rlib import rposix
 
 import os
 exec 'import %s as posix' % os.name
@@ -94,6 +95,8 @@ corresponding Unix manual entries for more information on calls."""
         interpleveldefs['fdatasync'] = 'interp_posix.fdatasync'
     if hasattr(os, 'fchdir'):
         interpleveldefs['fchdir'] = 'interp_posix.fchdir'
+    if rposix.HAVE_SENDFILE:
+        interpleveldefs['sendfile'] = 'interp_posix.sendfile'
     if hasattr(os, 'putenv'):
         interpleveldefs['putenv'] = 'interp_posix.putenv'
     if hasattr(posix, 'unsetenv'): # note: emulated in os
@@ -1,5 +1,6 @@
 import os
 import sys
+import errno
 
 from rpython.rlib import rposix, objectmodel, rurandom
 from rpython.rlib.objectmodel import specialize
@@ -201,6 +202,27 @@ Does not force update of metadata."""
     except OSError, e:
         raise wrap_oserror(space, e)
 
+@unwrap_spec(count=int)
+def sendfile(space, w_out, w_in, w_offset, count):
+    """sendfile(out, in, offset, count) -> byteswritten
+
+Copy count bytes from file descriptor in to file descriptor out, without
+going through user space.  If offset is None, the bytes are read from the
+current position of in, which is then updated."""
+    out_fd = space.c_filedescriptor_w(w_out)
+    in_fd = space.c_filedescriptor_w(w_in)
+    if space.is_none(w_offset):
+        offset = r_longlong(-1)
+    else:
+        offset = space.r_longlong_w(w_offset)
+        if offset < 0:
+            raise wrap_oserror(space, OSError(errno.EINVAL, "sendfile"))
+    try:
+        res = rposix.sendfile(out_fd, in_fd, offset, count)
+    except OSError, e:
+        raise wrap_oserror(space, e)
+    return space.wrap(res)
+
 def fchdir(space, w_fd):
     """Change to the directory of the given file descriptor.  fildes must be
 opened on a directory, not a file."""
@@ -7,6 +7,7 @@ from rpython.tool.udir import udir
 from pypy.tool.pytest.objspace import gettestobjspace
 from pypy.conftest import pypydir
 from rpython.rtyper.module.ll_os import RegisterOs
+from rpython.rlib import rposix
 from rpython.translator.c.test.test_extfunc import need_sparse_files
 import os
 import py
@@ -819,6 +820,29 @@ class AppTestPosix:
             finally:
                 os.chdir(localdir)
 
+    if rposix.HAVE_SENDFILE:
+        def test_sendfile(self):
+            os = self.posix
+            fd = os.open(self.path2 + 'sendfile_src', os.O_RDWR | os.O_CREAT,
+                         0666)
+            os.write(fd, '0123456789' * 100)
+            os.lseek(fd, 10, 0)
+            r, w = os.pipe()
+            try:
+                assert os.sendfile(w, fd, None, 25) == 25
+                assert os.read(r, 100) == '0123456789012345678901234'
+                assert os.lseek(fd, 0, 1) == 35
+                assert os.sendfile(w, fd, 995, 100) == 5
+                assert os.read(r, 100) == '56789'
+                assert os.lseek(fd, 0, 1) == 35
+                assert os.sendfile(w, fd, 1000, 100) == 0
+                raises(OSError, os.sendfile, w, fd, -1, 10)
+                raises(OSError, os.sendfile, r, fd, 0, 10)
+            finally:
+                os.close(fd)
+                os.close(r)
+                os.close(w)
+
     def test_largefile(self):
         os = self.posix
         fd = os.open(self.path2 + 'test_largefile', os.O_RDWR | os.O_CREAT, 0666)
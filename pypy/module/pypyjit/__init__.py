@@ -2,15 +2,20 @@ from pypy.interpreter.mixedmodule import MixedModule
 
 class Module(MixedModule):
     appleveldefs = {
+        'enable_warmup_cache': 'app_warmup.enable_warmup_cache',
+        'load_warmup_cache': 'app_warmup.load_warmup_cache',
+        'save_warmup_cache': 'app_warmup.save_warmup_cache',
     }
 
     interpleveldefs = {
         'set_param':    'interp_jit.set_param',
         'residual_call': 'interp_jit.residual_call',
+        'trace_next_iteration': 'interp_jit.trace_next_iteration',
         'not_from_assembler': 'interp_jit.W_NotFromAssembler',
         'set_compile_hook': 'interp_resop.set_compile_hook',
         'set_optimize_hook': 'interp_resop.set_optimize_hook',
         'set_abort_hook': 'interp_resop.set_abort_hook',
+        'set_loop_recorder': 'interp_resop.set_loop_recorder',
         'get_stats_snapshot': 'interp_resop.get_stats_snapshot',
         'enable_debug': 'interp_resop.enable_debug',
         'disable_debug': 'interp_resop.disable_debug',
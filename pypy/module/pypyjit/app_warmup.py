@@ -0,0 +1,163 @@
+# NOT_RPYTHON
+
+"""Persistent JIT warm-up profile.
+
+The JIT only compiles a loop after it has seen it run for 'threshold'
+iterations, and a function after 'function_threshold' calls.  For
+processes that are restarted often, most of the warm-up time is spent
+waiting for the counters of code that was already hot in the previous
+run.  The warm-up cache records, when the process exits, which loops
+were compiled, keyed on the identity of their code object (file name,
+first line number, name and bytecode hash) and the bytecode offset.  In
+the next process these positions are primed with trace_next_iteration(),
+so that they are traced as soon as they are reached.
+
+Only *where* to trace is persisted, not the traces themselves: the
+loops are traced, optimized and compiled normally, so guards and
+invalidation behave exactly as without the cache.
+"""
+
+_CACHE_FILE = 'jitwarmup.marshal'
+_CACHE_VERSION = 1
+
+_MAX_RECORDED = 10000
+
+_profile = {}        # {code key: [(offset, is_being_profiled)]}
+_save_registered = []
+
+
+def _code_key(code):
+    return (code.co_filename, code.co_firstlineno, code.co_name,
+            hash(code.co_code))
+
+class _LoopRecorder(object):
+    """Given to set_loop_recorder(): the JIT calls append() with the
+    greenkey of every loop that it compiles.  Only the key of the code
+    object is kept, not the code object itself, and each position is
+    recorded once, up to _MAX_RECORDED positions.
+    """
+    def __init__(self):
+        self.positions = {}   # {(code key, offset): is_being_profiled}
+
+    def append(self, greenkey):
+        code, offset, is_being_profiled = greenkey
+        key = (_code_key(code), offset)
+        if key not in self.positions and len(self.positions) < _MAX_RECORDED:
+            self.positions[key] = bool(is_being_profiled)
+
+_recorded = _LoopRecorder()
+
+def _iter_codes():
+    """Yield all the code objects reachable from the loaded modules."""
+    import sys
+    seen = set()
+    todo = []
+    for module in sys.modules.values():
+        d = getattr(module, '__dict__', None)
+        if isinstance(d, dict):
+            todo.extend(d.values())
+    while todo:
+        obj = todo.pop()
+        if isinstance(obj, (staticmethod, classmethod)):
+            obj = obj.__func__
+        elif hasattr(obj, 'im_func'):
+            obj = obj.im_func
+        if hasattr(obj, 'func_code'):
+            obj = obj.func_code
+        if isinstance(obj, _code_type):
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            yield obj
+            todo.extend(obj.co_consts)
+        elif isinstance(obj, (type, type(_Classic))):
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            todo.extend(obj.__dict__.values())
+
+class _Classic:
+    pass
+
+_code_type = type(_code_key.func_code)
+
+def _read_profile(filename):
+    import marshal
+    try:
+        f = open(filename, 'rb')
+    except IOError:
+        return {}
+    try:
+        try:
+            data = marshal.load(f)
+        except (EOFError, ValueError, TypeError):
+            return {}
+    finally:
+        f.close()
+    if (not isinstance(data, tuple) or len(data) != 2 or
+            data[0] != _CACHE_VERSION):
+        return {}
+    return data[1]
+
+def _merge(profile, key, position):
+    positions = profile.setdefault(key, [])
+    if position not in positions:
+        positions.append(position)
+
+def load_warmup_cache(directory):
+    """Read the warm-up profile stored in 'directory' and prime the JIT
+    for all the recorded loops whose code objects are currently reachable
+    from sys.modules.  Call it again after importing more modules to
+    prime their code too.  Returns the number of primed positions.
+    """
+    import os, pypyjit
+    profile = _read_profile(os.path.join(directory, _CACHE_FILE))
+    for key, positions in profile.items():
+        for position in positions:
+            _merge(_profile, key, position)
+    primed = 0
+    if _profile:
+        for code in _iter_codes():
+            positions = _profile.get(_code_key(code))
+            if positions is None:
+                continue
+            for offset, is_being_profiled in positions:
+                pypyjit.trace_next_iteration(code, offset, is_being_profiled)
+                primed += 1
+    return primed
+
+def save_warmup_cache(directory):
+    """Write the warm-up profile to 'directory': the loops compiled so far
+    since enable_warmup_cache(), merged with the profile that was loaded
+    and with what other processes wrote in the meantime.
+    """
+    import os, marshal
+    profile = _read_profile(os.path.join(directory, _CACHE_FILE))
+    for key, positions in _profile.items():
+        for position in positions:
+            _merge(profile, key, position)
+    for (key, offset), is_being_profiled in _recorded.positions.items():
+        _merge(profile, key, (offset, is_being_profiled))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    filename = os.path.join(directory, _CACHE_FILE)
+    tmpname = '%s.%d.tmp' % (filename, os.getpid())
+    f = open(tmpname, 'wb')
+    try:
+        marshal.dump((_CACHE_VERSION, profile), f)
+    finally:
+        f.close()
+    os.rename(tmpname, filename)
+
+def enable_warmup_cache(directory):
+    """Start recording the compiled loops, prime the JIT with the profile
+    saved in 'directory' by previous processes (see load_warmup_cache()),
+    and save the updated profile there when the process exits.
+    """
+    import pypyjit
+    pypyjit.set_loop_recorder(_recorded)
+    if not _save_registered:
+        import atexit
+        atexit.register(save_warmup_cache, directory)
+        _save_registered.append(directory)
+    return load_warmup_cache(directory)
@@ -45,6 +45,9 @@ class PyPyJitIface(JitHookInterface):
         cache = space.fromcache(Cache)
         if cache.in_recursion:
             return
+        if not is_bridge and not space.is_w(cache.w_loop_recorder,
+                                            space.w_None):
+            self._record_loop(cache, debug_info)
         if space.is_true(cache.w_compile_hook):
             w_debug_info = W_JitLoopInfo(space, debug_info, is_bridge)
             cache.in_recursion = True
@@ -57,6 +60,22 @@ class PyPyJitIface(JitHookInterface):
             finally:
                 cache.in_recursion = False
 
+    def _record_loop(self, cache, debug_info):
+        space = self.space
+        jitdriver = debug_info.get_jitdriver()
+        if jitdriver.name != 'pypyjit':
+            return
+        w_greenkey = wrap_greenkey(space, jitdriver, debug_info.greenkey, '')
+        cache.in_recursion = True
+        try:
+            try:
+                space.call_method(cache.w_loop_recorder, 'append', w_greenkey)
+            except OperationError, e:
+                e.write_unraisable(space, "jit loop recorder ",
+                                   cache.w_loop_recorder)
+        finally:
+            cache.in_recursion = False
+
     def _optimize_hook(self, debug_info, is_bridge=False):
         space = self.space
         cache = space.fromcache(Cache)
@@ -5,16 +5,16 @@ This is transformed to become a JIT by code elsewhere: rpython/jit/*
 
 from rpython.rlib.rarithmetic import r_uint, intmask
 from rpython.rlib.jit import JitDriver, hint, we_are_jitted, dont_look_inside
-from rpython.rlib import jit
+from rpython.rlib import jit, jit_hooks
 from rpython.rlib.jit import current_trace_length, unroll_parameters
 import pypy.interpreter.pyopcode   # for side-effects
 from pypy.interpreter.error import OperationError, oefmt
-from pypy.interpreter.pycode import CO_GENERATOR
+from pypy.interpreter.pycode import PyCode, CO_GENERATOR
 from pypy.interpreter.pyframe import PyFrame
 from pypy.interpreter.pyopcode import ExitFrame, Yield
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.typedef import TypeDef
-from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.gateway import interp2app, unwrap_spec
 from opcode import opmap
 
 
@@ -145,6 +145,18 @@ def set_param(space, __args__):
             else:
                 raise oefmt(space.w_TypeError, "no JIT parameter '%s'", key)
 
+@unwrap_spec(w_code=PyCode, next_instr=int, is_being_profiled=bool)
+@dont_look_inside
+def trace_next_iteration(space, w_code, next_instr=0,
+                         is_being_profiled=False):
+    '''Make the JIT start tracing the next time the given position of
+    the code object is reached (the start of the function if next_instr
+    is 0, otherwise the target of a loop's backward jump), instead of
+    waiting for the usual threshold to be reached.'''
+    jit_hooks.trace_next_iteration('pypyjit', r_uint(next_instr),
+                                   is_being_profiled,
+                                   jit_hooks._cast_to_gcref(w_code))
+
 @dont_look_inside
 def residual_call(space, w_callable, __args__):
     '''For testing.  Invokes callable(...), but without letting
@@ -23,6 +23,7 @@ class Cache(object):
         self.w_compile_hook = space.w_None
         self.w_abort_hook = space.w_None
         self.w_optimize_hook = space.w_None
+        self.w_loop_recorder = space.w_None
 
     def getno(self):
         self.no += 1
@@ -60,6 +61,18 @@ def set_compile_hook(space, w_hook):
     cache.w_compile_hook = w_hook
     cache.in_recursion = NonConstant(False)
 
+def set_loop_recorder(space, w_list):
+    """ set_loop_recorder(list)
+
+    Every time a loop (not a bridge) of the Python interpreter is compiled,
+    call the append() method of the given object with the greenkey of the
+    loop, (code, offset, is_being_profiled).  Pass None to stop recording.
+    Like the jit hooks, this is not reentrant: loops compiled while
+    append() runs are not recorded.
+    """
+    cache = space.fromcache(Cache)
+    cache.w_loop_recorder = w_list
+
 def set_optimize_hook(space, w_hook):
     """ set_optimize_hook(hook)
 
@@ -193,6 +193,30 @@ class AppTestJitHook(object):
         self.on_compile_bridge()
         assert len(l) == 2 # and did not crash
 
+    def test_loop_recorder_non_reentrant(self):
+        import pypyjit
+        on_compile = self.on_compile
+        l = []
+        class Recorder(list):
+            def append(self, greenkey):
+                list.append(self, greenkey)
+                on_compile()
+        def hook(*args):
+            l.append(None)
+
+        recorder = Recorder()
+        pypyjit.set_loop_recorder(recorder)
+        try:
+            self.on_compile()
+            assert recorder == [(self.f.func_code, 0, False)]
+            pypyjit.set_compile_hook(hook)
+            self.on_compile()
+            assert len(recorder) == 2
+            assert len(l) == 1
+        finally:
+            pypyjit.set_loop_recorder(None)
+            pypyjit.set_compile_hook(None)
+
     def test_on_compile_types(self):
         import pypyjit
         l = []
@@ -0,0 +1,89 @@
+from pypy.interpreter.gateway import interp2app
+from pypy.module.pypyjit.interp_resop import Cache
+from rpython.tool.udir import udir
+
+
+class AppTestWarmupCache(object):
+    spaceconfig = dict(usemodules=('pypyjit', 'marshal'))
+
+    def setup_class(cls):
+        def get_loop_recorder(space):
+            return space.fromcache(Cache).w_loop_recorder
+        cls.w_get_loop_recorder = cls.space.wrap(
+            interp2app(get_loop_recorder))
+        cls.w_tmpdir = cls.space.wrap(str(udir.join('jitwarmup')))
+
+    def test_save_and_load(self):
+        import pypyjit, sys, types, os
+
+        src = ("def f(n):\n"
+               "    total = 0\n"
+               "    for i in range(n):\n"
+               "        total += i\n"
+               "    return total\n"
+               "class A(object):\n"
+               "    @staticmethod\n"
+               "    def g():\n"
+               "        while True:\n"
+               "            pass\n")
+        def new_module():
+            mod = types.ModuleType('warmup_test_module')
+            exec compile(src, 'warmup_test.py', 'exec') in mod.__dict__
+            sys.modules['warmup_test_module'] = mod
+            return mod
+        mod = new_module()
+        primed = []
+        orig_trace_next_iteration = pypyjit.trace_next_iteration
+        pypyjit.trace_next_iteration = lambda *args: primed.append(args)
+        try:
+            assert pypyjit.enable_warmup_cache(self.tmpdir) == 0
+            recorder = self.get_loop_recorder()
+            assert recorder.positions == {}
+            # this is what the JIT does when it compiles these loops
+            recorder.append((mod.f.func_code, 17, False))
+            recorder.append((mod.A.g.func_code, 0, True))
+            recorder.append((mod.f.func_code, 17, False))
+            assert len(recorder.positions) == 2
+            pypyjit.save_warmup_cache(self.tmpdir)
+            assert os.listdir(self.tmpdir) == ['jitwarmup.marshal']
+            #
+            # pretend this is a new process, with new code objects
+            mod = new_module()
+            assert pypyjit.load_warmup_cache(self.tmpdir) == 2
+            assert sorted(primed) == sorted([
+                (mod.f.func_code, 17, False),
+                (mod.A.g.func_code, 0, True)])
+        finally:
+            pypyjit.trace_next_iteration = orig_trace_next_iteration
+            pypyjit.set_loop_recorder(None)
+            del sys.modules['warmup_test_module']
+
+    def test_trace_next_iteration(self):
+        import pypyjit
+        def f():
+            pass
+        # not translated: this does nothing, but must accept its arguments
+        pypyjit.trace_next_iteration(f.func_code)
+        pypyjit.trace_next_iteration(f.func_code, 3, True)
+        raises(TypeError, pypyjit.trace_next_iteration, f)
+
+    def test_recorder_is_bounded(self):
+        import pypyjit
+        def f():
+            pass
+        pypyjit.enable_warmup_cache(self.tmpdir)
+        try:
+            recorder = type(self.get_loop_recorder())()
+        finally:
+            pypyjit.set_loop_recorder(None)
+        app_globals = recorder.append.im_func.func_globals
+        orig_max_recorded = app_globals['_MAX_RECORDED']
+        app_globals['_MAX_RECORDED'] = 5
+        try:
+            for i in range(10):
+                recorder.append((f.func_code, i, False))
+                recorder.append((f.func_code, i, True))
+        finally:
+            app_globals['_MAX_RECORDED'] = orig_max_recorded
+        assert len(recorder.positions) == 5
+        assert recorder.positions.values() == [False] * 5
@@ -0,0 +1,88 @@
+"""Compare epoll.poll(), epoll.poll_into() and poll.poll() when many
+file descriptors are ready at once.
+
+usage: epoll.py [number of socket pairs] [number of polls]
+"""
+import array
+import select
+import socket
+import sys
+import time
+
+
+def make_pairs(n):
+    pairs = []
+    for i in xrange(n):
+        a, b = socket.socketpair()
+        b.send('x')     # makes 'a' readable
+        pairs.append((a, b))
+    return pairs
+
+
+def bench(name, func):
+    t0 = time.time()
+    events = func()
+    t1 = time.time()
+    print '%-22s %d events in %.3f seconds, %.0f events/s' % (
+        name, events, t1 - t0, events / (t1 - t0))
+
+
+def main(npairs, npolls):
+    pairs = make_pairs(npairs)
+    fds = [a.fileno() for a, b in pairs]
+
+    ep = select.epoll()
+    for fd in fds:
+        ep.register(fd, select.EPOLLIN)
+
+    def run_epoll_poll():
+        total = 0
+        for i in xrange(npolls):
+            for fd, mask in ep.poll(0, npairs):
+                total += 1
+        return total
+
+    def run_epoll_poll_into():
+        total = 0
+        buf = [0] * (2 * npairs)
+        for i in xrange(npolls):
+            n = ep.poll_into(buf, 0)
+            for j in xrange(0, 2 * n, 2):
+                fd = buf[j]
+                mask = buf[j + 1]
+                total += 1
+        return total
+
+    def run_epoll_poll_into_array():
+        total = 0
+        buf = array.array('l', [0] * (2 * npairs))
+        for i in xrange(npolls):
+            n = ep.poll_into(buf, 0)
+            for j in xrange(0, 2 * n, 2):
+                fd = buf[j]
+                mask = buf[j + 1]
+                total += 1
+        return total
+
+    p = select.poll()
+    for fd in fds:
+        p.register(fd, select.POLLIN)
+
+    def run_poll():
+        total = 0
+        for i in xrange(npolls):
+            for fd, mask in p.poll(0):
+                total += 1
+        return total
+
+    bench('epoll.poll', run_epoll_poll)
+    bench('epoll.poll_into(list)', run_epoll_poll_into)
+    bench('epoll.poll_into(array)', run_epoll_poll_into_array)
+    bench('poll.poll', run_poll)
+    ep.close()
+
+
+if __name__ == '__main__':
+    npairs = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    npolls = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    main(npairs, npolls)
@@ -72,8 +72,24 @@ epoll_wait = rffi.llexternal(
     save_err=rffi.RFFI_SAVE_ERRNO
 )
 
+EVENTS = rffi.CArray(epoll_event)
+EPOLLET = public_symbols["EPOLLET"]
+EPOLLONESHOT = public_symbols["EPOLLONESHOT"]
+
+
+def _get_eventmask(eventmask, edge, oneshot):
+    if edge:
+        eventmask |= EPOLLET
+    if oneshot:
+        eventmask |= EPOLLONESHOT
+    return eventmask
+
 
 class W_Epoll(W_Root):
+    # the event array of the last poll(), kept for the next one
+    evs = lltype.nullptr(EVENTS)
+    evs_size = 0
+
     def __init__(self, space, epfd):
         self.epfd = epfd
 
@@ -110,6 +126,39 @@ class W_Epoll(W_Root):
         if not self.get_closed():
             socketclose(self.epfd)
             self.epfd = -1
+        if self.evs:
+            lltype.free(self.evs, flavor='raw')
+            self.evs = lltype.nullptr(EVENTS)
+            self.evs_size = 0
+
+    def acquire_events(self, maxevents):
+        # The GIL is released during epoll_wait(), so the array is taken
+        # away from self while in use: a poll() running concurrently in
+        # another thread gets a fresh one.
+        evs = self.evs
+        if evs and self.evs_size >= maxevents:
+            size = self.evs_size
+            self.evs = lltype.nullptr(EVENTS)
+            self.evs_size = 0
+            return evs, size
+        return lltype.malloc(EVENTS, maxevents, flavor='raw'), maxevents
+
+    def release_events(self, evs, size):
+        if not self.evs and not self.get_closed():
+            self.evs = evs
+            self.evs_size = size
+        else:
+            lltype.free(evs, flavor='raw')
+
+    def wait(self, space, evs, maxevents, timeout):
+        if timeout < 0:
+            timeout = -1.0
+        else:
+            timeout *= 1000.0
+        nfds = epoll_wait(self.epfd, evs, maxevents, int(timeout))
+        if nfds < 0:
+            raise exception_from_saved_errno(space, space.w_IOError)
+        return nfds
 
     def epoll_ctl(self, space, ctl, w_fd, eventmask, ignore_ebadf=False):
         fd = space.c_filedescriptor_w(w_fd)
@@ -133,46 +182,73 @@ class W_Epoll(W_Root):
     def descr_close(self, space):
         self.close()
 
-    @unwrap_spec(eventmask=int)
-    def descr_register(self, space, w_fd, eventmask=-1):
+    @unwrap_spec(eventmask=int, edge=bool, oneshot=bool)
+    def descr_register(self, space, w_fd, eventmask=-1, edge=False,
+                       oneshot=False):
         self.check_closed(space)
-        self.epoll_ctl(space, EPOLL_CTL_ADD, w_fd, eventmask)
+        self.epoll_ctl(space, EPOLL_CTL_ADD, w_fd,
+                       _get_eventmask(eventmask, edge, oneshot))
 
     def descr_unregister(self, space, w_fd):
         self.check_closed(space)
         self.epoll_ctl(space, EPOLL_CTL_DEL, w_fd, 0, ignore_ebadf=True)
 
-    @unwrap_spec(eventmask=int)
-    def descr_modify(self, space, w_fd, eventmask=-1):
+    @unwrap_spec(eventmask=int, edge=bool, oneshot=bool)
+    def descr_modify(self, space, w_fd, eventmask=-1, edge=False,
+                     oneshot=False):
         self.check_closed(space)
-        self.epoll_ctl(space, EPOLL_CTL_MOD, w_fd, eventmask)
+        self.epoll_ctl(space, EPOLL_CTL_MOD, w_fd,
+                       _get_eventmask(eventmask, edge, oneshot))
 
     @unwrap_spec(timeout=float, maxevents=int)
     def descr_poll(self, space, timeout=-1.0, maxevents=-1):
         self.check_closed(space)
-        if timeout < 0:
-            timeout = -1.0
-        else:
-            timeout *= 1000.0
-
         if maxevents == -1:
             maxevents = FD_SETSIZE - 1
         elif maxevents < 1:
             raise oefmt(space.w_ValueError,
                         "maxevents must be greater than 0, not %d", maxevents)
 
-        with lltype.scoped_alloc(rffi.CArray(epoll_event), maxevents) as evs:
-            nfds = epoll_wait(self.epfd, evs, maxevents, int(timeout))
-            if nfds < 0:
-                raise exception_from_saved_errno(space, space.w_IOError)
-
+        evs, size = self.acquire_events(maxevents)
+        try:
+            nfds = self.wait(space, evs, maxevents, timeout)
             elist_w = [None] * nfds
             for i in xrange(nfds):
                 event = evs[i]
                 elist_w[i] = space.newtuple(
                     [space.wrap(event.c_data.c_fd), space.wrap(event.c_events)]
                 )
-            return space.newlist(elist_w)
+        finally:
+            self.release_events(evs, size)
+        return space.newlist(elist_w)
+
+    @unwrap_spec(timeout=float)
+    def descr_poll_into(self, space, w_events, timeout=-1.0):
+        """poll_into(events[, timeout=-1]) -> number of events
+
+        Like poll(), but stores the events as fd, eventmask, fd,
+        eventmask... in the mutable sequence 'events' (a list or an
+        array, typically reused from one call to the next) instead of
+        building a new list of tuples.  At most len(events) // 2 events
+        are retrieved."""
+        self.check_closed(space)
+        maxevents = space.len_w(w_events) // 2
+        if maxevents < 1:
+            raise oefmt(space.w_ValueError,
+                        "events must have room for at least one event")
+
+        evs, size = self.acquire_events(maxevents)
+        try:
+            nfds = self.wait(space, evs, maxevents, timeout)
+            for i in xrange(nfds):
+                event = evs[i]
+                space.setitem(w_events, space.wrap(2 * i),
+                              space.wrap(event.c_data.c_fd))
+                space.setitem(w_events, space.wrap(2 * i + 1),
+                              space.wrap(event.c_events))
+        finally:
+            self.release_events(evs, size)
+        return space.wrap(nfds)
 
 
 W_Epoll.typedef = TypeDef("select.epoll",
@@ -186,5 +262,6 @@ W_Epoll.typedef = TypeDef("select.epoll",
     unregister = interp2app(W_Epoll.descr_unregister),
     modify = interp2app(W_Epoll.descr_modify),
     poll = interp2app(W_Epoll.descr_poll),
+    poll_into = interp2app(W_Epoll.descr_poll_into),
 )
 W_Epoll.typedef.acceptable_as_base_class = False
@@ -7,7 +7,7 @@ import platform
 
 class AppTestEpoll(object):
     spaceconfig = {
-        "usemodules": ["select", "_socket", "posix", "time"],
+        "usemodules": ["select", "_socket", "posix", "time", "array"],
     }
 
     def setup_class(cls):
@@ -205,3 +205,61 @@ class AppTestEpoll(object):
         ep = select.epoll()
         ep.close()
         ep.close()
+
+    def test_poll_into(self):
+        import array
+        import select
+
+        client, server = self.socket_pair()
+
+        ep = select.epoll(16)
+        ep.register(server.fileno(), select.EPOLLIN | select.EPOLLOUT)
+        ep.register(client.fileno(), select.EPOLLIN | select.EPOLLOUT)
+
+        events = [0] * 8
+        assert ep.poll_into(events, 1) == 2
+        result = sorted(zip(events[0:4:2], events[1:4:2]))
+        expected = sorted([(client.fileno(), select.EPOLLOUT),
+                           (server.fileno(), select.EPOLLOUT)])
+        assert result == expected
+        assert events[4:] == [0] * 4
+
+        client.send("Hello!")
+        server.send("world!!!")
+        events = array.array('l', [0, 0])
+        assert ep.poll_into(events, 1) == 1
+        assert events[0] in (client.fileno(), server.fileno())
+        assert events[1] == select.EPOLLIN | select.EPOLLOUT
+
+        # the event buffer is reused, and grown when needed
+        assert len(ep.poll(1, 1)) == 1
+        assert len(ep.poll(1, 4)) == 2
+        assert ep.poll_into([0] * 3, 1) == 1
+
+        raises(ValueError, ep.poll_into, [0], 1)
+        ep.close()
+        raises(ValueError, ep.poll_into, [0, 0], 1)
+
+    def test_edge_and_oneshot(self):
+        import select
+
+        client, server = self.socket_pair()
+
+        ep = select.epoll(16)
+        ep.register(server.fileno(), select.EPOLLIN, edge=True)
+        ep.register(client.fileno(), select.EPOLLIN, oneshot=True)
+        assert ep.poll(0) == []
+
+        client.send("Hello!")
+        server.send("world!!!")
+        events = sorted(ep.poll(1, 4))
+        expected = sorted([(client.fileno(), select.EPOLLIN),
+                           (server.fileno(), select.EPOLLIN)])
+        assert events == expected
+        # nothing new for the edge-triggered fd, and the one-shot fd is
+        # disabled until it is modified again
+        assert ep.poll(0) == []
+        ep.modify(client.fileno(), select.EPOLLIN, oneshot=True)
+        assert ep.poll(1, 4) == [(client.fileno(), select.EPOLLIN)]
+        assert ep.poll(0) == []
+        ep.close()
@@ -55,6 +55,8 @@ class Module(MixedModule):
         'getrecursionlimit'     : 'vm.getrecursionlimit',
         'setcheckinterval'      : 'vm.setcheckinterval',
         'getcheckinterval'      : 'vm.getcheckinterval',
+        'setswitchinterval'     : 'vm.setswitchinterval',
+        'getswitchinterval'     : 'vm.getswitchinterval',
         'exc_info'              : 'vm.exc_info',
         'exc_clear'             : 'vm.exc_clear',
         'settrace'              : 'vm.settrace',
@@ -395,6 +395,20 @@ class AppTestSysModulePortedFromCPython:
             sys.setcheckinterval(n)
             assert sys.getcheckinterval() == n
 
+    def test_switchinterval(self):
+        import sys
+        raises(TypeError, sys.setswitchinterval)
+        raises(ValueError, sys.setswitchinterval, 0.0)
+        raises(ValueError, sys.setswitchinterval, -1)
+        orig = sys.getswitchinterval()
+        assert orig == 0.005
+        try:
+            for n in 1e-6, 0.25, 1:
+                sys.setswitchinterval(n)
+                assert abs(sys.getswitchinterval() - n) < 1e-9
+        finally:
+            sys.setswitchinterval(orig)
+
     def test_recursionlimit(self):
         import sys
         raises(TypeError, sys.getrecursionlimit, 42)
@@ -6,7 +6,7 @@ from rpython.rlib import jit
 from rpython.rlib.runicode import MAXUNICODE
 
 from pypy.interpreter import gateway
-from pypy.interpreter.error import OperationError
+from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.gateway import unwrap_spec
 
 
@@ -83,6 +83,24 @@ def getcheckinterval(space):
         result = 0
     return space.wrap(result)
 
+@unwrap_spec(interval=float)
+def setswitchinterval(space, interval):
+    """Set the ideal thread switching delay inside the Python interpreter.
+The actual frequency of switching threads can be lower if the interpreter
+executes long sequences of uninterruptible code (this is implementation-
+specific and workload-dependent).
+
+The parameter must represent the desired switching delay in seconds.
+A typical value is 0.005 (5 milliseconds)."""
+    if not interval > 0.0:
+        raise oefmt(space.w_ValueError,
+                    "switch interval must be strictly positive")
+    space.threadlocals.setswitchinterval(interval)
+
+def getswitchinterval(space):
+    """Return the current thread switch interval; see setswitchinterval()."""
+    return space.wrap(space.threadlocals.getswitchinterval())
+
 def exc_info(space):
     """Return the (type, value, traceback) of the most recent exception
 caught by an except clause in the current stack frame or in an older stack
@@ -5,13 +5,18 @@ Global Interpreter Lock.
 # This module adds a global lock to an object space.
 # If multiple threads try to execute simultaneously in this space,
 # all but one will be blocked.  The other threads get a chance to run
-# from time to time, using the periodic action GILReleaseAction.
+# from time to time, using the periodic action GILReleaseAction: a
+# thread that waits for longer than sys.getswitchinterval() asks for
+# the GIL, see thread_gil.c.
 
 from rpython.rlib import rthread, rgil
 from pypy.module.thread.error import wrap_thread_error
 from pypy.interpreter.executioncontext import PeriodicAsyncAction
 from pypy.module.thread.threadlocals import OSThreadLocals
-from rpython.rlib.objectmodel import invoke_around_extcall
+from rpython.rlib.objectmodel import invoke_around_extcall, we_are_translated
+
+MAX_SWITCH_INTERVAL = float(2**31 - 1)     # in microseconds
+
 
 class GILThreadLocals(OSThreadLocals):
     """A version of OSThreadLocals that enforces a GIL."""
@@ -25,6 +30,12 @@ class GILThreadLocals(OSThreadLocals):
 
     def _initialize_gil(self, space):
         rgil.gil_allocate()
+        if we_are_translated():
+            # not when running on top of CPython: there, forcing the
+            # ticker can make a thread give up the GIL in the middle of
+            # building a rlib.cache entry, and the next thread that
+            # looks up the cache blocks on its lock forever
+            rgil.gil_set_ticker(space.actionflag.get_ticker_address())
 
     def setup_threads(self, space):
         """Enable threads in the object space, if they haven't already been."""
@@ -46,6 +57,15 @@ class GILThreadLocals(OSThreadLocals):
         invoke_around_extcall(before_external_call, after_external_call)
         return result
 
+    def getswitchinterval(self):
+        return rgil.gil_get_switch_interval() / 1000000.0
+
+    def setswitchinterval(self, interval):
+        microseconds = interval * 1000000.0
+        if microseconds > MAX_SWITCH_INTERVAL:
+            microseconds = MAX_SWITCH_INTERVAL
+        rgil.gil_set_switch_interval(int(microseconds))
+
     def reinit_threads(self, space):
         "Called in the child process after a fork()"
         OSThreadLocals.reinit_threads(self, space)
@@ -54,12 +74,14 @@ class GILThreadLocals(OSThreadLocals):
 
 
 class GILReleaseAction(PeriodicAsyncAction):
-    """An action called every sys.checkinterval bytecodes.  It releases
-    the GIL to give some other thread a chance to run.
+    """An action called every sys.checkinterval bytecodes, and as soon as
+    another thread has been waiting for the GIL for longer than the switch
+    interval.  In the latter case, it releases the GIL to give that thread
+    a chance to run.
     """
 
     def perform(self, executioncontext, frame):
-        do_yield_thread()
+        do_yield_thread_if_requested()
 
 
 after_thread_switch = lambda: None     # hook for signal.py
@@ -96,6 +118,17 @@ do_yield_thread._gctransformer_hint_close_stack_ = True
 do_yield_thread._dont_reach_me_in_del_ = True
 do_yield_thread._dont_inline_ = True
 
-# do_yield_thread() needs a different hint: _gctransformer_hint_close_stack_.
+def do_yield_thread_if_requested():
+    # same as do_yield_thread(), but only if a waiting thread asked for
+    # the GIL, i.e. if it has been waiting for longer than the switch
+    # interval.
+    if rgil.gil_yield_thread_if_requested():
+        rthread.gc_thread_run()
+        after_thread_switch()
+do_yield_thread_if_requested._gctransformer_hint_close_stack_ = True
+do_yield_thread_if_requested._dont_reach_me_in_del_ = True
+do_yield_thread_if_requested._dont_inline_ = True
+
+# do_yield_thread*() need a different hint: _gctransformer_hint_close_stack_.
 # The *_external_call() functions are themselves called only from the rffi
 # module from a helper function that also has this hint.
@@ -3,6 +3,7 @@ from pypy.module.thread import gil
 from rpython.rlib.test import test_rthread
 from rpython.rlib import rthread as thread
 from rpython.rlib.objectmodel import we_are_translated
+from rpython.rtyper.lltypesystem import lltype, rffi
 
 class FakeEC(object):
     pass
@@ -14,6 +15,18 @@ class FakeActionFlag(object):
         return 0
     def set(self, x):
         pass
+    def get_ticker_address(self):
+        return lltype.nullptr(rffi.LONGP.TO)
+
+class FakeTickerActionFlag(FakeActionFlag):
+    def __init__(self):
+        self.ticker = lltype.malloc(rffi.LONGP.TO, 1, flavor='raw',
+                                    immortal=True)
+        self.ticker[0] = 100
+    def _freeze_(self):
+        return True
+    def get_ticker_address(self):
+        return self.ticker
 
 class FakeSpace(object):
     def __init__(self):
@@ -105,6 +118,53 @@ class GILTests(test_rthread.AbstractGCTestClass):
     def test_one_thread_rev(self):
         self.test_one_thread(skew=-1)
 
+    def test_switch_interval(self):
+        from rpython.rlib import rgil
+        space = FakeSpace()
+        space.actionflag = FakeTickerActionFlag()
+        ticker = space.actionflag.ticker
+        class State:
+            pass
+        state = State()
+        def wait_for_request():
+            # busy loop without releasing the GIL, until the other
+            # thread forces the ticker to -1; then give it the GIL
+            still_waiting = 100000000
+            while ticker[0] != -1:
+                if not still_waiting:
+                    raise ValueError("time out")
+                still_waiting -= 1
+                rgil.gil_get_switch_interval()    # opaque call
+            ticker[0] = 100
+            gil.do_yield_thread_if_requested()
+        def bootstrap():
+            state.data.append(2)
+            wait_for_request()
+            thread.gc_thread_die()
+        my_gil_threadlocals = gil.GILThreadLocals()
+        def f():
+            state.data = []
+            state.threadlocals = my_gil_threadlocals
+            state.threadlocals.setup_threads(space)
+            rgil.gil_set_ticker(ticker)     # not done untranslated
+            state.threadlocals.setswitchinterval(0.001)
+            assert state.threadlocals.getswitchinterval() == 0.001
+            # nothing is waiting: not yielding
+            assert not rgil.gil_yield_thread_if_requested()
+            ticker[0] = 100
+            thread.start_new_thread(bootstrap, ())
+            # the new thread either ran already, and then gave us the
+            # GIL back when we asked for it; or it is waiting now
+            if not state.data:
+                wait_for_request()
+            state.data.append(1)
+            state.threadlocals.setswitchinterval(0.005)
+            return state.data[0] * 10 + state.data[1]
+
+        fn = self.getcompiled(f, [])
+        res = fn()
+        assert res == 21
+
 
 class TestRunDirectly(GILTests):
     def getcompiled(self, f, argtypes):
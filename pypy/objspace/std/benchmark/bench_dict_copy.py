@@ -0,0 +1,72 @@
+
+""" Copying, updating and iterating over dicts of every strategy, and the
+memory taken by many small copied dicts.  Run it with two pypy-c to
+compare them.
+"""
+
+import sys, time
+
+def make_keys(kind, size):
+    if kind == 'bytes':
+        return ['key%d' % i for i in xrange(size)]
+    if kind == 'unicode':
+        return [u'key%d' % i for i in xrange(size)]
+    if kind == 'int':
+        return range(size)
+    return [(i,) for i in xrange(size)]      # object strategy
+
+def make_kwargs(size):
+    def f(**kwargs):
+        return kwargs
+    return f(**dict.fromkeys(['k%d' % i for i in xrange(size)]))
+
+def count_operation(name, function, repeat):
+    t0 = time.time()
+    for i in xrange(repeat):
+        function()
+    tk = time.time()
+    print "%-40s %f" % (name, tk - t0)
+
+def bench_kind(kind, size, repeat):
+    if kind == 'kwargs':
+        d = make_kwargs(size)
+    else:
+        d = dict.fromkeys(make_keys(kind, size), 42)
+        # leave a few deleted entries behind
+        for key in d.keys()[::4]:
+            del d[key]
+    def iterate():
+        for key, value in d.iteritems():
+            pass
+    def update():
+        {}.update(d)
+    count_operation("%s[%d]: copy()" % (kind, size), d.copy, repeat)
+    count_operation("%s[%d]: dict(d)" % (kind, size), lambda: dict(d),
+                    repeat)
+    count_operation("%s[%d]: {}.update(d)" % (kind, size), update, repeat)
+    count_operation("%s[%d]: iteritems()" % (kind, size), iterate, repeat)
+
+def maxrss_kb():
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def bench_memory(count=1000000):
+    d = {'a': 1, 'b': 2, 'c': 3, 'd': 4, 'e': 5}
+    del d['e']
+    before = maxrss_kb()
+    t0 = time.time()
+    lst = [d.copy() for i in xrange(count)]
+    tk = time.time()
+    after = maxrss_kb()
+    print "%-40s %f" % ("%d small copies" % count, tk - t0)
+    print "%-40s %d kB" % ("max RSS growth", after - before)
+    return lst
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    for kind in ['bytes', 'unicode', 'int', 'object', 'kwargs']:
+        for size in [5, 1000]:
+            if kind == 'kwargs' and size > 16:
+                continue     # would switch to the bytes strategy
+            bench_kind(kind, size, repeat * 1000 // size)
+    bench_memory()
@@ -0,0 +1,39 @@
+
+""" list.sort(key=...) with int, float, str and unicode keys, on lists of
+10 million items by default.  Int keys on such lists are sorted with a
+radix sort, the other keys with a timsort on the unwrapped keys.  Run it
+with two pypy-c to compare them.
+"""
+
+import sys, time
+
+def make_items(size):
+    items = [None] * size
+    x = 12345
+    for i in xrange(size):
+        x = (x * 1103515245 + 12345) & 0x7fffffff
+        items[i] = x
+    return items
+
+KEYS = [
+    ('int', lambda x: x),
+    ('small int', lambda x: x & 0xff),
+    ('negative int', lambda x: -x),
+    ('float', lambda x: x * 0.5),
+    ('str', str),
+    ('unicode', unicode),
+    ('object', lambda x: (x,)),
+]
+
+def bench_key(name, key, items):
+    l = items[:]
+    t0 = time.time()
+    l.sort(key=key)
+    tk = time.time()
+    print "%-40s %f" % ("%s[%d]" % (name, len(items)), tk - t0)
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+    items = make_items(size)
+    for name, key in KEYS:
+        bench_key(name, key, items)
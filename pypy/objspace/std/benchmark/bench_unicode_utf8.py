@@ -0,0 +1,75 @@
+
+""" Indexing, slicing, find and concatenation of unicode strings decoded
+from UTF-8 (which keep the UTF-8 representation), compared with the same
+strings built directly as unicode.  Also prints the memory taken by many
+decoded strings.  Run it with two pypy-c to compare them.
+"""
+
+import sys, time
+
+SAMPLES = {
+    'ascii': u'The quick brown fox jumps over the lazy dog. ',
+    'accented': (u'Voix ambigu\xeb d\'un c\u0153ur qui au z\xe9phyr '
+                 u'pr\xe9f\xe8re '),
+    'cjk': (u'\u65e5\u672c\u8a9e\u306e\u30c6\u30ad\u30b9\u30c8'
+            u'\u3067\u3059\u3002 '),
+}
+
+def make_strings(kind, size):
+    text = SAMPLES[kind] * (size // len(SAMPLES[kind]) + 1)
+    text = text[:size]
+    decoded = text.encode('utf-8').decode('utf-8')
+    built = u''.join([c for c in text])
+    return decoded, built
+
+def count_operation(name, function, repeat):
+    t0 = time.time()
+    for i in xrange(repeat):
+        function()
+    tk = time.time()
+    print "%-40s %f" % (name, tk - t0)
+
+def bench_kind(kind, size, repeat):
+    for label, u in zip(['decoded', 'built'], make_strings(kind, size)):
+        step = len(u) // 97 + 1
+        positions = range(0, len(u), step)
+        needle = u[len(u) - 20:len(u) - 10]
+        def index():
+            for i in positions:
+                u[i]
+        def slice():
+            for i in positions:
+                u[i:i + 50]
+        def find():
+            u.find(needle)
+            needle in u
+        def concat():
+            u + u[:10]
+        name = "%s %s[%d]" % (label, kind, size)
+        count_operation(name + ": index", index, repeat)
+        count_operation(name + ": slice", slice, repeat)
+        count_operation(name + ": find", find, repeat)
+        count_operation(name + ": concat", concat, repeat)
+        count_operation(name + ": encode", lambda: u.encode('utf-8'), repeat)
+
+def maxrss_kb():
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def bench_memory(count=100000):
+    data = [('line %d: some log message\n' % i) for i in xrange(count)]
+    before = maxrss_kb()
+    t0 = time.time()
+    lst = [s.decode('utf-8') for s in data]
+    tk = time.time()
+    after = maxrss_kb()
+    print "%-40s %f" % ("decoding %d lines" % count, tk - t0)
+    print "%-40s %d kB" % ("max RSS growth", after - before)
+    return lst
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    for kind in ['ascii', 'accented', 'cjk']:
+        for size in [100, 100000]:
+            bench_kind(kind, size, repeat * 1000 // size + 1)
+    bench_memory()
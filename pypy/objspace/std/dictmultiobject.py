@@ -12,6 +12,7 @@ from pypy.interpreter.gateway import (
 from pypy.interpreter.mixedmodule import MixedModule
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
+from pypy.objspace.std.unicodeobject import W_UTF8UnicodeObject
 from pypy.objspace.std.util import negate
 
 
@@ -517,6 +518,9 @@ class DictStrategy(object):
     has_iterreversed = False
     # no 'getiterreversed': no default implementation available
 
+    has_storage_copy = False
+    # no 'get_storage_copy': no default implementation available
+
     def rev_update1_dict_dict(self, w_dict, w_updatedict):
         iteritems = self.iteritems(w_dict)
         while True:
@@ -976,6 +980,13 @@ class AbstractTypedStrategy(object):
     def setitem_untyped(self, dstorage, key, w_value):
         self.unerase(dstorage)[key] = w_value
 
+    has_storage_copy = True
+
+    def get_storage_copy(self, w_dict):
+        # the entries of the ordered dict are copied in a single pass,
+        # without any hashing, lookup or wrapping of the keys
+        return self.erase(self.unerase(w_dict.dstorage).copy())
+
 
 class ObjectDictStrategy(AbstractTypedStrategy, DictStrategy):
     erase, unerase = rerased.new_erasing_pair("object")
@@ -1087,14 +1098,28 @@ class UnicodeDictStrategy(AbstractTypedStrategy, DictStrategy):
         return self.space.unicode_w(wrapped)
 
     def is_correct_type(self, w_obj):
-        space = self.space
-        return space.is_w(space.type(w_obj), space.w_unicode)
+        # not the unicode objects that keep their UTF-8 representation:
+        # wrap() would return another object, with another identity
+        return type(w_obj) is self.space.UnicodeObjectCls
 
     def get_empty_storage(self):
         res = {}
         mark_dict_non_null(res)
         return self.erase(res)
 
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        if self.is_correct_type(w_key) or isinstance(w_key,
+                                                     W_UTF8UnicodeObject):
+            # a lookup doesn't store w_key, so it can use its value
+            key = space.unicode_w(w_key)
+            return self.unerase(w_dict.dstorage).get(key, None)
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
     def _never_equal_to(self, w_lookup_type):
         return _never_equal_to_string(self.space, w_lookup_type)
 
@@ -1195,7 +1220,15 @@ def update1(space, w_dict, w_data):
 
 
 def update1_dict_dict(space, w_dict, w_data):
-    w_data.strategy.rev_update1_dict_dict(w_data, w_dict)
+    strategy = w_data.strategy
+    if strategy.has_storage_copy and isinstance(w_dict.strategy,
+                                                EmptyDictStrategy):
+        # common case of copy() or dict(d): 'w_dict' is still empty,
+        # so it can simply take a copy of the whole storage of 'w_data'
+        w_dict.strategy = strategy
+        w_dict.dstorage = strategy.get_storage_copy(w_data)
+        return
+    strategy.rev_update1_dict_dict(w_data, w_dict)
 
 
 def update1_pairs(space, w_dict, data_w):
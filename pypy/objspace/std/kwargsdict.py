@@ -159,6 +159,12 @@ class KwargsDictStrategy(DictStrategy):
         keys, values_w = self.unerase(w_dict.dstorage)
         return keys[:], values_w[:] # copy to make non-resizable
 
+    has_storage_copy = True
+
+    def get_storage_copy(self, w_dict):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        return self.erase((keys[:], values_w[:]))
+
     def getiterkeys(self, w_dict):
         return iter(self.unerase(w_dict.dstorage)[0])
 
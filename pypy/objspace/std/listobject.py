@@ -14,6 +14,9 @@ from rpython.rlib import debug, jit, rerased
 from rpython.rlib.listsort import make_timsort_class
 from rpython.rlib.objectmodel import (
     import_from_mixin, instantiate, newlist_hint, resizelist_hint, specialize)
+from rpython.rlib.rarithmetic import LONG_BIT, intmask, r_uint, widen
+from rpython.rlib.unroll import unrolling_iterable
+from rpython.rtyper.lltypesystem import rffi
 from rpython.tool.sourcetools import func_with_new_name
 
 from pypy.interpreter.baseobjspace import W_Root
@@ -78,6 +81,13 @@ def get_strategy_from_list_objects(space, list_w, sizehint):
         if not type(w_obj) is W_IntObject:
             break
     else:
+        if space.config.objspace.std.withcompactintlist:
+            lo = hi = space.int_w(list_w[0])
+            for w_obj in list_w:
+                value = space.int_w(w_obj)
+                lo = min(lo, value)
+                hi = max(hi, value)
+            return get_int_list_strategy(space, lo, hi)
         return space.fromcache(IntegerListStrategy)
 
     # check for strings
@@ -198,6 +208,13 @@ class W_ListObject(W_Root):
         # XXX this is quite indirect
         self.init_from_list_w(list_w)
 
+    def switch_to_int_strategy(self, strategy):
+        """Switches from an int strategy to 'strategy', which must be able
+        to store all the current items."""
+        list_i = self.getitems_int()
+        self.strategy = strategy
+        self.lstorage = strategy.storage_from_ints(list_i)
+
     def _temporarily_as_objects(self):
         if self.strategy is self.space.fromcache(ObjectListStrategy):
             return self
@@ -677,24 +694,33 @@ class W_ListObject(W_Root):
             # core-dump factory, since the storage may change).
             self.__init__(space, [])
 
-            # wrap each item in a KeyContainer if needed
+            done = False
             if has_key:
+                keys_w = [None] * sorter.listlength
                 for i in range(sorter.listlength):
-                    w_item = sorter.list[i]
-                    w_keyitem = space.call_function(w_key, w_item)
-                    sorter.list[i] = KeyContainer(w_keyitem, w_item)
-
-            # Reverse sort stability achieved by initially reversing the list,
-            # applying a stable forward sort, then reversing the final result.
-            if reverse:
-                sorter.list.reverse()
-
-            # perform the sort
-            sorter.sort()
-
-            # reverse again
-            if reverse:
-                sorter.list.reverse()
+                    keys_w[i] = space.call_function(w_key, sorter.list[i])
+                if not has_cmp:
+                    done = sort_by_unboxed_keys(space, sorter.list, keys_w,
+                                                reverse)
+                if not done:
+                    # wrap each item in a KeyContainer
+                    for i in range(sorter.listlength):
+                        sorter.list[i] = KeyContainer(keys_w[i],
+                                                      sorter.list[i])
+
+            if not done:
+                # Reverse sort stability achieved by initially reversing the
+                # list, applying a stable forward sort, then reversing the
+                # final result.
+                if reverse:
+                    sorter.list.reverse()
+
+                # perform the sort
+                sorter.sort()
+
+                # reverse again
+                if reverse:
+                    sorter.list.reverse()
 
         finally:
             # unwrap each item if needed
@@ -775,6 +801,11 @@ class ListStrategy(object):
     def getitems_float(self, w_list):
         return None
 
+    def storage_from_ints(self, list_i):
+        """Only for the int strategies: returns a storage holding the given
+        list of ints.  It may reuse the list itself instead of a copy."""
+        raise NotImplementedError
+
     def getstorage_copy(self, w_list):
         raise NotImplementedError
 
@@ -903,7 +934,11 @@ class EmptyListStrategy(ListStrategy):
 
     def switch_to_correct_strategy(self, w_list, w_item):
         if type(w_item) is W_IntObject:
-            strategy = self.space.fromcache(IntegerListStrategy)
+            if self.space.config.objspace.std.withcompactintlist:
+                value = self.space.int_w(w_item)
+                strategy = get_int_list_strategy(self.space, value, value)
+            else:
+                strategy = self.space.fromcache(IntegerListStrategy)
         elif type(w_item) is W_BytesObject:
             strategy = self.space.fromcache(BytesListStrategy)
         elif type(w_item) is W_UnicodeObject:
@@ -960,8 +995,12 @@ class EmptyListStrategy(ListStrategy):
 
         intlist = space.unpackiterable_int(w_iterable)
         if intlist is not None:
-            w_list.strategy = strategy = space.fromcache(IntegerListStrategy)
-            w_list.lstorage = strategy.erase(intlist)
+            if space.config.objspace.std.withcompactintlist:
+                strategy = get_int_list_strategy_for_ints(space, intlist)
+            else:
+                strategy = space.fromcache(IntegerListStrategy)
+            w_list.strategy = strategy
+            w_list.lstorage = strategy.storage_from_ints(intlist)
             return
 
         floatlist = space.unpackiterable_float(w_iterable)
@@ -1381,12 +1420,16 @@ class AbstractUnwrappedStrategy(object):
             return W_ListObject.from_storage_and_strategy(
                     self.space, storage, self)
 
+    def switch_to_next_strategy(self, w_list, w_sample_item):
+        """Switch to a more generic strategy able to store w_sample_item"""
+        w_list.switch_to_object_strategy()
+
     def append(self, w_list, w_item):
         if self.is_correct_type(w_item):
             self.unerase(w_list.lstorage).append(self.unwrap(w_item))
             return
 
-        w_list.switch_to_object_strategy()
+        self.switch_to_next_strategy(w_list, w_item)
         w_list.append(w_item)
 
     def insert(self, w_list, index, w_item):
@@ -1396,7 +1439,7 @@ class AbstractUnwrappedStrategy(object):
             l.insert(index, self.unwrap(w_item))
             return
 
-        w_list.switch_to_object_strategy()
+        self.switch_to_next_strategy(w_list, w_item)
         w_list.insert(index, w_item)
 
     def _extend_from_list(self, w_list, w_other):
@@ -1420,7 +1463,7 @@ class AbstractUnwrappedStrategy(object):
             except IndexError:
                 raise
         else:
-            w_list.switch_to_object_strategy()
+            self.switch_to_next_strategy(w_list, w_item)
             w_list.setitem(index, w_item)
 
     def setslice(self, w_list, start, step, slicelength, w_other):
@@ -1617,11 +1660,15 @@ class IntegerListStrategy(ListStrategy):
     def getitems_int(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    def storage_from_ints(self, list_i):
+        return self.erase(list_i)
+
 
     _base_extend_from_list = _extend_from_list
 
     def _extend_from_list(self, w_list, w_other):
-        if isinstance(w_other.strategy, BaseRangeListStrategy):
+        if (isinstance(w_other.strategy, BaseRangeListStrategy) or
+                isinstance(w_other.strategy, AbstractCompactIntListStrategy)):
             l = self.unerase(w_list.lstorage)
             other = w_other.getitems_int()
             assert other is not None
@@ -1633,12 +1680,165 @@ class IntegerListStrategy(ListStrategy):
     _base_setslice = setslice
 
     def setslice(self, w_list, start, step, slicelength, w_other):
-        if w_other.strategy is self.space.fromcache(RangeListStrategy):
+        if (w_other.strategy is self.space.fromcache(RangeListStrategy) or
+                isinstance(w_other.strategy, AbstractCompactIntListStrategy)):
             storage = self.erase(w_other.getitems_int())
             w_other = W_ListObject.from_storage_and_strategy(
                     self.space, storage, self)
         return self._base_setslice(w_list, start, step, slicelength, w_other)
 
+
+class AbstractCompactIntListStrategy(ListStrategy):
+    """Base class of the strategies that store ints in an array of a
+    narrower integer type, when all of them fit.  Storing an int that
+    doesn't fit switches the list to the next wider strategy, up to
+    IntegerListStrategy."""
+
+
+def make_compact_int_list_strategy(TYPE):
+    bits = rffi.sizeof(TYPE) * 8
+    minval = -(1 << (bits - 1))
+    maxval = (1 << (bits - 1)) - 1
+
+    # arithmetic is not supported on TYPE, so the items are always widened
+    # before comparing them
+    class CompactIntSort(make_timsort_class()):
+        def lt(self, a, b):
+            return widen(a) < widen(b)
+
+    class CompactIntListStrategy(AbstractCompactIntListStrategy):
+        import_from_mixin(AbstractUnwrappedStrategy)
+
+        _none_value = rffi.cast(TYPE, 0)
+        MIN = minval
+        MAX = maxval
+
+        def wrap(self, intval):
+            return self.space.wrap(widen(intval))
+
+        def unwrap(self, w_int):
+            return rffi.cast(TYPE, self.space.int_w(w_int))
+
+        erase, unerase = rerased.new_erasing_pair("int%d" % bits)
+        erase = staticmethod(erase)
+        unerase = staticmethod(unerase)
+
+        def is_correct_type(self, w_obj):
+            if type(w_obj) is not W_IntObject:
+                return False
+            return minval <= self.space.int_w(w_obj) <= maxval
+
+        def list_is_correct_type(self, w_list):
+            return w_list.strategy is self
+
+        def switch_to_next_strategy(self, w_list, w_sample_item):
+            if type(w_sample_item) is W_IntObject:
+                value = self.space.int_w(w_sample_item)
+                strategy = get_int_list_strategy(self.space,
+                                                 min(value, minval),
+                                                 max(value, maxval))
+                w_list.switch_to_int_strategy(strategy)
+            else:
+                w_list.switch_to_object_strategy()
+
+        def sort(self, w_list, reverse):
+            l = self.unerase(w_list.lstorage)
+            sorter = CompactIntSort(l, len(l))
+            sorter.sort()
+            if reverse:
+                l.reverse()
+
+        def getitems_int(self, w_list):
+            return [widen(item) for item in self.unerase(w_list.lstorage)]
+
+        def storage_from_ints(self, list_i):
+            return self.erase([rffi.cast(TYPE, item) for item in list_i])
+
+        _base_find = find
+
+        def find(self, w_list, w_obj, start, stop):
+            if type(w_obj) is W_IntObject and not self.is_correct_type(w_obj):
+                raise ValueError     # too large to be in the list
+            return self._base_find(w_list, w_obj, start, stop)
+
+        def _safe_find(self, w_list, obj, start, stop):
+            l = self.unerase(w_list.lstorage)
+            intval = widen(obj)
+            for i in range(start, min(stop, len(l))):
+                if widen(l[i]) == intval:
+                    return i
+            raise ValueError
+
+        def _strategy_for_ints(self, list_i):
+            lo = minval
+            hi = maxval
+            for value in list_i:
+                lo = min(lo, value)
+                hi = max(hi, value)
+            return get_int_list_strategy(self.space, lo, hi)
+
+        _base_extend_from_list = _extend_from_list
+
+        def _extend_from_list(self, w_list, w_other):
+            if not self.list_is_correct_type(w_other):
+                other = w_other.getitems_int()
+                if other is not None:
+                    strategy = self._strategy_for_ints(other)
+                    if strategy is self:
+                        l = self.unerase(w_list.lstorage)
+                        l += [rffi.cast(TYPE, item) for item in other]
+                    else:
+                        w_list.switch_to_int_strategy(strategy)
+                        w_list.extend(w_other)
+                    return
+            self._base_extend_from_list(w_list, w_other)
+
+        _base_setslice = setslice
+
+        def setslice(self, w_list, start, step, slicelength, w_other):
+            if not self.list_is_correct_type(w_other):
+                other = w_other.getitems_int()
+                if other is not None:
+                    strategy = self._strategy_for_ints(other)
+                    if strategy is not self:
+                        w_list.switch_to_int_strategy(strategy)
+                    w_other = W_ListObject.from_storage_and_strategy(
+                            self.space, strategy.storage_from_ints(other),
+                            strategy)
+                    w_list.setslice(start, step, slicelength, w_other)
+                    return
+            self._base_setslice(w_list, start, step, slicelength, w_other)
+
+    CompactIntListStrategy.__name__ = 'Int%dListStrategy' % bits
+    return CompactIntListStrategy
+
+Int8ListStrategy = make_compact_int_list_strategy(rffi.SIGNEDCHAR)
+Int16ListStrategy = make_compact_int_list_strategy(rffi.SHORT)
+_compact_int_strategies = [Int8ListStrategy, Int16ListStrategy]
+if LONG_BIT > 32:
+    Int32ListStrategy = make_compact_int_list_strategy(rffi.INT)
+    _compact_int_strategies.append(Int32ListStrategy)
+_compact_int_strategies = unrolling_iterable(_compact_int_strategies)
+
+def get_int_list_strategy(space, lo, hi):
+    """Returns the narrowest strategy that can store ints from 'lo' to
+    'hi'."""
+    if space.config.objspace.std.withcompactintlist:
+        for strategy_cls in _compact_int_strategies:
+            if strategy_cls.MIN <= lo and hi <= strategy_cls.MAX:
+                return space.fromcache(strategy_cls)
+    return space.fromcache(IntegerListStrategy)
+
+def get_int_list_strategy_for_ints(space, list_i):
+    if not list_i:
+        return space.fromcache(IntegerListStrategy)
+    lo = hi = list_i[0]
+    for value in list_i:
+        lo = min(lo, value)
+        hi = max(hi, value)
+    return get_int_list_strategy(space, lo, hi)
+
+
 class FloatListStrategy(ListStrategy):
     import_from_mixin(AbstractUnwrappedStrategy)
 
@@ -1787,6 +1987,10 @@ IntBaseTimSort = make_timsort_class()
 FloatBaseTimSort = make_timsort_class()
 StringBaseTimSort = make_timsort_class()
 UnicodeBaseTimSort = make_timsort_class()
+IntKeyBaseTimSort = make_timsort_class()
+FloatKeyBaseTimSort = make_timsort_class()
+StringKeyBaseTimSort = make_timsort_class()
+UnicodeKeyBaseTimSort = make_timsort_class()
 
 
 class KeyContainer(W_Root):
@@ -1795,6 +1999,101 @@ class KeyContainer(W_Root):
         self.w_item = w_item
 
 
+# sort(key=...) where all the keys are ints, floats, strings or unicodes
+# sorts a list of indices into the list of unwrapped keys, and then
+# permutes the items.  Int keys of lists of at least RADIX_SORT_CUTOFF
+# items are sorted with a radix sort instead.
+
+RADIX_SORT_CUTOFF = 2048
+RADIX_BITS = 8
+RADIX_MASK = (1 << RADIX_BITS) - 1
+SIGN_BIT = r_uint(1) << (LONG_BIT - 1)
+
+def sort_by_unboxed_keys(space, items_w, keys_w, reverse):
+    """Sorts 'items_w' in place according to 'keys_w' if the keys can all
+    be unwrapped to the same type.  Returns False if they can't."""
+    w_keys = W_ListObject(space, keys_w)
+    keys = w_keys.getitems_int()
+    if keys is not None:
+        if len(keys) >= RADIX_SORT_CUTOFF:
+            _sort_by_keys(None, keys, items_w, reverse)
+        else:
+            _sort_by_keys(IntKeySort, keys, items_w, reverse)
+        return True
+    keys = w_keys.getitems_float()
+    if keys is not None:
+        _sort_by_keys(FloatKeySort, keys, items_w, reverse)
+        return True
+    keys = w_keys.getitems_bytes()
+    if keys is not None:
+        _sort_by_keys(StringKeySort, keys, items_w, reverse)
+        return True
+    keys = w_keys.getitems_unicode()
+    if keys is not None:
+        _sort_by_keys(UnicodeKeySort, keys, items_w, reverse)
+        return True
+    return False
+
+@specialize.arg(0)
+def _sort_by_keys(sorterclass, keys, items_w, reverse):
+    # same trick as in descr_sort() for the stability of reverse sorts
+    if reverse:
+        keys.reverse()
+        items_w.reverse()
+    if sorterclass is None:
+        _radix_sort_by_int_keys(keys, items_w)
+    else:
+        length = len(items_w)
+        sorter = sorterclass(range(length), length)
+        sorter.keys = keys
+        sorter.sort()
+        indices = sorter.list
+        unsorted_w = items_w[:]
+        for i in range(length):
+            items_w[i] = unsorted_w[indices[i]]
+    if reverse:
+        items_w.reverse()
+
+def _radix_sort_by_int_keys(keys, items_w):
+    """Stable LSD radix sort of 'items_w' according to 'keys', RADIX_BITS
+    at a time.  Passes where all the keys have the same digit are skipped,
+    so small keys only need a few passes."""
+    length = len(keys)
+    # flipping the sign bit gives unsigned numbers in the same order
+    src_keys = [r_uint(0)] * length
+    for i in range(length):
+        src_keys[i] = r_uint(keys[i]) ^ SIGN_BIT
+    src_w = items_w
+    dst_keys = [r_uint(0)] * length
+    dst_w = [None] * length
+    counts = [0] * (RADIX_MASK + 1)
+    shift = 0
+    while shift < LONG_BIT:
+        for d in range(RADIX_MASK + 1):
+            counts[d] = 0
+        for i in range(length):
+            counts[intmask((src_keys[i] >> shift) & RADIX_MASK)] += 1
+        if counts[intmask((src_keys[0] >> shift) & RADIX_MASK)] < length:
+            pos = 0
+            for d in range(RADIX_MASK + 1):
+                count = counts[d]
+                counts[d] = pos
+                pos += count
+            for i in range(length):
+                key = src_keys[i]
+                d = intmask((key >> shift) & RADIX_MASK)
+                j = counts[d]
+                counts[d] = j + 1
+                dst_keys[j] = key
+                dst_w[j] = src_w[i]
+            src_keys, dst_keys = dst_keys, src_keys
+            src_w, dst_w = dst_w, src_w
+        shift += RADIX_BITS
+    if src_w is not items_w:
+        for i in range(length):
+            items_w[i] = src_w[i]
+
+
 # NOTE: all the subclasses of TimSort should inherit from a common subclass,
 #       so make sure that only SimpleSort inherits directly from TimSort.
 #       This is necessary to hide the parent method TimSort.lt() from the
@@ -1825,6 +2124,28 @@ class UnicodeSort(UnicodeBaseTimSort):
         return a < b
 
 
+# these sort a list of indices into self.keys
+
+class IntKeySort(IntKeyBaseTimSort):
+    def lt(self, a, b):
+        return self.keys[a] < self.keys[b]
+
+
+class FloatKeySort(FloatKeyBaseTimSort):
+    def lt(self, a, b):
+        return self.keys[a] < self.keys[b]
+
+
+class StringKeySort(StringKeyBaseTimSort):
+    def lt(self, a, b):
+        return self.keys[a] < self.keys[b]
+
+
+class UnicodeKeySort(UnicodeKeyBaseTimSort):
+    def lt(self, a, b):
+        return self.keys[a] < self.keys[b]
+
+
 class CustomCompareSort(SimpleSort):
     def lt(self, a, b):
         space = self.space
@@ -473,6 +473,24 @@ class BaseMapdictObject:
         self._get_mapdict_map().write(self, ("weakref", SPECIAL), None)
     delweakref._cannot_really_call_random_things_ = True
 
+    # used by cpyext
+
+    def getcpyextlink(self):
+        from pypy.module.cpyext.pyobject import CpyextLink
+        link = self._get_mapdict_map().read(self, ("cpyext", SPECIAL))
+        if link is None:
+            return None
+        assert isinstance(link, CpyextLink)
+        return link
+    getcpyextlink._cannot_really_call_random_things_ = True
+
+    def setcpyextlink(self, link):
+        from pypy.module.cpyext.pyobject import CpyextLink
+        assert link is None or isinstance(link, CpyextLink)
+        self._get_mapdict_map().write(self, ("cpyext", SPECIAL), link)
+        return True
+    setcpyextlink._cannot_really_call_random_things_ = True
+
 class ObjectMixin(object):
     _mixin_ = True
     def _init_empty(self, map):
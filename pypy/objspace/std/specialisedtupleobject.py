@@ -1,6 +1,11 @@
+import operator
+
 from pypy.interpreter.error import OperationError
-from pypy.objspace.std.tupleobject import W_AbstractTupleObject
+from pypy.objspace.std.tupleobject import (W_AbstractTupleObject,
+    UNROLL_CUTOFF, _unroll_condition, _unroll_condition_cmp)
 from pypy.objspace.std.util import negate
+from rpython.rlib import jit
+from rpython.rlib.debug import make_sure_not_resized
 from rpython.rlib.objectmodel import compute_hash
 from rpython.rlib.rarithmetic import intmask
 from rpython.rlib.unroll import unrolling_iterable
@@ -125,12 +130,169 @@ def make_specialised_class(typetuple):
     _specialisations.append(cls)
     return cls
 
+
+def make_homogeneous_class(valtype):
+    """Tuples of any length whose items are all exactly ints, floats or
+    strings.  The items are stored unboxed in the list 'values'."""
+    default = {int: 0, float: 0.0, str: ''}[valtype]
+
+    def unwrap(space, w_obj):
+        if valtype == int:
+            return w_obj.int_w(space)
+        elif valtype == float:
+            return w_obj.float_w(space)
+        elif valtype == str:
+            return w_obj.str_w(space)
+        else:
+            raise AssertionError
+
+    def values_equal(myval, otherval):
+        if myval == otherval:
+            return True
+        if valtype == float:
+            # issue with NaNs, which should be equal here
+            return float2longlong(myval) == float2longlong(otherval)
+        return False
+
+    class cls(W_AbstractTupleObject):
+        _immutable_fields_ = ['values[*]']
+
+        def __init__(self, space, values):
+            make_sure_not_resized(values)
+            self.space = space
+            self.values = values
+
+        @staticmethod
+        @jit.look_inside_iff(lambda space, list_w, w_type:
+            jit.loop_unrolling_heuristic(list_w, len(list_w), UNROLL_CUTOFF))
+        def try_make(space, list_w, w_type):
+            """Returns a tuple with the items of 'list_w', or None if they
+            are not all of type 'w_type'."""
+            values = [default] * len(list_w)
+            for i in range(len(list_w)):
+                w_obj = list_w[i]
+                if type(w_obj) is not w_type:
+                    return None
+                values[i] = unwrap(space, w_obj)
+            return cls(space, values)
+
+        def length(self):
+            return len(self.values)
+
+        @jit.look_inside_iff(lambda self: _unroll_condition(self))
+        def tolist(self):
+            values = self.values
+            list_w = [None] * len(values)
+            for i in range(len(values)):
+                list_w[i] = self.space.wrap(values[i])
+            return list_w
+
+        # same source code, but builds and returns a resizable list
+        getitems_copy = func_with_new_name(tolist, 'getitems_copy')
+
+        @jit.look_inside_iff(lambda self, _1: _unroll_condition(self))
+        def descr_hash(self, space):
+            mult = 1000003
+            x = 0x345678
+            z = len(self.values)
+            for value in self.values:
+                if valtype == float:
+                    from pypy.objspace.std.floatobject import _hash_float
+                    y = _hash_float(space, value)
+                elif valtype == int:
+                    y = value     # see W_IntObject.descr_hash()
+                else:
+                    y = compute_hash(value)
+                x = (x ^ y) * mult
+                z -= 1
+                mult += 82520 + z + z
+            x += 97531
+            return space.wrap(intmask(x))
+
+        def descr_eq(self, space, w_other):
+            if not isinstance(w_other, W_AbstractTupleObject):
+                return space.w_NotImplemented
+            if not isinstance(w_other, cls):
+                return self._descr_eq_generic(space, w_other)
+            return space.newbool(self._eq_values(w_other))
+
+        @jit.look_inside_iff(_unroll_condition_cmp)
+        def _descr_eq_generic(self, space, w_other):
+            values = self.values
+            if len(values) != w_other.length():
+                return space.w_False
+            for i in range(len(values)):
+                if not space.eq_w(space.wrap(values[i]),
+                                  w_other.getitem(space, i)):
+                    return space.w_False
+            return space.w_True
+
+        @jit.look_inside_iff(lambda self, w_other:
+            _unroll_condition_cmp(self, None, w_other))
+        def _eq_values(self, w_other):
+            values1 = self.values
+            values2 = w_other.values
+            if len(values1) != len(values2):
+                return False
+            for i in range(len(values1)):
+                if not values_equal(values1[i], values2[i]):
+                    return False
+            return True
+
+        descr_ne = negate(descr_eq)
+
+        def _make_comparison(name):
+            op = getattr(operator, name)
+            descr_generic = getattr(W_AbstractTupleObject,
+                                    'descr_' + name).im_func
+
+            def compare_tuples(self, space, w_other):
+                if not isinstance(w_other, cls):
+                    return descr_generic(self, space, w_other)
+                return space.newbool(_compare_values(self, w_other))
+
+            @jit.look_inside_iff(lambda self, w_other:
+                _unroll_condition_cmp(self, None, w_other))
+            def _compare_values(self, w_other):
+                values1 = self.values
+                values2 = w_other.values
+                ncmp = min(len(values1), len(values2))
+                # Search for the first index where items are different
+                for p in range(ncmp):
+                    if not values_equal(values1[p], values2[p]):
+                        return op(values1[p], values2[p])
+                # No more items to compare -- compare sizes
+                return op(len(values1), len(values2))
+
+            compare_tuples.__name__ = 'descr_' + name
+            return compare_tuples
+
+        descr_lt = _make_comparison('lt')
+        descr_le = _make_comparison('le')
+        descr_gt = _make_comparison('gt')
+        descr_ge = _make_comparison('ge')
+        del _make_comparison
+
+        def getitem(self, space, index):
+            try:
+                return space.wrap(self.values[index])
+            except IndexError:
+                raise OperationError(space.w_IndexError,
+                                     space.wrap("tuple index out of range"))
+
+    cls.__name__ = 'W_SpecialisedTupleObject_' + valtype.__name__[0] + 'N'
+    _specialisations.append(cls)
+    return cls
+
 # ---------- current specialized versions ----------
 
 _specialisations = []
 Cls_ii = make_specialised_class((int, int))
 Cls_oo = make_specialised_class((object, object))
 Cls_ff = make_specialised_class((float, float))
+Cls_iN = make_homogeneous_class(int)
+Cls_fN = make_homogeneous_class(float)
+Cls_sN = make_homogeneous_class(str)
 
 def makespecialisedtuple(space, list_w):
     from pypy.objspace.std.intobject import W_IntObject
@@ -144,5 +306,17 @@ def makespecialisedtuple(space, list_w):
             if type(w_arg2) is W_FloatObject:
                 return Cls_ff(space, w_arg1, w_arg2)
         return Cls_oo(space, w_arg1, w_arg2)
-    else:
-        raise NotSpecialised
+    elif len(list_w) > 2 and space.config.objspace.std.withhomogeneoustuple:
+        from pypy.objspace.std.bytesobject import W_BytesObject
+        w_arg1 = list_w[0]
+        if type(w_arg1) is W_IntObject:
+            w_tuple = Cls_iN.try_make(space, list_w, W_IntObject)
+        elif type(w_arg1) is W_FloatObject:
+            w_tuple = Cls_fN.try_make(space, list_w, W_FloatObject)
+        elif type(w_arg1) is W_BytesObject:
+            w_tuple = Cls_sN.try_make(space, list_w, W_BytesObject)
+        else:
+            w_tuple = None
+        if w_tuple is not None:
+            return w_tuple
+    raise NotSpecialised
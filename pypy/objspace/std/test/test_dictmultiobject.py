@@ -986,6 +986,31 @@ class AppTestStrategies(object):
         assert "IntDictStrategy" in self.get_strategy(d)
         assert d[1L] == "hi"
 
+    def test_copy_keeps_strategy(self):
+        for key in ["a", u"a", 1, 1.5]:
+            d = {key: 1}
+            expected = self.get_strategy(d)
+            for d2 in [d.copy(), dict(d)]:
+                assert self.get_strategy(d2) == expected
+                assert d2 == d
+                d2[key] = 2
+                assert d[key] == 1
+        d = {}
+        d.update({1: 2, 3: 4})
+        assert "IntDictStrategy" in self.get_strategy(d)
+
+    def test_copy_after_deletions(self):
+        d = dict.fromkeys(range(100))
+        for i in range(0, 100, 3):
+            del d[i]
+        d2 = d.copy()
+        assert d2.keys() == d.keys()
+        assert d2 == d
+        d2[3] = 'x'
+        assert len(d2) == len(d) + 1
+        assert d2[3] == 'x'
+        assert 3 not in d
+
     def test_iter_dict_length_change(self):
         d = {1: 2, 3: 4, 5: 6}
         it = d.iteritems()
@@ -159,3 +159,12 @@ class AppTestKwargsDictStrategy(object):
         assert a == 3
         assert "KwargsDictStrategy" in self.get_strategy(d)
 
+    def test_copy(self):
+        def f(**args):
+            return args
+        d = f(a=1, b=2)
+        for d2 in [d.copy(), dict(d)]:
+            assert "KwargsDictStrategy" in self.get_strategy(d2)
+            assert d2 == {"a": 1, "b": 2}
+            d2["c"] = 3
+            assert "c" not in d
@@ -1,4 +1,5 @@
 # coding: iso-8859-15
+import sys
 import py
 import random
 from pypy.objspace.std.listobject import W_ListObject, SizeListStrategy,\
@@ -431,6 +432,40 @@ class TestW_ListObject(object):
             intlist.find(w(4), 0, 2)
 
 
+    def test_sort_by_unboxed_keys(self, monkeypatch):
+        from pypy.objspace.std import listobject
+        space = self.space
+        def check(keys, expect_unboxed=True):
+            for reverse in [False, True]:
+                items_w = [space.wrap(i) for i in range(len(keys))]
+                keys_w = [space.wrap(key) for key in keys]
+                res = listobject.sort_by_unboxed_keys(space, items_w, keys_w,
+                                                      reverse)
+                assert res == expect_unboxed
+                if not res:
+                    continue
+                expected = sorted(range(len(keys)), key=keys.__getitem__,
+                                  reverse=reverse)
+                assert [space.int_w(w_x) for w_x in items_w] == expected
+        seed = 12345
+        keys = []
+        for i in range(1000):
+            seed = (seed * 1103515245 + 12345) & 0x7fffffff
+            keys.append(seed)
+        for cutoff in [2048, 10]:
+            monkeypatch.setattr(listobject, 'RADIX_SORT_CUTOFF', cutoff)
+            check([k % 7 for k in keys])
+            check([k - (1 << 30) for k in keys])
+            check([k * (sys.maxint // (1 << 31)) for k in keys])
+            check([(k % 3 - 1) * sys.maxint - (k % 3 == 0) for k in keys])
+            check([k % 100 * 1.5 for k in keys])
+            check([str(k % 10) for k in keys])
+            check([unicode(k % 10) for k in keys])
+            check([k % 100 * 1.5 for k in keys] + [3], expect_unboxed=False)
+            check([u'a', 'b'], expect_unboxed=False)
+            check([], expect_unboxed=False)
+
+
 class AppTestListObject(object):
     def setup_class(cls):
         import platform
@@ -639,6 +674,34 @@ class AppTestListObject(object):
         r.sort(key=lambda x: -x)
         assert r == range(9, -1, -1)
 
+    def test_sort_unboxed_key(self):
+        def check(l, key):
+            for reverse in [False, True]:
+                expected = [(key(x), i, x) for i, x in enumerate(l)]
+                if reverse:
+                    expected.sort(key=None, cmp=lambda a, b:
+                                      cmp(b[0], a[0]) or cmp(a[1], b[1]))
+                else:
+                    expected.sort()
+                assert sorted(l, key=key, reverse=reverse) == [
+                    x for _, _, x in expected]
+        import sys
+        l = [(i * 7919) % 101 - 50 for i in range(30)]
+        check(l, lambda x: x // 3)
+        check(l, lambda x: -x * sys.maxint)
+        check(l, lambda x: x / 3.0)
+        check([str(x) for x in l], lambda s: s[-1:])
+        check([str(x) for x in l], lambda s: unicode(s[-1:]))
+        # not all of the same type
+        check(l, lambda x: [1, 2.5, 3L][x % 3])
+        check(l, lambda x: ['a', u'b'][x % 2])
+
+    def test_sort_unboxed_key_nan(self):
+        nan = float('nan')
+        l = [3.0, nan, 1.0, 2.0]
+        l.sort(key=lambda x: x)
+        assert str(l) == '[3.0, nan, 1.0, 2.0]'
+
     def test_sort_reversed(self):
         l = range(10)
         l.sort(reverse=True)
@@ -1585,6 +1648,12 @@ class AppTestListObjectWithRangeList(AppTestListObject):
     spaceconfig = {"objspace.std.withrangelist": True}
 
 
+class AppTestListObjectWithCompactIntList(AppTestListObject):
+    """Run the list object tests with compact int lists enabled.
+    """
+    spaceconfig = {"objspace.std.withcompactintlist": True}
+
+
 class AppTestRangeListForcing:
     """Tests for range lists that test forcing. Regular tests should go in
     AppTestListObject so they can be run -A against CPython as well. Separate
@@ -1,10 +1,16 @@
 import sys
+import py
 from pypy.objspace.std.listobject import (
     W_ListObject, EmptyListStrategy, ObjectListStrategy, IntegerListStrategy,
     FloatListStrategy, BytesListStrategy, RangeListStrategy,
-    SimpleRangeListStrategy, make_range_list, UnicodeListStrategy)
+    SimpleRangeListStrategy, make_range_list, UnicodeListStrategy,
+    Int8ListStrategy, Int16ListStrategy)
 from pypy.objspace.std import listobject
 from pypy.objspace.std.test.test_listobject import TestW_ListObject
+if sys.maxint > 2 ** 31:
+    from pypy.objspace.std.listobject import Int32ListStrategy
+else:
+    Int32ListStrategy = IntegerListStrategy
 
 
 class TestW_ListStrategies(TestW_ListObject):
@@ -734,6 +740,142 @@ class TestW_ListStrategies(TestW_ListObject):
         assert list_orig == [1, 2, 3]
 
 
+class TestW_CompactIntListStrategies:
+    spaceconfig = {"objspace.std.withcompactintlist": True}
+
+    def test_check_strategy(self):
+        space = self.space
+        w = space.wrap
+        def strategy(values):
+            return W_ListObject(space, [w(x) for x in values]).strategy
+        assert isinstance(strategy([1, -128, 127]), Int8ListStrategy)
+        assert isinstance(strategy([1, 128]), Int16ListStrategy)
+        assert isinstance(strategy([-32768, 32767]), Int16ListStrategy)
+        assert isinstance(strategy([1, -32769]), Int32ListStrategy)
+        assert isinstance(strategy([2 ** 31 - 1, -2 ** 31]), Int32ListStrategy)
+        assert isinstance(strategy([1, 2 ** 31]), IntegerListStrategy)
+        assert isinstance(strategy([1, 2.5]), ObjectListStrategy)
+        assert isinstance(strategy([1.5, 2.5]), FloatListStrategy)
+
+    def test_empty_to_int(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [])
+        l.append(w(5))
+        assert isinstance(l.strategy, Int8ListStrategy)
+        l = W_ListObject(space, [])
+        l.append(w(sys.maxint))
+        assert isinstance(l.strategy, IntegerListStrategy)
+        l = W_ListObject(space, [])
+        l.extend(space.newtuple([w(1), w(1000)]))
+        assert isinstance(l.strategy, Int16ListStrategy)
+        assert space.unwrap(l) == [1, 1000]
+
+    def test_widen(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [w(1), w(2)])
+        assert isinstance(l.strategy, Int8ListStrategy)
+        l.append(w(-100))
+        assert isinstance(l.strategy, Int8ListStrategy)
+        l.append(w(200))
+        assert isinstance(l.strategy, Int16ListStrategy)
+        l.insert(0, w(-100000))
+        assert isinstance(l.strategy, Int32ListStrategy)
+        l.setitem(1, w(sys.maxint))
+        assert isinstance(l.strategy, IntegerListStrategy)
+        assert space.unwrap(l) == [-100000, sys.maxint, 2, -100, 200]
+        l.append(w(3))
+        assert isinstance(l.strategy, IntegerListStrategy)
+        l.append(w('a'))
+        assert isinstance(l.strategy, ObjectListStrategy)
+        assert space.unwrap(l) == [-100000, sys.maxint, 2, -100, 200, 3, 'a']
+
+        l = W_ListObject(space, [w(1), w(2)])
+        l.setitem(0, w(None))
+        assert isinstance(l.strategy, ObjectListStrategy)
+        assert space.unwrap(l) == [None, 2]
+
+    def test_extend(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [w(1), w(2)])
+        l.extend(W_ListObject(space, [w(3), w(4)]))
+        assert isinstance(l.strategy, Int8ListStrategy)
+        l.extend(W_ListObject(space, [w(300)]))
+        assert isinstance(l.strategy, Int16ListStrategy)
+        l.extend(W_ListObject(space, [w(5)]))
+        assert isinstance(l.strategy, Int16ListStrategy)
+        l.extend(make_range_list(space, 0, 100000, 3))
+        assert isinstance(l.strategy, Int32ListStrategy)
+        l.extend(l)
+        assert space.unwrap(l) == [1, 2, 3, 4, 300, 5, 0, 100000, 200000] * 2
+
+        l = W_ListObject(space, [w(sys.maxint)])
+        l.extend(W_ListObject(space, [w(3), w(4)]))
+        assert isinstance(l.strategy, IntegerListStrategy)
+        assert space.unwrap(l) == [sys.maxint, 3, 4]
+
+        l = W_ListObject(space, [w(1)])
+        l.extend(W_ListObject(space, [w(3), w('a')]))
+        assert isinstance(l.strategy, ObjectListStrategy)
+        assert space.unwrap(l) == [1, 3, 'a']
+
+    def test_setslice(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [w(1), w(2), w(3)])
+        l.setslice(0, 1, 2, W_ListObject(space, [w(4), w(5), w(6)]))
+        assert isinstance(l.strategy, Int8ListStrategy)
+        assert space.unwrap(l) == [4, 5, 6, 3]
+        l.setslice(1, 1, 1, W_ListObject(space, [w(1000)]))
+        assert isinstance(l.strategy, Int16ListStrategy)
+        assert space.unwrap(l) == [4, 1000, 6, 3]
+        l.setslice(0, 2, 2, W_ListObject(space, [w(7), w(8)]))
+        assert isinstance(l.strategy, Int16ListStrategy)
+        assert space.unwrap(l) == [7, 1000, 8, 3]
+        l.setslice(0, 1, 4, W_ListObject(space, [w(sys.maxint)]))
+        assert isinstance(l.strategy, IntegerListStrategy)
+        assert space.unwrap(l) == [sys.maxint]
+        l.setslice(1, 1, 0, W_ListObject(space, [w(1), w(2)]))
+        assert isinstance(l.strategy, IntegerListStrategy)
+        assert space.unwrap(l) == [sys.maxint, 1, 2]
+        l.setslice(0, 1, 1, W_ListObject(space, [w('a')]))
+        assert isinstance(l.strategy, ObjectListStrategy)
+        assert space.unwrap(l) == ['a', 1, 2]
+
+    def test_find_sort(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [w(5), w(-3), w(100), w(-3)])
+        assert l.find(w(-3)) == 1
+        assert l.find(w(-3), 2) == 3
+        py.test.raises(ValueError, l.find, w(1000))
+        py.test.raises(ValueError, l.find, w(sys.maxint))
+        assert l.find(w(100.0)) == 2
+        l.sort(False)
+        assert space.unwrap(l) == [-3, -3, 5, 100]
+        l.sort(True)
+        assert space.unwrap(l) == [100, 5, -3, -3]
+        assert isinstance(l.strategy, Int8ListStrategy)
+
+    def test_getitems_int(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [w(1), w(-1000), w(100000)])
+        assert isinstance(l.strategy, Int32ListStrategy)
+        assert l.getitems_int() == [1, -1000, 100000]
+        assert space.listview_int(l) == [1, -1000, 100000]
+        assert space.unpackiterable_int(l) == [1, -1000, 100000]
+        l2 = W_ListObject(space, [w(sys.maxint)])
+        l2.extend(l)
+        assert isinstance(l2.strategy, IntegerListStrategy)
+        assert space.unwrap(l2) == [sys.maxint, 1, -1000, 100000]
+        l2.setslice(0, 1, 1, l)
+        assert isinstance(l2.strategy, IntegerListStrategy)
+        assert space.unwrap(l2) == [1, -1000, 100000, 1, -1000, 100000]
+
+
 class TestW_ListStrategiesDisabled:
     spaceconfig = {"objspace.std.withliststrategies": False}
 
@@ -1,5 +1,8 @@
 from pypy.objspace.std.test.test_dictmultiobject import FakeSpace, W_DictMultiObject
 from pypy.objspace.std.mapdict import *
+from pypy.module.cpyext.pyobject import CpyextLink
+from pypy.module.cpyext.api import PyObject
+from rpython.rtyper.lltypesystem import lltype
 
 class Config:
     class objspace:
@@ -229,6 +232,36 @@ def test_special():
     obj.setweakref(space, lifeline1)
     obj.delweakref()
 
+def test_cpyext_link():
+    # cpyext is imported at module level, because importing it allocates
+    # raw memory, which the leak checker of the tests would report
+    link1 = CpyextLink(lltype.nullptr(PyObject.TO))
+    link2 = CpyextLink(lltype.nullptr(PyObject.TO))
+    c = Class()
+    obj = c.instantiate()
+    assert obj.getcpyextlink() is None
+    obj.setdictvalue(space, "a", 50)
+    assert obj.setcpyextlink(link1)
+    obj.setdictvalue(space, "b", 60)
+    assert obj.storage == [50, link1, 60]
+    assert obj.getcpyextlink() is link1
+    assert obj.getdictvalue(space, "cpyext") is None
+    obj.setdictvalue(space, "cpyext", 41)
+    assert obj.getcpyextlink() is link1
+    assert obj.getdictvalue(space, "cpyext") == 41
+    # the weakref lifeline and the link are independent
+    assert obj.getweakref() is None
+
+    obj2 = c.instantiate()
+    obj2.setdictvalue(space, "a", 150)
+    assert obj2.getcpyextlink() is None
+    assert obj2.setcpyextlink(link2)
+    assert obj2.getcpyextlink() is link2
+    assert obj.getcpyextlink() is link1
+    assert obj2.setcpyextlink(None)
+    assert obj2.getcpyextlink() is None
+    assert obj2.getdictvalue(space, "a") == 150
+
 
 
 def test_slots():
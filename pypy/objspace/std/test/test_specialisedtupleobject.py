@@ -1,3 +1,6 @@
+import operator
+import sys
+
 from pypy.objspace.std.specialisedtupleobject import _specialisations
 from pypy.objspace.std.test import test_tupleobject
 from pypy.objspace.std.tupleobject import W_TupleObject
@@ -232,3 +235,129 @@ class AppTestW_SpecialisedTupleObject:
 
 class AppTestAll(test_tupleobject.AppTestW_TupleObject):
     spaceconfig = {"objspace.std.withspecialisedtuple": True}
+
+
+class TestW_HomogeneousTupleObject():
+    spaceconfig = {"objspace.std.withspecialisedtuple": True,
+                   "objspace.std.withhomogeneoustuple": True}
+
+    def test_ishomogeneous(self):
+        space = self.space
+        w_tuple = space.newtuple([space.wrap(1), space.wrap(2), space.wrap(3)])
+        assert isinstance(w_tuple, W_SpecialisedTupleObject_iN)
+        assert w_tuple.values == [1, 2, 3]
+        w_tuple = space.newtuple([space.wrap(1.5)] * 5)
+        assert isinstance(w_tuple, W_SpecialisedTupleObject_fN)
+        w_tuple = space.newtuple([space.wrap('a'), space.wrap('b'),
+                                  space.wrap('')])
+        assert isinstance(w_tuple, W_SpecialisedTupleObject_sN)
+
+    def test_isnothomogeneous(self):
+        space = self.space
+        for values in [[1, 2, 3.0], [1.0, 2.0, 3], ['a', 'b', u'c'],
+                       [1, 2, sys.maxint + 1], [1, 2, None], [1], []]:
+            w_tuple = space.newtuple([space.wrap(x) for x in values])
+            assert not type(w_tuple).__name__.endswith('N')
+
+    def test_hash_eq_against_normal_tuple(self):
+        space = self.space
+        for values in [[1, 2, 3], [-1, -2, 0, sys.maxint, -sys.maxint - 1],
+                       [1.5, 2.8, -0.0], [1.0, 2.0, 3.0, 1e300],
+                       ['arbitrary', 'strings', '']]:
+            N_w_tuple = W_TupleObject([space.wrap(x) for x in values])
+            S_w_tuple = space.newtuple([space.wrap(x) for x in values])
+            assert type(S_w_tuple).__name__.endswith('N')
+            assert space.eq_w(N_w_tuple, S_w_tuple)
+            assert space.eq_w(S_w_tuple, N_w_tuple)
+            assert space.eq_w(space.hash(N_w_tuple), space.hash(S_w_tuple))
+
+    def test_compare_against_normal_tuple(self):
+        space = self.space
+        all_values = [[1, 2, 3], [1, 2, 4], [1, 2, 3, 0], [0, 5, 5],
+                      [1.0, 2.0, 3.0], [1.0, 2.5, 3.0], [1.0, 2.0],
+                      ['a', 'b', 'c'], ['a', 'b', 'cd'], ['a', 'b']]
+        for values1 in all_values:
+            for values2 in all_values:
+                w_s1 = space.newtuple([space.wrap(x) for x in values1])
+                w_s2 = space.newtuple([space.wrap(x) for x in values2])
+                w_n2 = W_TupleObject([space.wrap(x) for x in values2])
+                for op in ['eq', 'ne', 'lt', 'le', 'gt', 'ge']:
+                    expected = getattr(operator, op)(tuple(values1),
+                                                     tuple(values2))
+                    w_res = getattr(space, op)(w_s1, w_s2)
+                    assert space.is_true(w_res) == expected
+                    w_res = getattr(space, op)(w_s1, w_n2)
+                    assert space.is_true(w_res) == expected
+
+
+class AppTestW_HomogeneousTupleObject:
+    spaceconfig = {"objspace.std.withspecialisedtuple": True,
+                   "objspace.std.withhomogeneoustuple": True}
+
+    def w_isspecialised(self, obj, expected=''):
+        import __pypy__
+        r = __pypy__.internal_repr(obj)
+        print obj, '==>', r, '   (expected: %r)' % expected
+        return ("SpecialisedTupleObject" + expected) in r
+
+    def test_createhomogeneoustuple(self):
+        assert self.isspecialised((1, 2, 3), '_iN')
+        assert self.isspecialised((1.5, 2.5, 3.5, 4.5), '_fN')
+        assert self.isspecialised(('a', 'b', 'c'), '_sN')
+        assert self.isspecialised(tuple(range(100)), '_iN')
+        assert not self.isspecialised((1, 2, 3.5), '_iN')
+        assert not self.isspecialised((1, 2, 3.5), '_fN')
+
+        class I(int): pass
+        assert not self.isspecialised((1, 2, I(3)), '_iN')
+
+    def test_getitem_slice(self):
+        t = tuple(range(10))
+        assert t[3] == 3
+        assert t[-1] == 9
+        raises(IndexError, "t[10]")
+        raises(IndexError, "t[-11]")
+        assert t[2:5] == (2, 3, 4)
+        assert t[::3] == (0, 3, 6, 9)
+        assert list(t) == range(10)
+        assert 7 in t
+        assert 7.0 in t
+        assert 10 not in t
+        a, b, c = t[:3]
+        assert (a, b, c) == (0, 1, 2)
+
+    def test_hash(self):
+        a = (1, 2, 3)
+        b = (1,)
+        b += (2, 3)
+        assert hash(a) == hash(b)
+        assert hash(a) == hash((1L, 2L, 3L)) == hash((1.0, 2.0, 3.0))
+        assert hash(a) == hash((1, 2L, 3.0))
+        assert hash(('a', 'b', 'c')) == hash(('a', u'b', 'c'))
+        d = {(1, 2, 3): 'x'}
+        assert d[(1.0, 2, 3)] == 'x'
+
+    def test_eq_ordering(self):
+        assert (1, 2, 3) == (1.0, 2.0, 3.0)
+        assert (1, 2, 3) != (1, 2, 4)
+        assert (1, 2, 3) < (1, 2, 4)
+        assert (1, 2, 3) < (1, 2, 3, 0)
+        assert (1, 2, 3) <= (1, 2, 3)
+        assert not (1, 2, 3) > (1, 2, 3)
+        assert (1.5, 2.5, 3.5) > (1.5, 2.5, 3.0)
+        assert (1, 2, 3) < (1.0, 2.0, 3.5)
+        assert ('a', 'b', 'c') < ('a', 'b', 'd')
+        assert ('a', 'b', 'c') == ('a', 'b', u'c')
+
+    def test_bug_tuples_of_nans(self):
+        N = float('nan')
+        T = (N, N, N)
+        assert N in T
+        assert T == (N, N, N)
+        assert not T < (N, N, N)
+        assert (0.0, 0.0, 0.0) == (-0.0, -0.0, -0.0)
+
+
+class AppTestAllHomogeneous(test_tupleobject.AppTestW_TupleObject):
+    spaceconfig = {"objspace.std.withspecialisedtuple": True,
+                   "objspace.std.withhomogeneoustuple": True}
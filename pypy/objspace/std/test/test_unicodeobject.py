@@ -32,6 +32,67 @@ class TestUnicodeObject:
                 space.w_unicode, "__new__", space.w_unicode, w_uni)
         assert w_new is w_uni
 
+    def test_utf8_representation(self):
+        from pypy.objspace.std.unicodeobject import W_UTF8UnicodeObject
+        space = self.space
+        utf8 = (u'h\xe9llo \u20ac' * 20).encode('utf-8')
+        w_str = space.wrap(utf8)
+        w_uni = space.call_method(w_str, 'decode', space.wrap('utf-8'))
+        assert type(w_uni) is W_UTF8UnicodeObject
+        assert w_uni._utf8 is utf8
+        assert space.int_w(space.len(w_uni)) == 140
+        w_res = space.getitem(w_uni, space.wrap(-1))
+        assert space.unicode_w(w_res) == u'\u20ac'
+        w_res = space.getslice(w_uni, space.wrap(66), space.wrap(75))
+        assert space.unicode_w(w_res) == utf8.decode('utf-8')[66:75]
+        w_res = space.add(w_uni, w_res)
+        assert space.int_w(space.len(w_res)) == 149
+        w_res = space.call_method(w_uni, 'find', space.wrap(u'\u20ac'),
+                                  space.wrap(10))
+        assert space.int_w(w_res) == 13
+        w_res = space.call_method(w_uni, 'encode', space.wrap('utf-8'))
+        assert space.str_w(w_res) is utf8
+        # none of the operations above needed the unicode value, and
+        # neither does the identity
+        w_uni2 = space.call_method(w_str, 'decode', space.wrap('utf-8'))
+        assert space.is_w(w_uni, w_uni2)
+        assert space.is_true(space.eq(space.id(w_uni), space.id(w_uni2)))
+        assert not space.is_true(space.eq(space.id(w_uni), space.id(w_str)))
+        assert w_uni._decoded is None
+        # the unicode value is computed once, and the UTF-8 string kept
+        w_id = space.id(w_uni)
+        w_res = space.call_method(w_uni, 'lower')
+        assert space.unicode_w(w_res) == utf8.decode('utf-8').lower()
+        assert w_uni._utf8 is utf8
+        assert w_uni._decoded == utf8.decode('utf-8')
+        assert space.int_w(space.len(w_uni)) == 140
+        w_res = space.call_method(w_uni, 'encode', space.wrap('utf-8'))
+        assert space.str_w(w_res) is utf8
+        assert space.is_true(space.eq(space.id(w_uni), w_id))
+        assert space.is_w(w_uni, w_uni2)
+        assert not space.is_w(w_uni, space.wrap(w_uni._decoded))
+        assert not space.is_w(space.wrap(w_uni._decoded), w_uni)
+
+    def test_utf8_representation_not_used(self):
+        from pypy.objspace.std.unicodeobject import W_UnicodeObject
+        space = self.space
+        # encoded surrogates are accepted, but not stored as UTF-8
+        w_str = space.wrap('\xed\xa0\x80')
+        w_uni = space.call_method(w_str, 'decode', space.wrap('utf-8'))
+        assert type(w_uni) is W_UnicodeObject
+        assert space.unicode_w(w_uni) == u'\ud800'
+        # subclasses of unicode keep the plain representation
+        w_str = space.wrap('\xc3\xa9')
+        w_uni = space.call_method(w_str, 'decode', space.wrap('utf-8'))
+        w_sub = space.appexec([w_uni], """(u):
+            class U(unicode):
+                pass
+            return U(u)
+        """)
+        assert isinstance(w_sub, W_UnicodeObject)
+        assert not hasattr(w_sub, '_utf8')
+        assert space.unicode_w(w_sub) == u'\xe9'
+
 
 class AppTestUnicodeStringStdOnly:
     def test_compares(self):
@@ -56,6 +117,66 @@ class AppTestUnicodeStringStdOnly:
 class AppTestUnicodeString:
     spaceconfig = dict(usemodules=('unicodedata',))
 
+    def test_decoded_utf8_identity(self):
+        s = u'x\xe9\u20ac'.encode('utf-8')
+        u = s.decode('utf-8')
+        assert u is u
+        assert id(u) == id(u)
+        assert id(u) != id(s)
+        assert u.upper() == u'X\xc9\u20ac'
+        assert id(u) == id(u)
+        # the keys of a dict, or the items of a list, keep their identity
+        d = {u'abc': 1}
+        d[u] = 2
+        assert d[s.decode('utf-8')] == 2
+        assert [k for k in d if k is u] == [u]
+        assert [k for k in [u'abc', u] if k is u] == [u]
+
+    def test_decoded_utf8(self):
+        expected = u'x\xe9\u20ac\uffffa' * 30 + u'abc'
+        u = expected.encode('utf-8').decode('utf-8')
+        assert u == expected
+        assert hash(u) == hash(expected)
+        assert len(u) == len(expected)
+        for i in range(-len(u), len(u)):
+            assert u[i] == expected[i]
+        for start, stop in [(0, 1), (63, 65), (64, 128), (100, 150),
+                            (-5, -1), (3, 2), (-200, 200)]:
+            assert u[start:stop] == expected[start:stop]
+        assert u[1:50:7] == expected[1:50:7]
+        assert u + u == expected + expected
+        assert u.find(u'\u20ac\uffffa') == 2
+        assert u.find(u'\u20ac\uffffa', 3) == 7
+        assert u.find(u'\u20ac\uffffa', 3, 9) == -1
+        assert u.find(u'', 200) == -1
+        assert u.find(u'', 153) == 153
+        assert u.rfind(u'\xe9') == expected.rfind(u'\xe9')
+        assert u.rfind(u'x', 0, -10) == expected.rfind(u'x', 0, -10)
+        assert u.index(u'abc') == 150
+        assert u.rindex(u'a', 0, 10) == 9
+        raises(ValueError, u.index, u'b', 0, 150)
+        assert u.count(u'\uffff') == 30
+        assert u.count(u'\uffff', 10, 20) == 2
+        assert u.count(u'', 10, 20) == 11
+        assert u'\uffffax' in u
+        assert u'\u20acx' not in u
+        assert u.encode('utf-8') == expected.encode('utf-8')
+        assert ord(u[2]) == 0x20ac
+        v = 'abc'.decode('ascii')
+        assert v.encode('ascii') == 'abc'
+        assert v < u'abd' < u
+        assert sorted([u'\xff', u, v, u'\u0100']) == [v, u, u'\xff', u'\u0100']
+        lst = [u'\u0100', u'\xff', expected, u'abc', u'\uffff', u'x\xe9']
+        decoded = [x.encode('utf-8').decode('utf-8') for x in lst]
+        assert sorted(decoded) == sorted(lst)
+        assert [x == u for x in decoded] == [x == u for x in lst]
+        class U(unicode):
+            pass
+        assert U(u) == expected
+        assert type(U(u)) is U
+        assert type(U(u)[0]) is unicode
+        assert unicode(u) is u
+
     def test_addition(self):
         def check(a, b):
             assert a == b
@@ -580,6 +580,16 @@ class W_TypeObject(W_Root):
     def delweakref(self):
         self._lifeline_ = None
 
+    # the cpyext link, see pypy.module.cpyext.pyobject.CpyextLink
+    _cpyextlink_ = None
+
+    def getcpyextlink(self):
+        return self._cpyextlink_
+
+    def setcpyextlink(self, link):
+        self._cpyextlink_ = link
+        return True
+
     def descr_call(self, space, __args__):
         promote(self)
         # invoke the __new__ of the type
@@ -1,7 +1,9 @@
 """The builtin unicode implementation"""
 
+from rpython.rlib import rutf8
 from rpython.rlib.objectmodel import (
     compute_hash, compute_unique_id, import_from_mixin)
+from rpython.rlib.rbigint import rbigint
 from rpython.rlib.buffer import StringBuffer
 from rpython.rlib.rstring import StringBuilder, UnicodeBuilder
 from rpython.rlib.runicode import (
@@ -11,15 +13,19 @@ from rpython.rlib.runicode import (
 from pypy.interpreter import unicodehelper
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
-from pypy.interpreter.gateway import WrappedDefault, interp2app, unwrap_spec
+from pypy.interpreter.gateway import (
+    WrappedDefault, interp2app, interpindirect2app, unwrap_spec)
 from pypy.interpreter.typedef import TypeDef
 from pypy.module.unicodedata import unicodedb
 from pypy.objspace.std import newformat
 from pypy.objspace.std.basestringtype import basestring_typedef
 from pypy.objspace.std.formatting import mod_format
+from pypy.objspace.std.sliceobject import (W_SliceObject,
+    normalize_simple_slice, unwrap_start_stop)
 from pypy.objspace.std.stringmethods import StringMethods
+from pypy.objspace.std.util import IDTAG_UTF8
 
-__all__ = ['W_UnicodeObject', 'wrapunicode', 'plain_str2unicode',
+__all__ = ['W_UnicodeObject', 'wrapunicode', 'newutf8', 'plain_str2unicode',
            'encode_object', 'decode_object', 'unicode_from_object',
            'unicode_from_string', 'unicode_to_decimal_w']
 
@@ -38,13 +44,18 @@ class W_UnicodeObject(W_Root):
 
     def unwrap(w_self, space):
         # for testing
-        return w_self._value
+        return w_self._get_value()
 
     def create_if_subclassed(w_self):
         if type(w_self) is W_UnicodeObject:
             return w_self
         return W_UnicodeObject(w_self._value)
 
+    def _get_value(w_self):
+        # overridden by W_UTF8UnicodeObject: use this instead of '_value'
+        # in the methods that it inherits
+        return w_self._value
+
     def is_w(self, space, w_other):
         if not isinstance(w_other, W_UnicodeObject):
             return False
@@ -52,6 +63,8 @@ class W_UnicodeObject(W_Root):
             return True
         if self.user_overridden_class or w_other.user_overridden_class:
             return False
+        if isinstance(w_other, W_UTF8UnicodeObject):
+            return False     # see W_UTF8UnicodeObject.is_w()
         return space.unicode_w(self) is space.unicode_w(w_other)
 
     def immutable_unique_id(self, space):
@@ -63,12 +76,12 @@ class W_UnicodeObject(W_Root):
         return space.str_w(space.str(self))
 
     def unicode_w(self, space):
-        return self._value
+        return self._get_value()
 
     def readbuf_w(self, space):
         from rpython.rlib.rstruct.unichar import pack_unichar, UNICODE_SIZE
-        builder = StringBuilder(len(self._value) * UNICODE_SIZE)
-        for unich in self._value:
+        builder = StringBuilder(self._len() * UNICODE_SIZE)
+        for unich in self._get_value():
             pack_unichar(unich, builder)
         return StringBuffer(builder.build())
 
@@ -79,14 +92,14 @@ class W_UnicodeObject(W_Root):
     charbuf_w = str_w
 
     def listview_unicode(w_self):
-        return _create_list_from_unicode(w_self._value)
+        return _create_list_from_unicode(w_self._get_value())
 
     def ord(self, space):
-        if len(self._value) != 1:
+        if self._len() != 1:
             raise oefmt(space.w_TypeError,
                          "ord() expected a character, but string of length %d "
-                         "found", len(self._value))
-        return space.wrap(ord(self._value[0]))
+                         "found", self._len())
+        return space.wrap(ord(self._get_value()[0]))
 
     def _new(self, value):
         return W_UnicodeObject(value)
@@ -111,11 +124,11 @@ class W_UnicodeObject(W_Root):
     @staticmethod
     def _op_val(space, w_other):
         if isinstance(w_other, W_UnicodeObject):
-            return w_other._value
+            return w_other._get_value()
         if space.isinstance_w(w_other, space.w_str):
-            return unicode_from_string(space, w_other)._value
+            return unicode_from_string(space, w_other)._get_value()
         return unicode_from_encoded_object(
-            space, w_other, None, "strict")._value
+            space, w_other, None, "strict")._get_value()
 
     def _chr(self, char):
         assert len(char) == 1
@@ -202,11 +215,11 @@ class W_UnicodeObject(W_Root):
 
         assert isinstance(w_value, W_UnicodeObject)
         w_newobj = space.allocate_instance(W_UnicodeObject, w_unicodetype)
-        W_UnicodeObject.__init__(w_newobj, w_value._value)
+        W_UnicodeObject.__init__(w_newobj, w_value._get_value())
         return w_newobj
 
     def descr_repr(self, space):
-        chars = self._value
+        chars = self._get_value()
         size = len(chars)
         s = _repr_function(chars, size, "strict")
         return space.wrap(s)
@@ -215,7 +228,7 @@ class W_UnicodeObject(W_Root):
         return encode_object(space, self, None, None)
 
     def descr_hash(self, space):
-        x = compute_hash(self._value)
+        x = compute_hash(self._get_value())
         return space.wrap(x)
 
     def descr_eq(self, space, w_other):
@@ -296,13 +309,13 @@ class W_UnicodeObject(W_Root):
         formatter = newformat.unicode_formatter(space, spec)
         self2 = unicode_from_object(space, self)
         assert isinstance(self2, W_UnicodeObject)
-        return formatter.format_string(self2._value)
+        return formatter.format_string(self2._get_value())
 
     def descr_mod(self, space, w_values):
         return mod_format(space, self, w_values, do_unicode=True)
 
     def descr_translate(self, space, w_table):
-        selfvalue = self._value
+        selfvalue = self._get_value()
         w_sys = space.getbuiltinmodule('sys')
         maxunicode = space.int_w(space.getattr(w_sys,
                                                space.wrap("maxunicode")))
@@ -374,7 +387,7 @@ class W_UnicodeObject(W_Root):
 
     def descr_islower(self, space):
         cased = False
-        for uchar in self._value:
+        for uchar in self._get_value():
             if (unicodedb.isupper(ord(uchar)) or
                 unicodedb.istitle(ord(uchar))):
                 return space.w_False
@@ -384,7 +397,7 @@ class W_UnicodeObject(W_Root):
 
     def descr_isupper(self, space):
         cased = False
-        for uchar in self._value:
+        for uchar in self._get_value():
             if (unicodedb.islower(ord(uchar)) or
                 unicodedb.istitle(ord(uchar))):
                 return space.w_False
@@ -393,10 +406,271 @@ class W_UnicodeObject(W_Root):
         return space.newbool(cased)
 
 
+class W_UTF8UnicodeObject(W_UnicodeObject):
+    """A unicode string decoded from strict UTF-8 (see rpython.rlib.rutf8),
+    which keeps the encoded string in '_utf8' instead of an RPython unicode.
+    len, indexing, slicing, searching, concatenation, comparison, identity
+    and encoding to UTF-8 work directly on '_utf8'.  The other operations
+    decode it once, into '_decoded', and keep '_utf8' too.  Unicode objects
+    created in other ways, and instances of subclasses of unicode, are
+    always plain W_UnicodeObjects.
+    """
+    _immutable_fields_ = ['_utf8', '_length']
+
+    def __init__(w_self, utf8, length):
+        assert length >= 0
+        w_self._utf8 = utf8
+        w_self._decoded = None
+        w_self._length = length
+        w_self._index = None
+
+    def __repr__(w_self):
+        """representation for debugging purposes"""
+        return "%s(utf8=%r)" % (w_self.__class__.__name__, w_self._utf8)
+
+    def create_if_subclassed(w_self):
+        return w_self
+
+    def is_w(self, space, w_other):
+        # the identity is the one of '_utf8', which is never decoded for
+        # this.  So it is never the same object as a plain W_UnicodeObject
+        if not isinstance(w_other, W_UTF8UnicodeObject):
+            return False
+        return self is w_other or self._utf8 is w_other._utf8
+
+    def immutable_unique_id(self, space):
+        # tagged, because '_utf8' may also be the value of a str object
+        b = rbigint.fromint(compute_unique_id(self._utf8))
+        return space.newlong_from_rbigint(b.lshift(3).int_or_(IDTAG_UTF8))
+
+    def _get_value(w_self):
+        value = w_self._decoded
+        if value is None:
+            value = _utf8_to_unicode(w_self._utf8)
+            w_self._decoded = value
+        return value
+
+    def _len(w_self):
+        return w_self._length
+
+    def _is_ascii(w_self):
+        return len(w_self._utf8) == w_self._length
+
+    def _get_index(w_self):
+        index = w_self._index
+        if index is None:
+            index = rutf8.create_index(w_self._utf8)
+            w_self._index = index
+        return index
+
+    def _utf8_offset(w_self, i):
+        if not w_self._is_ascii():
+            i = rutf8.offset_of_codepoint(w_self._utf8, w_self._get_index(), i)
+        assert i >= 0
+        return i
+
+    def _utf8_codepoint_index(w_self, pos):
+        if w_self._is_ascii():
+            return pos
+        return rutf8.codepoint_index_at_offset(w_self._utf8,
+                                               w_self._get_index(), pos)
+
+    def _utf8_slice(w_self, start, stop):
+        if start >= stop:
+            return W_UnicodeObject.EMPTY
+        bstart = w_self._utf8_offset(start)
+        bstop = w_self._utf8_offset(stop)
+        return newutf8(w_self._utf8[bstart:bstop], stop - start)
+
+    @staticmethod
+    def _utf8_of(w_obj):
+        # the UTF-8 representation of w_obj, or None.  Used for the
+        # second operand of operations on a UTF-8 string, which is often
+        # a short unicode literal: encoding it is cheaper than decoding
+        # the first operand
+        if isinstance(w_obj, W_UTF8UnicodeObject):
+            return w_obj._utf8
+        if isinstance(w_obj, W_UnicodeObject):
+            return _unicode_to_utf8(w_obj._get_value())
+        return None
+
+    @staticmethod
+    def _same_kind_utf8(w_obj):
+        # the UTF-8 string of w_obj if it has this representation
+        if isinstance(w_obj, W_UTF8UnicodeObject):
+            return w_obj._utf8
+        return None
+
+    def ord(self, space):
+        if self._length != 1:
+            return W_UnicodeObject.ord(self, space)
+        return space.wrap(rutf8.codepoint_at_pos(self._utf8, 0))
+
+    def descr_hash(self, space):
+        if self._is_ascii():
+            # same hash as the unicode string
+            return space.wrap(compute_hash(self._utf8))
+        return W_UnicodeObject.descr_hash(self, space)
+
+    def descr_eq(self, space, w_other):
+        other = self._same_kind_utf8(w_other)
+        if other is not None:
+            return space.newbool(self._utf8 == other)
+        return W_UnicodeObject.descr_eq(self, space, w_other)
+
+    def descr_ne(self, space, w_other):
+        other = self._same_kind_utf8(w_other)
+        if other is not None:
+            return space.newbool(self._utf8 != other)
+        return W_UnicodeObject.descr_ne(self, space, w_other)
+
+    def descr_lt(self, space, w_other):
+        other = self._same_kind_utf8(w_other)
+        if other is not None:
+            return space.newbool(self._utf8 < other)
+        return W_UnicodeObject.descr_lt(self, space, w_other)
+
+    def descr_le(self, space, w_other):
+        other = self._same_kind_utf8(w_other)
+        if other is not None:
+            return space.newbool(self._utf8 <= other)
+        return W_UnicodeObject.descr_le(self, space, w_other)
+
+    def descr_gt(self, space, w_other):
+        other = self._same_kind_utf8(w_other)
+        if other is not None:
+            return space.newbool(self._utf8 > other)
+        return W_UnicodeObject.descr_gt(self, space, w_other)
+
+    def descr_ge(self, space, w_other):
+        other = self._same_kind_utf8(w_other)
+        if other is not None:
+            return space.newbool(self._utf8 >= other)
+        return W_UnicodeObject.descr_ge(self, space, w_other)
+
+    def descr_add(self, space, w_other):
+        other = self._utf8_of(w_other)
+        if other is not None:
+            assert isinstance(w_other, W_UnicodeObject)
+            return newutf8(self._utf8 + other, self._length + w_other._len())
+        return W_UnicodeObject.descr_add(self, space, w_other)
+
+    def descr_getitem(self, space, w_index):
+        if isinstance(w_index, W_SliceObject):
+            start, stop, step, sl = w_index.indices4(space, self._length)
+            if step == 1:
+                return self._utf8_slice(start, stop)
+        return W_UnicodeObject.descr_getitem(self, space, w_index)
+
+    def _getitem_result(self, space, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise oefmt(space.w_IndexError, "string index out of range")
+        return self._utf8_slice(index, index + 1)
+
+    def descr_getslice(self, space, w_start, w_stop):
+        start, stop = normalize_simple_slice(space, self._length, w_start,
+                                             w_stop)
+        return self._utf8_slice(start, stop)
+
+    def descr_contains(self, space, w_sub):
+        sub = self._utf8_of(w_sub)
+        if sub is not None:
+            return space.newbool(self._utf8.find(sub) >= 0)
+        return W_UnicodeObject.descr_contains(self, space, w_sub)
+
+    def _utf8_find(self, space, sub, w_start, w_end, forward):
+        start, end = unwrap_start_stop(space, self._length, w_start, w_end)
+        if end > self._length:
+            end = self._length
+        if start > end:
+            return -1
+        bstart = self._utf8_offset(start)
+        bend = self._utf8_offset(end)
+        if forward:
+            res = self._utf8.find(sub, bstart, bend)
+        else:
+            res = self._utf8.rfind(sub, bstart, bend)
+        if res < 0:
+            return -1
+        return self._utf8_codepoint_index(res)
+
+    def descr_find(self, space, w_sub, w_start=None, w_end=None):
+        sub = self._utf8_of(w_sub)
+        if sub is not None:
+            return space.wrap(self._utf8_find(space, sub, w_start, w_end,
+                                              True))
+        return W_UnicodeObject.descr_find(self, space, w_sub, w_start, w_end)
+
+    def descr_rfind(self, space, w_sub, w_start=None, w_end=None):
+        sub = self._utf8_of(w_sub)
+        if sub is not None:
+            return space.wrap(self._utf8_find(space, sub, w_start, w_end,
+                                              False))
+        return W_UnicodeObject.descr_rfind(self, space, w_sub, w_start, w_end)
+
+    def descr_index(self, space, w_sub, w_start=None, w_end=None):
+        sub = self._utf8_of(w_sub)
+        if sub is not None:
+            res = self._utf8_find(space, sub, w_start, w_end, True)
+            if res < 0:
+                raise oefmt(space.w_ValueError,
+                            "substring not found in string.index")
+            return space.wrap(res)
+        return W_UnicodeObject.descr_index(self, space, w_sub, w_start, w_end)
+
+    def descr_rindex(self, space, w_sub, w_start=None, w_end=None):
+        sub = self._utf8_of(w_sub)
+        if sub is not None:
+            res = self._utf8_find(space, sub, w_start, w_end, False)
+            if res < 0:
+                raise oefmt(space.w_ValueError,
+                            "substring not found in string.rindex")
+            return space.wrap(res)
+        return W_UnicodeObject.descr_rindex(self, space, w_sub, w_start,
+                                            w_end)
+
+    def descr_count(self, space, w_sub, w_start=None, w_end=None):
+        sub = self._utf8_of(w_sub)
+        if sub:
+            # non-empty substrings can be counted bytewise
+            start, end = unwrap_start_stop(space, self._length, w_start,
+                                           w_end)
+            if end > self._length:
+                end = self._length
+            if start >= end:
+                return space.newint(0)
+            return space.newint(self._utf8.count(
+                sub, self._utf8_offset(start), self._utf8_offset(end)))
+        return W_UnicodeObject.descr_count(self, space, w_sub, w_start, w_end)
+
+
 def wrapunicode(space, uni):
     return W_UnicodeObject(uni)
 
 
+def newutf8(utf8, length):
+    """Return a unicode object using 'utf8' as its representation.  It
+    must be strict UTF-8 encoding 'length' code points, as checked by
+    rutf8.check_utf8()."""
+    return W_UTF8UnicodeObject(utf8, length)
+
+
+def _utf8_to_unicode(utf8):
+    # 'utf8' was already checked, so this cannot fail
+    return str_decode_utf_8(utf8, len(utf8), "strict", final=True)[0]
+
+
+def _unicode_to_utf8(value):
+    # returns None if 'value' contains surrogates, which have no strict
+    # UTF-8 encoding (and on narrow builds could be part of a pair)
+    for ch in value:
+        if 0xD800 <= ord(ch) <= 0xDFFF:
+            return None
+    return unicode_encode_utf_8(value, len(value), "strict")
+
+
 def plain_str2unicode(space, s):
     try:
         return unicode(s)
@@ -438,11 +712,16 @@ def encode_object(space, w_object, encoding, errors):
         if errors is None or errors == 'strict':
             try:
                 if encoding == 'ascii':
+                    if (isinstance(w_object, W_UTF8UnicodeObject) and
+                            w_object._is_ascii()):
+                        return space.wrap(w_object._utf8)
                     u = space.unicode_w(w_object)
                     eh = unicodehelper.raise_unicode_exception_encode
                     return space.wrap(unicode_encode_ascii(
                             u, len(u), None, errorhandler=eh))
                 if encoding == 'utf-8':
+                    if isinstance(w_object, W_UTF8UnicodeObject):
+                        return space.wrap(w_object._utf8)
                     u = space.unicode_w(w_object)
                     eh = unicodehelper.raise_unicode_exception_encode
                     return space.wrap(unicode_encode_utf_8(
@@ -478,11 +757,18 @@ def decode_object(space, w_obj, encoding, errors):
         if encoding == 'ascii':
             # XXX error handling
             s = space.charbuf_w(w_obj)
+            length = rutf8.check_utf8(s)
+            if length == len(s):
+                return newutf8(s, length)
             eh = unicodehelper.decode_error_handler(space)
             return space.wrap(str_decode_ascii(
                     s, len(s), None, final=True, errorhandler=eh)[0])
         if encoding == 'utf-8':
             s = space.charbuf_w(w_obj)
+            length = rutf8.check_utf8(s)
+            if length >= 0:
+                return newutf8(s, length)
+            # invalid, or contains encoded surrogates
             eh = unicodehelper.decode_error_handler(space)
             return space.wrap(str_decode_utf_8(
                     s, len(s), None, final=True, errorhandler=eh,
@@ -953,59 +1239,59 @@ W_UnicodeObject.typedef = TypeDef(
                           doc=UnicodeDocstrings.__repr__.__doc__),
     __str__ = interp2app(W_UnicodeObject.descr_str,
                          doc=UnicodeDocstrings.__str__.__doc__),
-    __hash__ = interp2app(W_UnicodeObject.descr_hash,
-                          doc=UnicodeDocstrings.__hash__.__doc__),
-
-    __eq__ = interp2app(W_UnicodeObject.descr_eq,
-                        doc=UnicodeDocstrings.__eq__.__doc__),
-    __ne__ = interp2app(W_UnicodeObject.descr_ne,
-                        doc=UnicodeDocstrings.__ne__.__doc__),
-    __lt__ = interp2app(W_UnicodeObject.descr_lt,
-                        doc=UnicodeDocstrings.__lt__.__doc__),
-    __le__ = interp2app(W_UnicodeObject.descr_le,
-                        doc=UnicodeDocstrings.__le__.__doc__),
-    __gt__ = interp2app(W_UnicodeObject.descr_gt,
-                        doc=UnicodeDocstrings.__gt__.__doc__),
-    __ge__ = interp2app(W_UnicodeObject.descr_ge,
-                        doc=UnicodeDocstrings.__ge__.__doc__),
+    __hash__ = interpindirect2app(W_UnicodeObject.descr_hash,
+                                  doc=UnicodeDocstrings.__hash__.__doc__),
+
+    __eq__ = interpindirect2app(W_UnicodeObject.descr_eq,
+                                doc=UnicodeDocstrings.__eq__.__doc__),
+    __ne__ = interpindirect2app(W_UnicodeObject.descr_ne,
+                                doc=UnicodeDocstrings.__ne__.__doc__),
+    __lt__ = interpindirect2app(W_UnicodeObject.descr_lt,
+                                doc=UnicodeDocstrings.__lt__.__doc__),
+    __le__ = interpindirect2app(W_UnicodeObject.descr_le,
+                                doc=UnicodeDocstrings.__le__.__doc__),
+    __gt__ = interpindirect2app(W_UnicodeObject.descr_gt,
+                                doc=UnicodeDocstrings.__gt__.__doc__),
+    __ge__ = interpindirect2app(W_UnicodeObject.descr_ge,
+                                doc=UnicodeDocstrings.__ge__.__doc__),
 
     __len__ = interp2app(W_UnicodeObject.descr_len,
                          doc=UnicodeDocstrings.__len__.__doc__),
-    __contains__ = interp2app(W_UnicodeObject.descr_contains,
-                              doc=UnicodeDocstrings.__contains__.__doc__),
+    __contains__ = interpindirect2app(W_UnicodeObject.descr_contains,
+        doc=UnicodeDocstrings.__contains__.__doc__),
 
-    __add__ = interp2app(W_UnicodeObject.descr_add,
-                         doc=UnicodeDocstrings.__add__.__doc__),
+    __add__ = interpindirect2app(W_UnicodeObject.descr_add,
+                                 doc=UnicodeDocstrings.__add__.__doc__),
     __mul__ = interp2app(W_UnicodeObject.descr_mul,
                          doc=UnicodeDocstrings.__mul__.__doc__),
     __rmul__ = interp2app(W_UnicodeObject.descr_mul,
                           doc=UnicodeDocstrings.__rmul__.__doc__),
 
-    __getitem__ = interp2app(W_UnicodeObject.descr_getitem,
-                             doc=UnicodeDocstrings.__getitem__.__doc__),
-    __getslice__ = interp2app(W_UnicodeObject.descr_getslice,
-                              doc=UnicodeDocstrings.__getslice__.__doc__),
+    __getitem__ = interpindirect2app(W_UnicodeObject.descr_getitem,
+        doc=UnicodeDocstrings.__getitem__.__doc__),
+    __getslice__ = interpindirect2app(W_UnicodeObject.descr_getslice,
+        doc=UnicodeDocstrings.__getslice__.__doc__),
 
     capitalize = interp2app(W_UnicodeObject.descr_capitalize,
                             doc=UnicodeDocstrings.capitalize.__doc__),
     center = interp2app(W_UnicodeObject.descr_center,
                         doc=UnicodeDocstrings.center.__doc__),
-    count = interp2app(W_UnicodeObject.descr_count,
-                       doc=UnicodeDocstrings.count.__doc__),
+    count = interpindirect2app(W_UnicodeObject.descr_count,
+                               doc=UnicodeDocstrings.count.__doc__),
     decode = interp2app(W_UnicodeObject.descr_decode,
                         doc=UnicodeDocstrings.decode.__doc__),
     encode = interp2app(W_UnicodeObject.descr_encode,
                         doc=UnicodeDocstrings.encode.__doc__),
     expandtabs = interp2app(W_UnicodeObject.descr_expandtabs,
                             doc=UnicodeDocstrings.expandtabs.__doc__),
-    find = interp2app(W_UnicodeObject.descr_find,
-                      doc=UnicodeDocstrings.find.__doc__),
-    rfind = interp2app(W_UnicodeObject.descr_rfind,
-                       doc=UnicodeDocstrings.rfind.__doc__),
-    index = interp2app(W_UnicodeObject.descr_index,
-                       doc=UnicodeDocstrings.index.__doc__),
-    rindex = interp2app(W_UnicodeObject.descr_rindex,
-                        doc=UnicodeDocstrings.rindex.__doc__),
+    find = interpindirect2app(W_UnicodeObject.descr_find,
+                              doc=UnicodeDocstrings.find.__doc__),
+    rfind = interpindirect2app(W_UnicodeObject.descr_rfind,
+                               doc=UnicodeDocstrings.rfind.__doc__),
+    index = interpindirect2app(W_UnicodeObject.descr_index,
+                               doc=UnicodeDocstrings.index.__doc__),
+    rindex = interpindirect2app(W_UnicodeObject.descr_rindex,
+                                doc=UnicodeDocstrings.rindex.__doc__),
     isalnum = interp2app(W_UnicodeObject.descr_isalnum,
                          doc=UnicodeDocstrings.isalnum.__doc__),
     isalpha = interp2app(W_UnicodeObject.descr_isalpha,
@@ -1093,7 +1379,7 @@ W_UnicodeObject.EMPTY = W_UnicodeObject(u'')
 def unicode_to_decimal_w(space, w_unistr):
     if not isinstance(w_unistr, W_UnicodeObject):
         raise oefmt(space.w_TypeError, "expected unicode, got '%T'", w_unistr)
-    unistr = w_unistr._value
+    unistr = w_unistr._get_value()
     result = ['\0'] * len(unistr)
     digits = ['0', '1', '2', '3', '4',
               '5', '6', '7', '8', '9']
@@ -168,6 +168,13 @@ translation_optiondescription = OptionDescription(
     IntOption("make_jobs", "Specify -j argument to make for compilation"
               " (C backend only)",
               cmdline="--make-jobs", default=detect_number_of_processors()),
+    IntOption("source_jobs", "Number of processes that write the C source in"
+              " parallel (C backend only, needs fork())",
+              cmdline="--source-jobs", default=1),
+    StrOption("objcache", "Directory where the compiled object files are"
+              " kept, to be reused when a later translation produces the"
+              " same preprocessed source (C backend only)",
+              cmdline="--objcache", default=None),
 
     # Flags of the TranslationContext:
     BoolOption("list_comprehension_operations",
@@ -232,6 +232,7 @@ class LLGraphCPU(model.AbstractCPU):
     supports_floats = True
     supports_longlong = r_uint is not r_ulonglong
     supports_singlefloats = True
+    vector_ext = True
     translate_support_code = False
     is_llgraph = True
 
@@ -887,6 +888,32 @@ class LLFrame(object):
         self.overflow_flag = ovf
         return z
 
+    def _execute_vec_raw_float(self, descr, func, dstaddr, dstofs,
+                               aaddr, aofs, baddr, bofs):
+        # both lanes are loaded before anything is stored, like the
+        # packed instructions of the real backends do
+        cpu = self.cpu
+        results = []
+        for lane in (0, 8):
+            a = cpu.bh_raw_load_f(aaddr, aofs + lane, descr)
+            b = cpu.bh_raw_load_f(baddr, bofs + lane, descr)
+            z = func(longlong.getrealfloat(a), longlong.getrealfloat(b))
+            results.append(longlong.getfloatstorage(z))
+        cpu.bh_raw_store_f(dstaddr, dstofs, results[0], descr)
+        cpu.bh_raw_store_f(dstaddr, dstofs + 8, results[1], descr)
+
+    def execute_vec_raw_float_add(self, descr, *args):
+        self._execute_vec_raw_float(descr, lambda x, y: x + y, *args)
+
+    def execute_vec_raw_float_sub(self, descr, *args):
+        self._execute_vec_raw_float(descr, lambda x, y: x - y, *args)
+
+    def execute_vec_raw_float_mul(self, descr, *args):
+        self._execute_vec_raw_float(descr, lambda x, y: x * y, *args)
+
+    def execute_vec_raw_float_truediv(self, descr, *args):
+        self._execute_vec_raw_float(descr, lambda x, y: x / y, *args)
+
     def execute_guard_no_overflow(self, descr):
         if self.overflow_flag:
             self.fail_guard(descr)
@@ -7,6 +7,8 @@ class CPUTotalTracker(object):
     total_compiled_bridges = 0
     total_freed_loops = 0
     total_freed_bridges = 0
+    total_evicted_loops = 0
+    total_evicted_bridges = 0
 
     # for heaptracker
     # _all_size_descrs_with_vtable = None
@@ -19,6 +21,9 @@ class AbstractCPU(object):
     # longlongs are supported by the JIT, but stored as doubles.
     # Boxes and Consts are BoxFloats and ConstFloats.
     supports_singlefloats = False
+    vector_ext = False
+    # ^^^ If True, the backend implements the VEC_RAW_FLOAT_* operations
+    # emitted by optimizeopt/vectorize.py when the 'vec' parameter is set.
 
     propagate_exception_descr = None
 
@@ -159,6 +164,11 @@ class AbstractCPU(object):
         """
         pass
 
+    def get_code_memory_used(self):
+        """Return the number of bytes of machine code currently
+        allocated for all the loops and bridges that are not freed."""
+        return 0
+
     def sizeof(self, S):
         raise NotImplementedError
 
@@ -308,6 +318,15 @@ class CompiledLoopToken(object):
         debug_print("allocating Bridge #", self.bridges_count, "of Loop #", self.number)
         debug_stop("jit-mem-looptoken-alloc")
 
+    def get_code_memory_size(self):
+        """The number of bytes of machine code of the loop and all its
+        bridges."""
+        size = 0
+        if self.asmmemmgr_blocks is not None:
+            for rawstart, rawstop in self.asmmemmgr_blocks:
+                size += rawstop - rawstart
+        return size
+
     def update_frame_info(self, oldlooptoken, baseofs):
         new_fi = self.frame_info
         new_loop_tokens = []
@@ -4631,6 +4631,38 @@ class LLtypeBackendTest(BaseBackendTest):
                     rffi.cast(lltype.Float, value))
             rawstorage.free_raw_storage(p)
 
+    def test_vec_raw_float(self):
+        if not self.cpu.vector_ext:
+            py.test.skip("requires vector_ext")
+        from rpython.rlib import rawstorage
+        arraydescr = self.cpu.arraydescrof(rffi.CArray(rffi.DOUBLE))
+        for opname, func in [('add', lambda x, y: x + y),
+                             ('sub', lambda x, y: x - y),
+                             ('mul', lambda x, y: x * y),
+                             ('truediv', lambda x, y: x / y)]:
+            ops = """
+            [i0, i1, i2, i3]
+            vec_raw_float_%s(i0, i1, i2, 8, i2, i3, descr=arraydescr)
+            finish()
+            """ % opname
+            # 'a' overlaps with 'dst', and the storage is not 16-bytes aligned
+            p = rawstorage.alloc_raw_storage(64)
+            src = [1.5, -2.25, 3.0, 7.5, 0.125, 1e10]
+            for i in range(6):
+                rawstorage.raw_storage_setitem(p, 8 + i * 8, src[i])
+            loop = parse(ops, self.cpu, namespace=locals())
+            looptoken = JitCellToken()
+            self.cpu.compile_loop(loop.inputargs, loop.operations, looptoken)
+            self.cpu.execute_token(looptoken, rffi.cast(lltype.Signed, p),
+                                   16, rffi.cast(lltype.Signed, p), 32)
+            for lane in range(2):
+                result = rawstorage.raw_storage_getitem(rffi.DOUBLE, p,
+                                                        16 + lane * 8)
+                assert result == func(src[lane], src[3 + lane])
+            assert rawstorage.raw_storage_getitem(rffi.DOUBLE, p, 8) == 1.5
+            assert rawstorage.raw_storage_getitem(rffi.DOUBLE, p, 32) == 7.5
+            rawstorage.free_raw_storage(p)
+
     def test_forcing_op_with_fail_arg_in_reg(self):
         values = []
         def maybe_force(token, flag):
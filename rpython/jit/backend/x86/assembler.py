@@ -1554,6 +1554,35 @@ class Assembler386(BaseAssembler):
         dest_addr = AddressLoc(base_loc, ofs_loc, 0, baseofs.value)
         self.save_into_mem(dest_addr, value_loc, size_loc)
 
+    def _genop_vec_raw_float(self, arglocs):
+        dst_loc, dstofs_loc, a_loc, aofs_loc, b_loc, bofs_loc = arglocs[:6]
+        baseofs, tmp1, tmp2 = arglocs[6:]
+        assert isinstance(baseofs, ImmedLoc)
+        # unaligned loads and stores: raw storage is only 8-bytes aligned
+        self.mc.MOVUPD(tmp1, AddressLoc(a_loc, aofs_loc, 0, baseofs.value))
+        self.mc.MOVUPD(tmp2, AddressLoc(b_loc, bofs_loc, 0, baseofs.value))
+        return AddressLoc(dst_loc, dstofs_loc, 0, baseofs.value), tmp1, tmp2
+
+    def genop_discard_vec_raw_float_add(self, op, arglocs):
+        dest_addr, tmp1, tmp2 = self._genop_vec_raw_float(arglocs)
+        self.mc.ADDPD(tmp1, tmp2)
+        self.mc.MOVUPD(dest_addr, tmp1)
+
+    def genop_discard_vec_raw_float_sub(self, op, arglocs):
+        dest_addr, tmp1, tmp2 = self._genop_vec_raw_float(arglocs)
+        self.mc.SUBPD(tmp1, tmp2)
+        self.mc.MOVUPD(dest_addr, tmp1)
+
+    def genop_discard_vec_raw_float_mul(self, op, arglocs):
+        dest_addr, tmp1, tmp2 = self._genop_vec_raw_float(arglocs)
+        self.mc.MULPD(tmp1, tmp2)
+        self.mc.MOVUPD(dest_addr, tmp1)
+
+    def genop_discard_vec_raw_float_truediv(self, op, arglocs):
+        dest_addr, tmp1, tmp2 = self._genop_vec_raw_float(arglocs)
+        self.mc.DIVPD(tmp1, tmp2)
+        self.mc.MOVUPD(dest_addr, tmp1)
+
     def genop_discard_strsetitem(self, op, arglocs):
         base_loc, ofs_loc, val_loc = arglocs
         basesize, itemsize, ofs_length = symbolic.get_array_token(rstr.STR,
@@ -1043,6 +1043,22 @@ class RegAlloc(BaseRegalloc):
     consider_setarrayitem_raw = consider_setarrayitem_gc
     consider_raw_store = consider_setarrayitem_gc
 
+    def consider_vec_raw_float_add(self, op):
+        _, ofs, _ = unpack_arraydescr(op.getdescr())
+        args = op.getarglist()
+        arglocs = [self.rm.make_sure_var_in_reg(box, args) for box in args]
+        tmpxvar1 = TempBox()
+        tmpxvar2 = TempBox()
+        loctmp1 = self.xrm.force_allocate_reg(tmpxvar1)
+        loctmp2 = self.xrm.force_allocate_reg(tmpxvar2, [tmpxvar1])
+        self.xrm.possibly_free_var(tmpxvar1)
+        self.xrm.possibly_free_var(tmpxvar2)
+        self.perform_discard(op, arglocs + [imm(ofs), loctmp1, loctmp2])
+
+    consider_vec_raw_float_sub = consider_vec_raw_float_add
+    consider_vec_raw_float_mul = consider_vec_raw_float_add
+    consider_vec_raw_float_truediv = consider_vec_raw_float_add
+
     def consider_getfield_gc(self, op):
         ofs, size, sign = unpack_fielddescr(op.getdescr())
         ofs_loc = imm(ofs)
@@ -156,6 +156,7 @@ class CPU386_NO_SSE2(CPU386):
 class CPU_X86_64(AbstractX86CPU):
     backend_name = 'x86_64'
     NUM_REGS = 16
+    vector_ext = True
     CALLEE_SAVE_REGISTERS = [regloc.ebx, regloc.r12, regloc.r13, regloc.r14, regloc.r15]
 
     IS_64_BIT = True
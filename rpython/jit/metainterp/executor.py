@@ -340,6 +340,10 @@ def _make_execute_list():
                          rop.CALL_MALLOC_NURSERY_VARSIZE,
                          rop.CALL_MALLOC_NURSERY_VARSIZE_FRAME,
                          rop.LABEL,
+                         rop.VEC_RAW_FLOAT_ADD,
+                         rop.VEC_RAW_FLOAT_SUB,
+                         rop.VEC_RAW_FLOAT_MUL,
+                         rop.VEC_RAW_FLOAT_TRUEDIV,
                          ):      # list of opcodes never executed by pyjitpl
                 continue
             raise AssertionError("missing %r" % (key,))
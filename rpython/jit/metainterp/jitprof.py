@@ -11,7 +11,7 @@ from rpython.rlib.jit import Counters
 
 JITPROF_LINES = Counters.ncounters + 1 + 1
 # one for TOTAL, 1 for calls, update if needed
-_CPU_LINES = 4       # the last 4 lines are stored on the cpu
+_CPU_LINES = 7       # the last 7 lines are stored on the cpu
 
 class BaseProfiler(object):
     pass
@@ -110,6 +110,12 @@ class Profiler(BaseProfiler):
             return self.cpu.tracker.total_freed_loops
         elif num == Counters.TOTAL_FREED_BRIDGES:
             return self.cpu.tracker.total_freed_bridges
+        elif num == Counters.TOTAL_EVICTED_LOOPS:
+            return self.cpu.tracker.total_evicted_loops
+        elif num == Counters.TOTAL_EVICTED_BRIDGES:
+            return self.cpu.tracker.total_evicted_bridges
+        elif num == Counters.CODE_MEMORY_USED:
+            return self.cpu.get_code_memory_used()
         return self.counters[num]
 
     def get_times(self, num):
@@ -164,6 +170,12 @@ class Profiler(BaseProfiler):
                                 cpu.tracker.total_freed_loops)
             self._print_intline("Freed # of bridges",
                                 cpu.tracker.total_freed_bridges)
+            self._print_intline("Evicted # of loops",
+                                cpu.tracker.total_evicted_loops)
+            self._print_intline("Evicted # of bridges",
+                                cpu.tracker.total_evicted_bridges)
+            self._print_intline("Code memory used",
+                                cpu.get_code_memory_used())
 
     def _print_line_time(self, string, i, tim):
         final = "%s:%s\t%d\t%f" % (string, " " * max(0, 13-len(string)), i, tim)
@@ -2,6 +2,7 @@ import math
 from rpython.rlib.rarithmetic import r_int64
 from rpython.rlib.debug import debug_start, debug_print, debug_stop
 from rpython.rlib.objectmodel import we_are_translated
+from rpython.rlib.listsort import make_timsort_class
 
 #
 # Logic to decide which loops are old and not used any more.
@@ -19,10 +20,38 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# In addition, a budget for the machine code can be given with
+# set_max_code_memory().  When the backend reports more code than that,
+# the least recently entered loops are removed from 'alive_loops' until
+# the loops that remain fit in 3/4 of the budget.  A loop is always
+# freed together with all its bridges.  The 'generation' of a LoopToken
+# is updated every time it is entered, so sorting by generation gives
+# the least recently entered loops first.  The evicted loops are still
+# counted by the backend until the GC frees them, so after a scan the
+# next one only occurs when the backend reports a quarter of the budget
+# more, or after 'min_eviction_interval' generations.
+#
+
+def _older_than(looptoken1, looptoken2):
+    return looptoken1.generation < looptoken2.generation
+
+LoopTokenSort = make_timsort_class(lt=_older_than)
+
+def get_code_memory_size(looptoken):
+    clt = looptoken.compiled_loop_token
+    if clt is None:
+        return 0
+    return clt.get_code_memory_size()
+
 
 class MemoryManager(object):
+    min_eviction_interval = 50
 
-    def __init__(self):
+    def __init__(self, cpu=None):
+        self.cpu = cpu
+        self.max_code_memory = 0
+        self.last_eviction_generation = r_int64(-1)
+        self.code_memory_at_last_eviction = 0
         self.check_frequency = -1
         # NB. use of r_int64 to be extremely far on the safe side:
         # this is increasing by one after each loop or bridge is
@@ -49,11 +78,29 @@ class MemoryManager(object):
             self.check_frequency = check_frequency
             self.next_check = self.current_generation + 1
 
+    def set_max_code_memory(self, max_code_memory):
+        self.max_code_memory = max(max_code_memory, 0)
+
     def next_generation(self):
         self.current_generation += 1
         if self.current_generation == self.next_check:
             self._kill_old_loops_now()
             self.next_check = self.current_generation + self.check_frequency
+        if self.max_code_memory > 0 and self.cpu is not None:
+            used = self.cpu.get_code_memory_used()
+            if used > self.max_code_memory and self._eviction_due(used):
+                self.last_eviction_generation = self.current_generation
+                self.code_memory_at_last_eviction = used
+                self._evict_cold_loops_now()
+
+    def _eviction_due(self, used):
+        if self.last_eviction_generation < 0:
+            return True
+        if (used - self.code_memory_at_last_eviction >=
+                self.max_code_memory // 4):
+            return True
+        return (self.current_generation - self.last_eviction_generation >=
+                self.min_eviction_interval)
 
     def keep_loop_alive(self, looptoken):
         if looptoken.generation != self.current_generation:
@@ -81,3 +128,40 @@ class MemoryManager(object):
             # a single one is not enough for all tests :-(
             rgc.collect(); rgc.collect(); rgc.collect()
         debug_stop("jit-mem-collect")
+
+    def _evict_cold_loops_now(self):
+        # The backend's number also includes the loops that were already
+        # removed from 'alive_loops' but not freed yet by the GC, so count
+        # again only the loops that we keep alive.
+        alive = self.alive_loops.keys()
+        total = 0
+        for looptoken in alive:
+            total += get_code_memory_size(looptoken)
+        if total <= self.max_code_memory:
+            return
+        debug_start("jit-mem-evict")
+        debug_print("Code memory of alive loops:", total)
+        debug_print("Loop tokens before:", len(alive))
+        target = self.max_code_memory - self.max_code_memory // 4
+        LoopTokenSort(alive).sort()
+        # never evict the loops entered or compiled just now
+        youngest_generation = self.current_generation - 1
+        tracker = self.cpu.tracker
+        evicted = 0
+        for looptoken in alive:
+            if total <= target or looptoken.generation >= youngest_generation:
+                break
+            del self.alive_loops[looptoken]
+            total -= get_code_memory_size(looptoken)
+            evicted += 1
+            tracker.total_evicted_loops += 1
+            clt = looptoken.compiled_loop_token
+            if clt is not None:
+                tracker.total_evicted_bridges += clt.bridges_count
+        debug_print("Loop tokens evicted:", evicted)
+        debug_print("Code memory left:", total)
+        if not we_are_translated() and evicted > 0:
+            looptoken = None
+            from rpython.rlib import rgc
+            rgc.collect(); rgc.collect(); rgc.collect()
+        debug_stop("jit-mem-evict")
@@ -0,0 +1,243 @@
+from rpython.jit.metainterp.optimizeopt.test.test_util import (
+    LLtypeMixin, BaseTest)
+from rpython.jit.metainterp.optimizeopt.vectorize import (Vectorizer,
+    optimize_vector)
+
+
+class TestVectorize(BaseTest, LLtypeMixin):
+
+    def optimize(self, ops, expected):
+        loop = self.parse(ops)
+        vectorizer = Vectorizer(loop.operations)
+        loop.operations = vectorizer.vectorize()
+        self.assert_equal(loop, self.parse(expected))
+        return vectorizer.packed
+
+    def test_pair(self):
+        ops = """
+        [i0, i1, i2, i3]
+        i4 = int_add(i3, 8)
+        f0 = raw_load(i1, i3, descr=rawarraydescr_float)
+        f1 = raw_load(i2, i3, descr=rawarraydescr_float)
+        f2 = raw_load(i1, i4, descr=rawarraydescr_float)
+        f3 = raw_load(i2, i4, descr=rawarraydescr_float)
+        f4 = float_add(f0, f1)
+        f5 = float_add(f2, f3)
+        raw_store(i0, i3, f4, descr=rawarraydescr_float)
+        raw_store(i0, i4, f5, descr=rawarraydescr_float)
+        i5 = int_add(i3, 16)
+        jump(i0, i1, i2, i5)
+        """
+        expected = """
+        [i0, i1, i2, i3]
+        i4 = int_add(i3, 8)
+        vec_raw_float_add(i0, i3, i1, i3, i2, i3, descr=rawarraydescr_float)
+        i5 = int_add(i3, 16)
+        jump(i0, i1, i2, i5)
+        """
+        assert self.optimize(ops, expected) == 1
+
+    def test_pair_descending_offsets(self):
+        ops = """
+        [i0, i1, i3]
+        i4 = int_add(i3, 16)
+        i5 = int_sub(i4, 8)
+        f0 = raw_load(i1, i4, descr=rawarraydescr_float)
+        f1 = raw_load(i1, i5, descr=rawarraydescr_float)
+        f2 = raw_load(i0, i4, descr=rawarraydescr_float)
+        f3 = raw_load(i0, i5, descr=rawarraydescr_float)
+        f4 = float_sub(f0, f2)
+        f5 = float_sub(f1, f3)
+        raw_store(i0, i4, f4, descr=rawarraydescr_float)
+        raw_store(i0, i5, f5, descr=rawarraydescr_float)
+        jump(i0, i1, i4)
+        """
+        expected = """
+        [i0, i1, i3]
+        i4 = int_add(i3, 16)
+        i5 = int_sub(i4, 8)
+        vec_raw_float_sub(i0, i5, i1, i5, i0, i5, descr=rawarraydescr_float)
+        jump(i0, i1, i4)
+        """
+        assert self.optimize(ops, expected) == 1
+
+    def test_commutative_operands(self):
+        ops = """
+        [i0, i1, i2]
+        f0 = raw_load(i1, 0, descr=rawarraydescr_float)
+        f1 = raw_load(i2, 0, descr=rawarraydescr_float)
+        f2 = raw_load(i1, 8, descr=rawarraydescr_float)
+        f3 = raw_load(i2, 8, descr=rawarraydescr_float)
+        f4 = float_mul(f0, f1)
+        f5 = float_mul(f3, f2)
+        raw_store(i0, 0, f4, descr=rawarraydescr_float)
+        raw_store(i0, 8, f5, descr=rawarraydescr_float)
+        jump(i0, i1, i2)
+        """
+        expected = """
+        [i0, i1, i2]
+        vec_raw_float_mul(i0, 0, i1, 0, i2, 0, descr=rawarraydescr_float)
+        jump(i0, i1, i2)
+        """
+        assert self.optimize(ops, expected) == 1
+        ops = ops.replace('float_mul', 'float_truediv')
+        assert self.optimize(ops, ops) == 0
+
+    def test_interleaved_in_place(self):
+        # the second pair of loads may only be moved before the first
+        # store if they provably don't read the stored item
+        ops = """
+        [i0, i1, i3]
+        i4 = int_add(i3, 8)
+        f0 = raw_load(i0, i3, descr=rawarraydescr_float)
+        f1 = raw_load(i0, i3, descr=rawarraydescr_float)
+        f4 = float_add(f0, f1)
+        raw_store(i0, i3, f4, descr=rawarraydescr_float)
+        f2 = raw_load(i0, i4, descr=rawarraydescr_float)
+        f3 = raw_load(i0, i4, descr=rawarraydescr_float)
+        f5 = float_add(f2, f3)
+        raw_store(i0, i4, f5, descr=rawarraydescr_float)
+        jump(i0, i1, i4)
+        """
+        expected = """
+        [i0, i1, i3]
+        i4 = int_add(i3, 8)
+        vec_raw_float_add(i0, i3, i0, i3, i0, i3, descr=rawarraydescr_float)
+        jump(i0, i1, i4)
+        """
+        assert self.optimize(ops, expected) == 1
+        ops = ops.replace('raw_load(i0, i4', 'raw_load(i1, i4')
+        assert self.optimize(ops, ops) == 0
+
+    def test_not_adjacent(self):
+        ops = """
+        [i0, i1, i2]
+        f0 = raw_load(i1, 0, descr=rawarraydescr_float)
+        f1 = raw_load(i2, 0, descr=rawarraydescr_float)
+        f2 = raw_load(i1, 16, descr=rawarraydescr_float)
+        f3 = raw_load(i2, 8, descr=rawarraydescr_float)
+        f4 = float_add(f0, f1)
+        f5 = float_add(f2, f3)
+        raw_store(i0, 0, f4, descr=rawarraydescr_float)
+        raw_store(i0, 8, f5, descr=rawarraydescr_float)
+        jump(i0, i1, i2)
+        """
+        assert self.optimize(ops, ops) == 0
+
+    def test_one_item_per_iteration(self):
+        # loops are not unrolled: a loop handling one double per
+        # iteration has nothing to pair
+        ops = """
+        [i0, i1, i2, i3]
+        f0 = raw_load(i1, i3, descr=rawarraydescr_float)
+        f1 = raw_load(i2, i3, descr=rawarraydescr_float)
+        f2 = float_add(f0, f1)
+        raw_store(i0, i3, f2, descr=rawarraydescr_float)
+        i4 = int_add(i3, 8)
+        jump(i0, i1, i2, i4)
+        """
+        assert self.optimize(ops, ops) == 0
+
+    def test_guard_or_call_in_between(self):
+        ops = """
+        [i0, i1, i2, i6]
+        f0 = raw_load(i1, 0, descr=rawarraydescr_float)
+        f1 = raw_load(i2, 0, descr=rawarraydescr_float)
+        f4 = float_add(f0, f1)
+        guard_true(i6) []
+        f2 = raw_load(i1, 8, descr=rawarraydescr_float)
+        f3 = raw_load(i2, 8, descr=rawarraydescr_float)
+        f5 = float_add(f2, f3)
+        raw_store(i0, 0, f4, descr=rawarraydescr_float)
+        raw_store(i0, 8, f5, descr=rawarraydescr_float)
+        jump(i0, i1, i2, i6)
+        """
+        assert self.optimize(ops, ops) == 0
+        ops = ops.replace('guard_true(i6) []',
+                          'raw_store(i6, 0, f0, descr=rawarraydescr_float)')
+        assert self.optimize(ops, ops) == 0
+
+    def test_value_escapes(self):
+        ops = """
+        [i0, i1, i2]
+        f0 = raw_load(i1, 0, descr=rawarraydescr_float)
+        f1 = raw_load(i2, 0, descr=rawarraydescr_float)
+        f2 = raw_load(i1, 8, descr=rawarraydescr_float)
+        f3 = raw_load(i2, 8, descr=rawarraydescr_float)
+        f4 = float_add(f0, f1)
+        f5 = float_add(f2, f3)
+        raw_store(i0, 0, f4, descr=rawarraydescr_float)
+        raw_store(i0, 8, f5, descr=rawarraydescr_float)
+        jump(i0, i1, i2, f2)
+        """
+        assert self.optimize(ops, ops) == 0
+
+    def test_not_floats(self):
+        ops = """
+        [i0, i1, i2]
+        i10 = raw_load(i1, 0, descr=rawarraydescr)
+        i11 = raw_load(i2, 0, descr=rawarraydescr)
+        i12 = raw_load(i1, 8, descr=rawarraydescr)
+        i13 = raw_load(i2, 8, descr=rawarraydescr)
+        i14 = int_add(i10, i11)
+        i15 = int_add(i12, i13)
+        raw_store(i0, 0, i14, descr=rawarraydescr)
+        raw_store(i0, 8, i15, descr=rawarraydescr)
+        jump(i0, i1, i2)
+        """
+        assert self.optimize(ops, ops) == 0
+
+    def test_two_pairs(self):
+        ops = """
+        [i0, i1, i2]
+        f0 = raw_load(i1, 0, descr=rawarraydescr_float)
+        f1 = raw_load(i2, 0, descr=rawarraydescr_float)
+        f2 = raw_load(i1, 8, descr=rawarraydescr_float)
+        f3 = raw_load(i2, 8, descr=rawarraydescr_float)
+        f4 = float_add(f0, f1)
+        f5 = float_add(f2, f3)
+        raw_store(i0, 0, f4, descr=rawarraydescr_float)
+        raw_store(i0, 8, f5, descr=rawarraydescr_float)
+        f10 = raw_load(i1, 16, descr=rawarraydescr_float)
+        f11 = raw_load(i2, 16, descr=rawarraydescr_float)
+        f12 = raw_load(i1, 24, descr=rawarraydescr_float)
+        f13 = raw_load(i2, 24, descr=rawarraydescr_float)
+        f14 = float_add(f10, f11)
+        f15 = float_add(f12, f13)
+        raw_store(i0, 16, f14, descr=rawarraydescr_float)
+        raw_store(i0, 24, f15, descr=rawarraydescr_float)
+        jump(i0, i1, i2)
+        """
+        expected = """
+        [i0, i1, i2]
+        vec_raw_float_add(i0, 0, i1, 0, i2, 0, descr=rawarraydescr_float)
+        vec_raw_float_add(i0, 16, i1, 16, i2, 16, descr=rawarraydescr_float)
+        jump(i0, i1, i2)
+        """
+        assert self.optimize(ops, expected) == 2
+
+    def test_disabled(self):
+        class FakeWarmState:
+            vec = 0
+        class FakeJitDriverSD:
+            warmstate = FakeWarmState()
+        class FakeMetaInterpSD:
+            cpu = self.cpu
+        ops = """
+        [i0, i1, i2]
+        f0 = raw_load(i1, 0, descr=rawarraydescr_float)
+        f1 = raw_load(i2, 0, descr=rawarraydescr_float)
+        f2 = raw_load(i1, 8, descr=rawarraydescr_float)
+        f3 = raw_load(i2, 8, descr=rawarraydescr_float)
+        f4 = float_add(f0, f1)
+        f5 = float_add(f2, f3)
+        raw_store(i0, 0, f4, descr=rawarraydescr_float)
+        raw_store(i0, 8, f5, descr=rawarraydescr_float)
+        jump(i0, i1, i2)
+        """
+        loop = self.parse(ops)
+        optimize_vector(FakeMetaInterpSD(), FakeJitDriverSD(), loop)
+        assert len(loop.operations) == 9
+        FakeWarmState.vec = 1
+        optimize_vector(FakeMetaInterpSD(), FakeJitDriverSD(), loop)
+        assert len(loop.operations) == 2
@@ -0,0 +1,271 @@
+"""Superword-level vectorization of float operations on raw memory.
+
+This pass runs on the fully optimized loop, just before it is sent to
+the backend.  It looks for pairs of independent chains of the form
+
+    f1 = raw_load(a, i, descr=floatarray)
+    f2 = raw_load(b, j, descr=floatarray)
+    f3 = float_xxx(f1, f2)
+    raw_store(c, k, f3, descr=floatarray)
+
+that work on adjacent doubles, i.e. whose three offsets differ by exactly
+one item, and replaces each pair with a single VEC_RAW_FLOAT_XXX, which
+the backend emits as two-lane SSE instructions.  The pass does not
+unroll loops: a loop that handles one double per iteration is left
+alone.  Pairs only exist in loops that were unrolled by hand, e.g. over
+array.array('d'), and for complex numbers in micronumpy.  It is not a
+loop vectorizer.  The pass never changes the order of memory
+accesses except inside a pair, and only when nothing but pure operations
+are found between the first and the last operation of the pair.
+"""
+
+from rpython.jit.metainterp.history import Const, ConstInt
+from rpython.jit.metainterp.resoperation import rop, ResOperation
+from rpython.rlib.debug import debug_start, debug_stop, debug_print
+
+FLOAT_SIZE = 8
+
+VEC_OPNUMS = {rop.FLOAT_ADD: rop.VEC_RAW_FLOAT_ADD,
+              rop.FLOAT_SUB: rop.VEC_RAW_FLOAT_SUB,
+              rop.FLOAT_MUL: rop.VEC_RAW_FLOAT_MUL,
+              rop.FLOAT_TRUEDIV: rop.VEC_RAW_FLOAT_TRUEDIV}
+
+
+def optimize_vector(metainterp_sd, jitdriver_sd, loop):
+    """Vectorize loop.operations in-place if the 'vec' parameter is set
+    and the backend supports it.
+    """
+    if not jitdriver_sd.warmstate.vec or not metainterp_sd.cpu.vector_ext:
+        return
+    debug_start("jit-vectorize")
+    try:
+        vectorizer = Vectorizer(loop.operations)
+        loop.operations = vectorizer.vectorize()
+        debug_print("packed pairs:", vectorizer.packed)
+    finally:
+        debug_stop("jit-vectorize")
+
+
+class Chain(object):
+    """raw_load, raw_load, float_xxx and raw_store of a single lane."""
+
+    def __init__(self, store_index, binop_index, load1_index, load2_index):
+        self.store_index = store_index
+        self.binop_index = binop_index
+        self.load1_index = load1_index
+        self.load2_index = load2_index
+
+    def indexes(self):
+        return [self.load1_index, self.load2_index, self.binop_index,
+                self.store_index]
+
+
+class Vectorizer(object):
+
+    def __init__(self, operations):
+        self.operations = operations
+        self.packed = 0
+        self.uses = {}         # {box: number of uses, including failargs}
+        self.producers = {}    # {box: index of the operation producing it}
+        self.indexvars = {}    # {box: (root box, constant offset)}
+
+    def vectorize(self):
+        """Return the new list of operations."""
+        operations = self.operations
+        for i in range(len(operations)):
+            self._analyse(i, operations[i])
+        chains = []
+        for i in range(len(operations)):
+            chain = self._find_chain(i, operations[i])
+            if chain is not None:
+                chains.append(chain)
+        if len(chains) < 2:
+            return operations
+        newops = operations[:]
+        for i in range(len(chains)):
+            chain1 = chains[i]
+            if newops[chain1.store_index] is None:
+                continue
+            for j in range(i + 1, len(chains)):
+                chain2 = chains[j]
+                if newops[chain2.store_index] is None:
+                    continue
+                if self._try_pack(newops, chain1, chain2):
+                    break
+        if not self.packed:
+            return operations
+        return [op for op in newops if op is not None]
+
+    # ____________________________________________________________
+
+    def _analyse(self, index, op):
+        for box in op.getarglist():
+            self._use(box)
+        failargs = op.getfailargs()
+        if failargs is not None:
+            for box in failargs:
+                self._use(box)
+        result = op.result
+        if result is None:
+            return
+        self.producers[result] = index
+        opnum = op.getopnum()
+        if opnum == rop.INT_ADD:
+            if isinstance(op.getarg(1), ConstInt):
+                root, offset = self.get_index(op.getarg(0))
+                self.indexvars[result] = (root, offset + op.getarg(1).getint())
+            elif isinstance(op.getarg(0), ConstInt):
+                root, offset = self.get_index(op.getarg(1))
+                self.indexvars[result] = (root, offset + op.getarg(0).getint())
+        elif opnum == rop.INT_SUB:
+            if isinstance(op.getarg(1), ConstInt):
+                root, offset = self.get_index(op.getarg(0))
+                self.indexvars[result] = (root, offset - op.getarg(1).getint())
+
+    def _use(self, box):
+        if box is None or isinstance(box, Const):
+            return
+        self.uses[box] = self.uses.get(box, 0) + 1
+
+    def get_index(self, box):
+        """Return (root, offset) such that 'box == root + offset'.  The
+        root is None for constants.
+        """
+        if isinstance(box, ConstInt):
+            return (None, box.getint())
+        try:
+            return self.indexvars[box]
+        except KeyError:
+            return (box, 0)
+
+    def _single_use_producer(self, box, opnum):
+        if isinstance(box, Const) or self.uses.get(box, 0) != 1:
+            return -1
+        index = self.producers.get(box, -1)
+        if index < 0 or self.operations[index].getopnum() != opnum:
+            return -1
+        return index
+
+    def _find_chain(self, index, op):
+        if op.getopnum() != rop.RAW_STORE:
+            return None
+        descr = op.getdescr()
+        if not descr.is_array_of_floats():
+            return None
+        binop_index = self.producers.get(op.getarg(2), -1)
+        if binop_index < 0 or self.uses.get(op.getarg(2), 0) != 1:
+            return None
+        binop = self.operations[binop_index]
+        if binop.getopnum() not in VEC_OPNUMS:
+            return None
+        load1_index = self._single_use_producer(binop.getarg(0), rop.RAW_LOAD)
+        load2_index = self._single_use_producer(binop.getarg(1), rop.RAW_LOAD)
+        if load1_index < 0 or load2_index < 0:
+            return None
+        if (self.operations[load1_index].getdescr() is not descr or
+                self.operations[load2_index].getdescr() is not descr):
+            return None
+        return Chain(index, binop_index, load1_index, load2_index)
+
+    def _adjacent(self, op1, op2):
+        """Return the distance in items between the memory accessed by op1
+        and op2, or 0 if they don't access adjacent items of the same
+        array.
+        """
+        if op1.getarg(0) is not op2.getarg(0):
+            return 0
+        root1, offset1 = self.get_index(op1.getarg(1))
+        root2, offset2 = self.get_index(op2.getarg(1))
+        if root1 is not root2:
+            return 0
+        if offset2 - offset1 == FLOAT_SIZE:
+            return 1
+        if offset1 - offset2 == FLOAT_SIZE:
+            return -1
+        return 0
+
+    def _disjoint(self, op1, op2):
+        if op1.getarg(0) is not op2.getarg(0):
+            return False
+        root1, offset1 = self.get_index(op1.getarg(1))
+        root2, offset2 = self.get_index(op2.getarg(1))
+        if root1 is not root2:
+            return False
+        return offset1 - offset2 >= FLOAT_SIZE or offset2 - offset1 >= FLOAT_SIZE
+
+    def _try_pack(self, newops, chain1, chain2):
+        ops = self.operations
+        binop1 = ops[chain1.binop_index]
+        binop2 = ops[chain2.binop_index]
+        opnum = binop1.getopnum()
+        if binop2.getopnum() != opnum:
+            return False
+        store1 = ops[chain1.store_index]
+        if store1.getdescr() is not ops[chain2.store_index].getdescr():
+            return False
+        direction = self._adjacent(store1, ops[chain2.store_index])
+        if direction == 0:
+            return False
+        if (self._adjacent(ops[chain1.load1_index],
+                           ops[chain2.load1_index]) != direction or
+            self._adjacent(ops[chain1.load2_index],
+                           ops[chain2.load2_index]) != direction):
+            if opnum != rop.FLOAT_ADD and opnum != rop.FLOAT_MUL:
+                return False
+            # commutative: try again with the operands of chain2 swapped
+            if (self._adjacent(ops[chain1.load1_index],
+                               ops[chain2.load2_index]) != direction or
+                self._adjacent(ops[chain1.load2_index],
+                               ops[chain2.load1_index]) != direction):
+                return False
+        if not self._can_reorder(newops, chain1, chain2):
+            return False
+        if direction > 0:
+            low = chain1
+        else:
+            low = chain2
+        store = ops[low.store_index]
+        load1 = ops[low.load1_index]
+        load2 = ops[low.load2_index]
+        args = [store.getarg(0), store.getarg(1),
+                load1.getarg(0), load1.getarg(1),
+                load2.getarg(0), load2.getarg(1)]
+        vecop = ResOperation(VEC_OPNUMS[opnum], args, None,
+                             descr=store.getdescr())
+        for index in chain1.indexes() + chain2.indexes():
+            newops[index] = None
+        newops[max(chain1.store_index, chain2.store_index)] = vecop
+        self.packed += 1
+        return True
+
+    def _can_reorder(self, newops, chain1, chain2):
+        """Check that all the operations between the first and the last
+        operation of the two chains can be moved around them: the first
+        store is sunk to the position of the second one, after all the
+        loads, and nothing else may access memory or fail in-between.
+        chain1 is always the one whose store comes first.
+        """
+        ops = self.operations
+        indexes = chain1.indexes() + chain2.indexes()
+        first_store = chain1.store_index
+        last_store = chain2.store_index
+        start = last_store
+        for index in indexes:
+            if index < start:
+                start = index
+        for index in [chain2.load1_index, chain2.load2_index]:
+            if index > first_store:
+                # the load is moved before the first store: only allowed
+                # if they provably access different items of the array
+                if not self._disjoint(ops[first_store], ops[index]):
+                    return False
+        for index in range(start + 1, last_store):
+            if index in indexes:
+                continue
+            op = newops[index]
+            if op is None:
+                continue
+            if op.is_always_pure() or op.getopnum() == rop.DEBUG_MERGE_POINT:
+                continue
+            return False
+        return True
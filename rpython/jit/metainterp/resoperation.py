@@ -511,6 +511,10 @@ _oplist = [
     'SETINTERIORFIELD_GC/3d',
     'SETINTERIORFIELD_RAW/3d',    # right now, only used by tests
     'RAW_STORE/3d',
+    'VEC_RAW_FLOAT_ADD/6d',     # [dstaddr, dstofs, aaddr, aofs, baddr, bofs]
+    'VEC_RAW_FLOAT_SUB/6d',     # on two adjacent floats, descr=ArrayDescr;
+    'VEC_RAW_FLOAT_MUL/6d',     # only emitted by optimizeopt/vectorize.py
+    'VEC_RAW_FLOAT_TRUEDIV/6d',
     'SETFIELD_GC/2d',
     'ZERO_PTR_FIELD/2', # only emitted by the rewrite, clears a pointer field
                         # at a given constant offset, no descr
@@ -35,6 +35,7 @@ class FakeLogger(object):
 class FakeState(object):
     enable_opts = ALL_OPTS_DICT.copy()
     enable_opts.pop('unroll')
+    vec = 0
 
     def attach_unoptimized_bridge_from_interp(*args):
         pass
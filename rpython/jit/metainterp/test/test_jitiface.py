@@ -1,5 +1,5 @@
 
-from rpython.rlib.jit import JitDriver, JitHookInterface, Counters
+from rpython.rlib.jit import JitDriver, JitHookInterface, Counters, set_param
 from rpython.rlib import jit_hooks
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.codewriter.policy import JitPolicy
@@ -191,6 +191,29 @@ class JitHookInterfaceTests(object):
             assert jit_hooks.stats_get_times_value(None, Counters.TRACING) == 0
         self.meta_interp(main, [], ProfilerClass=EmptyProfiler)
 
+    def test_trace_next_iteration(self):
+        driver = JitDriver(greens = ['g'], reds = ['i', 's'],
+                           name = 'tracenext')
+
+        def loop(g, i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(g=g, i=i, s=s)
+                s += g
+                i -= 1
+            return s
+
+        def main(g):
+            set_param(driver, 'threshold', 1000)
+            jit_hooks.trace_next_iteration('tracenext', g)
+            return loop(g, 10) + loop(g + 1, 10)
+
+        res = self.meta_interp(main, [5])
+        assert res == 110
+        # only the loop with the primed greenkey was compiled
+        self.check_trace_count(1)
+        self.check_resops(int_add=2)
+
 
 class LLJitHookInterfaceTests(JitHookInterfaceTests):
     # use this for any backend, instead of the super class
@@ -21,6 +21,31 @@ from rpython.rlib import rgc
 class FakeLoopToken:
     generation = 0
     invalidated = False
+    compiled_loop_token = None
+
+class FakeCompiledLoopToken:
+    def __init__(self, size, bridges_count=0):
+        self.size = size
+        self.bridges_count = bridges_count
+    def get_code_memory_size(self):
+        return self.size
+
+class FakeTracker:
+    total_evicted_loops = 0
+    total_evicted_bridges = 0
+
+class FakeCPU:
+    def __init__(self):
+        self.tracker = FakeTracker()
+        self.alive = {}
+    def get_code_memory_used(self):
+        return sum([token.compiled_loop_token.size for token in self.alive])
+
+def make_sized_token(cpu, size, bridges_count=0):
+    token = FakeLoopToken()
+    token.compiled_loop_token = FakeCompiledLoopToken(size, bridges_count)
+    cpu.alive[token] = None
+    return token
 
 
 class _TestMemoryManager:
@@ -79,6 +104,92 @@ class _TestMemoryManager:
                 assert tokens[i] in memmgr.alive_loops
 
 
+    def test_code_memory_no_limit(self):
+        cpu = FakeCPU()
+        memmgr = MemoryManager(cpu)
+        tokens = [make_sized_token(cpu, 1000) for i in range(10)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys(tokens)
+
+    def test_code_memory_evicts_least_recently_entered(self):
+        cpu = FakeCPU()
+        memmgr = MemoryManager(cpu)
+        memmgr.set_max_code_memory(4000)
+        tokens = []
+        for i in range(4):
+            token = make_sized_token(cpu, 1000, bridges_count=i)
+            tokens.append(token)
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys(tokens)
+        # tokens[0] is entered again, so tokens[1] is now the coldest
+        memmgr.keep_loop_alive(tokens[0])
+        memmgr.next_generation()
+        token = make_sized_token(cpu, 1000)
+        memmgr.keep_loop_alive(token)
+        memmgr.next_generation()
+        # 5000 bytes is above the budget: evict until we are below 3000
+        assert memmgr.alive_loops == dict.fromkeys([tokens[0], tokens[3],
+                                                    token])
+        assert cpu.tracker.total_evicted_loops == 2
+        assert cpu.tracker.total_evicted_bridges == 1 + 2
+
+    def test_code_memory_waiting_for_gc(self):
+        cpu = FakeCPU()
+        memmgr = MemoryManager(cpu)
+        memmgr.set_max_code_memory(2800)
+        tokens = []
+        for i in range(3):
+            token = make_sized_token(cpu, 1000)
+            tokens.append(token)
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys(tokens[1:])
+        # tokens[0] is not freed yet, but we don't evict more loops
+        memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys(tokens[1:])
+        assert cpu.tracker.total_evicted_loops == 1
+
+    def test_code_memory_no_rescan_while_waiting_for_gc(self):
+        cpu = FakeCPU()
+        memmgr = MemoryManager(cpu)
+        memmgr.set_max_code_memory(2800)
+        memmgr.min_eviction_interval = 10
+        scans = []
+        evict_cold_loops_now = memmgr._evict_cold_loops_now
+        def counting_evict():
+            scans.append(memmgr.current_generation)
+            evict_cold_loops_now()
+        memmgr._evict_cold_loops_now = counting_evict
+        for i in range(3):
+            token = make_sized_token(cpu, 1000)
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        assert len(scans) == 1
+        # the backend still reports 3000 bytes, because tokens[0] is
+        # not freed: scan again only every 'min_eviction_interval'
+        for i in range(25):
+            memmgr.next_generation()
+        assert scans == [scans[0], scans[0] + 10, scans[0] + 20]
+        # unless a quarter of the budget more is reported
+        token = make_sized_token(cpu, 1000)
+        memmgr.keep_loop_alive(token)
+        memmgr.next_generation()
+        assert len(scans) == 4
+        assert cpu.tracker.total_evicted_loops == 2
+
+    def test_code_memory_keeps_youngest_loop(self):
+        cpu = FakeCPU()
+        memmgr = MemoryManager(cpu)
+        memmgr.set_max_code_memory(100)
+        token = make_sized_token(cpu, 1000)
+        memmgr.keep_loop_alive(token)
+        memmgr.next_generation()
+        assert memmgr.alive_loops == {token: None}
+
+
 class _TestIntegration(LLJitMixin):
     # See comments in TestMemoryManager.  To get temporarily the normal
     # behavior just rename this class to TestIntegration.
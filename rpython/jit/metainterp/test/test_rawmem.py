@@ -1,4 +1,5 @@
 from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.rlib.jit import JitDriver
 from rpython.rtyper.lltypesystem import lltype, rffi
 from rpython.rlib.rawstorage import (alloc_raw_storage, raw_storage_setitem,
                                      free_raw_storage, raw_storage_getitem)
@@ -99,6 +100,36 @@ class RawMemTests(object):
         res = self.interp_operations(f, [])
         assert res == ord('X')
 
+    def test_vectorize_float_pairs(self):
+        driver = JitDriver(greens=[], reds='auto')
+        def f(n):
+            a = alloc_raw_storage(n * 8)
+            b = alloc_raw_storage(n * 8)
+            for i in range(n):
+                raw_storage_setitem(a, i * 8, i * 1.5)
+                raw_storage_setitem(b, i * 8, 2.0 - i)
+            i = 0
+            while i < n * 8:
+                driver.jit_merge_point()
+                x0 = (raw_storage_getitem(lltype.Float, a, i) *
+                      raw_storage_getitem(lltype.Float, b, i))
+                x1 = (raw_storage_getitem(lltype.Float, a, i + 8) *
+                      raw_storage_getitem(lltype.Float, b, i + 8))
+                raw_storage_setitem(a, i, x0)
+                raw_storage_setitem(a, i + 8, x1)
+                i += 16
+            res = 0.0
+            for i in range(n):
+                res = res * 0.5 + raw_storage_getitem(lltype.Float, a, i * 8)
+            free_raw_storage(a)
+            free_raw_storage(b)
+            return res
+        expected = f(40)
+        res = self.meta_interp(f, [40], vec=1)
+        assert res == expected
+        if self.CPUClass.vector_ext:
+            self.check_resops(vec_raw_float_mul=2, float_mul=0, raw_store=0)
+
 
 class TestRawMem(RawMemTests, LLJitMixin):
 
@@ -72,7 +72,7 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
                     inline=False, loop_longevity=0, retrace_limit=5,
                     function_threshold=4,
                     enable_opts=ALL_OPTS_NAMES, max_retrace_guards=15, 
-                    max_unroll_recursion=7, **kwds):
+                    max_unroll_recursion=7, vec=0, **kwds):
     from rpython.config.config import ConfigError
     translator = interp.typer.annotator.translator
     try:
@@ -95,6 +95,7 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
         jd.warmstate.set_param_max_retrace_guards(max_retrace_guards)
         jd.warmstate.set_param_enable_opts(enable_opts)
         jd.warmstate.set_param_max_unroll_recursion(max_unroll_recursion)
+        jd.warmstate.set_param_vec(vec)
     warmrunnerdesc.finish()
     if graph_and_interp_only:
         return interp, graph
@@ -146,6 +147,10 @@ def find_jit_merge_points(graphs):
 def find_access_helpers(graphs):
     return _find_jit_marker(graphs, 'access_helper', False)
 
+def find_jitcell_accesses(graphs):
+    # the jitdriver is given by name, so don't check it
+    return _find_jit_marker(graphs, 'trace_next_iteration', False)
+
 def locate_jit_merge_point(graph):
     [(graph, block, pos)] = find_jit_merge_points([graph])
     return block, pos, block.operations[pos]
@@ -191,8 +196,8 @@ class WarmRunnerDesc(object):
                  ProfilerClass=EmptyProfiler, **kwds):
         pyjitpl._warmrunnerdesc = self   # this is a global for debugging only!
         self.set_translator(translator)
-        self.memory_manager = memmgr.MemoryManager()
         self.build_cpu(CPUClass, **kwds)
+        self.memory_manager = memmgr.MemoryManager(self.cpu)
         self.inline_inlineable_portals()
         self.find_portals()
         self.codewriter = codewriter.CodeWriter(self.cpu, self.jitdrivers_sd)
@@ -230,6 +235,7 @@ class WarmRunnerDesc(object):
 
         verbose = False # not self.cpu.translate_support_code
         self.rewrite_access_helpers()
+        self.rewrite_jitcell_accesses()
         self.create_jit_entry_points()
         self.codewriter.make_jitcodes(verbose=verbose)
         self.rewrite_can_enter_jits()
@@ -681,6 +687,48 @@ class WarmRunnerDesc(object):
             op = block.operations[index]
             self.rewrite_access_helper(op)
 
+    def rewrite_jitcell_accesses(self):
+        jitdrivers_by_name = {}
+        for jd in self.jitdrivers_sd:
+            jitdrivers_by_name[jd.jitdriver.name] = jd
+        helpers = {}
+        for graph, block, index in find_jitcell_accesses(
+                self.translator.graphs):
+            op = block.operations[index]
+            jd = jitdrivers_by_name[op.args[1].value]
+            ARGS = [v.concretetype for v in op.args[2:]]
+            key = (jd, tuple(ARGS))
+            if key not in helpers:
+                helpers[key] = self.make_trace_next_iteration_helper(jd, ARGS)
+            op.opname = 'direct_call'
+            op.args = [helpers[key]] + op.args[2:]
+
+    def make_trace_next_iteration_helper(self, jd, ARGS):
+        JitCell = jd.warmstate.make_jitcell_subclass()
+        assert len(ARGS) == jd.num_green_args, (
+            "trace_next_iteration(%r) needs all the green args" %
+            (jd.jitdriver.name,))
+        d = {'JitCell': JitCell, 'lltype': lltype}
+        argnames = ', '.join(['arg%d' % i for i in range(len(ARGS))])
+        lines = ['def trace_next_iteration(%s):' % argnames]
+        for i, TYPE in enumerate(jd._green_args_spec):
+            if ARGS[i] == TYPE:
+                continue
+            d['TYPE%d' % i] = TYPE
+            if isinstance(TYPE, lltype.Ptr):
+                # GC pointers are passed around as GCREFs
+                lines.append('    arg%d = lltype.cast_opaque_ptr(TYPE%d, arg%d)'
+                             % (i, i, i))
+            else:
+                lines.append('    arg%d = lltype.cast_primitive(TYPE%d, arg%d)'
+                             % (i, i, i))
+        lines.append('    JitCell.trace_at_next_tick(%s)' % argnames)
+        exec compile('\n'.join(lines) + '\n', '<trace_next_iteration>',
+                     'exec') in d
+        FUNCPTR = lltype.Ptr(lltype.FuncType(ARGS, lltype.Void))
+        ptr = self.helper_func(FUNCPTR, d['trace_next_iteration'])
+        return Constant(ptr, FUNCPTR)
+
     def create_jit_entry_points(self):
         for func, args, result in all_jit_entrypoints:
             self.helper_func(lltype.Ptr(lltype.FuncType(args, result)), func)
@@ -130,6 +130,9 @@ JC_DONT_TRACE_HERE = 0x02
 JC_TEMPORARY       = 0x04
 JC_TRACING_OCCURRED= 0x08
 
+# the largest single-precision float that is still lower than 1.0
+ALMOST_ONE = 1.0 - 2.0 ** -24
+
 class BaseJitCell(object):
     """Subclasses of BaseJitCell are used in tandem with the single
     JitCounter instance to record places in the JIT-tracked user program
@@ -277,6 +280,12 @@ class WarmEnterState(object):
             self.warmrunnerdesc.memory_manager is not None):   # all for tests
             self.warmrunnerdesc.memory_manager.set_max_age(value)
 
+    def set_param_max_code_memory(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if (self.warmrunnerdesc is not None and
+            self.warmrunnerdesc.memory_manager is not None):   # all for tests
+            self.warmrunnerdesc.memory_manager.set_max_code_memory(value)
+
     def set_param_retrace_limit(self, value):
         if self.warmrunnerdesc:
             if self.warmrunnerdesc.memory_manager:
@@ -297,6 +306,9 @@ class WarmEnterState(object):
             if self.warmrunnerdesc.memory_manager:
                 self.warmrunnerdesc.memory_manager.max_unroll_recursion = value
 
+    def set_param_vec(self, value):
+        self.vec = value
+
     def disable_noninlinable_function(self, greenkey):
         cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
         cell.flags |= JC_DONT_TRACE_HERE
@@ -544,6 +556,14 @@ class WarmEnterState(object):
                 hash = JitCell.get_uhash(*greenargs)
                 jitcounter.change_current_fraction(hash, 0.98)
 
+            @staticmethod
+            def trace_at_next_tick(*greenargs):
+                # like trace_next_iteration(), but the very next tick()
+                # reaches the threshold, whatever its value is (unless
+                # it is disabled, in which case the increment is 0.0)
+                hash = JitCell.get_uhash(*greenargs)
+                jitcounter.change_current_fraction(hash, ALMOST_ONE)
+
             @staticmethod
             def ensure_jit_cell_at_key(greenkey):
                 greenargs = unwrap_greenkey(greenkey)
@@ -30,6 +30,9 @@ REGEXES = [
     (('total_compiled_bridges',), '^Total # of bridges:\s+(\d+)$'),
     (('total_freed_loops',),      '^Freed # of loops:\s+(\d+)$'),
     (('total_freed_bridges',),    '^Freed # of bridges:\s+(\d+)$'),
+    (('total_evicted_loops',),    '^Evicted # of loops:\s+(\d+)$'),
+    (('total_evicted_bridges',),  '^Evicted # of bridges:\s+(\d+)$'),
+    (('code_memory_used',),       '^Code memory used:\s+(\d+)$'),
     ]
 
 class Ops(object):
@@ -65,6 +65,9 @@ Total # of loops:       100
 Total # of bridges:     300
 Freed # of loops:       99
 Freed # of bridges:     299
+Evicted # of loops:     7
+Evicted # of bridges:   20
+Code memory used:       65536
 '''
 
 def test_parse():
@@ -88,3 +91,6 @@ def test_parse():
     assert info.nvirtuals == 13
     assert info.nvholes == 14
     assert info.nvreused == 15
+    assert info.total_evicted_loops == 7
+    assert info.total_evicted_bridges == 20
+    assert info.code_memory_used == 65536
@@ -23,7 +23,7 @@ class GCBase(object):
     gcflag_extra = 0   # or a real GC flag that is always 0 when not collecting
 
     def __init__(self, config, chunk_size=DEFAULT_CHUNK_SIZE,
-                 translated_to_c=True):
+                 translated_to_c=True, hooks=None):
         self.gcheaderbuilder = GCHeaderBuilder(self.HDR)
         self.AddressStack = get_address_stack(chunk_size)
         self.AddressDeque = get_address_deque(chunk_size)
@@ -32,6 +32,10 @@ class GCBase(object):
         self.config = config
         assert isinstance(translated_to_c, bool)
         self.translated_to_c = translated_to_c
+        if hooks is None:
+            from rpython.memory.gc.hook import GcHooks
+            hooks = GcHooks()     # no hook enabled
+        self.hooks = hooks
 
     def setup(self):
         # all runtime mutable values' setup should happen here
@@ -181,6 +185,23 @@ class GCBase(object):
     def set_max_heap_size(self, size):
         raise NotImplementedError
 
+    def get_param(self, index):
+        """Return the value of the tuning parameter 'index' (one of the
+        rgc.GC_PARAM_xxx), or -1.0 if this GC doesn't have it."""
+        return -1.0
+
+    def set_param(self, index, value):
+        """Change the tuning parameter 'index'.  Returns False if this GC
+        doesn't have it or if 'value' is out of range."""
+        return False
+
+    def collect_step(self):
+        """Do one step of the major collection; GCs that are not
+        incremental do a full collection.  Returns True if a major
+        collection was finished."""
+        self.collect()
+        return True
+
     def trace(self, obj, callback, arg):
         """Enumerate the locations inside the given obj that can contain
         GC pointers.  For each such location, callback(pointer, arg) is
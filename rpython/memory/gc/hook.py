@@ -0,0 +1,78 @@
+"""
+Hooks called by the GC on collection events.
+
+An instance of a subclass of GcHooks can be passed to the GC with the
+'hooks' argument; for a translated program, the target returns it from
+its get_gchooks() function.  The GC calls the on_gc_xxx() methods only
+if the corresponding is_gc_xxx_enabled() returns True.
+
+The hooks are called in the middle of a collection: they must not
+allocate GC objects or do anything that could trigger a collection.
+They can only record the numbers they receive and set some flags, and
+leave the real work for later.  The durations are in the units of
+rtimer.read_timestamp().
+
+The methods must be annotated together with the rest of the program,
+with annotate_hooks(): this is done by the translation driver.
+"""
+from rpython.rlib.nonconst import NonConstant
+from rpython.rlib.rarithmetic import r_uint
+from rpython.rlib.rtimer import read_timestamp
+
+
+class GcHooks(object):
+
+    def is_gc_minor_enabled(self):
+        return False
+
+    def is_gc_collect_step_enabled(self):
+        return False
+
+    def is_gc_collect_enabled(self):
+        return False
+
+    def on_gc_minor(self, duration, total_memory_used, surviving_bytes,
+                    pinned_objects, allocated_bytes):
+        """Called after a minor collection.  'surviving_bytes' were
+        copied out of the nursery, and 'pinned_objects' are still in it.
+        'allocated_bytes' is the part of the nursery that was used since
+        the previous minor collection.
+        """
+
+    def on_gc_collect_step(self, duration, oldstate, newstate):
+        """Called after each step of the incremental major collection;
+        'oldstate' and 'newstate' are indexes in incminimark.GC_STATES.
+        """
+
+    def on_gc_collect(self, num_major_collects,
+                      arenas_count_before, arenas_count_after,
+                      arenas_bytes, rawmalloc_bytes_before,
+                      rawmalloc_bytes_after):
+        """Called at the end of a major collection.  'arenas_bytes' is
+        the memory used by the objects in the arenas, and the 'before'
+        values are from the start of the major collection.
+        """
+
+
+def annotate_hooks(annotator, hooks):
+    """NOT_RPYTHON: annotate all the methods of 'hooks' with the types of
+    the arguments that the GC passes to them.  This must be done before
+    rtyping, because the GC itself is only annotated later, by the GC
+    transformer, when no method can be added to the classes any more.
+    """
+    def call_all_hooks():
+        # never called; the NonConstant(-42) are for signed integers
+        duration = read_timestamp()
+        if hooks.is_gc_minor_enabled():
+            hooks.on_gc_minor(duration, NonConstant(r_uint(42)),
+                              NonConstant(-42), NonConstant(-42),
+                              NonConstant(-42))
+        if hooks.is_gc_collect_step_enabled():
+            hooks.on_gc_collect_step(duration, NonConstant(-42),
+                                     NonConstant(-42))
+        if hooks.is_gc_collect_enabled():
+            hooks.on_gc_collect(NonConstant(-42), NonConstant(-42),
+                                NonConstant(-42), NonConstant(r_uint(42)),
+                                NonConstant(r_uint(42)),
+                                NonConstant(r_uint(42)))
+    annotator.build_types(call_all_hooks, [], complete_now=False)
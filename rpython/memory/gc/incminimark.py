@@ -52,6 +52,10 @@ Environment variables can be used to fine-tune the following parameters:
                          in time.  Defaults to a conservative value depending
                          on nursery size and maximum object size inside the
                          nursery.  Useful for debugging by setting it to 0.
+
+PYPY_GC_NURSERY, PYPY_GC_INCREMENT_STEP, PYPY_GC_MAJOR_COLLECT, PYPY_GC_MAX
+and PYPY_GC_MIN can also be changed while the program runs, with
+rgc.set_gc_param().
 """
 # XXX Should find a way to bound the major collection threshold by the
 # XXX total addressable size.  Maybe by keeping some minimarkpage arenas
@@ -72,6 +76,8 @@ from rpython.rlib.rarithmetic import ovfcheck, LONG_BIT, intmask, r_uint
 from rpython.rlib.rarithmetic import LONG_BIT_SHIFT
 from rpython.rlib.debug import ll_assert, debug_print, debug_start, debug_stop
 from rpython.rlib.objectmodel import specialize
+from rpython.rlib import rgc
+from rpython.rlib.rtimer import read_timestamp
 from rpython.memory.gc.minimarkpage import out_of_memory
 
 #
@@ -310,6 +316,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.nursery_free = llmemory.NULL
         self.nursery_top  = llmemory.NULL
         self.debug_tiny_nursery = -1
+        self.requested_nursery_size = 0
+        # for the 'before' values reported by the on_gc_collect() hook
+        self.stat_arenas_count = 0
+        self.stat_rawmalloced_total_size = r_uint(0)
         self.debug_rotating_nurseries = lltype.nullptr(NURSARRAY)
         self.extra_threshold = 0
         #
@@ -703,6 +713,15 @@ class IncrementalMiniMarkGC(MovingGCBase):
             self.minor_and_major_collection()
 
 
+    def collect_step(self):
+        """Do a minor collection and a single step of the major
+        collection, starting a new one if we are not in the middle of
+        one.  Returns True if this step finished a major collection."""
+        self.minor_collection()
+        self.major_collection_step()
+        return self.gc_state == STATE_SCANNING
+
+
     def collect_and_reserve(self, totalsize):
         """To call when nursery_free overflows nursery_top.
         First check if pinned objects are in front of nursery_top. If so,
@@ -942,6 +961,66 @@ class IncrementalMiniMarkGC(MovingGCBase):
             if self.max_heap_size < self.next_major_collection_threshold:
                 self.next_major_collection_threshold = self.max_heap_size
 
+    def get_param(self, index):
+        if index == rgc.GC_PARAM_NURSERY_SIZE:
+            if self.requested_nursery_size > 0:
+                return float(self.requested_nursery_size)
+            return float(self.nursery_size)
+        elif index == rgc.GC_PARAM_MAJOR_COLLECT:
+            return self.major_collection_threshold
+        elif index == rgc.GC_PARAM_INCREMENT_STEP:
+            return float(self.gc_increment_step)
+        elif index == rgc.GC_PARAM_MIN_HEAP_SIZE:
+            return self.min_heap_size
+        elif index == rgc.GC_PARAM_MAX_HEAP_SIZE:
+            return self.max_heap_size
+        return -1.0
+
+    def set_param(self, index, value):
+        # The new values are not applied retroactively: a new nursery
+        # size is used after the next minor collection; the others are
+        # used from the next step or the end of the next major collection.
+        if index == rgc.GC_PARAM_NURSERY_SIZE:
+            if value < 1.0 or self.debug_rotating_nurseries:
+                return False
+            newsize = int(value) & ~(WORD-1)
+            minsize = 2 * (self.nonlarge_max + 1)
+            if newsize < minsize:
+                newsize = minsize
+            if newsize == self.nursery_size:
+                newsize = 0
+            self.requested_nursery_size = newsize
+        elif index == rgc.GC_PARAM_MAJOR_COLLECT:
+            if value <= 1.0:
+                return False
+            self.major_collection_threshold = value
+        elif index == rgc.GC_PARAM_INCREMENT_STEP:
+            if value < 1.0:
+                return False
+            self.gc_increment_step = r_uint(int(value))
+        elif index == rgc.GC_PARAM_MIN_HEAP_SIZE:
+            if value < 0.0:
+                return False
+            self.min_heap_size = value
+        elif index == rgc.GC_PARAM_MAX_HEAP_SIZE:
+            if value < 0.0:
+                return False
+            self.set_max_heap_size(int(value))
+        else:
+            return False
+        return True
+
+    def _resize_nursery(self):
+        # called at the end of a minor collection that left no pinned
+        # object in the nursery, so that the nursery is really empty
+        llarena.arena_free(self.nursery)
+        self.nursery_size = self.requested_nursery_size
+        self.requested_nursery_size = 0
+        debug_start("gc-set-nursery-size")
+        debug_print("nursery size:", self.nursery_size)
+        self.nursery = self._alloc_nursery()
+        debug_stop("gc-set-nursery-size")
+
     def raw_malloc_memory_pressure(self, sizehint):
         # Decrement by 'sizehint' plus a very little bit extra.  This
         # is needed e.g. for _rawffi, which may allocate a lot of tiny
@@ -1527,6 +1606,26 @@ class IncrementalMiniMarkGC(MovingGCBase):
     def minor_collection(self):
         """Perform a minor collection: find the objects from the nursery
         that remain alive and move them out."""
+        if self.hooks.is_gc_minor_enabled():
+            # 'nursery_free' is NULL when called from collect_and_reserve(),
+            # i.e. when the nursery is full
+            if self.nursery_free != llmemory.NULL:
+                allocated_bytes = self.nursery_free - self.nursery
+            else:
+                allocated_bytes = self.nursery_top - self.nursery
+            start = read_timestamp()
+            self._minor_collection()
+            duration = read_timestamp() - start
+            self.hooks.on_gc_minor(
+                duration=duration,
+                total_memory_used=self.get_total_memory_used(),
+                surviving_bytes=self.nursery_surviving_size,
+                pinned_objects=self.pinned_objects_in_nursery,
+                allocated_bytes=allocated_bytes)
+        else:
+            self._minor_collection()
+
+    def _minor_collection(self):
         #
         debug_start("gc-minor")
         #
@@ -1673,6 +1772,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
         else:
             llarena.arena_reset(prev, self.nursery + self.nursery_size - prev, 0)
         #
+        # if the nursery is now empty, it can be reallocated with the size
+        # requested by set_param()
+        if (self.requested_nursery_size > 0 and
+                self.pinned_objects_in_nursery == 0):
+            self._resize_nursery()
+        #
         # always add the end of the nursery to the list
         nursery_barriers.append(self.nursery + self.nursery_size)
         #
@@ -2061,6 +2166,19 @@ class IncrementalMiniMarkGC(MovingGCBase):
     # Note - minor collections seem fast enough so that one
     # is done before every major collection step
     def major_collection_step(self, reserving_size=0):
+        if self.hooks.is_gc_collect_step_enabled():
+            oldstate = self.gc_state
+            start = read_timestamp()
+            self._major_collection_step(reserving_size)
+            duration = read_timestamp() - start
+            self.hooks.on_gc_collect_step(
+                duration=duration,
+                oldstate=oldstate,
+                newstate=self.gc_state)
+        else:
+            self._major_collection_step(reserving_size)
+
+    def _major_collection_step(self, reserving_size):
         debug_start("gc-collect-step")
         debug_print("starting gc state: ", GC_STATES[self.gc_state])
         # Debugging checks
@@ -2133,6 +2251,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 if self.old_objects_with_light_finalizers.non_empty():
                     self.deal_with_old_objects_with_finalizers()
                 # objects_to_trace processed fully, can move on to sweeping
+                self.stat_arenas_count = self.ac.arenas_count
+                self.stat_rawmalloced_total_size = self.rawmalloced_total_size
                 self.ac.mass_free_prepare()
                 self.start_free_rawmalloc_objects()
                 #
@@ -2172,6 +2292,15 @@ class IncrementalMiniMarkGC(MovingGCBase):
             #
             if done:
                 self.num_major_collects += 1
+                if self.hooks.is_gc_collect_enabled():
+                    self.hooks.on_gc_collect(
+                        num_major_collects=self.num_major_collects,
+                        arenas_count_before=self.stat_arenas_count,
+                        arenas_count_after=self.ac.arenas_count,
+                        arenas_bytes=self.ac.total_memory_used,
+                        rawmalloc_bytes_before=
+                            self.stat_rawmalloced_total_size,
+                        rawmalloc_bytes_after=self.rawmalloced_total_size)
                 #
                 # We also need to reset the GCFLAG_VISITED on prebuilt GC objects.
                 self.prebuilt_root_objects.foreach(self._reset_gcflag_visited, None)
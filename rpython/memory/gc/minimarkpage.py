@@ -140,6 +140,9 @@ class ArenaCollection(object):
         # the total memory used, counting every block in use, without
         # the additional bookkeeping stuff.
         self.total_memory_used = r_uint(0)
+        #
+        # the number of arenas currently allocated
+        self.arenas_count = 0
 
 
     def _new_page_ptr_list(self, length):
@@ -295,6 +298,7 @@ class ArenaCollection(object):
         arena_base = llarena.arena_malloc(self.arena_size, False)
         if not arena_base:
             out_of_memory("out of memory: couldn't allocate the next arena")
+        self.arenas_count += 1
         arena_end = arena_base + self.arena_size
         #
         # 'firstpage' points to the first unused page
@@ -397,6 +401,7 @@ class ArenaCollection(object):
                     # The whole arena is empty.  Free it.
                     llarena.arena_free(arena.base)
                     lltype.free(arena, flavor='raw', track_allocation=False)
+                    self.arenas_count -= 1
                     #
                 else:
                     # Insert 'arena' in the correct arenas_lists[n]
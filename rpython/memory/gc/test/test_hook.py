@@ -0,0 +1,107 @@
+from rpython.rtyper.lltypesystem import llmemory
+from rpython.memory.gc.hook import GcHooks
+from rpython.memory.gc.test.test_direct import BaseDirectGCTest, S
+from rpython.memory.gc import incminimark
+
+
+class MyGcHooks(GcHooks):
+
+    def __init__(self):
+        self._gc_minor_enabled = False
+        self._gc_collect_step_enabled = False
+        self._gc_collect_enabled = False
+        self.reset()
+
+    def is_gc_minor_enabled(self):
+        return self._gc_minor_enabled
+
+    def is_gc_collect_step_enabled(self):
+        return self._gc_collect_step_enabled
+
+    def is_gc_collect_enabled(self):
+        return self._gc_collect_enabled
+
+    def reset(self):
+        self.minors = []
+        self.steps = []
+        self.collects = []
+
+    def on_gc_minor(self, duration, total_memory_used, surviving_bytes,
+                    pinned_objects, allocated_bytes):
+        assert duration >= 0
+        self.minors.append({
+            'total_memory_used': total_memory_used,
+            'surviving_bytes': surviving_bytes,
+            'pinned_objects': pinned_objects,
+            'allocated_bytes': allocated_bytes})
+
+    def on_gc_collect_step(self, duration, oldstate, newstate):
+        assert duration >= 0
+        self.steps.append((oldstate, newstate))
+
+    def on_gc_collect(self, num_major_collects,
+                      arenas_count_before, arenas_count_after,
+                      arenas_bytes, rawmalloc_bytes_before,
+                      rawmalloc_bytes_after):
+        self.collects.append({
+            'num_major_collects': num_major_collects,
+            'arenas_count_before': arenas_count_before,
+            'arenas_count_after': arenas_count_after,
+            'arenas_bytes': arenas_bytes,
+            'rawmalloc_bytes_before': rawmalloc_bytes_before,
+            'rawmalloc_bytes_after': rawmalloc_bytes_after})
+
+
+class TestIncMiniMarkHooks(BaseDirectGCTest):
+    from rpython.memory.gc.incminimark import IncrementalMiniMarkGC as GCClass
+
+    def setup_method(self, m):
+        BaseDirectGCTest.setup_method(self, m)
+        self.gc.hooks = MyGcHooks()
+        size = self.gc.fixed_size(self.get_type_id(S))
+        self.size_of_S = llmemory.raw_malloc_usage(
+            self.gc.gcheaderbuilder.size_gc_header + size)
+
+    def test_default_hooks(self):
+        hooks = GcHooks()
+        assert not hooks.is_gc_minor_enabled()
+        assert not hooks.is_gc_collect_step_enabled()
+        assert not hooks.is_gc_collect_enabled()
+
+    def test_on_gc_minor(self):
+        self.gc.hooks._gc_minor_enabled = True
+        self.stackroots.append(self.malloc(S))
+        self.gc.collect(0)
+        self.stackroots.append(self.malloc(S))
+        self.malloc(S)
+        self.gc.collect(0)
+        minors = self.gc.hooks.minors
+        assert len(minors) == 2
+        assert minors[0]['surviving_bytes'] == self.size_of_S
+        assert minors[1]['surviving_bytes'] == self.size_of_S
+        assert minors[0]['allocated_bytes'] == self.size_of_S
+        assert minors[1]['allocated_bytes'] == 2 * self.size_of_S
+        assert minors[1]['total_memory_used'] >= 2 * self.size_of_S
+        assert minors[1]['pinned_objects'] == 0
+        # disabled hooks are not called
+        self.gc.hooks._gc_minor_enabled = False
+        self.gc.collect(0)
+        assert len(self.gc.hooks.minors) == 2
+
+    def test_on_gc_collect_step_and_collect(self):
+        self.gc.hooks._gc_collect_step_enabled = True
+        self.gc.hooks._gc_collect_enabled = True
+        self.stackroots.append(self.malloc(S))
+        self.gc.collect()
+        steps = self.gc.hooks.steps
+        assert len(steps) >= 3
+        assert steps[0][0] == incminimark.STATE_SCANNING
+        assert steps[-1][1] == incminimark.STATE_SCANNING
+        for i in range(1, len(steps)):
+            assert steps[i][0] == steps[i-1][1]
+        [collect] = self.gc.hooks.collects
+        assert collect['num_major_collects'] == 1
+        assert collect['arenas_count_after'] == self.gc.ac.arenas_count
+        assert collect['arenas_count_after'] >= 1
+        assert collect['arenas_bytes'] == self.size_of_S
+        assert collect['rawmalloc_bytes_after'] == 0
@@ -177,7 +177,10 @@ class BaseFrameworkGCTransformer(GCTransformer):
         self.gcdata = gcdata
         self.malloc_fnptr_cache = {}
 
-        gcdata.gc = GCClass(translator.config.translation, **GC_PARAMS)
+        # the GcHooks instance given by the target, if any
+        gchooks = getattr(translator, '_gchooks', None)
+        gcdata.gc = GCClass(translator.config.translation, hooks=gchooks,
+                            **GC_PARAMS)
         root_walker = self.build_root_walker()
         root_walker.finished_minor_collection_func = finished_minor_collection
         self.root_walker = root_walker
@@ -472,6 +475,15 @@ class BaseFrameworkGCTransformer(GCTransformer):
                                            [s_gc,
                                             annmodel.SomeInteger(nonneg=True)],
                                            annmodel.s_None)
+        self.get_param_ptr = getfn(GCClass.get_param.im_func,
+                                   [s_gc, annmodel.SomeInteger()],
+                                   annmodel.SomeFloat())
+        self.set_param_ptr = getfn(GCClass.set_param.im_func,
+                                   [s_gc, annmodel.SomeInteger(),
+                                    annmodel.SomeFloat()],
+                                   annmodel.SomeBool())
+        self.collect_step_ptr = getfn(GCClass.collect_step.im_func, [s_gc],
+                                      annmodel.SomeBool())
 
         if GCClass.can_usually_pin_objects:
             self.pin_ptr = getfn(GCClass.pin,
@@ -785,6 +797,13 @@ class BaseFrameworkGCTransformer(GCTransformer):
                   resultvar=op.result)
         self.pop_roots(hop, livevars)
 
+    def gct_gc__collect_step(self, hop):
+        op = hop.spaceop
+        livevars = self.push_roots(hop)
+        hop.genop("direct_call", [self.collect_step_ptr, self.c_const_gc],
+                  resultvar=op.result)
+        self.pop_roots(hop, livevars)
+
     def gct_gc_can_move(self, hop):
         op = hop.spaceop
         v_addr = hop.genop('cast_ptr_to_adr',
@@ -1090,6 +1109,18 @@ class BaseFrameworkGCTransformer(GCTransformer):
                                   self.c_const_gc,
                                   v_size])
 
+    def gct_gc_get_param(self, hop):
+        [v_index] = hop.spaceop.args
+        hop.genop("direct_call", [self.get_param_ptr, self.c_const_gc,
+                                  v_index],
+                  resultvar=hop.spaceop.result)
+
+    def gct_gc_set_param(self, hop):
+        [v_index, v_value] = hop.spaceop.args
+        hop.genop("direct_call", [self.set_param_ptr, self.c_const_gc,
+                                  v_index, v_value],
+                  resultvar=hop.spaceop.result)
+
     def gct_gc_pin(self, hop):
         if not hasattr(self, 'pin_ptr'):
             c_false = rmodel.inputconst(lltype.Bool, False)
@@ -126,6 +126,15 @@ class GCManagedHeap(object):
     def collect(self, *gen):
         self.gc.collect(*gen)
 
+    def collect_step(self):
+        return self.gc.collect_step()
+
+    def get_gc_param(self, index):
+        return self.gc.get_param(index)
+
+    def set_gc_param(self, index, value):
+        return self.gc.set_param(index, value)
+
     def can_move(self, addr):
         return self.gc.can_move(addr)
 
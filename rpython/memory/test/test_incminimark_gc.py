@@ -91,3 +91,50 @@ class TestIncrementalMiniMarkGC(test_minimark_gc.TestMiniMarkGC):
             return ref() is b
         res = self.interpret(f, [])
         assert res == True
+
+    def test_collect_step(self):
+        class A(object):
+            pass
+        def f():
+            a = A()
+            a.x = 42
+            llop.gc__collect(lltype.Void)
+            steps = 1
+            while not rgc.collect_step():    # finish a new major cycle
+                steps += 1
+            return a.x * 1000 + steps
+        res = self.interpret(f, [])
+        assert res // 1000 == 42
+        assert res % 1000 > 1
+
+    def test_gc_params(self):
+        class A(object):
+            pass
+        def f():
+            assert rgc.set_gc_param(rgc.GC_PARAM_MAJOR_COLLECT, 3.0)
+            assert rgc.get_gc_param(rgc.GC_PARAM_MAJOR_COLLECT) == 3.0
+            assert not rgc.set_gc_param(rgc.GC_PARAM_MAJOR_COLLECT, 0.5)
+            assert rgc.set_gc_param(rgc.GC_PARAM_INCREMENT_STEP, 1000.0)
+            assert rgc.get_gc_param(rgc.GC_PARAM_INCREMENT_STEP) == 1000.0
+            assert rgc.get_gc_param(42) == -1.0
+            assert not rgc.set_gc_param(42, 1.0)
+            #
+            # the new nursery size is used after the next minor collection
+            old = rgc.get_gc_param(rgc.GC_PARAM_NURSERY_SIZE)
+            assert rgc.set_gc_param(rgc.GC_PARAM_NURSERY_SIZE, old * 2)
+            assert rgc.get_gc_param(rgc.GC_PARAM_NURSERY_SIZE) == old * 2
+            a = A()
+            a.x = 5
+            llop.gc__collect(lltype.Void, 0)
+            lst = []
+            for i in range(100):
+                b = A()
+                b.x = i
+                lst.append(b)
+            llop.gc__collect(lltype.Void)
+            total = a.x
+            for b in lst:
+                total += b.x
+            return total
+        res = self.interpret(f, [])
+        assert res == 5 + 4950
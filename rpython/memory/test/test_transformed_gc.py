@@ -11,6 +11,7 @@ from rpython.rtyper.lltypesystem.lloperation import llop, void
 from rpython.rlib.objectmodel import compute_unique_id, we_are_translated
 from rpython.rlib.debug import ll_assert
 from rpython.rlib import rgc
+from rpython.memory.gc.hook import GcHooks
 from rpython.conftest import option
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.rarithmetic import LONG_BIT
@@ -20,7 +21,7 @@ WORD = LONG_BIT // 8
 
 
 def rtype(func, inputtypes, specialize=True, gcname='ref',
-          backendopt=False, **extraconfigopts):
+          backendopt=False, gchooks=None, **extraconfigopts):
     from rpython.translator.translator import TranslationContext
     t = TranslationContext()
     # XXX XXX XXX mess
@@ -28,6 +29,10 @@ def rtype(func, inputtypes, specialize=True, gcname='ref',
     t.config.translation.gcremovetypeptr = True
     t.config.set(**extraconfigopts)
     ann = t.buildannotator()
+    if gchooks is not None:
+        from rpython.memory.gc.hook import annotate_hooks
+        t._gchooks = gchooks
+        annotate_hooks(ann, gchooks)
     ann.build_types(func, inputtypes)
 
     if specialize:
@@ -45,6 +50,7 @@ class GCTest(object):
     gcpolicy = None
     GC_CAN_MOVE = False
     taggedpointers = False
+    gchooks = None
 
     def setup_class(cls):
         cls.marker = lltype.malloc(rffi.CArray(lltype.Signed), 1,
@@ -102,7 +108,7 @@ class GCTest(object):
 
         s_args = SomePtr(lltype.Ptr(ARGS))
         t = rtype(entrypoint, [s_args], gcname=cls.gcname,
-                  taggedpointers=cls.taggedpointers)
+                  taggedpointers=cls.taggedpointers, gchooks=cls.gchooks)
 
         for fixup in mixlevelstuff:
             if fixup:
@@ -1297,6 +1303,84 @@ class TestIncrementalMiniMarkGC(TestMiniMarkGC):
         res = run([])
         assert res
 
+    def define_gc_params_and_collect_step(cls):
+        class A(object):
+            pass
+        def f():
+            ok = rgc.set_gc_param(rgc.GC_PARAM_INCREMENT_STEP, 100.0)
+            ok &= rgc.get_gc_param(rgc.GC_PARAM_INCREMENT_STEP) == 100.0
+            size = rgc.get_gc_param(rgc.GC_PARAM_NURSERY_SIZE)
+            ok &= rgc.set_gc_param(rgc.GC_PARAM_NURSERY_SIZE, size * 2)
+            a = A()
+            a.x = 5
+            steps = 1
+            while not rgc.collect_step():
+                steps += 1
+            ok &= rgc.get_gc_param(rgc.GC_PARAM_NURSERY_SIZE) == size * 2
+            ok &= a.x == 5
+            return ok and steps > 1
+        return f
+
+    def test_gc_params_and_collect_step(self):
+        run = self.runner("gc_params_and_collect_step")
+        res = run([])
+        assert res
+
+
+class MyGcHooks(GcHooks):
+
+    def __init__(self):
+        self.enabled = False
+        self.minors = 0
+        self.steps = 0
+        self.collects = 0
+
+    def is_gc_minor_enabled(self):
+        return self.enabled
+
+    def is_gc_collect_step_enabled(self):
+        return self.enabled
+
+    def is_gc_collect_enabled(self):
+        return self.enabled
+
+    def on_gc_minor(self, duration, total_memory_used, surviving_bytes,
+                    pinned_objects, allocated_bytes):
+        self.minors += 1
+
+    def on_gc_collect_step(self, duration, oldstate, newstate):
+        self.steps += 1
+
+    def on_gc_collect(self, num_major_collects,
+                      arenas_count_before, arenas_count_after,
+                      arenas_bytes, rawmalloc_bytes_before,
+                      rawmalloc_bytes_after):
+        self.collects += 1
+
+
+class TestIncrementalMiniMarkGCHooks(GCTest):
+    gcname = "incminimark"
+    gcpolicy = TestIncrementalMiniMarkGC.gcpolicy
+    gchooks = MyGcHooks()
+
+    def define_gc_hooks(cls):
+        gchooks = cls.gchooks
+        def f():
+            gchooks.minors = gchooks.steps = gchooks.collects = 0
+            gchooks.enabled = True
+            llop.gc__collect(lltype.Void)
+            gchooks.enabled = False
+            return (gchooks.minors * 10000 + gchooks.steps * 100 +
+                    gchooks.collects)
+        return f
+
+    def test_gc_hooks(self):
+        run = self.runner("gc_hooks")
+        res = run([])
+        assert res // 10000 >= 1            # minor collections
+        assert (res // 100) % 100 >= 3      # steps of the major collection
+        assert res % 100 == 1               # one major collection
+
 # ________________________________________________________________
 # tagged pointers
 
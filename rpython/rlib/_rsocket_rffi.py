@@ -161,7 +161,7 @@ IP_MULTICAST_LOOP IP_MULTICAST_TTL IP_OPTIONS IP_RECVDSTADDR IP_RECVOPTS
 IP_RECVRETOPTS IP_RETOPTS IP_TOS IP_TTL
 
 MSG_BTAG MSG_ETAG MSG_CTRUNC MSG_DONTROUTE MSG_DONTWAIT MSG_EOR MSG_OOB
-MSG_PEEK MSG_TRUNC MSG_WAITALL
+MSG_PEEK MSG_TRUNC MSG_WAITALL MSG_WAITFORONE
 
 NI_DGRAM NI_MAXHOST NI_MAXSERV NI_NAMEREQD NI_NOFQDN NI_NUMERICHOST
 NI_NUMERICSERV
@@ -586,6 +586,115 @@ if _POSIX:
         ioctl = external('ioctl', [socketfd_type, rffi.INT, lltype.Ptr(ifreq)],
                          rffi.INT)
 
+# recvmmsg() and sendmmsg() transfer several datagrams with a single system
+# call.  The wrappers take one buffer per datagram and an optional array
+# of addresses, each 'addrsize' bytes long, and hide the mmsghdr structures.
+HAVE_MMSG = sys.platform.startswith('linux')
+MMSG_MAX = 1024      # UIO_MAXIOV, the kernel's limit on vlen
+
+if HAVE_MMSG:
+    mmsg_eci = ExternalCompilationInfo(
+        includes=['sys/socket.h'],
+        post_include_bits=[
+            'RPY_EXTERN int pypy_recvmmsg(int, char **, long *, int, int, '
+                                         'char *, int, int *);',
+            'RPY_EXTERN int pypy_sendmmsg(int, char **, long *, int, int, '
+                                         'char *, int, int *);'],
+        separate_module_sources=['''
+            #include <errno.h>
+            #include <stddef.h>
+            #include <stdlib.h>
+            #include <string.h>
+            #include <sys/socket.h>
+            #include <sys/uio.h>
+
+            #define PYPY_MMSG_MAX %(MMSG_MAX)d
+            /* larger batches take their arrays from malloc(), to keep
+               the C stack small in threads with a small stack_size() */
+            #define PYPY_MMSG_STACK 16
+
+            static int pypy_do_mmsg(int send, int fd, char **bufs,
+                                    long *lens, int vlen, int flags,
+                                    char *addrs, int addrsize,
+                                    int *addrlens)
+            {
+                struct mmsghdr stack_msgs[PYPY_MMSG_STACK];
+                struct iovec stack_iovs[PYPY_MMSG_STACK];
+                struct mmsghdr *msgs = stack_msgs;
+                struct iovec *iovs = stack_iovs;
+                int i, res, saved_errno;
+                if (vlen > PYPY_MMSG_MAX)
+                    vlen = PYPY_MMSG_MAX;
+                if (vlen > PYPY_MMSG_STACK) {
+                    msgs = malloc(vlen * sizeof(struct mmsghdr));
+                    iovs = malloc(vlen * sizeof(struct iovec));
+                    if (msgs == NULL || iovs == NULL) {
+                        free(msgs);
+                        free(iovs);
+                        errno = ENOMEM;
+                        return -1;
+                    }
+                }
+                memset(msgs, 0, vlen * sizeof(struct mmsghdr));
+                for (i = 0; i < vlen; i++) {
+                    iovs[i].iov_base = bufs[i];
+                    iovs[i].iov_len = lens[i];
+                    msgs[i].msg_hdr.msg_iov = &iovs[i];
+                    msgs[i].msg_hdr.msg_iovlen = 1;
+                    if (addrs != NULL) {
+                        msgs[i].msg_hdr.msg_name = addrs + i * addrsize;
+                        msgs[i].msg_hdr.msg_namelen = addrlens[i];
+                    }
+                }
+                if (send)
+                    res = sendmmsg(fd, msgs, vlen, flags);
+                else
+                    res = recvmmsg(fd, msgs, vlen, flags, NULL);
+                for (i = 0; i < res; i++) {
+                    lens[i] = msgs[i].msg_len;
+                    if (!send && addrs != NULL)
+                        addrlens[i] = msgs[i].msg_hdr.msg_namelen;
+                }
+                if (msgs != stack_msgs) {
+                    saved_errno = errno;
+                    free(msgs);
+                    free(iovs);
+                    errno = saved_errno;
+                }
+                return res;
+            }
+
+            /* on return, lens[i] and addrlens[i] are the sizes of
+               the i-th datagram and of its source address */
+            RPY_EXTERN int pypy_recvmmsg(int fd, char **bufs, long *lens,
+                                         int vlen, int flags,
+                                         char *addrs, int addrsize,
+                                         int *addrlens)
+            {
+                return pypy_do_mmsg(0, fd, bufs, lens, vlen, flags,
+                                    addrs, addrsize, addrlens);
+            }
+
+            /* on return, lens[i] is the number of bytes sent from
+               the i-th buffer */
+            RPY_EXTERN int pypy_sendmmsg(int fd, char **bufs, long *lens,
+                                         int vlen, int flags,
+                                         char *addrs, int addrsize,
+                                         int *addrlens)
+            {
+                return pypy_do_mmsg(1, fd, bufs, lens, vlen, flags,
+                                    addrs, addrsize, addrlens);
+            }
+        ''' % {'MMSG_MAX': MMSG_MAX}])
+    mmsg_args = [socketfd_type, rffi.CCHARPP, rffi.LONGP, rffi.INT, rffi.INT,
+                 rffi.CCHARP, rffi.INT, rffi.INTP]
+    recvmmsg = rffi.llexternal('pypy_recvmmsg', mmsg_args, rffi.INT,
+                               compilation_info=mmsg_eci,
+                               save_err=SAVE_ERR)
+    sendmmsg = rffi.llexternal('pypy_sendmmsg', mmsg_args, rffi.INT,
+                               compilation_info=mmsg_eci,
+                               save_err=SAVE_ERR)
+
 if _WIN32:
     ioctlsocket = external('ioctlsocket',
                            [socketfd_type, rffi.LONG, rffi.ULONGP],
@@ -546,12 +546,17 @@ PARAMETER_DOCS = {
     'trace_limit': 'number of recorded operations before we abort tracing with ABORT_TOO_LONG',
     'inlining': 'inline python functions or not (1/0)',
     'loop_longevity': 'a parameter controlling how long loops will be kept before being freed, an estimate',
+    'max_code_memory': 'maximum number of bytes of machine code; above it, the least recently entered loops are freed with their bridges (0=no limit)',
     'retrace_limit': 'how many times we can try retracing before giving up',
     'max_retrace_guards': 'number of extra guards a retrace can cause',
     'max_unroll_loops': 'number of extra unrollings a loop can cause',
     'enable_opts': 'INTERNAL USE ONLY (MAY NOT WORK OR LEAD TO CRASHES): '
                    'optimizations to enable, or all = %s' % ENABLE_ALL_OPTS,
-    'max_unroll_recursion': 'how many levels deep to unroll a recursive function'
+    'max_unroll_recursion': 'how many levels deep to unroll a recursive function',
+    'vec': 'pack pairs of float operations on adjacent doubles in raw '
+           'memory into SSE instructions, if the backend supports it; '
+           'loops are not unrolled, so only hand-unrolled kernels '
+           'benefit (1/0)',
     }
 
 PARAMETERS = {'threshold': 1039, # just above 1024, prime
@@ -561,11 +566,13 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'trace_limit': 6000,
               'inlining': 1,
               'loop_longevity': 1000,
+              'max_code_memory': 0,
               'retrace_limit': 5,
               'max_retrace_guards': 15,
               'max_unroll_loops': 0,
               'enable_opts': 'all',
               'max_unroll_recursion': 7,
+              'vec': 0,
               }
 unroll_parameters = unrolling_iterable(PARAMETERS.items())
 
@@ -1156,6 +1163,9 @@ class Counters(object):
     TOTAL_COMPILED_BRIDGES
     TOTAL_FREED_LOOPS
     TOTAL_FREED_BRIDGES
+    TOTAL_EVICTED_LOOPS
+    TOTAL_EVICTED_BRIDGES
+    CODE_MEMORY_USED
     """
 
     counter_names = []
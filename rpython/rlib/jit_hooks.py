@@ -140,3 +140,35 @@ LOOP_RUN_CONTAINER = lltype.GcArray(lltype.Struct('elem',
 @register_helper(lltype.Ptr(LOOP_RUN_CONTAINER))
 def stats_get_loop_run_times(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.get_all_loop_runs()
+
+# ------------------------- jitcell interface -------------------------
+
+def _new_hook(name, resulttype):
+    def hook(name, *greenkey):
+        # untranslated, or translated without the JIT: nothing to do
+        return None
+    hook.func_name = name
+
+    class Entry(ExtRegistryEntry):
+        _about_ = hook
+
+        def compute_result_annotation(self, s_name, *args_s):
+            assert s_name.is_constant()
+            return resulttype
+
+        def specialize_call(self, hop):
+            from rpython.flowspace.model import Constant
+            c_name = Constant(name, concretetype=lltype.Void)
+            c_jitdriver = Constant(hop.args_s[0].const,
+                                   concretetype=lltype.Void)
+            args_v = [hop.inputarg(arg, arg=i + 1)
+                      for i, arg in enumerate(hop.args_r[1:])]
+            hop.exception_cannot_occur()
+            return hop.genop('jit_marker', [c_name, c_jitdriver] + args_v,
+                             resulttype=hop.r_result)
+    return hook
+
+# trace_next_iteration(jitdriver_name, *greenargs): make the JIT start
+# tracing the next time it reaches the given greenkey, as if the counter
+# had already reached its threshold.  GC pointers must be passed as GCREFs.
+trace_next_iteration = _new_hook('trace_next_iteration', annmodel.s_None)
@@ -83,6 +83,32 @@ else:
 
 KARATSUBA_SQUARE_CUTOFF = 2 * KARATSUBA_CUTOFF
 
+# Toom-Cook 3-way is O(N**1.465).  It replaces Karatsuba when both
+# operands contain more than TOOMCOOK_CUTOFF digits.
+
+if SHIFT > 31:
+    TOOMCOOK_CUTOFF = 150
+else:
+    TOOMCOOK_CUTOFF = 300
+
+# For division, use the O(N**2) school algorithm unless both the divisor
+# and the quotient contain at least DIV_LIMIT digits.  Then use the
+# recursive algorithm of Burnikel and Ziegler, which costs about as much
+# as a few multiplications of the same size.
+
+if SHIFT > 31:
+    DIV_LIMIT = 60
+else:
+    DIV_LIMIT = 120
+
+# Strings of more than FROMSTR_CUTOFF digits are turned into a bigint
+# by splitting them recursively in two halves and combining the results
+# with a multiplication, instead of processing one digit at a time.
+
+FROMSTR_CUTOFF = 1000
+
+# The cutoffs above are tuned with rpython/rlib/test/targetbigintcutoffs.py.
+
 # For exponentiation, use the binary left-to-right algorithm
 # unless the exponent contains more than FIVEARY_CUTOFF digits.
 # In that case, do 5 bits at a time.  The potential drawback is that
@@ -286,6 +312,16 @@ class rbigint(object):
 
     @staticmethod
     def _from_numberstring_parser(parser):
+        if parser.n - parser.i > FROMSTR_CUTOFF:
+            digits = []
+            while True:
+                digit = parser.next_digit()
+                if digit < 0:
+                    break
+                digits.append(digit)
+            a = _digits_to_bigint(digits, parser.base)
+            a.sign *= parser.sign
+            return a
         return parse_digit_string(parser)
 
     @staticmethod
@@ -714,6 +750,8 @@ class rbigint(object):
                 result = _x_mul(a, b)
                 """elif 2 * asize <= bsize:
                     result = _k_lopsided_mul(a, b)"""
+            elif asize > TOOMCOOK_CUTOFF:
+                result = _tc_mul(a, b)
             else:
                 result = _k_mul(a, b)
         else:
@@ -1818,6 +1856,113 @@ def _k_lopsided_mul(a, b):
     ret._normalize()
     return ret
 
+def _tcmul_split(n, size):
+    """
+    A helper for Toom-Cook multiplication (tc_mul).
+    Takes a bigint "n" and an integer "size" representing the place to
+    split, and sets low, mid and high such that
+    abs(n) == (high << 2*size) + (mid << size) + low, viewing the shifts
+    as being by digits.  The sign bit is ignored, and the return values
+    are >= 0.
+    """
+    size_n = n.numdigits()
+    size_lo = min(size_n, size)
+    size_mid = min(size_n, 2 * size)
+
+    lo = rbigint(n._digits[:size_lo] or [NULLDIGIT], 1)
+    mid = rbigint(n._digits[size_lo:size_mid] or [NULLDIGIT], 1)
+    hi = rbigint(n._digits[size_mid:n.size] or [NULLDIGIT], 1)
+    lo._normalize()
+    mid._normalize()
+    hi._normalize()
+    return hi, mid, lo
+
+def _tc_divexact3(x):
+    """Divide 'x' by 3, keeping its sign.  The division must be exact."""
+    if x.sign == 0:
+        return x
+    z, rem = _divrem1(x, 3)
+    assert rem == 0
+    z.sign = x.sign
+    return z
+
+def _tc_mul(a, b):
+    """
+    Toom-Cook 3-way multiplication.  Ignores the input signs, and returns
+    the absolute value of the product (or raises if error).
+    See Bodrato and Zanoni, "Integer and Polynomial Multiplication:
+    Towards Optimal Toom-Cook Matrices" (ISSAC 2007).
+    """
+    asize = a.numdigits()
+    bsize = b.numdigits()
+
+    # Split a and b in three pieces of 'shift' digits, and view them as
+    # the polynomials a(x) = a2*x**2 + a1*x + a0 and b(x) similarly,
+    # with x = BASE**shift.  The product r(x) = a(x)*b(x) has degree 4:
+    # it is found from its values at the points 0, 1, -1, -2 and
+    # infinity, which only need 5 multiplications of a third of the size.
+    shift = (bsize + 2) // 3
+    a2, a1, a0 = _tcmul_split(a, shift)
+    if a1.sign == 0 and a2.sign == 0:
+        # lopsided operands, 'a' fits in a single piece
+        return _k_mul(a, b)
+
+    if a is b:
+        b2 = a2
+        b1 = a1
+        b0 = a0
+    else:
+        b2, b1, b0 = _tcmul_split(b, shift)
+
+    # Evaluation.
+    p = a0.add(a2)
+    pa1 = p.add(a1)
+    pam1 = p.sub(a1)
+    pam2 = pam1.add(a2).lshift(1).sub(a0)
+    if a is b:
+        pb1 = pa1
+        pbm1 = pam1
+        pbm2 = pam2
+    else:
+        p = b0.add(b2)
+        pb1 = p.add(b1)
+        pbm1 = p.sub(b1)
+        pbm2 = pbm1.add(b2).lshift(1).sub(b0)
+
+    # Pointwise multiplication.
+    v0 = a0.mul(b0)
+    v1 = pa1.mul(pb1)
+    vm1 = pam1.mul(pbm1)
+    vm2 = pam2.mul(pbm2)
+    vinf = a2.mul(b2)
+
+    # Interpolation, with the sequence of Bodrato: the divisions by 2
+    # and 3 are exact.
+    r3 = _tc_divexact3(vm2.sub(v1))
+    r1 = v1.sub(vm1).rshift(1)
+    r2 = vm1.sub(v0)
+    r3 = r2.sub(r3).rshift(1).add(vinf.lshift(1))
+    r2 = r2.add(r1).sub(vinf)
+    r1 = r1.sub(r3)
+
+    # Recomposition.  All the coefficients of r(x) are >= 0, and adding
+    # them at their place never runs out of the asize + bsize digits
+    # because the final result fits.
+    ret = rbigint([NULLDIGIT] * (asize + bsize), 1)
+    for i in range(v0.numdigits()):
+        ret._digits[i] = v0._digits[i]
+    if vinf.sign != 0:
+        assert 4*shift + vinf.numdigits() <= ret.numdigits()
+        for i in range(vinf.numdigits()):
+            ret._digits[4*shift + i] = vinf._digits[i]
+    for k, r in [(1, r1), (2, r2), (3, r3)]:
+        assert r.sign >= 0
+        i = ret.numdigits() - k*shift
+        _v_iadd(ret, k*shift, i, r, r.numdigits())
+
+    ret._normalize()
+    return ret
+
 def _inplace_divrem1(pout, pin, n, size=0):
     """
     Divide bigint pin by non-zero digit n, storing quotient
@@ -2061,8 +2206,10 @@ def _divrem(a, b):
     if size_b == 1:
         z, urem = _divrem1(a, b.digit(0))
         rem = rbigint([_store_digit(urem)], int(urem != 0), 1)
-    else:
+    elif size_b < DIV_LIMIT or size_a - size_b < DIV_LIMIT:
         z, rem = _x_divrem(a, b)
+    else:
+        z, rem = _divmod_big(a, b)
     # Set the signs.
     # The quotient z has the sign of a*b;
     # the remainder r has the sign of a,
@@ -2073,6 +2220,93 @@ def _divrem(a, b):
         rem.sign = - rem.sign
     return z, rem
 
+def _bz_slice(x, start, stop):
+    """ Return the digits x[start:stop] as a new bigint >= 0, i.e.
+        (abs(x) >> start) % BASE**(stop-start) viewing the shift as being
+        by digits. """
+    stop = min(stop, x.numdigits())
+    if start >= stop:
+        return NULLRBIGINT
+    assert start >= 0
+    z = rbigint(x._digits[start:stop], 1, stop - start)
+    z._normalize()
+    return z
+
+def _bz_join(hi, lo, n):
+    """ Return (hi << n) + lo viewing the shift as being by digits, for
+        hi >= 0 and 0 <= lo < BASE**n. """
+    if hi.sign == 0:
+        return lo
+    size = n + hi.numdigits()
+    z = rbigint([NULLDIGIT] * size, 1, size)
+    for i in range(lo.numdigits()):
+        z._digits[i] = lo._digits[i]
+    for i in range(hi.numdigits()):
+        z._digits[n + i] = hi._digits[i]
+    return z
+
+def _bz_div2n1n(a, b, n):
+    """ Divide a by b, where b has exactly n digits and its top digit is
+        >= BASE/2, and 0 <= a < b << n (digits).  Returns the quotient and
+        the remainder.  Burnikel and Ziegler, "Fast Recursive Division"
+        (MPI-I-98-1-022), algorithm 1. """
+    if n < DIV_LIMIT:
+        return _divrem(a, b)
+    pad = n & 1
+    if pad:
+        a = a.lshift(SHIFT)
+        b = b.lshift(SHIFT)
+        n += 1
+    half_n = n >> 1
+    b1 = _bz_slice(b, half_n, n)
+    b2 = _bz_slice(b, 0, half_n)
+    q1, r = _bz_div3n2n(_bz_slice(a, n, a.numdigits()),
+                        _bz_slice(a, half_n, n), b, b1, b2, half_n)
+    q2, r = _bz_div3n2n(r, _bz_slice(a, 0, half_n), b, b1, b2, half_n)
+    if pad:
+        r = r.rshift(SHIFT)
+    return _bz_join(q1, q2, half_n), r
+
+def _bz_div3n2n(a12, a3, b, b1, b2, n):
+    """ Helper for _bz_div2n1n: divide (a12 << n) + a3 by b, where
+        b == (b1 << n) + b2 and b1 has n digits.  Algorithm 2. """
+    if _bz_slice(a12, n, a12.numdigits()).eq(b1):
+        # the quotient would not fit in n digits, use BASE**n - 1
+        q = rbigint([_store_digit(MASK)] * n, 1, n)
+        r = a12.sub(b1.lshift(n * SHIFT)).add(b1)
+    else:
+        q, r = _bz_div2n1n(a12, b1, n)
+    r = _bz_join(r, a3, n).sub(q.mul(b2))
+    while r.sign < 0:
+        # this is done at most twice
+        q = q.int_sub(1)
+        r = r.add(b)
+    return q, r
+
+def _divmod_big(a, b):
+    """ Unsigned bigint division with remainder, for large numbers.
+        a is cut into pieces of the size of b, which are divided one after
+        the other with the recursive algorithm of Burnikel and Ziegler. """
+    # normalize: shift b left so that its top digit is >= BASE/2, and
+    # shift a left by the same amount
+    d = SHIFT - bits_in_digit(b.digit(b.numdigits() - 1))
+    a = a.abs().lshift(d)
+    b = b.abs().lshift(d)
+    n = b.numdigits()
+    size_a = a.numdigits()
+    chunks = (size_a + n - 1) // n
+    z = rbigint([NULLDIGIT] * (chunks * n), 1, chunks * n)
+    r = NULLRBIGINT
+    i = chunks - 1
+    while i >= 0:
+        q, r = _bz_div2n1n(_bz_join(r, _bz_slice(a, i * n, (i + 1) * n), n),
+                           b, n)
+        for j in range(q.numdigits()):
+            z._digits[i * n + j] = q._digits[j]
+        i -= 1
+    z._normalize()
+    return z, r.rshift(d)
+
 # ______________ conversions to double _______________
 
 def _AsScaledDouble(v):
@@ -2776,6 +3010,13 @@ def _decimalstr_to_bigint(s):
     elif s[p] == '+':
         p += 1
 
+    if lim - p > FROMSTR_CUTOFF:
+        ord0 = ord('0')
+        a = _digits_to_bigint([ord(s[i]) - ord0 for i in range(p, lim)], 10)
+        if sign and a.sign == 1:
+            a.sign = -1
+        return a
+
     a = rbigint()
     tens = 1
     dig = 0
@@ -2811,3 +3052,33 @@ def parse_digit_string(parser):
             tens *= base
     a.sign *= parser.sign
     return a
+
+def _digits_to_bigint_rec(digits, start, stop, base, powers):
+    if stop - start <= FROMSTR_CUTOFF:
+        a = rbigint()
+        digitmax = BASE_MAX[base]
+        tens, dig = 1, 0
+        for i in range(start, stop):
+            dig = dig * base + digits[i]
+            tens *= base
+            if tens == digitmax or i == stop - 1:
+                a = _muladd1(a, tens, dig)
+                tens, dig = 1, 0
+        return a
+    mid = (start + stop + 1) >> 1
+    n = stop - mid
+    try:
+        power = powers[n]
+    except KeyError:
+        power = rbigint.fromint(base).pow(rbigint.fromint(n))
+        powers[n] = power
+    hi = _digits_to_bigint_rec(digits, start, mid, base, powers)
+    lo = _digits_to_bigint_rec(digits, mid, stop, base, powers)
+    return hi.mul(power).add(lo)
+
+def _digits_to_bigint(digits, base):
+    """Turn a list of digits in the given base, most significant first,
+    into a bigint >= 0.  The list is split recursively in two halves,
+    which makes it subquadratic given fast enough multiplications."""
+    powers = {}
+    return _digits_to_bigint_rec(digits, 0, len(digits), base, powers)
@@ -18,6 +18,40 @@ def set_max_heap_size(nbytes):
     """
     pass
 
+# Indexes of the tuning parameters for get_gc_param() and set_gc_param()
+GC_PARAM_NURSERY_SIZE   = 0     # bytes, like PYPY_GC_NURSERY
+GC_PARAM_MAJOR_COLLECT  = 1     # factor, like PYPY_GC_MAJOR_COLLECT
+GC_PARAM_INCREMENT_STEP = 2     # bytes, like PYPY_GC_INCREMENT_STEP
+GC_PARAM_MIN_HEAP_SIZE  = 3     # bytes, like PYPY_GC_MIN
+GC_PARAM_MAX_HEAP_SIZE  = 4     # bytes, like PYPY_GC_MAX (0.0 = no limit)
+
+# for test purposes, the parameters are simply stored here
+_gc_params = {}
+
+def get_gc_param(index):
+    """Return the current value of the GC tuning parameter 'index', one
+    of the GC_PARAM_xxx constants, or -1.0 if the GC doesn't have it.
+    """
+    return _gc_params.get(index, -1.0)
+
+def set_gc_param(index, value):
+    """Change the GC tuning parameter 'index' to the float 'value'.
+    Returns False if the GC doesn't have this parameter or refuses the
+    value.  The GC may round the value, e.g. to a multiple of the word
+    size; use get_gc_param() to know the value really used.
+    """
+    _gc_params[index] = float(value)
+    return True
+
+def collect_step():
+    """Do a minor collection followed by a single step of the
+    incremental major collection, starting a new major collection if
+    none is in progress.  Returns True if this step finished a major
+    collection.  GCs that are not incremental do a full collection.
+    """
+    gc.collect()
+    return True
+
 # for test purposes we allow objects to be pinned and use
 # the following list to keep track of the pinned objects
 _pinned_objects = []
@@ -136,6 +170,42 @@ class SetMaxHeapSizeEntry(ExtRegistryEntry):
         return hop.genop('gc_set_max_heap_size', [v_nbytes],
                          resulttype=lltype.Void)
 
+class GetGcParamEntry(ExtRegistryEntry):
+    _about_ = get_gc_param
+
+    def compute_result_annotation(self, s_index):
+        from rpython.annotator import model as annmodel
+        return annmodel.SomeFloat()
+
+    def specialize_call(self, hop):
+        [v_index] = hop.inputargs(lltype.Signed)
+        hop.exception_cannot_occur()
+        return hop.genop('gc_get_param', [v_index], resulttype=lltype.Float)
+
+class SetGcParamEntry(ExtRegistryEntry):
+    _about_ = set_gc_param
+
+    def compute_result_annotation(self, s_index, s_value):
+        from rpython.annotator import model as annmodel
+        return annmodel.SomeBool()
+
+    def specialize_call(self, hop):
+        v_index, v_value = hop.inputargs(lltype.Signed, lltype.Float)
+        hop.exception_cannot_occur()
+        return hop.genop('gc_set_param', [v_index, v_value],
+                         resulttype=lltype.Bool)
+
+class CollectStepEntry(ExtRegistryEntry):
+    _about_ = collect_step
+
+    def compute_result_annotation(self):
+        from rpython.annotator import model as annmodel
+        return annmodel.SomeBool()
+
+    def specialize_call(self, hop):
+        hop.exception_cannot_occur()
+        return hop.genop('gc__collect_step', [], resulttype=lltype.Bool)
+
 def can_move(p):
     """Check if the GC object 'p' is at an address that can move.
     Must not be called with None.  With non-moving GCs, it is always False.
@@ -23,6 +23,11 @@ gil_yield_thread  = llexternal('RPyGilYieldThread', [], lltype.Signed,
                                _nowrapper=True, sandboxsafe=True,
                                compilation_info=eci)
 
+gil_yield_thread_if_requested = llexternal('RPyGilYieldThreadIfRequested',
+                               [], lltype.Signed,
+                               _nowrapper=True, sandboxsafe=True,
+                               compilation_info=eci)
+
 gil_release       = llexternal('RPyGilRelease', [], lltype.Void,
                                _nowrapper=True, sandboxsafe=True,
                                compilation_info=eci)
@@ -34,3 +39,20 @@ gil_acquire       = llexternal('RPyGilAcquire', [], lltype.Void,
 gil_fetch_fastgil = llexternal('RPyFetchFastGil', [], llmemory.Address,
                                _nowrapper=True, sandboxsafe=True,
                                compilation_info=eci)
+
+# time-based switching: a thread waiting for the GIL for more than the
+# switch interval (in microseconds) forces the given ticker to -1 and
+# makes gil_yield_thread_if_requested() give the GIL away
+gil_set_switch_interval = llexternal('RPyGilSetSwitchInterval',
+                               [lltype.Signed], lltype.Void,
+                               _nowrapper=True, sandboxsafe=True,
+                               compilation_info=eci)
+
+gil_get_switch_interval = llexternal('RPyGilGetSwitchInterval',
+                               [], lltype.Signed,
+                               _nowrapper=True, sandboxsafe=True,
+                               compilation_info=eci)
+
+gil_set_ticker    = llexternal('RPyGilSetTicker', [rffi.LONGP], lltype.Void,
+                               _nowrapper=True, sandboxsafe=True,
+                               compilation_info=eci)
@@ -1,6 +1,7 @@
 import os
+import sys
 from rpython.rtyper.lltypesystem.rffi import CConstant, CExternVariable, INT
-from rpython.rtyper.lltypesystem import ll2ctypes, rffi
+from rpython.rtyper.lltypesystem import ll2ctypes, lltype, rffi
 from rpython.translator.tool.cbuild import ExternalCompilationInfo
 from rpython.rlib.rarithmetic import intmask
 from rpython.rlib.objectmodel import specialize
@@ -311,3 +312,80 @@ if os.name == 'nt':
     os_kill = rwin32.os_kill
 else:
     os_kill = os.kill
+
+#___________________________________________________________________
+# Raw I/O that avoids going through an RPython string.
+
+c_read = rffi.llexternal(('_' if WIN32 else '') + 'read',
+                         [rffi.INT, rffi.VOIDP, rffi.SIZE_T], rffi.SSIZE_T,
+                         save_err=rffi.RFFI_SAVE_ERRNO)
+
+def read_into(fd, buf, count):
+    """Like os.read(), but reads at most 'count' bytes directly into
+    the raw memory 'buf' and returns the number of bytes read."""
+    if count < 0:
+        from errno import EINVAL
+        raise OSError(EINVAL, None)
+    validate_fd(fd)
+    got = rffi.cast(lltype.Signed, c_read(rffi.cast(rffi.INT, fd),
+                                          rffi.cast(rffi.VOIDP, buf),
+                                          rffi.cast(rffi.SIZE_T, count)))
+    if got < 0:
+        raise OSError(get_saved_errno(), "read failed")
+    return got
+
+HAVE_SENDFILE = sys.platform.startswith('linux')
+
+if HAVE_SENDFILE:
+    # sendfile() takes an off_t*, whose size depends on the compilation
+    # flags, so go through a small wrapper
+    sendfile_eci = ExternalCompilationInfo(
+        includes=['sys/types.h', 'sys/sendfile.h'],
+        post_include_bits=['RPY_EXTERN long long pypy_sendfile('
+                           'int, int, long long *, long long);'],
+        separate_module_sources=['''
+            #include <stddef.h>
+            #include <sys/types.h>
+            #include <sys/sendfile.h>
+            RPY_EXTERN long long pypy_sendfile(int out_fd, int in_fd,
+                                               long long *offset,
+                                               long long count)
+            {
+                off_t off;
+                ssize_t res;
+                if (offset == NULL)
+                    return sendfile(out_fd, in_fd, NULL, (size_t)count);
+                off = (off_t)*offset;
+                res = sendfile(out_fd, in_fd, &off, (size_t)count);
+                *offset = (long long)off;
+                return res;
+            }
+        '''])
+    LONGLONGP = rffi.CArrayPtr(rffi.LONGLONG)
+    c_sendfile = rffi.llexternal('pypy_sendfile',
+                                 [rffi.INT, rffi.INT, LONGLONGP,
+                                  rffi.LONGLONG], rffi.LONGLONG,
+                                 compilation_info=sendfile_eci,
+                                 save_err=rffi.RFFI_SAVE_ERRNO)
+
+    def sendfile(out_fd, in_fd, offset, count):
+        """Copy up to 'count' bytes from 'in_fd' to 'out_fd' without
+        going through user space.  Reads start at 'offset', or at the
+        current position of 'in_fd' (which is then updated) if 'offset'
+        is negative.  Returns the number of bytes sent."""
+        if offset < 0:
+            p_offset = lltype.nullptr(LONGLONGP.TO)
+        else:
+            p_offset = lltype.malloc(LONGLONGP.TO, 1, flavor='raw')
+            p_offset[0] = rffi.cast(rffi.LONGLONG, offset)
+        try:
+            res = c_sendfile(rffi.cast(rffi.INT, out_fd),
+                             rffi.cast(rffi.INT, in_fd), p_offset,
+                             rffi.cast(rffi.LONGLONG, count))
+        finally:
+            if p_offset:
+                lltype.free(p_offset, flavor='raw')
+        res = rffi.cast(lltype.Signed, res)
+        if res < 0:
+            raise OSError(get_saved_errno(), "sendfile failed")
+        return res
@@ -946,6 +946,152 @@ class RSocket(object):
             raise self.error_handler()
         return res
 
+    if _c.HAVE_MMSG:
+        @jit.dont_look_inside
+        def recvmmsg_into(self, rwbuffers, flags=0):
+            """Receive up to len(rwbuffers) datagrams with a single system
+            call, each one into the next buffer.  Only waits for the first
+            datagram (MSG_WAITFORONE).  Returns a list of (nbytes, address)
+            tuples, where address may be None.  Buffers that expose raw
+            memory are filled directly; the others are received into a raw
+            scratch area first and copied."""
+            vlen = min(len(rwbuffers), _c.MMSG_MAX)
+            if vlen == 0:
+                return []
+            timeout = self._select(False)
+            if timeout == 1:
+                raise SocketTimeout
+            elif timeout != 0:
+                raise self.error_handler()
+            addrsize = familyclass(self.family).maxlen
+            bufs = lltype.malloc(rffi.CCHARPP.TO, vlen, flavor='raw')
+            lens = lltype.malloc(rffi.LONGP.TO, vlen, flavor='raw')
+            addrs = lltype.malloc(rffi.CCHARP.TO, vlen * addrsize,
+                                  flavor='raw')
+            addrlens = lltype.malloc(rffi.INTP.TO, vlen, flavor='raw')
+            # buffers without raw memory (bytearrays...) are received into
+            # one raw scratch area, at the offsets in 'copied'
+            copied = [-1] * vlen
+            scratchsize = 0
+            for i in range(vlen):
+                try:
+                    bufs[i] = rwbuffers[i].get_raw_address()
+                except ValueError:
+                    copied[i] = scratchsize
+                    scratchsize += rwbuffers[i].getlength()
+            scratch = lltype.nullptr(rffi.CCHARP.TO)
+            try:
+                if scratchsize > 0:
+                    scratch = lltype.malloc(rffi.CCHARP.TO, scratchsize,
+                                            flavor='raw')
+                for i in range(vlen):
+                    if copied[i] >= 0:
+                        bufs[i] = rffi.ptradd(scratch, copied[i])
+                    lens[i] = rffi.cast(rffi.LONG, rwbuffers[i].getlength())
+                    addrlens[i] = rffi.cast(rffi.INT, addrsize)
+                res = _c.recvmmsg(self.fd, bufs, lens, vlen,
+                                  flags | _c.MSG_WAITFORONE,
+                                  addrs, addrsize, addrlens)
+                res = rffi.cast(lltype.Signed, res)
+                if res < 0:
+                    raise self.error_handler()
+                result = []
+                for i in range(res):
+                    nbytes = rffi.cast(lltype.Signed, lens[i])
+                    if copied[i] >= 0:
+                        buf = bufs[i]
+                        for j in range(nbytes):
+                            rwbuffers[i].setitem(j, buf[j])
+                    addrlen = rffi.cast(lltype.Signed, addrlens[i])
+                    address = None
+                    if addrlen:
+                        addr_p = rffi.ptradd(addrs, i * addrsize)
+                        address = make_address(
+                            rffi.cast(_c.sockaddr_ptr, addr_p), addrlen)
+                    result.append((nbytes, address))
+            finally:
+                if scratch:
+                    lltype.free(scratch, flavor='raw')
+                lltype.free(addrlens, flavor='raw')
+                lltype.free(addrs, flavor='raw')
+                lltype.free(lens, flavor='raw')
+                lltype.free(bufs, flavor='raw')
+            keepalive_until_here(rwbuffers)
+            return result
+
+        @jit.dont_look_inside
+        def sendmmsg(self, buffers, flags=0, addresses=None):
+            """Send each buffer as a separate datagram, with a single system
+            call.  If given, 'addresses' holds the destination address of
+            each datagram.  Returns the number of datagrams sent.  Buffers
+            that don't expose raw memory are copied to a raw scratch area
+            first."""
+            vlen = min(len(buffers), _c.MMSG_MAX)
+            if vlen == 0:
+                return 0
+            timeout = self._select(True)
+            if timeout == 1:
+                raise SocketTimeout
+            elif timeout != 0:
+                raise self.error_handler()
+            if addresses is not None:
+                addrsize = 0
+                for i in range(vlen):
+                    addrsize = max(addrsize, addresses[i].addrlen)
+            else:
+                addrsize = 0
+            bufs = lltype.malloc(rffi.CCHARPP.TO, vlen, flavor='raw')
+            lens = lltype.malloc(rffi.LONGP.TO, vlen, flavor='raw')
+            addrlens = lltype.malloc(rffi.INTP.TO, vlen, flavor='raw')
+            if addresses is not None:
+                addrs = lltype.malloc(rffi.CCHARP.TO, vlen * addrsize,
+                                      flavor='raw')
+            else:
+                addrs = lltype.nullptr(rffi.CCHARP.TO)
+            copied = [-1] * vlen
+            scratchsize = 0
+            for i in range(vlen):
+                try:
+                    bufs[i] = buffers[i].get_raw_address()
+                except ValueError:
+                    copied[i] = scratchsize
+                    scratchsize += buffers[i].getlength()
+            scratch = lltype.nullptr(rffi.CCHARP.TO)
+            try:
+                if scratchsize > 0:
+                    scratch = lltype.malloc(rffi.CCHARP.TO, scratchsize,
+                                            flavor='raw')
+                for i in range(vlen):
+                    length = buffers[i].getlength()
+                    if copied[i] >= 0:
+                        buf = rffi.ptradd(scratch, copied[i])
+                        rffi.str2chararray(buffers[i].as_str(), buf, length)
+                        bufs[i] = buf
+                    lens[i] = rffi.cast(rffi.LONG, length)
+                    if addresses is not None:
+                        address = addresses[i]
+                        src = rffi.cast(rffi.CCHARP, address.lock())
+                        dst = rffi.ptradd(addrs, i * addrsize)
+                        for j in range(address.addrlen):
+                            dst[j] = src[j]
+                        address.unlock()
+                        addrlens[i] = rffi.cast(rffi.INT, address.addrlen)
+                res = _c.sendmmsg(self.fd, bufs, lens, vlen, flags,
+                                  addrs, addrsize, addrlens)
+                res = rffi.cast(lltype.Signed, res)
+                if res < 0:
+                    raise self.error_handler()
+            finally:
+                if scratch:
+                    lltype.free(scratch, flavor='raw')
+                if addrs:
+                    lltype.free(addrs, flavor='raw')
+                lltype.free(addrlens, flavor='raw')
+                lltype.free(lens, flavor='raw')
+                lltype.free(bufs, flavor='raw')
+            keepalive_until_here(buffers)
+            return res
+
     def setblocking(self, block):
         if block:
             timeout = -1.0
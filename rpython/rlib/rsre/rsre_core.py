@@ -89,6 +89,7 @@ class AbstractMatchContext(object):
     match_end = 0
     match_marks = None
     match_marks_flat = None
+    dfa = None        # see rsre_dfa.py
 
     def __init__(self, pattern, match_start, end, flags):
         # 'match_start' and 'end' must be known to be non-negative
@@ -192,8 +193,10 @@ class BufMatchContext(AbstractMatchContext):
         return rsre_char.getlower(c, self.flags)
 
     def fresh_copy(self, start):
-        return BufMatchContext(self.pattern, self._buffer, start,
-                               self.end, self.flags)
+        ctx = BufMatchContext(self.pattern, self._buffer, start,
+                              self.end, self.flags)
+        ctx.dfa = self.dfa
+        return ctx
 
 class StrMatchContext(AbstractMatchContext):
     """Concrete subclass for matching in a plain string."""
@@ -215,8 +218,10 @@ class StrMatchContext(AbstractMatchContext):
         return rsre_char.getlower(c, self.flags)
 
     def fresh_copy(self, start):
-        return StrMatchContext(self.pattern, self._string, start,
-                               self.end, self.flags)
+        ctx = StrMatchContext(self.pattern, self._string, start,
+                              self.end, self.flags)
+        ctx.dfa = self.dfa
+        return ctx
 
 class UnicodeMatchContext(AbstractMatchContext):
     """Concrete subclass for matching in a unicode string."""
@@ -236,8 +241,10 @@ class UnicodeMatchContext(AbstractMatchContext):
         return rsre_char.getlower(c, self.flags)
 
     def fresh_copy(self, start):
-        return UnicodeMatchContext(self.pattern, self._unicodestr, start,
-                                   self.end, self.flags)
+        ctx = UnicodeMatchContext(self.pattern, self._unicodestr, start,
+                                  self.end, self.flags)
+        ctx.dfa = self.dfa
+        return ctx
 
 # ____________________________________________________________
 
@@ -0,0 +1,719 @@
+"""
+A lazily-built DFA for the patterns that don't need backtracking.
+
+Patterns without group references, lookaround assertions and GROUPREF_EXISTS
+are turned into an NFA (a Thompson construction where the two outgoing
+edges of a split are ordered by priority, as the backtracker would try
+them).  The DFA states are built on demand from the NFA while scanning the
+string and they are cached, up to a bounded number of states.
+
+Searching is done in two linear passes: a forward scan with leftmost-first
+semantics finds the end of the match that the backtracker would report,
+and a backward scan over the reversed pattern, starting from that end,
+finds where the match starts.  Only if the pattern contains groups do we
+run the backtracker, anchored at the start that we already know.
+
+Zero-width assertions (^, $, \\b...) are supported: the DFA states
+remember what kind of character precedes the current position, and the
+assertions are resolved when the following character is read.
+"""
+from rpython.rlib.rsre import rsre_char, rsre_core
+from rpython.rlib.rsre.rsre_core import specializectx
+from rpython.rlib.rstring import StringBuilder
+from rpython.rlib import jit
+
+
+MAX_NFA_SIZE = 2000     # bigger patterns are left to the backtracker
+MAX_DFA_STATES = 1000   # the state cache is flushed when it grows bigger
+
+# kinds of NFA nodes
+N_CHAR = 0       # consume one character; arg is the position of the
+                 # single-character opcode in the pattern, or -1 for "any"
+N_AT = 1         # zero-width assertion; arg is the AT_xxx code
+N_SPLIT = 2      # try out1 first, then out2
+N_MATCH = 3
+
+# the properties of the characters that the assertions need to look at
+C_NL = 1
+C_WORD = 2
+C_UNIWORD = 4
+
+# flags describing a position in the string.  The left flags are about
+# the character before the position, and the right flags about the
+# character after it.
+LEFT_SHIFT = 1
+RIGHT_SHIFT = 5
+F_BOT = 0x001                       # beginning of text
+F_LEFT_NL = C_NL << LEFT_SHIFT
+F_LEFT_WORD = C_WORD << LEFT_SHIFT
+F_LEFT_UNIWORD = C_UNIWORD << LEFT_SHIFT
+F_EOT = 0x010                       # end of text
+F_RIGHT_NL = C_NL << RIGHT_SHIFT
+F_RIGHT_WORD = C_WORD << RIGHT_SHIFT
+F_RIGHT_UNIWORD = C_UNIWORD << RIGHT_SHIFT
+F_FINAL_NL = 0x200                  # the next character is the last one
+                                    # and it is a newline
+F_MATCHED = 0x400                   # only in DFAState.flags: the step that
+                                    # led to this state went through a match
+
+EOT_UNKNOWN = 0
+EOT_NO_MATCH = 1
+EOT_MATCH = 2
+
+
+class Unsupported(Exception):
+    pass
+
+# ____________________________________________________________
+#
+# A tree built from the SRE code.  Its only purpose is to produce the NFA,
+# either for the pattern or for the reversed pattern.
+
+class Node(object):
+
+    def nullable(self):
+        raise NotImplementedError
+
+    def compile(self, nfa, nxt, reverse):
+        """Add the NFA nodes for this subpattern, which must be followed
+        by the NFA node 'nxt'.  Returns the entry node."""
+        raise NotImplementedError
+
+
+class Char(Node):
+
+    def __init__(self, ppos):
+        self.ppos = ppos
+
+    def nullable(self):
+        return False
+
+    def compile(self, nfa, nxt, reverse):
+        return nfa.add(N_CHAR, self.ppos, nxt, -1)
+
+
+class At(Node):
+
+    def __init__(self, atcode):
+        self.atcode = atcode
+
+    def nullable(self):
+        return True
+
+    def compile(self, nfa, nxt, reverse):
+        return nfa.add(N_AT, self.atcode, nxt, -1)
+
+
+class Sequence(Node):
+
+    def __init__(self, items):
+        self.items = items
+
+    def nullable(self):
+        for item in self.items:
+            if not item.nullable():
+                return False
+        return True
+
+    def compile(self, nfa, nxt, reverse):
+        n = len(self.items)
+        for i in range(n):
+            if reverse:
+                item = self.items[i]
+            else:
+                item = self.items[n - 1 - i]
+            nxt = item.compile(nfa, nxt, reverse)
+        return nxt
+
+
+class Alternation(Node):
+
+    def __init__(self, alternatives):
+        assert len(alternatives) > 0
+        self.alternatives = alternatives
+
+    def nullable(self):
+        for alternative in self.alternatives:
+            if alternative.nullable():
+                return True
+        return False
+
+    def compile(self, nfa, nxt, reverse):
+        n = len(self.alternatives)
+        start = self.alternatives[n - 1].compile(nfa, nxt, reverse)
+        for i in range(n - 2, -1, -1):
+            first = self.alternatives[i].compile(nfa, nxt, reverse)
+            start = nfa.add(N_SPLIT, 0, first, start)
+        return start
+
+
+class Repeat(Node):
+
+    def __init__(self, item, min, max, greedy):
+        self.item = item
+        self.min = min
+        self.max = max
+        self.greedy = greedy
+
+    def nullable(self):
+        return self.min == 0 or self.item.nullable()
+
+    def _split(self, nfa, more, done):
+        if self.greedy:
+            return nfa.add(N_SPLIT, 0, more, done)
+        else:
+            return nfa.add(N_SPLIT, 0, done, more)
+
+    def compile(self, nfa, nxt, reverse):
+        if self.max == rsre_char.MAXREPEAT:
+            loop = self._split(nfa, -1, nxt)
+            body = self.item.compile(nfa, loop, reverse)
+            if self.greedy:
+                nfa.out1[loop] = body
+            else:
+                nfa.out2[loop] = body
+            start = loop
+        else:
+            start = nxt
+            for i in range(self.max - self.min):
+                body = self.item.compile(nfa, start, reverse)
+                start = self._split(nfa, body, nxt)
+        for i in range(self.min):
+            start = self.item.compile(nfa, start, reverse)
+        return start
+
+
+class Parser(object):
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.has_marks = False
+        self.has_repeats = False
+        self.atcodes = []
+
+    def pat(self, index):
+        if not (0 <= index < len(self.pattern)):
+            raise Unsupported
+        return self.pattern[index]
+
+    def parse_sequence(self, ppos, endpos):
+        items = []
+        while ppos < endpos:
+            pc = ppos
+            op = self.pat(pc)
+            if op == rsre_core.OPCODE_SUCCESS:
+                break
+            elif (op == rsre_core.OPCODE_ANY or
+                  op == rsre_core.OPCODE_ANY_ALL):
+                items.append(Char(pc))
+                ppos = pc + 1
+            elif (op == rsre_core.OPCODE_LITERAL or
+                  op == rsre_core.OPCODE_LITERAL_IGNORE or
+                  op == rsre_core.OPCODE_NOT_LITERAL or
+                  op == rsre_core.OPCODE_NOT_LITERAL_IGNORE or
+                  op == rsre_core.OPCODE_CATEGORY):
+                items.append(Char(pc))
+                ppos = pc + 2
+            elif (op == rsre_core.OPCODE_IN or
+                  op == rsre_core.OPCODE_IN_IGNORE):
+                items.append(Char(pc))
+                ppos = pc + 1 + self.pat(pc + 1)
+            elif op == rsre_core.OPCODE_AT:
+                atcode = self.pat(pc + 1)
+                if (atcode == rsre_core.AT_LOC_BOUNDARY or
+                    atcode == rsre_core.AT_LOC_NON_BOUNDARY or
+                    atcode > rsre_core.AT_UNI_NON_BOUNDARY):
+                    raise Unsupported
+                items.append(At(atcode))
+                self.atcodes.append(atcode)
+                ppos = pc + 2
+            elif op == rsre_core.OPCODE_MARK:
+                self.has_marks = True
+                ppos = pc + 2
+            elif op == rsre_core.OPCODE_INFO:
+                ppos = pc + 1 + self.pat(pc + 1)
+            elif op == rsre_core.OPCODE_BRANCH:
+                # <BRANCH> <0=skip> code <JUMP> ... <NULL>
+                self.has_repeats = True
+                alternatives = []
+                ppos = pc + 1
+                while self.pat(ppos):
+                    skip = self.pat(ppos)
+                    if self.pat(ppos + skip - 2) != rsre_core.OPCODE_JUMP:
+                        raise Unsupported
+                    alternatives.append(
+                        self.parse_sequence(ppos + 1, ppos + skip - 2))
+                    ppos += skip
+                ppos += 1
+                if not alternatives:
+                    raise Unsupported
+                items.append(Alternation(alternatives))
+            elif op == rsre_core.OPCODE_REPEAT:
+                # <REPEAT> <skip> <1=min> <2=max> item <UNTIL> tail
+                self.has_repeats = True
+                untilppos = pc + 1 + self.pat(pc + 1)
+                until = self.pat(untilppos)
+                if until == rsre_core.OPCODE_MAX_UNTIL:
+                    greedy = True
+                elif until == rsre_core.OPCODE_MIN_UNTIL:
+                    greedy = False
+                else:
+                    raise Unsupported
+                item = self.parse_sequence(pc + 4, untilppos)
+                if item.nullable():
+                    # the backtracker has its own rules about repeating
+                    # an item that matched the empty string
+                    raise Unsupported
+                items.append(Repeat(item, self.pat(pc + 2), self.pat(pc + 3),
+                                    greedy))
+                ppos = untilppos + 1
+            elif (op == rsre_core.OPCODE_REPEAT_ONE or
+                  op == rsre_core.OPCODE_MIN_REPEAT_ONE):
+                # <REPEAT_ONE> <skip> <1=min> <2=max> item <SUCCESS> tail
+                nextppos = pc + 1 + self.pat(pc + 1)
+                item = self.parse_sequence(pc + 4, nextppos)
+                if item.nullable():
+                    raise Unsupported
+                greedy = op == rsre_core.OPCODE_REPEAT_ONE
+                items.append(Repeat(item, self.pat(pc + 2), self.pat(pc + 3),
+                                    greedy))
+                ppos = nextppos
+            else:
+                # GROUPREF, ASSERT, GROUPREF_EXISTS, FAILURE, ...
+                raise Unsupported
+        return Sequence(items)
+
+
+class NFA(object):
+
+    def __init__(self):
+        self.ops = []
+        self.args = []
+        self.out1 = []
+        self.out2 = []
+
+    def add(self, op, arg, out1, out2):
+        index = len(self.ops)
+        if index >= MAX_NFA_SIZE:
+            raise Unsupported
+        self.ops.append(op)
+        self.args.append(arg)
+        self.out1.append(out1)
+        self.out2.append(out2)
+        return index
+
+# ____________________________________________________________
+
+
+class DFAState(object):
+
+    def __init__(self, seeds, flags):
+        self.seeds = seeds        # the NFA nodes to continue from, in the
+                                  # order of priority
+        self.flags = flags
+        self.next_ascii = None    # list of 256 DFAStates, built lazily
+        self.next_other = None    # dict {char: DFAState}
+        self.eot = EOT_UNKNOWN
+
+    def is_dead(self):
+        return len(self.seeds) == 0
+
+    def is_matched(self):
+        return (self.flags & F_MATCHED) != 0
+
+
+class DFA(object):
+    """The DFA built on demand from one NFA, scanning forward with the
+    leftmost-first semantics of the backtracker, or backward finding the
+    longest match."""
+
+    def __init__(self, pattern, flags, nfa, reverse, flagmask):
+        self.pattern = pattern
+        self.flags = flags
+        self.nfa = nfa
+        self.reverse = reverse
+        self.longest = reverse
+        self.flagmask = flagmask
+        self.max_states = MAX_DFA_STATES
+        self.states = []
+        self.state_cache = {}
+        self.flushes = 0
+        self.visited = [0] * len(nfa.ops)
+        self.added = [0] * len(nfa.ops)
+        self.generation = 0
+
+    def char_flags(self, c):
+        flags = 0
+        if rsre_char.is_linebreak(c):
+            flags |= C_NL
+        if self.flagmask & F_LEFT_WORD and rsre_char.is_word(c):
+            flags |= C_WORD
+        if self.flagmask & F_LEFT_UNIWORD and rsre_char.is_uni_word(c):
+            flags |= C_UNIWORD
+        return flags
+
+    def left_flags(self, c):
+        return (self.char_flags(c) << LEFT_SHIFT) & self.flagmask
+
+    def right_flags(self, c):
+        return (self.char_flags(c) << RIGHT_SHIFT) & self.flagmask
+
+    def get_state(self, seeds, flags):
+        key = StringBuilder()
+        key.append(str(flags))
+        for seed in seeds:
+            key.append(',')
+            key.append(str(seed))
+        key = key.build()
+        try:
+            return self.state_cache[key]
+        except KeyError:
+            pass
+        if len(self.states) >= self.max_states:
+            self.flush()
+        state = DFAState(seeds, flags)
+        self.states.append(state)
+        self.state_cache[key] = state
+        return state
+
+    def flush(self):
+        # forget all the states.  The states still in use by a running
+        # scan remain valid, but they lose their transitions.
+        for state in self.states:
+            state.next_ascii = None
+            state.next_other = None
+        self.states = []
+        self.state_cache = {}
+        self.flushes += 1
+
+    def check_at(self, atcode, flags):
+        if (atcode == rsre_core.AT_BEGINNING or
+            atcode == rsre_core.AT_BEGINNING_STRING):
+            return (flags & F_BOT) != 0
+        elif atcode == rsre_core.AT_BEGINNING_LINE:
+            return (flags & (F_BOT | F_LEFT_NL)) != 0
+        elif atcode == rsre_core.AT_BOUNDARY:
+            return (((flags & F_LEFT_WORD) != 0) !=
+                    ((flags & F_RIGHT_WORD) != 0))
+        elif atcode == rsre_core.AT_NON_BOUNDARY:
+            return (((flags & F_LEFT_WORD) != 0) ==
+                    ((flags & F_RIGHT_WORD) != 0))
+        elif atcode == rsre_core.AT_END:
+            return (flags & (F_EOT | F_FINAL_NL)) != 0
+        elif atcode == rsre_core.AT_END_LINE:
+            return (flags & (F_EOT | F_RIGHT_NL)) != 0
+        elif atcode == rsre_core.AT_END_STRING:
+            return (flags & F_EOT) != 0
+        elif atcode == rsre_core.AT_UNI_BOUNDARY:
+            return (((flags & F_LEFT_UNIWORD) != 0) !=
+                    ((flags & F_RIGHT_UNIWORD) != 0))
+        elif atcode == rsre_core.AT_UNI_NON_BOUNDARY:
+            return (((flags & F_LEFT_UNIWORD) != 0) ==
+                    ((flags & F_RIGHT_UNIWORD) != 0))
+        return False
+
+    def char_matches(self, ppos, c):
+        if ppos < 0:
+            return True
+        pattern = self.pattern
+        op = pattern[ppos]
+        if op == rsre_core.OPCODE_ANY:
+            return not rsre_char.is_linebreak(c)
+        elif op == rsre_core.OPCODE_ANY_ALL:
+            return True
+        elif op == rsre_core.OPCODE_IN:
+            return rsre_char.check_charset(pattern, ppos + 2, c)
+        elif op == rsre_core.OPCODE_IN_IGNORE:
+            return rsre_char.check_charset(pattern, ppos + 2,
+                                           rsre_char.getlower(c, self.flags))
+        elif op == rsre_core.OPCODE_LITERAL:
+            return c == pattern[ppos + 1]
+        elif op == rsre_core.OPCODE_LITERAL_IGNORE:
+            return rsre_char.getlower(c, self.flags) == pattern[ppos + 1]
+        elif op == rsre_core.OPCODE_NOT_LITERAL:
+            return c != pattern[ppos + 1]
+        elif op == rsre_core.OPCODE_NOT_LITERAL_IGNORE:
+            return rsre_char.getlower(c, self.flags) != pattern[ppos + 1]
+        elif op == rsre_core.OPCODE_CATEGORY:
+            return rsre_char.category_dispatch(pattern[ppos + 1], c)
+        return False
+
+    def closure(self, seeds, flags):
+        """Follow the epsilon edges from 'seeds', in order of priority.
+        Returns the list of N_CHAR and N_MATCH nodes reached.  Unless we
+        are looking for the longest match, nothing after the first N_MATCH
+        is returned: these threads have a lower priority."""
+        nfa = self.nfa
+        self.generation += 1
+        generation = self.generation
+        visited = self.visited
+        result = []
+        stack = []
+        for i in range(len(seeds) - 1, -1, -1):
+            stack.append(seeds[i])
+        while stack:
+            node = stack.pop()
+            if visited[node] == generation:
+                continue
+            visited[node] = generation
+            op = nfa.ops[node]
+            if op == N_CHAR:
+                result.append(node)
+            elif op == N_MATCH:
+                result.append(node)
+                if not self.longest:
+                    break
+            elif op == N_SPLIT:
+                stack.append(nfa.out2[node])
+                stack.append(nfa.out1[node])
+            elif op == N_AT:
+                if self.check_at(nfa.args[node], flags):
+                    stack.append(nfa.out1[node])
+        return result
+
+    def compute_next(self, state, c, extra):
+        """Compute the state following 'state' when reading the character
+        'c'.  'extra' is F_FINAL_NL if 'c' is the last character of the
+        text, and it is a newline."""
+        if self.reverse:
+            flags = state.flags | self.left_flags(c)
+            newflags = self.right_flags(c) | extra
+        else:
+            flags = state.flags | self.right_flags(c) | extra
+            newflags = self.left_flags(c)
+        nfa = self.nfa
+        self.generation += 1
+        generation = self.generation
+        added = self.added
+        seeds = []
+        for node in self.closure(state.seeds, flags):
+            if nfa.ops[node] == N_MATCH:
+                newflags |= F_MATCHED
+            elif self.char_matches(nfa.args[node], c):
+                target = nfa.out1[node]
+                if added[target] != generation:
+                    added[target] = generation
+                    seeds.append(target)
+        return self.get_state(seeds, newflags & self.flagmask)
+
+    def step(self, state, c):
+        if c < 256:
+            table = state.next_ascii
+            if table is None:
+                table = [None] * 256
+                state.next_ascii = table
+            nextstate = table[c]
+            if nextstate is None:
+                nextstate = self.compute_next(state, c, 0)
+                table[c] = nextstate
+        else:
+            table = state.next_other
+            if table is None:
+                table = {}
+                state.next_other = table
+            nextstate = table.get(c, None)
+            if nextstate is None:
+                nextstate = self.compute_next(state, c, 0)
+                table[c] = nextstate
+        return nextstate
+
+    def step_last(self, state, c):
+        """Like step(), for the last character of the text."""
+        if rsre_char.is_linebreak(c) and self.flagmask & F_FINAL_NL:
+            return self.compute_next(state, c, F_FINAL_NL)
+        return self.step(state, c)
+
+    def matches_at_end(self, state):
+        """Is there a match at the end of the text (the beginning of the
+        text if we are scanning backward)?"""
+        if state.eot == EOT_UNKNOWN:
+            if self.reverse:
+                flags = state.flags | F_BOT
+            else:
+                flags = state.flags | F_EOT
+            state.eot = EOT_NO_MATCH
+            for node in self.closure(state.seeds, flags):
+                if self.nfa.ops[node] == N_MATCH:
+                    state.eot = EOT_MATCH
+        return state.eot == EOT_MATCH
+
+
+class PatternDFA(object):
+    """The DFAs for one pattern.  Attach it to the match contexts as
+    'ctx.dfa' to search and match with it."""
+
+    def __init__(self, pattern, flags, tree, has_marks, flagmask):
+        nfa = NFA()
+        match = nfa.add(N_MATCH, 0, -1, -1)
+        self.match_start = tree.compile(nfa, match, False)
+        # the unanchored search tries the pattern at the current position
+        # before skipping one more character, like a lazy '.*?' prefix
+        self.search_start = nfa.add(N_SPLIT, 0, self.match_start, -1)
+        skip = nfa.add(N_CHAR, -1, self.search_start, -1)
+        nfa.out2[self.search_start] = skip
+        self.forward = DFA(pattern, flags, nfa, False, flagmask)
+        #
+        nfa = NFA()
+        match = nfa.add(N_MATCH, 0, -1, -1)
+        self.reverse_start = tree.compile(nfa, match, True)
+        self.backward = DFA(pattern, flags, nfa, True, flagmask)
+        self.has_marks = has_marks
+
+
+def compile_dfa(pattern, flags):
+    """Returns a PatternDFA for the given SRE code, or None if the pattern
+    cannot be handled by a DFA or if it is not worth it."""
+    if flags & rsre_char.SRE_FLAG_LOCALE:
+        return None       # the character classes could change
+    parser = Parser(pattern)
+    try:
+        tree = parser.parse_sequence(0, len(pattern))
+        if not parser.has_repeats:
+            # no BRANCH nor REPEAT: the backtracker cannot go wrong, and it
+            # is better supported by the JIT
+            return None
+        flagmask = F_MATCHED
+        for atcode in parser.atcodes:
+            flagmask |= _flags_for_atcode(atcode)
+        return PatternDFA(pattern, flags, tree, parser.has_marks, flagmask)
+    except Unsupported:
+        return None
+
+def _flags_for_atcode(atcode):
+    if (atcode == rsre_core.AT_BEGINNING or
+        atcode == rsre_core.AT_BEGINNING_STRING):
+        return F_BOT
+    elif atcode == rsre_core.AT_BEGINNING_LINE:
+        return F_BOT | F_LEFT_NL
+    elif (atcode == rsre_core.AT_BOUNDARY or
+          atcode == rsre_core.AT_NON_BOUNDARY):
+        return F_LEFT_WORD | F_RIGHT_WORD
+    elif atcode == rsre_core.AT_END:
+        return F_EOT | F_FINAL_NL
+    elif atcode == rsre_core.AT_END_LINE:
+        return F_EOT | F_RIGHT_NL
+    elif atcode == rsre_core.AT_END_STRING:
+        return F_EOT
+    elif (atcode == rsre_core.AT_UNI_BOUNDARY or
+          atcode == rsre_core.AT_UNI_NON_BOUNDARY):
+        return F_LEFT_UNIWORD | F_RIGHT_UNIWORD
+    return 0
+
+# ____________________________________________________________
+
+@specializectx
+def find_end(ctx, dfa, seed, start):
+    """Scan forward from 'start'.  Returns the end of the match found by
+    the leftmost-first rules, or -1."""
+    prev = start - 1
+    if prev < 0:
+        flags = F_BOT & dfa.flagmask
+    else:
+        flags = dfa.left_flags(ctx.str(prev))
+    state = dfa.get_state([seed], flags)
+    end = ctx.end
+    result = -1
+    ptr = start
+    while ptr < end:
+        c = ctx.str(ptr)
+        if ptr + 1 == end:
+            state = dfa.step_last(state, c)
+        else:
+            state = dfa.step(state, c)
+        if state.is_matched():
+            result = ptr
+        if state.is_dead():
+            return result
+        ptr += 1
+    if dfa.matches_at_end(state):
+        result = end
+    return result
+
+@specializectx
+def find_start(ctx, dfa, seed, lowest, end):
+    """Scan backward from 'end', which is known to be the end of a match.
+    Returns the lowest position, not below 'lowest', where this match
+    can start."""
+    assert end >= 0
+    if end == ctx.end:
+        flags = F_EOT
+    else:
+        flags = dfa.right_flags(ctx.str(end))
+        if end + 1 == ctx.end and rsre_char.is_linebreak(ctx.str(end)):
+            flags |= F_FINAL_NL
+    state = dfa.get_state([seed], flags & dfa.flagmask)
+    result = -1
+    ptr = end
+    while ptr > lowest:
+        prev = ptr - 1
+        assert prev >= 0
+        c = ctx.str(prev)
+        if ptr == ctx.end:
+            state = dfa.step_last(state, c)
+        else:
+            state = dfa.step(state, c)
+        if state.is_matched():
+            result = ptr
+        if state.is_dead():
+            return result
+        ptr -= 1
+    prev = ptr - 1
+    if prev < 0:
+        if dfa.matches_at_end(state):
+            result = 0
+    else:
+        # check the assertions against the character before 'lowest'
+        if dfa.step(state, ctx.str(prev)).is_matched():
+            result = ptr
+    return result
+
+def _finish(ctx, pattern_dfa, start, end):
+    ctx.match_start = start
+    if pattern_dfa.has_marks:
+        # only the backtracker can tell where the groups are
+        if rsre_core.sre_match(ctx, 0, start, None) is None:
+            raise rsre_core.Error("rsre_dfa: no match found at %d" % start)
+    else:
+        ctx.match_end = end
+        ctx.match_marks = None
+    return True
+
+@jit.dont_look_inside
+def dfa_match_context(ctx, pattern_dfa):
+    ctx.original_pos = ctx.match_start
+    if ctx.end < ctx.match_start:
+        return False
+    start = ctx.match_start
+    end = find_end(ctx, pattern_dfa.forward, pattern_dfa.match_start, start)
+    if end < 0:
+        return False
+    return _finish(ctx, pattern_dfa, start, end)
+
+@jit.dont_look_inside
+def dfa_search_context(ctx, pattern_dfa):
+    ctx.original_pos = ctx.match_start
+    if ctx.end < ctx.match_start:
+        return False
+    lowest = ctx.match_start
+    end = find_end(ctx, pattern_dfa.forward, pattern_dfa.search_start, lowest)
+    if end < 0:
+        return False
+    start = find_start(ctx, pattern_dfa.backward, pattern_dfa.reverse_start,
+                       lowest, end)
+    if start < 0:
+        raise rsre_core.Error("rsre_dfa: no start found for %d" % end)
+    return _finish(ctx, pattern_dfa, start, end)
+
+def match_context(ctx):
+    """Like rsre_core.match_context(), using 'ctx.dfa' if it is set."""
+    pattern_dfa = ctx.dfa
+    if pattern_dfa is None or ctx.end == 0:
+        return rsre_core.match_context(ctx)
+    return dfa_match_context(ctx, pattern_dfa)
+
+def search_context(ctx):
+    """Like rsre_core.search_context(), using 'ctx.dfa' if it is set."""
+    pattern_dfa = ctx.dfa
+    if pattern_dfa is None or ctx.end == 0:
+        return rsre_core.search_context(ctx)
+    return dfa_search_context(ctx, pattern_dfa)
@@ -0,0 +1,170 @@
+import random
+from rpython.rlib.rsre import rsre_core, rsre_dfa, rsre_char
+from rpython.rlib.rsre.rpy import get_code
+from rpython.rlib.unicodedata import unicodedb
+
+
+def setup_module(mod):
+    rsre_char.set_unicode_db(unicodedb)
+
+def get_dfa(regexp, flags=0):
+    code, flags, args = get_code(regexp, flags, allargs=True)
+    return code, flags, rsre_dfa.compile_dfa(code, flags)
+
+def make_ctx(code, string, flags, start=0):
+    if isinstance(string, unicode):
+        return rsre_core.UnicodeMatchContext(code, string, start,
+                                             len(string), flags)
+    return rsre_core.StrMatchContext(code, string, start, len(string), flags)
+
+def all_matches(code, string, flags, pattern_dfa, search=True):
+    # like finditer(), returns the list of the spans of all the groups
+    result = []
+    ctx = make_ctx(code, string, flags)
+    ctx.dfa = pattern_dfa
+    while ctx.match_start <= ctx.end:
+        if search:
+            found = rsre_dfa.search_context(ctx)
+        else:
+            found = rsre_dfa.match_context(ctx)
+        if not found:
+            break
+        marks = ctx.flatten_marks()
+        result.append(marks)
+        if not search:
+            break
+        nextstart = ctx.match_end
+        nextstart += (ctx.match_start == nextstart)
+        ctx = ctx.fresh_copy(nextstart)
+    return result
+
+def check(regexp, strings, flags=0):
+    code, flags, pattern_dfa = get_dfa(regexp, flags)
+    assert pattern_dfa is not None, regexp
+    for string in strings:
+        for search in [True, False]:
+            expected = all_matches(code, string, flags, None, search)
+            got = all_matches(code, string, flags, pattern_dfa, search)
+            assert got == expected, (regexp, string, search)
+
+
+class TestDFA:
+
+    def test_unsupported(self):
+        for regexp in [r'(a)\1', r'a(?=b)', r'a(?!b)', r'(?<=a)b',
+                       r'(a)?(?(1)b|c)', r'(a*)*', r'(?:a|)+',
+                       r'abc', r'a*b', r'[ab]+?c', r'(?L)(?:a|b)\w']:
+            assert get_dfa(regexp)[2] is None, regexp
+
+    def test_supported(self):
+        for regexp in [r'a|bc', r'(?:ab)*', r'(ab)+c', r'\bfoo|bar$',
+                       r'^(?:x|y){2,5}?z', r'(?i)(?:Ab|cD)+',
+                       r'(?u)\b(?:a|bc)']:
+            assert get_dfa(regexp)[2] is not None, regexp
+
+    def test_alternatives(self):
+        check(r'a|ab|abc', ['abc', 'xxabcab', 'b', ''])
+        check(r'ab|a|abc', ['abc', 'xxabcab', 'b'])
+        check(r'(?:foo|foobar|fo)(bar)?', ['foobar', 'xfoobarbar', 'fofoo'])
+
+    def test_repeats(self):
+        check(r'(?:ab)*c', ['c', 'ababc', 'abab', 'xabcabababc'])
+        check(r'(?:ab)*?(?:ab|c)', ['ababc', 'abab', 'c'])
+        check(r'(?:a|b){2,4}', ['a', 'ab', 'abbabba', 'abcabbbbb'])
+        check(r'(?:a|b){2,4}?b', ['ab', 'abbabba', 'aaaab'])
+        check(r'x(?:a|bc)+y|x', ['xaabcay', 'xbcbc', 'xy'])
+
+    def test_groups(self):
+        check(r'(a|ab)(c|bcd)(d*)', ['abcd', 'xxabcdabcd', 'acd'])
+        check(r'(?:(a)|(b))+', ['ab', 'ba', 'xaabbx'])
+        check(r'<(\w+)>(?:[^<]|<[^/])*?</\w+>', ['<b>x<i>y</i></b>'])
+
+    def test_anchors(self):
+        strings = ['ab\nab\n', 'ab', 'xab\n', '\nab', 'ab\nx', 'abab']
+        check(r'^(?:ab|b)', strings)
+        check(r'(?m)^(?:ab|b)', strings)
+        check(r'(?:ab|b)$', strings)
+        check(r'(?m)(?:ab|b)$', strings)
+        check(r'(?:ab|b)\Z', strings)
+        check(r'\A(?:ab|b)', strings)
+        check(r'(?:a|xb)$\n', strings)
+        check(r'\b(?:ab|b)\b', strings + ['a b', 'b_ab'])
+        check(r'\B(?:ab|b)\B', strings + ['xbx', 'xabx'])
+
+    def test_ignorecase(self):
+        check(r'(?i)(?:ab|cd)+', ['xABcdAbCDx', 'ABC'])
+        check(r'(?i)(?:[a-c]|x)+', ['XaBcY'])
+
+    def test_unicode(self):
+        check(ur'(?:\u1234|b)+', [u'a\u1234b\u1234c', u'\u1235'])
+        check(ur'(?u)\b(?:\w|\u1234)+\b', [u'\xe9t\xe9 \u1234', u'a b'])
+        check(r'(?:a|b)+', [u'\u1234ab\u1234'])
+
+    def test_match_start(self):
+        code, flags, pattern_dfa = get_dfa(r'\b(?:ab|b)')
+        for start in range(4):
+            ctx = make_ctx(code, 'abab', flags, start)
+            ctx.dfa = pattern_dfa
+            found = rsre_dfa.search_context(ctx)
+            ctx1 = make_ctx(code, 'abab', flags, start)
+            assert found == rsre_core.search_context(ctx1)
+            if found:
+                assert ctx.span() == ctx1.span()
+
+    def test_no_catastrophic_backtracking(self):
+        code, flags, pattern_dfa = get_dfa(r'(?:a|aa)*b|(?:x|xx)*y')
+        ctx = make_ctx(code, 'a' * 100000 + 'x' * 100000, flags)
+        ctx.dfa = pattern_dfa
+        assert not rsre_dfa.search_context(ctx)
+        assert len(pattern_dfa.forward.states) < 20
+
+    def test_state_cache_is_bounded(self):
+        regexp = r'(?:a|b)*a(?:a|b)(?:a|b)(?:a|b)(?:a|b)(?:a|b)c'
+        code, flags, pattern_dfa = get_dfa(regexp)
+        pattern_dfa.forward.max_states = 10
+        strings = [''.join([random.choice('ab') for i in range(200)]) + 'c'
+                   for j in range(3)]
+        for string in strings:
+            assert (all_matches(code, string, flags, pattern_dfa) ==
+                    all_matches(code, string, flags, None))
+        assert pattern_dfa.forward.flushes > 0
+        assert len(pattern_dfa.forward.states) <= 10
+
+    def test_random(self):
+        r = random.Random(42)
+        def make(depth):
+            x = r.random()
+            if depth > 3 or x < 0.3:
+                return r.choice(['a', 'b', '.', '[ab]', '[^a]', r'\n',
+                                 r'\b', '^', '$', r'\w', r'\s'])
+            elif x < 0.5:
+                return '(?:%s|%s)' % (make(depth + 1), make(depth + 1))
+            elif x < 0.7:
+                return make(depth + 1) + make(depth + 1)
+            elif x < 0.8:
+                return '(%s)' % (make(depth + 1),)
+            else:
+                item = make(depth + 1)
+                if item in ('^', '$', r'\b'):
+                    item += 'a'
+                return '(?:%s)%s' % (item, r.choice(['*', '+', '?', '*?',
+                                                     '+?', '{1,3}', '{2}?']))
+        tested = 0
+        while tested < 300:
+            regexp = make(0)
+            try:
+                prefix = r.choice(['', '(?m)', '(?s)', '(?i)'])
+                code, flags, pattern_dfa = get_dfa(prefix + regexp)
+            except Exception:
+                continue
+            if pattern_dfa is None:
+                continue
+            strings = [''.join([r.choice('abA \n') for i in range(12)])
+                       for j in range(5)]
+            for string in strings:
+                for search in [True, False]:
+                    expected = all_matches(code, string, flags, None, search)
+                    got = all_matches(code, string, flags, pattern_dfa,
+                                      search)
+                    assert got == expected, (regexp, string, search)
+            tested += 1
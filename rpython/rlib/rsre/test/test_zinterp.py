@@ -55,3 +55,21 @@ def test_translates():
         for x in rsre_re.split("a{2}", s):      print x
         return 0
     interpret(f, [3])  # assert does not crash
+
+def test_dfa():
+    from rpython.rlib.rsre import rsre_dfa
+    from rpython.rlib.rsre.rpy import get_code
+    code = get_code(r"\b(?:a|bc)+(d)")
+    def f(i):
+        pattern_dfa = rsre_dfa.compile_dfa(code, 0)
+        if i:
+            s = "xx abcad"
+        else:
+            s = "abcab"
+        ctx = rsre_core.StrMatchContext(code, s, 0, len(s), 0)
+        ctx.dfa = pattern_dfa
+        if not rsre_dfa.search_context(ctx):
+            return -1
+        return ctx.match_start * 100 + ctx.match_end
+    assert interpret(f, [1]) == 308
+    assert interpret(f, [0]) == -1
@@ -0,0 +1,140 @@
+""" Helpers to work directly on UTF-8 encoded strings.
+
+These let a unicode string be stored as its UTF-8 encoding and still be
+indexed by code point.  Only 'strict' UTF-8 is considered: no overlong
+forms and no encoded surrogates, so that every code point corresponds to
+exactly one encoded sequence.  Then comparing two such strings bytewise
+gives the same result as comparing them code point by code point, and
+searching for one inside the other can be done bytewise too.
+
+Finding the byte position of a code point uses a sparse index built by
+create_index(), with one entry every INDEX_STEP code points.
+"""
+
+from rpython.rlib.runicode import MAXUNICODE
+
+
+INDEX_SHIFT = 6
+INDEX_STEP = 1 << INDEX_SHIFT
+
+
+def check_utf8(s, allow_nonbmp=(MAXUNICODE > 0xffff)):
+    """Return the number of code points in 's', or -1 if 's' is not
+    strict UTF-8.  Code points outside the BMP are rejected if
+    'allow_nonbmp' is False, which is the default on narrow builds where
+    they would turn into two unichars."""
+    size = len(s)
+    length = 0
+    pos = 0
+    while pos < size:
+        ordch1 = ord(s[pos])
+        pos += 1
+        length += 1
+        if ordch1 < 0x80:
+            continue
+        if ordch1 < 0xC2:
+            return -1     # continuation byte or overlong 2-bytes form
+        if ordch1 < 0xE0:
+            if pos >= size or not _is_continuation(s[pos]):
+                return -1
+            pos += 1
+            continue
+        if ordch1 < 0xF0:
+            if pos + 1 >= size:
+                return -1
+            ordch2 = ord(s[pos])
+            if (ordch2 >> 6 != 0x2 or
+                (ordch1 == 0xE0 and ordch2 < 0xA0) or   # overlong
+                (ordch1 == 0xED and ordch2 > 0x9F) or   # surrogate
+                not _is_continuation(s[pos + 1])):
+                return -1
+            pos += 2
+            continue
+        if ordch1 > 0xF4 or not allow_nonbmp:
+            return -1
+        if pos + 2 >= size:
+            return -1
+        ordch2 = ord(s[pos])
+        if (ordch2 >> 6 != 0x2 or
+            (ordch1 == 0xF0 and ordch2 < 0x90) or       # overlong
+            (ordch1 == 0xF4 and ordch2 > 0x8F) or       # > U+10FFFF
+            not _is_continuation(s[pos + 1]) or
+            not _is_continuation(s[pos + 2])):
+            return -1
+        pos += 3
+    return length
+
+def _is_continuation(ch):
+    return ord(ch) >> 6 == 0x2
+
+def next_codepoint_pos(s, pos):
+    """Return the byte position of the code point following the one that
+    starts at 'pos'."""
+    ordch1 = ord(s[pos])
+    if ordch1 < 0x80:
+        return pos + 1
+    if ordch1 < 0xE0:
+        return pos + 2
+    if ordch1 < 0xF0:
+        return pos + 3
+    return pos + 4
+
+def codepoint_at_pos(s, pos):
+    """Return the code point that starts at byte position 'pos'."""
+    ordch1 = ord(s[pos])
+    if ordch1 < 0x80:
+        return ordch1
+    if ordch1 < 0xE0:
+        return ((ordch1 & 0x1F) << 6) | (ord(s[pos + 1]) & 0x3F)
+    if ordch1 < 0xF0:
+        return (((ordch1 & 0x0F) << 12) | ((ord(s[pos + 1]) & 0x3F) << 6) |
+                (ord(s[pos + 2]) & 0x3F))
+    return (((ordch1 & 0x07) << 18) | ((ord(s[pos + 1]) & 0x3F) << 12) |
+            ((ord(s[pos + 2]) & 0x3F) << 6) | (ord(s[pos + 3]) & 0x3F))
+
+def create_index(s):
+    """Return the list of the byte positions of the code points number
+    0, INDEX_STEP, 2*INDEX_STEP... of the valid UTF-8 string 's'."""
+    index = []
+    size = len(s)
+    pos = 0
+    i = 0
+    while pos < size:
+        if i & (INDEX_STEP - 1) == 0:
+            index.append(pos)
+        pos = next_codepoint_pos(s, pos)
+        i += 1
+    return index
+
+def offset_of_codepoint(s, index, i):
+    """Return the byte position of the code point number 'i', which must
+    be between 0 and the length of 's' included."""
+    k = i >> INDEX_SHIFT
+    if k >= len(index):
+        # only when 'i' is the length of 's', a multiple of INDEX_STEP
+        return len(s)
+    pos = index[k]
+    i &= INDEX_STEP - 1
+    while i > 0:
+        pos = next_codepoint_pos(s, pos)
+        i -= 1
+    return pos
+
+def codepoint_index_at_offset(s, index, pos):
+    """Return the number of the code point that starts at byte position
+    'pos' (or the length of 's' if 'pos' is len(s))."""
+    lo = 0
+    hi = len(index)
+    while hi - lo > 1:
+        mid = (lo + hi) >> 1
+        if index[mid] <= pos:
+            lo = mid
+        else:
+            hi = mid
+    i = lo << INDEX_SHIFT
+    if lo < len(index):
+        p = index[lo]
+        while p < pos:
+            p = next_codepoint_pos(s, p)
+            i += 1
+    return i
@@ -0,0 +1,93 @@
+#! /usr/bin/env python
+
+import sys
+from time import time
+from rpython.rlib import rbigint as lobj
+from rpython.rlib.rbigint import rbigint
+
+# __________  Entry point  __________
+
+def entry_point(argv):
+    """
+        Measures the crossover points between the simple and the
+        subquadratic algorithms of rbigint, which are used to choose
+        TOOMCOOK_CUTOFF, DIV_LIMIT and FROMSTR_CUTOFF.
+
+        For every size (in digits), it prints the time taken by both
+        algorithms.  The cutoff should be set a bit above the size where
+        the second column starts to win.  Translate with --opt=2 and
+        run without arguments, or give the number of repetitions.
+    """
+    if len(argv) > 1:
+        repeat = int(argv[1])
+    else:
+        repeat = 200
+
+    print "mul        k_mul     tc_mul"
+    for size in [50, 100, 150, 200, 300, 400, 800]:
+        a = _make(size, 1)
+        b = _make(size, 2)
+        t = time()
+        for n in xrange(repeat):
+            lobj._k_mul(a, b)
+        t1 = time() - t
+        t = time()
+        for n in xrange(repeat):
+            lobj._tc_mul(a, b)
+        t2 = time() - t
+        print "%d: %f %f" % (size, t1, t2)
+
+    print "divmod     x_divrem  divmod_big"
+    for size in [30, 60, 90, 120, 180, 240, 480]:
+        a = _make(2 * size, 3)
+        b = _make(size, 4)
+        t = time()
+        for n in xrange(repeat):
+            lobj._x_divrem(a, b)
+        t1 = time() - t
+        t = time()
+        for n in xrange(repeat):
+            lobj._divmod_big(a, b)
+        t2 = time() - t
+        print "%d: %f %f" % (size, t1, t2)
+
+    print "fromstr    one-by-one  recursive"
+    for size in [250, 500, 1000, 2000, 4000, 8000]:
+        digits = [(i * 7 + 3) % 10 for i in range(size)]
+        t = time()
+        for n in xrange(repeat // 10 + 1):
+            _parse_one_by_one(digits)
+        t1 = time() - t
+        t = time()
+        for n in xrange(repeat // 10 + 1):
+            lobj._digits_to_bigint(digits, 10)
+        t2 = time() - t
+        print "%d: %f %f" % (size, t1, t2)
+
+    return 0
+
+def _make(size, seed):
+    digits = [lobj._store_digit((i * 1103515245 + seed * 12345) & lobj.MASK)
+              for i in range(size)]
+    digits[-1] = lobj._store_digit(lobj.MASK)
+    return rbigint(digits, 1, size)
+
+def _parse_one_by_one(digits):
+    a = rbigint()
+    tens, dig = 1, 0
+    for i in range(len(digits)):
+        dig = dig * 10 + digits[i]
+        tens *= 10
+        if tens == lobj.DEC_MAX or i == len(digits) - 1:
+            a = lobj._muladd1(a, tens, dig)
+            tens, dig = 1, 0
+    return a
+
+# _____ Define and setup target ___
+
+def target(*args):
+    return entry_point, None
+
+if __name__ == '__main__':
+    res = entry_point(sys.argv)
+    sys.exit(res)
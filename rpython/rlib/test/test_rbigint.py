@@ -790,6 +790,68 @@ class TestInternalFunctions(object):
         ret = lobj._k_lopsided_mul(f1, f2)
         assert ret.tolong() == f1.tolong() * f2.tolong()
 
+    def test__tc_mul(self):
+        seed(42)
+        for digs_a, digs_b in [(9, 9), (10, 12), (13, 30), (31, 32)]:
+            for f1 in [bigint([lobj.MASK] * digs_a, 1),
+                       rbigint.fromlong(randint(0, 1 << (SHIFT * digs_a)))]:
+                f2 = bigint([lobj.MASK] * digs_b, 1)
+                ret = lobj._tc_mul(f1, f2)
+                assert ret.tolong() == f1.tolong() * f2.tolong()
+                ret = lobj._tc_mul(f1, f1)
+                assert ret.tolong() == f1.tolong() ** 2
+
+    def test_mul_toomcook(self, monkeypatch):
+        monkeypatch.setattr(lobj, 'TOOMCOOK_CUTOFF', KARATSUBA_CUTOFF + 1)
+        x = 3 ** 2000 + 12345
+        y = -7 ** 1500
+        f1 = rbigint.fromlong(x)
+        f2 = rbigint.fromlong(y)
+        assert f1.mul(f2).tolong() == x * y
+        assert f1.mul(f1).tolong() == x * x
+
+    def test__divmod_big(self, monkeypatch):
+        monkeypatch.setattr(lobj, 'DIV_LIMIT', 3)
+        seed(42)
+        for digs_a, digs_b in [(8, 3), (20, 7), (21, 8), (40, 13), (50, 25)]:
+            x = randint(0, 1 << (SHIFT * digs_a))
+            y = randint(1 << (SHIFT * (digs_b - 1)), 1 << (SHIFT * digs_b))
+            for y in [y, (1 << (SHIFT * digs_b)) - 1]:
+                for x in [x, x // y * y, (y << (SHIFT * digs_a)) - 1]:
+                    div, rem = lobj._divmod_big(rbigint.fromlong(x),
+                                                rbigint.fromlong(y))
+                    assert (div.tolong(), rem.tolong()) == divmod(x, y)
+
+    def test_divmod_big(self, monkeypatch):
+        monkeypatch.setattr(lobj, 'DIV_LIMIT', 3)
+        x = 3 ** 1000 + 12345
+        y = 7 ** 200 - 1
+        for sx, sy in (1, 1), (1, -1), (-1, -1), (-1, 1):
+            div, rem = rbigint.fromlong(sx * x).divmod(rbigint.fromlong(sy * y))
+            assert (div.tolong(), rem.tolong()) == divmod(sx * x, sy * y)
+        assert rbigint.fromlong(x).str() == str(x)
+
+    def test__digits_to_bigint(self, monkeypatch):
+        monkeypatch.setattr(lobj, 'FROMSTR_CUTOFF', 5)
+        for base in [2, 10, 16, 36]:
+            for size in [1, 5, 6, 17, 100]:
+                digits = [(i * 7 + 3) % base for i in range(size)]
+                x = lobj._digits_to_bigint(digits, base)
+                expected = 0
+                for d in digits:
+                    expected = expected * base + d
+                assert x.tolong() == expected
+
+    def test_fromstr_big(self, monkeypatch):
+        monkeypatch.setattr(lobj, 'FROMSTR_CUTOFF', 5)
+        s = str(3 ** 300)
+        assert rbigint.fromstr(s).tolong() == 3 ** 300
+        assert rbigint.fromstr('-' + s).tolong() == -3 ** 300
+        assert rbigint.fromstr(s, 16).tolong() == long(s, 16)
+        assert rbigint.fromdecimalstr(s).tolong() == 3 ** 300
+        assert rbigint.fromdecimalstr('-' + s).tolong() == -3 ** 300
+        assert rbigint.fromdecimalstr('-' + '0' * 20).tolong() == 0
+
     def test_longlong(self):
         max = 1L << (r_longlong.BITS-1)
         f1 = rbigint.fromlong(max-1)    # fits in r_longlong
@@ -169,3 +169,48 @@ class TestPosixUnicode(BasePosixUnicodeOrAscii):
     def _get_filename(self):
         return (unicode(udir.join('test_open')) +
                 u'\u65e5\u672c.txt') # "Japan"
+
+def test_read_into():
+    from rpython.rtyper.lltypesystem import lltype, rffi
+    filename = str(udir.join('test_read_into.txt'))
+    with open(filename, 'w') as f:
+        f.write('hello, world')
+    def f(count):
+        fd = os.open(filename, os.O_RDONLY, 0)
+        buf = lltype.malloc(rffi.CCHARP.TO, 20, flavor='raw')
+        try:
+            got = rposix.read_into(fd, buf, count)
+            res = rffi.charpsize2str(buf, got)
+        finally:
+            lltype.free(buf, flavor='raw')
+            os.close(fd)
+        return len(res) * 100 + ord(res[-1])
+    assert f(20) == 12 * 100 + ord('d')
+    assert interpret(f, [5]) == 5 * 100 + ord('o')
+
+def test_sendfile():
+    if not rposix.HAVE_SENDFILE:
+        py.test.skip("no sendfile()")
+    src = str(udir.join('test_sendfile_src.txt'))
+    dst = str(udir.join('test_sendfile_dst.txt'))
+    with open(src, 'w') as f:
+        f.write('0123456789' * 1000)
+    def f(offset, count):
+        in_fd = os.open(src, os.O_RDONLY, 0)
+        out_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0666)
+        try:
+            res = rposix.sendfile(out_fd, in_fd, offset, count)
+            pos = os.lseek(in_fd, 0, 1)
+        finally:
+            os.close(in_fd)
+            os.close(out_fd)
+        return res * 100000 + pos
+    assert f(-1, 20000) == 10000 * 100000 + 10000
+    assert open(dst).read() == '0123456789' * 1000
+    assert interpret(f, [3, 4]) == 4 * 100000 + 0
+    assert open(dst).read() == '3456'
+    in_fd = os.open(src, os.O_RDONLY, 0)
+    try:
+        py.test.raises(OSError, rposix.sendfile, 12345, in_fd, 0, 10)
+    finally:
+        os.close(in_fd)
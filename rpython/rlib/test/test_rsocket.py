@@ -235,6 +235,75 @@ def test_simple_udp():
     s1.close()
     s2.close()
 
+def test_mmsg_udp():
+    if not rsocket._c.HAVE_MMSG:
+        py.test.skip('no recvmmsg() and sendmmsg()')
+    from rpython.rlib.buffer import StringBuffer
+    from rpython.rtyper.lltypesystem import lltype, rffi
+
+    class Buffer(StringBuffer):
+        # a buffer without raw memory
+        def __init__(self, size):
+            StringBuffer.__init__(self, '\x00' * size)
+            self.chars = ['\x00'] * size
+        def setitem(self, index, char):
+            self.chars[index] = char
+
+    class RawBuffer(StringBuffer):
+        def __init__(self, size):
+            StringBuffer.__init__(self, '\x00' * size)
+            self.raw = lltype.malloc(rffi.CCHARP.TO, size, flavor='raw')
+        def get_raw_address(self):
+            return self.raw
+
+    s1 = RSocket(AF_INET, SOCK_DGRAM)
+    s1.bind(INETAddress('127.0.0.1', INADDR_ANY))
+    addr1 = s1.getsockname()
+    s2 = RSocket(AF_INET, SOCK_DGRAM)
+    s2.bind(INETAddress('127.0.0.1', INADDR_ANY))
+    addr2 = s2.getsockname()
+
+    count = s2.sendmmsg([StringBuffer('hello'), StringBuffer('world!')], 0,
+                        [addr1, addr1])
+    assert count == 2
+    buffers = [Buffer(10), RawBuffer(3), Buffer(10)]
+    result = s1.recvmmsg_into(buffers)
+    assert len(result) == 2
+    assert result[0][0] == 5
+    assert ''.join(buffers[0].chars) == 'hello' + '\x00' * 5
+    assert result[1][0] == 3      # truncated
+    assert rffi.charpsize2str(buffers[1].raw, 3) == 'wor'
+    assert result[0][1].get_port() == addr2.get_port()
+    assert result[1][1].get_port() == addr2.get_port()
+    lltype.free(buffers[1].raw, flavor='raw')
+
+    s2.connect(addr1)
+    assert s2.sendmmsg([StringBuffer('x')]) == 1
+    s1.settimeout(10.0)
+    buffers = [Buffer(10)]
+    result = s1.recvmmsg_into(buffers)
+    assert [nbytes for nbytes, addr in result] == [1]
+    assert buffers[0].chars[0] == 'x'
+    s1.setblocking(False)
+    err = py.test.raises(CSocketError, s1.recvmmsg_into, buffers)
+    assert err.value.errno in (errno.EAGAIN, errno.EWOULDBLOCK)
+
+    # more datagrams than the arrays kept on the C stack
+    n = 40
+    data = [StringBuffer(str(i) * 3) for i in range(n)]
+    assert s2.sendmmsg(data) == n
+    buffers = [Buffer(8) for i in range(n)]
+    result = []
+    while len(result) < n:
+        s1.setblocking(True)
+        result += s1.recvmmsg_into(buffers[len(result):])
+    assert [nbytes for nbytes, addr in result] == [len(str(i)) * 3
+                                                   for i in range(n)]
+    for i in range(n):
+        assert ''.join(buffers[i].chars[:result[i][0]]) == str(i) * 3
+    s1.close()
+    s2.close()
+
 def test_nonblocking():
     sock = RSocket()
     sock.setblocking(False)
@@ -0,0 +1,57 @@
+import random
+import sys
+
+from rpython.rlib import rutf8
+from rpython.rtyper.test.test_llinterp import interpret
+
+
+def test_check_utf8():
+    for u in [u'', u'abc', u'\xe9t\xe9', u'\u20ac', u'a\u07ff\u0800b',
+              u'\uffff', u'\ud7ff\ue000']:
+        s = u.encode('utf-8')
+        assert rutf8.check_utf8(s) == len(u)
+    for s in ['\x80', 'a\xc3', '\xc0\x80', '\xc1\xbf', '\xe0\x80\x80',
+              '\xed\xa0\x80', '\xed\xbf\xbf', '\xf4\x90\x80\x80',
+              '\xf8\x88\x80\x80\x80', '\xe2\x82', '\xe2(\xac', '\xff']:
+        assert rutf8.check_utf8(s) == -1
+
+def test_check_utf8_nonbmp():
+    s = '\xf0\x9f\x92\xa9'
+    assert rutf8.check_utf8(s, allow_nonbmp=True) == 1
+    assert rutf8.check_utf8(s, allow_nonbmp=False) == -1
+    assert rutf8.check_utf8('\xf0\x8f\xbf\xbf', allow_nonbmp=True) == -1
+
+def test_codepoint_at_pos():
+    u = u'a\xe9\u20ac\U0001f4a9z'
+    s = u.encode('utf-8')
+    pos = 0
+    result = []
+    while pos < len(s):
+        result.append(rutf8.codepoint_at_pos(s, pos))
+        pos = rutf8.next_codepoint_pos(s, pos)
+    assert pos == len(s)
+    assert result == [0x61, 0xe9, 0x20ac, 0x1f4a9, 0x7a]
+
+def test_index_random():
+    chars = [u'a', u'\xe9', u'\u20ac', u'\ud7ff']
+    if sys.maxunicode > 0xffff:
+        chars.append(u'\U0001f4a9')
+    for length in [0, 1, 63, 64, 65, 127, 128, 200]:
+        u = u''.join([random.choice(chars) for i in range(length)])
+        s = u.encode('utf-8')
+        index = rutf8.create_index(s)
+        offsets = [len(u[:i].encode('utf-8')) for i in range(length + 1)]
+        for i in range(length + 1):
+            pos = rutf8.offset_of_codepoint(s, index, i)
+            assert pos == offsets[i]
+            assert rutf8.codepoint_index_at_offset(s, index, pos) == i
+
+def test_translated():
+    def f(n):
+        s = '\xc3\xa9' * n + 'abc'
+        index = rutf8.create_index(s)
+        pos = rutf8.offset_of_codepoint(s, index, n + 1)
+        assert rutf8.codepoint_index_at_offset(s, index, pos) == n + 1
+        return rutf8.check_utf8(s) * 1000 + pos
+    res = interpret(f, [100])
+    assert res == 103 * 1000 + 201
@@ -782,6 +782,9 @@ class LLFrame(object):
     def op_gc__collect(self, *gen):
         self.heap.collect(*gen)
 
+    def op_gc__collect_step(self):
+        return self.heap.collect_step()
+
     def op_gc_heap_stats(self):
         raise NotImplementedError
 
@@ -861,6 +864,12 @@ class LLFrame(object):
     def op_gc_set_max_heap_size(self, maxsize):
         raise NotImplementedError("gc_set_max_heap_size")
 
+    def op_gc_get_param(self, index):
+        return self.heap.get_gc_param(index)
+
+    def op_gc_set_param(self, index, value):
+        return self.heap.set_gc_param(index, value)
+
     def op_gc_asmgcroot_static(self, index):
         raise NotImplementedError("gc_asmgcroot_static")
 
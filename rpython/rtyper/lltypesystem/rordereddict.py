@@ -1097,27 +1097,34 @@ def ll_dict_setdefault(dict, key, default):
 def ll_dict_copy(dict):
     DICT = lltype.typeOf(dict).TO
     newdict = DICT.allocate()
-    newdict.entries = DICT.entries.TO.allocate(len(dict.entries))
+    # the copy gets exactly as many entries as there are live items: the
+    # deleted entries and the over-allocated room are not copied
+    num_live_items = dict.num_live_items
+    newdict.entries = DICT.entries.TO.allocate(num_live_items)
 
-    newdict.num_live_items = dict.num_live_items
-    newdict.num_ever_used_items = dict.num_ever_used_items
+    newdict.num_live_items = num_live_items
+    newdict.num_ever_used_items = num_live_items
     if hasattr(DICT, 'fnkeyeq'):
         newdict.fnkeyeq = dict.fnkeyeq
     if hasattr(DICT, 'fnkeyhash'):
         newdict.fnkeyhash = dict.fnkeyhash
 
-    i = 0
-    while i < newdict.num_ever_used_items:
-        d_entry = newdict.entries[i]
-        entry = dict.entries[i]
-        ENTRY = lltype.typeOf(newdict.entries).TO.OF
-        d_entry.key = entry.key
-        if hasattr(ENTRY, 'f_valid'):
-            d_entry.f_valid = entry.f_valid
-        d_entry.value = entry.value
-        if hasattr(ENTRY, 'f_hash'):
-            d_entry.f_hash = entry.f_hash
-        i += 1
+    ENTRY = lltype.typeOf(newdict.entries).TO.OF
+    entries = dict.entries
+    isrc = 0
+    idst = 0
+    while idst < num_live_items:
+        if entries.valid(isrc):
+            d_entry = newdict.entries[idst]
+            entry = entries[isrc]
+            d_entry.key = entry.key
+            if hasattr(ENTRY, 'f_valid'):
+                d_entry.f_valid = True
+            d_entry.value = entry.value
+            if hasattr(ENTRY, 'f_hash'):
+                d_entry.f_hash = entry.f_hash
+            idst += 1
+        isrc += 1
 
     ll_dict_reindex(newdict, _ll_len_of_d_indexes(dict))
     return newdict
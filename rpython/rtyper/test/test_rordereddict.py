@@ -258,6 +258,31 @@ class TestRDictDirect(object):
             assert rordereddict.ll_dict_get(ll_d3, llstr("j"), 42) == 2
             assert rordereddict.ll_dict_get(ll_d3, llstr("i"), 42) == 42
 
+    def test_copy_skips_deleted_entries(self):
+        DICT = self._get_str_dict()
+        ll_d = rordereddict.ll_newdict(DICT)
+        for i in range(10):
+            rordereddict.ll_dict_setitem(ll_d, llstr(str(i)), i)
+        for i in range(0, 10, 3):
+            rordereddict.ll_dict_delitem(ll_d, llstr(str(i)))
+        ll_d2 = rordereddict.ll_dict_copy(ll_d)
+        assert ll_d2.num_live_items == ll_d2.num_ever_used_items == 6
+        assert len(ll_d2.entries) == 6
+        ITER = rordereddict.get_ll_dictiter(lltype.Ptr(DICT))
+        ll_iter = rordereddict.ll_dictiter(ITER, ll_d2)
+        ll_dictnext = rordereddict._ll_dictnext
+        keys = []
+        for i in range(6):
+            num = ll_dictnext(ll_iter)
+            keys.append(hlstr(ll_d2.entries[num].key))
+        assert keys == ['1', '2', '4', '5', '7', '8']
+        for i in range(10):
+            expected = 42 if i % 3 == 0 else i
+            assert rordereddict.ll_dict_get(ll_d2, llstr(str(i)), 42) == expected
+        rordereddict.ll_dict_setitem(ll_d2, llstr("x"), 11)
+        assert rordereddict.ll_dict_getitem(ll_d2, llstr("x")) == 11
+        assert rordereddict.ll_dict_get(ll_d, llstr("x"), 42) == 42
+
     def test_update(self):
         DICT = self._get_str_dict()
         ll_d1 = rordereddict.ll_newdict(DICT)
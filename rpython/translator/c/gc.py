@@ -67,6 +67,12 @@ class BasicGcPolicy(object):
     def OP_GC_SET_MAX_HEAP_SIZE(self, funcgen, op):
         return ''
 
+    def OP_GC_GET_PARAM(self, funcgen, op):
+        return '%s = -1.0;' % (funcgen.expr(op.result),)
+
+    def OP_GC_SET_PARAM(self, funcgen, op):
+        return '%s = 0;' % (funcgen.expr(op.result),)
+
     def OP_GC_THREAD_PREPARE(self, funcgen, op):
         return ''
 
@@ -157,6 +163,9 @@ class RefcountingGcPolicy(BasicGcPolicy):
     def OP_GC__COLLECT(self, funcgen, op):
         return ''
 
+    def OP_GC__COLLECT_STEP(self, funcgen, op):
+        return '%s = 1;' % (funcgen.expr(op.result),)
+
     def OP_GC__DISABLE_FINALIZERS(self, funcgen, op):
         return ''
 
@@ -261,6 +270,9 @@ class BoehmGcPolicy(BasicGcPolicy):
     def OP_GC__COLLECT(self, funcgen, op):
         return 'GC_gcollect();'
 
+    def OP_GC__COLLECT_STEP(self, funcgen, op):
+        return 'GC_gcollect(); %s = 1;' % (funcgen.expr(op.result),)
+
     def OP_GC_SET_MAX_HEAP_SIZE(self, funcgen, op):
         nbytes = funcgen.expr(op.args[0])
         return 'GC_set_max_heap_size(%s);' % (nbytes,)
@@ -1,4 +1,5 @@
 import contextlib
+import marshal
 import py
 import sys, os
 from rpython.rlib import exports
@@ -239,9 +240,13 @@ class CBuilder(object):
                     defines['USE___THREAD'] = 1
             if self.config.translation.shared:
                 defines['PYPY_MAIN_FUNCTION'] = "pypy_main_startup"
+        jobs = self.config.translation.source_jobs
+        if 'PYPY_INSTRUMENT' in defines:
+            jobs = 1    # the counters are numbered while writing the source
         self.eci, cfile, extra, headers_to_precompile = \
                 gen_source(db, modulename, targetdir,
-                           self.eci, defines=defines, split=self.split)
+                           self.eci, defines=defines, split=self.split,
+                           jobs=jobs)
         self.c_source_filename = py.path.local(cfile)
         self.extrafiles = self.eventually_copy(extra)
         self.gen_makefile(targetdir, exe_name=exe_name,
@@ -394,6 +399,16 @@ class CStandaloneBuilder(CBuilder):
             shared=self.config.translation.shared,
             icon=self.config.translation.icon)
 
+        if (self.config.translation.objcache and
+                self.translator.platform.name != 'msvc'):
+            # compile through objcache.py, which reuses the object files
+            # of previous translations
+            objcache = py.path.local(__file__).dirpath().join('objcache.py')
+            cachedir = py.path.local(self.config.translation.objcache)
+            mk.definition('CC', "%s %s %s '%s'" % (
+                sys.executable, objcache, cachedir.ensure(dir=1),
+                self.translator.platform.cc))
+
         if self.has_profopt():
             profopt = self.config.translation.profopt
             mk.definition('ABS_TARGET', str(targetdir.join('$(TARGET)')))
@@ -504,6 +519,7 @@ class SourceGenerator:
         self.headers_to_precompile = []
         self.path = None
         self.namespace = NameManager()
+        self.implementations = None
 
     def set_strategy(self, path, split=True):
         all_nodes = list(self.database.globalcontainers())
@@ -537,6 +553,83 @@ class SourceGenerator:
     def getextrafiles(self):
         return self.extrafiles
 
+    def compute_implementations(self, jobs):
+        """Generate the C code of all nodes in 'jobs' forked processes.
+        Each child handles every jobs'th node and sends back the code in
+        a marshalled temporary file, together with the entries that the
+        node added to database.late_initializations.  A node can also
+        change the database in other ways, e.g. by finding a container
+        very late: the child stops at the first such node, and the parent
+        generates it and the rest of the child's nodes itself."""
+        nodes = self.othernodes + self.funcnodes
+        sys.stdout.flush()
+        sys.stderr.flush()
+        children = []
+        for i in range(jobs):
+            filename = udir.join('implementations_%d' % i)
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    results = self._implementations_in_child(nodes[i::jobs])
+                    f = open(str(filename), 'wb')
+                    marshal.dump(results, f)
+                    f.close()
+                except:
+                    import traceback
+                    traceback.print_exc()
+                    os._exit(1)
+                os._exit(0)
+            children.append((pid, filename))
+        failed = []
+        for pid, filename in children:
+            _, status = os.waitpid(pid, 0)
+            if status != 0:
+                failed.append(pid)
+        if failed:
+            raise Exception("generating the C source failed in process(es) "
+                            "%s, see the traceback(s) above" % (failed,))
+        self.implementations = {}
+        for i, (pid, filename) in enumerate(children):
+            f = open(str(filename), 'rb')
+            results = marshal.load(f)
+            f.close()
+            filename.remove()
+            for node, result in zip(nodes[i::jobs], results):
+                self.implementations[node] = result
+
+    def _implementations_in_child(self, nodes):
+        db = self.database
+        # count the names made, as this changes the global namespace
+        # even when the name was seen before
+        names_made = [0]
+        uniquename = db.namespace.uniquename
+        def counting_uniquename(*args, **kwds):
+            names_made[0] += 1
+            return uniquename(*args, **kwds)
+        db.namespace.uniquename = counting_uniquename
+        def state():
+            return (names_made[0], len(db.containernodes),
+                    len(db.structdefnodes), len(db.pendingsetupnodes),
+                    len(db.delayedfunctionptrs), len(db.externalfuncs),
+                    len(db.helper2ptr), db.instrument_ncounter)
+        results = []
+        for node in nodes:
+            before = state()
+            nlate = len(db.late_initializations)
+            impl = '\n'.join(node.implementation())
+            if state() != before:
+                break
+            results.append((impl, db.late_initializations[nlate:]))
+        return results
+
+    def getimplementation(self, node):
+        if self.implementations is not None and node in self.implementations:
+            impl, late_initializations = self.implementations.pop(node)
+            self.database.late_initializations.extend(late_initializations)
+        else:
+            impl = '\n'.join(list(node.implementation()))
+        return impl.split('\n')
+
     def getothernodes(self):
         return self.othernodes[:]
 
@@ -588,7 +681,7 @@ class SourceGenerator:
             def subiter():
                 used = nextra
                 for node in iternodes:
-                    impl = '\n'.join(list(node.implementation())).split('\n')
+                    impl = self.getimplementation(node)
                     if not impl:
                         continue
                     cost = len(impl) + nbetween
@@ -814,7 +907,7 @@ def add_extra_files(eci):
 
 
 def gen_source(database, modulename, targetdir,
-               eci, defines={}, split=False):
+               eci, defines={}, split=False, jobs=1):
     if isinstance(targetdir, str):
         targetdir = py.path.local(targetdir)
 
@@ -846,6 +939,8 @@ def gen_source(database, modulename, targetdir,
     sg = SourceGenerator(database)
     sg.set_strategy(targetdir, split)
     database.prepare_inline_helpers()
+    if jobs > 1 and hasattr(os, 'fork'):
+        sg.compute_implementations(jobs)
     sg.gen_readable_parts_of_source(f)
     headers_to_precompile = sg.headers_to_precompile[:]
     headers_to_precompile.insert(0, incfilename)
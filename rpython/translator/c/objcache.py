@@ -0,0 +1,77 @@
+#! /usr/bin/env python
+"""
+Compiler wrapper used by the Makefile when translating with --objcache.
+
+    objcache.py CACHEDIR 'CC' ARGS...
+
+Runs 'CC ARGS...', except that when ARGS compile a single .c file to an
+object file, the object file is looked up in CACHEDIR first, keyed on the
+preprocessed source and on the command line.  After a small change, most
+of the generated C files are identical to the ones of the previous
+translation and don't need to be compiled again.
+"""
+
+import sys, os
+import hashlib
+import shlex
+import shutil
+import subprocess
+
+
+def get_source_and_output(args):
+    if '-c' not in args or '-o' not in args:
+        return None, None
+    sources = [arg for arg in args if arg.endswith('.c')]
+    if len(sources) != 1:
+        return None, None
+    i = args.index('-o')
+    if i + 1 >= len(args):
+        return None, None
+    return sources[0], args[i + 1]
+
+
+def compute_key(cc, args):
+    i = args.index('-o')
+    key_args = args[:i] + args[i+2:]
+    preprocess_args = [arg for arg in key_args if arg != '-c'] + ['-E']
+    p = subprocess.Popen(cc + preprocess_args, stdout=subprocess.PIPE)
+    preprocessed, _ = p.communicate()
+    if p.returncode != 0:
+        return None
+    h = hashlib.sha1()
+    h.update('\x00'.join(cc + key_args))
+    h.update('\x00')
+    h.update(preprocessed)
+    return h.hexdigest()
+
+
+def main(argv):
+    cachedir, cc, args = argv[1], shlex.split(argv[2]), argv[3:]
+    source, output = get_source_and_output(args)
+    if source is None:
+        return subprocess.call(cc + args)
+    key = compute_key(cc, args)
+    if key is None:
+        # let the compiler report the error
+        return subprocess.call(cc + args)
+    cached = os.path.join(cachedir, key[:2], key[2:] + '.o')
+    if os.path.exists(cached):
+        shutil.copyfile(cached, output)
+        return 0
+    returncode = subprocess.call(cc + args)
+    if returncode == 0:
+        try:
+            if not os.path.isdir(os.path.dirname(cached)):
+                os.makedirs(os.path.dirname(cached))
+            # several compilations may run in parallel: write to a
+            # temporary file and rename it, which is atomic
+            tmp = '%s.%d.tmp' % (cached, os.getpid())
+            shutil.copyfile(output, tmp)
+            os.rename(tmp, cached)
+        except (IOError, OSError):
+            pass     # the cache is only an optimization
+    return returncode
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -29,6 +29,10 @@ typedef enum RPyLockStatus {
 RPY_EXTERN void RPyGilAllocate(void);
 RPY_EXTERN long RPyGilYieldThread(void);
 RPY_EXTERN void RPyGilAcquire(void);
+RPY_EXTERN long RPyGilYieldThreadIfRequested(void);
+RPY_EXTERN void RPyGilSetSwitchInterval(long microseconds);
+RPY_EXTERN long RPyGilGetSwitchInterval(void);
+RPY_EXTERN void RPyGilSetTicker(long *ticker);
 #define RPyGilRelease _RPyGilRelease
 #define RPyFetchFastGil _RPyFetchFastGil
 
@@ -34,6 +34,16 @@
      explicitly yield the GIL to thread 2: it does so by releasing
      'mutex_gil' (which is otherwise not released) but keeping the
      value of 'rpy_fastgil' to 1.
+
+   - Thread 1 only does so when asked to.  Once thread 2 has been
+     waiting for longer than the switch interval, it sets
+     'rpy_gil_drop_request' and forces the ticker (if one was given
+     with RPyGilSetTicker()) to -1, exactly like a signal would.  The
+     next ticker check of thread 1, which JIT-compiled loops do too,
+     ends up in RPyGilYieldThreadIfRequested().  Thread 2 keeps forcing
+     the ticker for as long as it waits, so that a concurrent
+     decrement of the ticker by thread 1 cannot make it lose the
+     request.
 */
 
 long rpy_fastgil = 1;
@@ -41,6 +51,10 @@ long rpy_waiting_threads = -42;    /* GIL not initialized */
 static mutex1_t mutex_gil_stealer;
 static mutex2_t mutex_gil;
 
+static long rpy_switch_interval = 5000;     /* in microseconds */
+static long rpy_gil_drop_request = 0;
+static long *rpy_gil_ticker = NULL;
+
 void RPyGilAllocate(void)
 {
     assert(RPY_FASTGIL_LOCKED(rpy_fastgil));
@@ -54,6 +68,7 @@ void RPyGilAcquire(void)
     /* Acquires the GIL.
      */
     long old_fastgil = lock_test_and_set(&rpy_fastgil, 1);
+    long waited;    /* in microseconds, roughly */
 
     if (!RPY_FASTGIL_LOCKED(old_fastgil)) {
         /* The fastgil was not previously locked: success.
@@ -77,6 +92,7 @@ void RPyGilAcquire(void)
         mutex2_loop_start(&mutex_gil);
 
         /* We are now the stealer thread.  Steals! */
+        waited = 0;
         while (1) {
             /* Sleep for one interval of time.  We may be woken up earlier
                if 'mutex_gil' is released.
@@ -98,8 +114,19 @@ void RPyGilAcquire(void)
                     /* yes, got a non-held value!  Now we hold it. */
                     break;
             }
+
+            /* Waited for too long?  Then ask the thread holding the
+               GIL to give it to us.
+            */
+            waited += 100;
+            if (waited >= rpy_switch_interval) {
+                rpy_gil_drop_request = 1;
+                if (rpy_gil_ticker != NULL)
+                    *rpy_gil_ticker = -1;
+            }
             /* Otherwise, loop back. */
         }
+        rpy_gil_drop_request = 0;
         atomic_decrement(&rpy_waiting_threads);
         mutex2_loop_stop(&mutex_gil);
         mutex1_unlock(&mutex_gil_stealer);
@@ -146,6 +173,34 @@ long RPyGilYieldThread(void)
     return 1;
 }
 
+long RPyGilYieldThreadIfRequested(void)
+{
+    /* Called regularly by the thread holding the GIL.  Gives the GIL
+       to the next waiting thread, but only if it has been waiting for
+       longer than the switch interval.
+    */
+    if (!rpy_gil_drop_request)
+        return 0;
+    return RPyGilYieldThread();
+}
+
+void RPyGilSetSwitchInterval(long microseconds)
+{
+    if (microseconds < 1)
+        microseconds = 1;
+    rpy_switch_interval = microseconds;
+}
+
+long RPyGilGetSwitchInterval(void)
+{
+    return rpy_switch_interval;
+}
+
+void RPyGilSetTicker(long *ticker)
+{
+    rpy_gil_ticker = ticker;
+}
+
 /********** for tests only **********/
 
 /* These functions are usually defined as a macros RPyXyz() in thread.h
@@ -125,6 +125,82 @@ class TestStandalone(StandaloneTests):
                         'rpython_translator_c_test_test_standalone.c'):
             assert cbuilder.targetdir.join(expfile) in gen_c_files
 
+    def test_source_jobs(self):
+        if not hasattr(os, 'fork'):
+            py.test.skip("needs fork()")
+        def entry_point(argv):
+            lst = [str(i) * i for i in range(len(argv) + 3)]
+            os.write(1, ','.join(lst) + "\n")
+            return 0
+
+        self.config = get_combined_translation_config(translating=True)
+        t, cbuilder1 = self.compile(entry_point)
+        self.config = get_combined_translation_config(translating=True)
+        self.config.translation.source_jobs = 3
+        t, cbuilder2 = self.compile(entry_point)
+        assert cbuilder2.cmdexec('x') == ',1,22,333,4444\n'
+        # same split into files as a serial build
+        def names(cbuilder):
+            main = cbuilder.targetdir.basename + '.c'
+            return sorted([f.basename for f in cbuilder.targetdir.listdir('*.[ch]')
+                           if f.basename != main])
+        assert names(cbuilder1) == names(cbuilder2)
+
+    def test_source_jobs_float_constants(self):
+        if not hasattr(os, 'fork'):
+            py.test.skip("needs fork()")
+        # prebuilt infinities and nans are patched by the startup code
+        inf = float('inf')
+        lst = [1.5, inf, -inf, inf - inf]
+        def entry_point(argv):
+            x = lst[len(argv)]
+            os.write(1, '%s %s %s\n' % (x, lst[1] > 1e308,
+                                        lst[3] != lst[3]))
+            return 0
+
+        self.config = get_combined_translation_config(translating=True)
+        self.config.translation.source_jobs = 3
+        t, cbuilder = self.compile(entry_point)
+        assert cbuilder.cmdexec('') == 'inf 1 1\n'
+        assert cbuilder.cmdexec('x') == '-inf 1 1\n'
+
+    def test_objcache(self):
+        if sys.platform == 'win32':
+            py.test.skip("only for Makefiles calling a gcc-like compiler")
+        from rpython.translator.c import objcache
+        def entry_point(argv):
+            os.write(1, "cached\n")
+            return 0
+
+        cachedir = udir.join('test_objcache')
+        self.config = get_combined_translation_config(translating=True)
+        self.config.translation.objcache = str(cachedir)
+        t, cbuilder = self.compile(entry_point)
+        assert cbuilder.cmdexec('') == 'cached\n'
+        cached = list(cachedir.visit('*.o'))
+        assert len(cached) > 0
+        # compiling the same source again, from another directory, is
+        # served from the cache (the Makefile uses relative paths)
+        cc = cbuilder.translator.platform.cc
+        entries = set(cachedir.visit('*.o'))
+        objs = []
+        for name in ['first', 'second']:
+            d = udir.join('test_objcache_' + name).ensure(dir=1)
+            d.join('x.c').write('int foo(int x) { return x + 42; }\n')
+            old = d.chdir()
+            try:
+                res = objcache.main(['objcache.py', str(cachedir), cc,
+                                     '-c', 'x.c', '-o', 'x.o'])
+            finally:
+                old.chdir()
+            assert res == 0
+            objs.append(d.join('x.o').read('rb'))
+            if name == 'first':
+                entries2 = set(cachedir.visit('*.o'))
+                assert len(entries2) == len(entries) + 1
+        assert set(cachedir.visit('*.o')) == entries2
+        assert objs[0] == objs[1]
+
     def test_print(self):
         def entry_point(argv):
             print "hello simpler world"
@@ -304,6 +304,14 @@ class TranslationDriver(SimpleTaskEngine):
 
         annotator = translator.buildannotator(policy=policy)
 
+        get_gchooks = self.extra.get('get_gchooks', None)
+        if (get_gchooks is not None and
+                self.config.translation.gctransformer == 'framework'):
+            # read by the framework GC transformer
+            from rpython.memory.gc.hook import annotate_hooks
+            translator._gchooks = get_gchooks(self)
+            annotate_hooks(annotator, translator._gchooks)
+
         if self.secondary_entrypoints is not None:
             for func, inputtypes in self.secondary_entrypoints:
                 if inputtypes == Ellipsis: